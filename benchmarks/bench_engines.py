@@ -0,0 +1,66 @@
+"""
+추출 엔진 비교 벤치마크: 기존 재귀 엔진(recursive_engine) vs TreeCursor 단일 패스 엔진 vs 쿼리 엔진(--query).
+
+같은 파싱 트리에 대해 엔진별 시간과 결과 일치 여부를 출력하고,
+깊은 else-if 체인에서 재귀 한도 초과 여부를 확인한다.
+
+실행: python -m benchmarks.bench_engines [--skip-recursive]
+"""
+import sys
+import time
+import warnings
+
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+from eep_checker import parser
+from eep_checker.source import SourceBuffer
+from eep_checker.records import as_dict
+from benchmarks.recursive_engine import extract_functions_with_enum_recursive
+from benchmarks.synth import ENUM_NAME, make_c_source, make_else_if_chain
+
+SIZES = (1_000, 10_000, 30_000)
+CHAIN_DEPTH = 3_000
+
+
+def run_engine(engine, code, tree, analyze_callers):
+    source = SourceBuffer(code)
+    t0 = time.perf_counter()
+    try:
+        results = engine(tree.root_node, code, ENUM_NAME, analyze_callers=analyze_callers, source=source)
+    except RecursionError:
+        return None, time.perf_counter() - t0
+    elapsed = time.perf_counter() - t0
+    # 기존 재귀 엔진은 dict, 나머지는 레코드를 반환하므로 비교를 위해 dict로 맞춘다
+    return [as_dict(r) for r in results], elapsed
+
+
+def main():
+    engines = [
+        ('recursive', extract_functions_with_enum_recursive),
+        ('visitor', parser.extract_functions_with_enum),
+        ('query', parser.extract_functions_with_enum_query),
+    ]
+    if '--skip-recursive' in sys.argv:
+        engines = engines[1:]
+
+    header = f"{'lines':>8} {'callers':>8} " + ' '.join(f"{name + '(ms)':>14}" for name, _ in engines) + f" {'same':>5}"
+    print(header)
+    for lines in SIZES:
+        code = make_c_source(lines).encode()
+        tree = parser.parser.parse(code)
+        for analyze_callers in (False, True):
+            runs = [run_engine(e, code, tree, analyze_callers) for _, e in engines]
+            same = all(r == runs[0][0] for r, _ in runs)
+            print(f"{lines:>8} {str(analyze_callers):>8} " + ' '.join(f"{t * 1e3:>14.1f}" for _, t in runs) + f" {str(same):>5}")
+
+    code = make_else_if_chain(CHAIN_DEPTH).encode()
+    tree = parser.parser.parse(code)
+    print(f"\nelse-if 체인 깊이 {CHAIN_DEPTH}:")
+    for name, engine in engines:
+        results, elapsed = run_engine(engine, code, tree, False)
+        status = 'RecursionError' if results is None else f"{len(results)}건"
+        print(f"  {name:>10}: {status} ({elapsed * 1e3:.1f}ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+식별자 색인 벤치마크: 파일마다 파싱하는 분석 vs 색인(IdentifierIndex)으로 답하는 query.
+
+합성 프로젝트(파일 N개)를 임시 폴더에 만들고 다음 시간을 잰다.
+  - parse: 모든 파일을 파싱해 분석 (사전 필터/캐시 없음, 기존 analyze)
+  - index build: 색인 처음 만들기
+  - index update: 바뀐 파일이 없을 때 갱신 (stat만)
+  - index update (1 changed): 파일 하나를 고친 뒤 갱신
+  - query: 색인으로 ENUM 결과 만들기 (코드 잘라내기 포함)
+parse와 query의 결과(함수 이름/라인)가 같은지도 확인한다.
+
+실행: python -m benchmarks.bench_index [--files N] [--lines N]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+from eep_checker.callgraph import SourceLoader
+from eep_checker.index import IdentifierIndex
+from eep_checker.parallel import analyze_files
+from eep_checker.targets import EnumTargets
+from benchmarks.synth import ENUM_NAME, make_c_source
+
+DEFAULT_FILES = 200
+DEFAULT_LINES = 2000
+
+
+def make_project(root, files, lines):
+    paths = []
+    for i in range(files):
+        path = os.path.join(root, f"module_{i:04d}.c")
+        with open(path, 'w') as f:
+            f.write(make_c_source(lines, hit_ratio=0.05 if i % 5 == 0 else 0.0, seed=i))
+        paths.append(path)
+    return paths
+
+
+def summarize(outcomes):
+    return [(rel_path, [(r['func_name'], r['start_line'], r['enum_lines']) for r in results.get(ENUM_NAME, ())])
+            for rel_path, results, _, _ in outcomes]
+
+
+def timed(label, func):
+    t0 = time.perf_counter()
+    value = func()
+    print(f"{label:<28} {time.perf_counter() - t0:8.3f}s")
+    return value
+
+
+def main():
+    files = DEFAULT_FILES
+    lines = DEFAULT_LINES
+    if '--files' in sys.argv:
+        files = int(sys.argv[sys.argv.index('--files') + 1])
+    if '--lines' in sys.argv:
+        lines = int(sys.argv[sys.argv.index('--lines') + 1])
+
+    root = tempfile.mkdtemp(prefix='eep_bench_index_')
+    try:
+        paths = make_project(root, files, lines)
+        print(f"합성 프로젝트: 파일 {files}개 x {lines}줄")
+        targets = EnumTargets([ENUM_NAME])
+        options = {'encoding': 'utf-8', 'debug': False, 'query_mode': False, 'analyze_callers': False,
+                   'context_lines': None}
+        parsed = timed('parse (analyze)', lambda: analyze_files(paths, root, targets, options))
+
+        index = IdentifierIndex(os.path.join(root, '.index', 'index.sqlite'))
+        timed('index build', lambda: index.update(paths, root))
+        timed('index update', lambda: index.update(paths, root))
+        with open(paths[0], 'a') as f:
+            f.write(f"int extra(void) {{ return {ENUM_NAME}; }}\n")
+        timed('index update (1 changed)', lambda: index.update(paths, root))
+        parsed[0] = analyze_files(paths[:1], root, targets, options)[0]
+
+        loader = SourceLoader(root, 'utf-8')
+        queried = timed('query', lambda: list(index.outcomes(paths, root, targets, loader)))
+        index.close()
+        size = sum(os.path.getsize(os.path.join(root, '.index', name)) for name in os.listdir(os.path.join(root, '.index')))
+        print(f"색인 크기: {size / 1024 / 1024:.1f} MB")
+        print("결과 일치" if summarize(parsed) == summarize(queried) else "결과 불일치!")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
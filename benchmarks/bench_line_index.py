@@ -0,0 +1,69 @@
+"""
+줄 인덱스(SourceBuffer) 스케일링 벤치마크.
+
+1k/10k/100k 줄 파일에서 추출 엔진 시간을 재고, 줄당 시간이
+파일 크기와 무관하게 거의 일정한지(선형 스케일링) 확인한다.
+기존 방식(오프셋마다 code.count(b'\\n', 0, offset))과의 비교도 함께 출력한다.
+
+실행: python -m benchmarks.bench_line_index
+"""
+import time
+import warnings
+
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+from eep_checker import parser
+from eep_checker.source import SourceBuffer
+from benchmarks.synth import ENUM_NAME, make_c_source
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def identifier_offsets(root):
+    offsets = []
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        if n.type == 'identifier':
+            offsets.append(n.start_byte)
+        stack.extend(n.children)
+    return offsets
+
+
+def bench(lines):
+    code = make_c_source(lines).encode()
+    tree = parser.parser.parse(code)
+    offsets = identifier_offsets(tree.root_node)
+
+    t0 = time.perf_counter()
+    source = SourceBuffer(code)
+    index_lines = [source.line_of(o) for o in offsets]
+    t_index = time.perf_counter() - t0
+
+    # 기존 방식은 100k에서 너무 오래 걸리므로 앞쪽 일부 샘플로 추정
+    sample = offsets[::max(1, len(offsets) // 2000)]
+    t0 = time.perf_counter()
+    count_lines = [code.count(b'\n', 0, o) + 1 for o in sample]
+    t_count = (time.perf_counter() - t0) * len(offsets) / max(1, len(sample))
+    assert count_lines == [source.line_of(o) for o in sample]
+
+    t0 = time.perf_counter()
+    results = parser.extract_functions_with_enum(tree.root_node, code, ENUM_NAME, source=source)
+    t_extract = time.perf_counter() - t0
+    return len(offsets), len(results), t_index, t_count, t_extract
+
+
+def main():
+    print(f"{'lines':>8} {'idents':>8} {'hits':>6} {'index(ms)':>10} {'count(ms)':>10} {'extract(ms)':>12} {'us/line':>8}")
+    bench(SIZES[0])  # 워밍업 (import, 파서 초기화 비용 제외)
+    per_line = []
+    for lines in SIZES:
+        n_ids, n_hits, t_index, t_count, t_extract = bench(lines)
+        per_line.append(t_extract / lines)
+        print(f"{lines:>8} {n_ids:>8} {n_hits:>6} {t_index * 1e3:>10.1f} {t_count * 1e3:>10.1f} "
+              f"{t_extract * 1e3:>12.1f} {t_extract / lines * 1e6:>8.2f}")
+    print(f"\n줄당 추출 시간 비율 (100k / 1k): {per_line[-1] / per_line[0]:.2f}x (1.0에 가까울수록 선형)")
+
+
+if __name__ == '__main__':
+    main()
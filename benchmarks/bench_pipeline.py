@@ -0,0 +1,270 @@
+"""
+분석 파이프라인 단계별 벤치마크 (합성 프로젝트, 기준값 대비 회귀 검사).
+
+benchmarks.synth.make_project로 만든 합성 C 프로젝트를 분석하면서 단계마다 시간을 따로 잰다.
+  - walk: 폴더 탐색 (find_c_files)
+  - read: 파일 읽기 (read_file)
+  - preprocess: 전처리기 지시문 지우기 (load_source)
+  - parse: tree-sitter 파싱
+  - extract: ENUM 사용 위치/호출 간선 추출 (함수 AST 지문 포함)
+  - dedup: 파일별 결과 정리 (_finalize_results)와 파일 사이 같은 함수 묶기 (FunctionClusters)
+  - callers: 프로젝트 전체 호출 그래프로 호출자 연결
+  - html / csv / prompt: 보고서/프롬프트 쓰기 (코드 잘라내기 포함)
+단계마다 --repeat번 실행한 것 중 가장 짧은 시간을 JSON으로 저장한다.
+
+--check를 주면 저장된 기준값(benchmarks/baselines/pipeline_{scale}.json)과 비교해
+어느 단계든 --threshold 비율(그리고 --min-delta초)보다 느려졌으면 종료 코드 1로 끝난다.
+기준값은 같은 기계에서 --save-baseline으로 다시 만든다.
+
+실행:
+  python -m benchmarks.bench_pipeline [--scale tiny|small|medium|1m] [--check] [--save-baseline]
+  python -m benchmarks.bench_pipeline --files 40 --lines 3000 --hit-ratio 0.05 --fan-in 8 --output result.json
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+from eep_checker import parser
+from eep_checker.callgraph import CallerResolver, SourceLoader, build_call_graph
+from eep_checker.csv_report import CsvReportWriter
+from eep_checker.dedup import FunctionClusters
+from eep_checker.prompt import make_llm_prompt
+from eep_checker.report import HtmlReportWriter
+from eep_checker.source import load_source, read_file
+from eep_checker.targets import EnumTargets
+from utils import PromptFileWriter, find_c_files
+from benchmarks.synth import ENUM_NAME, PROJECT_DEFAULTS, make_project
+
+RESULT_FORMAT = 1
+STAGES = ('walk', 'read', 'preprocess', 'parse', 'extract', 'dedup', 'callers', 'html', 'csv', 'prompt')
+# 프리셋: 10개 파일부터 약 100만 줄까지
+SCALES = {
+    'tiny': {'files': 10, 'lines': 200},
+    'small': {'files': 100, 'lines': 1000},
+    'medium': {'files': 250, 'lines': 2000},
+    '1m': {'files': 500, 'lines': 2000},
+}
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA = 0.05
+
+
+def run_pipeline(root, out_dir, encoding='utf-8'):
+    """
+    root의 프로젝트를 한 번 분석하며 단계별 시간을 잰다.
+
+    Returns:
+        tuple: ({단계: 초}, {'files', 'functions', 'enum_uses', 'callers'})
+    """
+    times = dict.fromkeys(STAGES, 0.0)
+    clock = time.perf_counter
+    targets = EnumTargets([ENUM_NAME])
+    ts_parser = parser.thread_parser()
+
+    t0 = clock()
+    c_files = find_c_files(root)
+    times['walk'] = clock() - t0
+
+    outcomes = []        # build_call_graph 입력 (rel_path, {}, None, {'calls'})
+    found = []           # 파일별 {ENUM: 결과}
+    clusters = FunctionClusters()
+    first = []           # 묶음마다 처음 나온 결과 (프롬프트 대상)
+    for path in c_files:
+        rel_path = os.path.relpath(path, root)
+        t0 = clock()
+        _, data = read_file(path)
+        t1 = clock()
+        source = load_source(data, encoding)
+        t2 = clock()
+        tree = ts_parser.parse(source.data)
+        t3 = clock()
+        edges = []
+        raw = parser.extract_functions_with_enums(tree.root_node, source.data, targets, analyze_callers=True,
+                                                  source=source, call_edges=edges, fingerprints=True)
+        t4 = clock()
+        results = {enum_name: parser._finalize_results(rs, rel_path, enum_name) for enum_name, rs in raw.items()}
+        first.extend(r for r in results.get(ENUM_NAME, ()) if clusters.add(ENUM_NAME, r))
+        t5 = clock()
+        times['read'] += t1 - t0
+        times['preprocess'] += t2 - t1
+        times['parse'] += t3 - t2
+        times['extract'] += t4 - t3
+        times['dedup'] += t5 - t4
+        outcomes.append((rel_path, {}, None, {'calls': edges}))
+        if any(results.values()):
+            found.append(results)
+
+    t0 = clock()
+    loader = SourceLoader(root, encoding)
+    resolver = CallerResolver(build_call_graph(outcomes), loader)
+    for results in found:
+        resolver.attach(results)
+    times['callers'] = clock() - t0
+
+    records = [r for results in found for r in results.get(ENUM_NAME, ())]
+
+    t0 = clock()
+    html = HtmlReportWriter(ENUM_NAME, out_dir, mode='auto')
+    for r in records:
+        html.add(ENUM_NAME, r)
+    html.close([ENUM_NAME])
+    times['html'] = clock() - t0
+
+    t0 = clock()
+    csv = CsvReportWriter(ENUM_NAME, out_dir)
+    for r in records:
+        csv.add(ENUM_NAME, r)
+    csv.close([ENUM_NAME])
+    times['csv'] = clock() - t0
+
+    t0 = clock()
+    prompts = PromptFileWriter(os.path.join(out_dir, f"{ENUM_NAME}_LLM_Prompts.txt"), split_mode='lines',
+                               target_lines_for_regular_files=None, find_caller_active=True)
+    for r in first:
+        prompts.add(make_llm_prompt(r['file'], r['func_name'], ENUM_NAME, 'OLD', 'NEW', r['code'],
+                                    callers=r.get('callers'),
+                                    locations=clusters.locations(ENUM_NAME, r.get('fingerprint'))),
+                    bool(r.get('callers')))
+    prompts.close()
+    times['prompt'] = clock() - t0
+
+    counts = {'files': len(c_files), 'functions': len(records),
+              'enum_uses': sum(r['enum_count'] for r in records),
+              'callers': sum(len(r['callers']) for r in records),
+              'prompts': len(first)}
+    return times, counts
+
+
+def compare(result, baseline, threshold, min_delta):
+    """
+    기준값보다 느려진 단계 목록. 비율(threshold)과 절대 시간(min_delta초)을 모두 넘어야 회귀로 본다
+    (아주 짧은 단계의 측정 흔들림은 무시).
+
+    Returns:
+        list: [(단계, 기준 초, 이번 초)]
+    """
+    regressions = []
+    for stage, base in baseline['stages'].items():
+        now = result['stages'].get(stage)
+        if now is not None and now > base * (1 + threshold) and now - base > min_delta:
+            regressions.append((stage, base, now))
+    return regressions
+
+
+def print_table(result, baseline=None):
+    total_lines = result['corpus']['total_lines']
+    print(f"{'stage':<12}{'seconds':>10}{'lines/s':>14}" + (f"{'baseline':>10}{'change':>9}" if baseline else ""))
+    for stage in STAGES + ('total',):
+        seconds = result['total'] if stage == 'total' else result['stages'][stage]
+        row = f"{stage:<12}{seconds:>10.3f}{total_lines / seconds if seconds else 0:>14,.0f}"
+        if baseline:
+            base = baseline['total'] if stage == 'total' else baseline['stages'].get(stage)
+            if base:
+                row += f"{base:>10.3f}{(seconds - base) / base:>+9.0%}"
+        print(row)
+
+
+def main():
+    argp = argparse.ArgumentParser(description='분석 파이프라인 단계별 벤치마크')
+    argp.add_argument('--scale', choices=sorted(SCALES), default='small', help='프로젝트 크기 프리셋 (기본: small)')
+    for key, value in PROJECT_DEFAULTS.items():
+        argp.add_argument('--' + key.replace('_', '-'), type=type(value), default=None,
+                          help=f'synth.make_project의 {key} (기본: 프리셋 또는 {value})')
+    argp.add_argument('--repeat', type=int, default=3, help='반복 횟수, 단계마다 가장 짧은 시간을 씀 (기본: 3)')
+    argp.add_argument('--output', default=None, help='결과 JSON 경로 (기본: outputs/bench_pipeline_{scale}.json)')
+    argp.add_argument('--check', action='store_true', help='기준값과 비교해 회귀가 있으면 종료 코드 1')
+    argp.add_argument('--baseline', default=None, help='기준값 JSON 경로 (기본: benchmarks/baselines/pipeline_{scale}.json)')
+    argp.add_argument('--save-baseline', action='store_true', help='이번 결과를 기준값으로 저장')
+    argp.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                      help=f'회귀로 볼 느려진 비율 (기본: {DEFAULT_THRESHOLD})')
+    argp.add_argument('--min-delta', type=float, default=DEFAULT_MIN_DELTA,
+                      help=f'회귀로 볼 최소 시간 차이(초) (기본: {DEFAULT_MIN_DELTA})')
+    argp.add_argument('--keep', default=None, help='합성 프로젝트를 지우지 않고 이 폴더에 만듦')
+    args = argp.parse_args()
+
+    params = dict(SCALES[args.scale])
+    for key in PROJECT_DEFAULTS:
+        if getattr(args, key) is not None:
+            params[key] = getattr(args, key)
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"pipeline_{args.scale}.json")
+    output_path = args.output or os.path.join('outputs', f"bench_pipeline_{args.scale}.json")
+
+    work = tempfile.mkdtemp(prefix='eep_bench_pipeline_')
+    root = args.keep or os.path.join(work, 'project')
+    try:
+        t0 = time.perf_counter()
+        corpus = make_project(root, **params)
+        generate = time.perf_counter() - t0
+        print(f"합성 프로젝트: 파일 {corpus['total_files']}개, {corpus['total_lines']:,}줄, "
+              f"{corpus['total_bytes'] / 1024 / 1024:.1f} MB, ENUM 사용 함수 {corpus['hit_funcs']}개 ({generate:.1f}초)")
+
+        best = None
+        for i in range(max(1, args.repeat)):
+            out_dir = os.path.join(work, f'out_{i}')
+            os.makedirs(out_dir)
+            with contextlib.redirect_stdout(io.StringIO()):  # 작성기의 "보고서가 생성되었습니다" 출력
+                times, counts = run_pipeline(root, out_dir)
+            best = times if best is None else {stage: min(best[stage], times[stage]) for stage in STAGES}
+            shutil.rmtree(out_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    result = {
+        'format': RESULT_FORMAT,
+        'scale': args.scale,
+        'corpus': corpus,
+        'counts': counts,
+        'stages': best,
+        'total': sum(best.values()),
+        'repeat': args.repeat,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+    baseline = None
+    if args.check:
+        try:
+            with open(baseline_path, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except OSError:
+            print(f"기준값 파일이 없습니다: {baseline_path} (--save-baseline으로 만드세요)")
+            sys.exit(2)
+        if baseline['corpus'] != corpus:
+            print(f"기준값과 합성 프로젝트 설정이 다릅니다: {baseline_path}")
+            sys.exit(2)
+    print()
+    print_table(result, baseline)
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"\n결과: {output_path}")
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"기준값 저장: {baseline_path}")
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.threshold, args.min_delta)
+        for stage, base, now in regressions:
+            print(f"회귀: {stage} {base:.3f}초 -> {now:.3f}초 (+{(now - base) / base:.0%}, 기준 {args.threshold:.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"회귀 없음 (기준 {args.threshold:.0%}, 최소 {args.min_delta}초)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+결과 저장 방식 메모리 비교 벤치마크: 결과 dict(코드 문자열 포함) vs ResultRecord(코드 위치만 저장).
+
+합성 소스 하나를 파싱해 얻은 결과를 여러 파일에서 나온 것처럼 복제해 100k건을 만들고,
+두 방식으로 들고 있을 때 tracemalloc으로 잰 메모리와 건당 바이트를 출력한다.
+소스 버퍼(파일 내용)는 두 방식 모두 측정 전에 만들어 두므로 비교에 포함하지 않는다.
+
+실행: python -m benchmarks.bench_records [--count N]
+"""
+import sys
+import time
+import tracemalloc
+import warnings
+
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+from eep_checker import parser
+from eep_checker.source import SourceBuffer
+from eep_checker.records import ResultRecord, CallerRecord, BufferSource, as_dict
+from benchmarks.synth import ENUM_NAME, make_c_source
+
+DEFAULT_COUNT = 100_000
+SOURCE_LINES = 50_000
+
+
+def build_records(base, count):
+    """base 결과를 파일 이름만 바꿔 count건까지 복제한 ResultRecord 리스트"""
+    out = []
+    i = 0
+    while len(out) < count:
+        r = base[len(out) % len(base)]
+        if len(out) % len(base) == 0:
+            i += 1
+        file_name = f"src/module_{i}.c"
+        callers = [CallerRecord(c.func_name, (c.code_start, c.code_end, c.code_mode, c.start_line, c.end_line),
+                                c.call_line, file=file_name, source=r.source) for c in r.callers]
+        out.append(ResultRecord(r.func_name, (r.code_start, r.code_end, r.code_mode, r.start_line, r.end_line),
+                                r.enum_lines, file=file_name, callers=callers, source=r.source))
+    return out
+
+
+def measure(build):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current, peak, elapsed
+
+
+def main():
+    count = DEFAULT_COUNT
+    if '--count' in sys.argv:
+        count = int(sys.argv[sys.argv.index('--count') + 1])
+
+    code = make_c_source(SOURCE_LINES, hit_ratio=1.0).encode()
+    tree = parser.parser.parse(code)
+    source = SourceBuffer(code)
+    base = parser.extract_functions_with_enum(tree.root_node, code, ENUM_NAME, analyze_callers=True, source=source)
+    for r in base:
+        r.source = BufferSource(source)
+        for c in r.callers:
+            c.source = r.source
+    print(f"기준 결과 {len(base)}건 (호출자 {sum(len(r.callers) for r in base)}건), {count}건으로 복제")
+
+    records, rec_mem, rec_peak, rec_time = measure(lambda: build_records(base, count))
+    dicts, dict_mem, dict_peak, dict_time = measure(lambda: [as_dict(r) for r in records])
+
+    print(f"{'방식':>10} {'유지(MB)':>10} {'최대(MB)':>10} {'건당(B)':>9} {'생성(ms)':>10}")
+    for name, mem, peak, elapsed in (('dict', dict_mem, dict_peak, dict_time),
+                                     ('record', rec_mem, rec_peak, rec_time)):
+        print(f"{name:>10} {mem / 2**20:>10.1f} {peak / 2**20:>10.1f} {mem / count:>9.0f} {elapsed * 1e3:>10.1f}")
+    print(f"\nrecord / dict = {rec_mem / dict_mem:.2f}")
+    del dicts, records
+
+
+if __name__ == '__main__':
+    main()
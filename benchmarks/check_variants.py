@@ -0,0 +1,115 @@
+"""
+빌드 변형별 호출자 회귀 확인.
+
+#ifdef 안에서만 호출하는 함수가 다른 변형의 호출자로 붙지 않는지, 호출자 코드가 그 변형의
+활성 구간으로 잘리는지, 간접 호출 경로가 모든 호출 위치가 활성인 변형에만 남는지 확인한다.
+사전 필터로 건너뛴 파일(호출 간선만 따로 수집)도 같은 규칙을 따라야 한다.
+결과가 기대와 다르면 종료 코드 1.
+
+실행: python -m benchmarks.check_variants
+"""
+import os
+import shutil
+import sys
+import tempfile
+import warnings
+
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+from eep_checker.callgraph import CallerResolver, SourceLoader, collect_call_graph
+from eep_checker.parallel import analyze_files
+from eep_checker.prefilter import Prefilter
+from eep_checker.targets import EnumTargets
+from eep_checker.variants import parse_variant_spec
+
+ENUM_NAME = 'EEPROM_MODE'
+SOURCES = {
+    'handler.c': f"""int handler(void)
+{{
+    return {ENUM_NAME};
+}}
+
+void task(void)
+{{
+#ifdef FEATURE_A
+    handler();
+    int a = 1;
+#else
+    int b = 2;
+#endif
+}}
+
+void always(void) {{ handler(); }}
+""",
+    # ENUM을 쓰지 않으므로 사전 필터로 건너뛰고 호출 간선만 따로 모은다
+    'top.c': """void top(void)
+{
+#ifndef FEATURE_A
+    task();
+#endif
+    always();
+}
+""",
+}
+# handler의 호출자: (깊이, 호출자, 호출 경로, 변형들)
+EXPECTED = [
+    (1, 'task', ['task', 'handler'], ['A']),
+    (1, 'always', ['always', 'handler'], ['A', 'B']),
+    (2, 'top', ['top', 'always', 'handler'], ['A']),
+    (2, 'top', ['top', 'always', 'handler'], ['B']),
+]
+
+
+def callers_of_handler(root, query_mode):
+    variants = parse_variant_spec(['A:FEATURE_A', 'B:'])
+    targets = EnumTargets([ENUM_NAME])
+    options = {'encoding': 'utf-8', 'debug': False, 'query_mode': query_mode, 'analyze_callers': True,
+               'context_lines': None, 'prefilter': Prefilter(targets), 'cache': None, 'variants': variants}
+    c_files = [os.path.join(root, name) for name in sorted(SOURCES)]
+    outcomes = analyze_files(c_files, root, targets, options)
+    graph, _ = collect_call_graph(outcomes, c_files, root, options, {'handler'}, max_depth=2)
+    resolver = CallerResolver(graph, SourceLoader(root, 'utf-8', variants=variants), max_depth=2)
+    results = {ENUM_NAME: [r for _, by_enum, _, _ in outcomes for r in (by_enum or {}).get(ENUM_NAME, ())]}
+    resolver.attach(results)
+    handler, = [r for r in results[ENUM_NAME] if r['func_name'] == 'handler']
+    return handler
+
+
+def check(root, query_mode):
+    handler = callers_of_handler(root, query_mode)
+    problems = []
+    if handler['variants'] != ['A', 'B']:
+        problems.append(f"handler 변형: {handler['variants']}")
+    got = [(c['depth'], c['func_name'], c['path'], c['variants']) for c in handler['callers']]
+    if got != EXPECTED:
+        problems.append(f"호출자: {got}")
+    for c in handler['callers']:
+        if c['func_name'] == 'task' and ('int b' in c['code'] or 'int a' not in c['code']):
+            problems.append(f"task 코드가 변형 A의 활성 구간이 아님: {c['code']!r}")
+        if c['func_name'] == 'top' and ('task();' in c['code']) != (c['variants'] == ['B']):
+            problems.append(f"top 코드가 변형 {c['variants']}의 활성 구간이 아님: {c['code']!r}")
+    return problems
+
+
+def main():
+    root = tempfile.mkdtemp(prefix='check_variants_')
+    try:
+        for name, text in SOURCES.items():
+            with open(os.path.join(root, name), 'w') as f:
+                f.write(text)
+        failed = False
+        for query_mode in (False, True):
+            engine = 'query' if query_mode else 'visitor'
+            problems = check(root, query_mode)
+            print(f"{engine:>8}: {'통과' if not problems else '실패'}")
+            for problem in problems:
+                print(f"  - {problem}")
+            failed = failed or bool(problems)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+추출 엔진 비교용 기준 구현: TreeCursor 단일 패스 엔진으로 바꾸기 전의 재귀 엔진 (수정하지 않고 고정).
+
+bench_engines에서 새 엔진과 시간/결과를 비교하고 깊은 else-if 체인에서 재귀 한도 초과를 확인하는 데만 쓴다.
+분석기 코드에서는 쓰지 않는다.
+"""
+from eep_checker.source import SourceBuffer
+from eep_checker.parser import (
+    find_identifier_in_declarator, check_enum_declaration, collect_enum_struct_fields, has_enum_in_function,
+)
+
+
+def get_enclosing_function_name(node, code):
+    """
+    현재 노드에서 가장 가까운 부모 중 function_definition이 있으면
+    그 함수 이름을 리턴. 없으면 None.
+    """
+    parent = node.parent
+    while parent:
+        if parent.type == 'function_definition':
+            decl = parent.child_by_field_name('declarator')
+            if decl: # declarator가 없을 수도 있음 (예: 익명 함수)
+                 # 함수 선언부에서 실제 함수 이름을 정확히 추출하도록 수정
+                func_name_node = decl.child_by_field_name('declarator') # function_declarator의 declarator
+                if func_name_node and func_name_node.type == 'identifier':
+                    return code[func_name_node.start_byte:func_name_node.end_byte].decode(errors='ignore')
+                # 포인터 함수 등의 경우 identifier가 더 깊이 있을 수 있음
+                return find_identifier_in_declarator(decl, code)
+        parent = parent.parent
+    return None
+
+
+def collect_enum_global_vars(root, code, target_enum, source=None):
+    """
+    전역 선언부(translation_unit 아래의 declaration)와 struct 내부 선언에서
+    target_enum을 타입으로 쓰거나 선언의 일부로 사용하는 변수 이름들을 모두 수집하여 반환한다.
+    """
+    enum_vars = set()
+    if source is None:
+        source = SourceBuffer(code)
+
+    # translation_unit 하위에서 모든 declaration 노드 순회
+    for child in root.children:
+        if child.type == 'declaration':
+            f, var = check_enum_declaration(child, code, target_enum)
+            if f and var:
+                enum_vars.add(var)
+
+        if child.type == 'struct_specifier':
+            enum_vars |= collect_enum_struct_fields(child, code, target_enum, source=source)
+    return enum_vars
+
+
+def extract_functions_with_enum_recursive(node, code, target_enum, enum_vars=None, debug=False, analyze_callers=False, context_lines=None, source=None):
+    """
+    (기존 재귀 엔진 - 기본 경로는 parser.extract_functions_with_enum)
+    AST의 node를 재귀 탐색하면서,
+    1) 전역에서 enum을 쓰는 변수들(enum_vars) 수집 (최상위 호출 시)
+    2) 함수 정의, struct 정의, declaration 노드에서
+       (a) target_enum 직접 사용 or
+       (b) enum_vars 중 하나라도 사용되는 경우
+       결과 리스트에 포함한다.
+
+    context_lines 값이 주어지면, ENUM 사용 라인을 중심으로 해당 줄수만큼
+    앞뒤 맥락을 포함한다. 호출자 함수 정보에도 동일하게 적용된다.
+
+    줄 번호와 코드 조각은 모두 source(SourceBuffer)를 통해 계산하며,
+    넘기지 않으면 최상위 호출에서 한 번 만들어 하위 호출에 공유한다.
+    """
+    if source is None:
+        source = SourceBuffer(code)
+
+    if enum_vars is None:
+        if node.type == 'translation_unit':
+            enum_vars = collect_enum_global_vars(node, code, target_enum, source=source)
+            if debug:
+                print(f"[DEBUG] 전역에서 수집된 enum 변수들: {enum_vars}")
+        else:
+            enum_vars = set()
+
+    results = []
+
+    if node.type in ['function_definition', 'struct_specifier', 'declaration']:
+        # 1) 노드별 이름 추출
+        name = None
+        if node.type == 'function_definition':
+            decl = node.child_by_field_name('declarator')
+            if decl:
+                name = find_identifier_in_declarator(decl, code)
+
+        elif node.type == 'struct_specifier':
+            name_node = node.child_by_field_name('name')
+            if name_node:
+                name = code[name_node.start_byte:name_node.end_byte].decode(errors='ignore')
+            else:
+                name = "(anonymous struct)"
+
+        elif node.type == 'declaration':
+            func_parent_name = get_enclosing_function_name(node, code)
+            if func_parent_name is None:
+                # 전역 선언인 경우에만 변수명 추출
+                var_name_node = node.child_by_field_name('declarator')
+                if not var_name_node:
+                    init_decl = node.child_by_field_name('init_declarator')
+                    if init_decl:
+                        var_name_node = init_decl.child_by_field_name('declarator')
+                if var_name_node:
+                    name = find_identifier_in_declarator(var_name_node, code)
+            else:
+                # 함수 내부 선언일 경우, 함수 단위에서만 결과에 남도록 name을 None으로 유지
+                name = None
+
+        # 2) 직접 enum(target_enum) 사용 여부 + 개수 + 라인 번호
+        found_direct, enum_count_direct, enum_lines = has_enum_in_function(node, code, target_enum, source=source)
+
+        # 3) enum_vars 목록에 든 변수가 쓰였는지 검사
+        found_via_var = False
+        if enum_vars:
+            def visit_for_var(n):
+                nonlocal found_via_var
+                if found_via_var:
+                    return
+                if n.type in ['comment', 'string_literal']:
+                    return
+                if n.type == 'identifier':
+                    txt = code[n.start_byte:n.end_byte].decode(errors='ignore')
+                    if txt in enum_vars:
+                        found_via_var = True
+                        return
+                for c_node in n.children:
+                    if found_via_var:
+                        return
+                    visit_for_var(c_node)
+            visit_for_var(node)
+
+        # 4) "직접 enum 사용"이나 "enum_vars 통해 사용" 중 하나라도 있으면 결과에 추가
+        #    단, name이 None인 경우(== 함수 내부 선언이었다면)에는 추가하지 않음
+        if (found_direct or found_via_var) and name:
+            snippet_code, snippet_start, snippet_end = source.snippet(
+                node.start_byte, node.end_byte, enum_lines, context_lines
+            )
+
+            results.append({
+                "func_name": name,
+                "code": snippet_code,
+                "enum_count": enum_count_direct,
+                "start_line": snippet_start,
+                "end_line": snippet_end,
+                "enum_lines": enum_lines,
+                "callers": [],
+            })
+            if debug:
+                print(
+                    f"[DEBUG] 포함됨: {name}, direct={enum_count_direct}, via_var={found_via_var}, enum_vars={enum_vars}, lines={enum_lines}"
+                )
+
+    # 5) 하위 노드 재귀 호출 (enum_vars를 그대로 넘겨줌)
+    for child_node in node.children:
+        results.extend(
+            extract_functions_with_enum_recursive(
+                child_node,
+                code,
+                target_enum,
+                enum_vars,
+                debug=debug,
+                analyze_callers=analyze_callers,
+                context_lines=context_lines,
+                source=source,
+            )
+        )
+
+    # 함수 호출 관계 분석 (extract_functions_with_enum_recursive가 translation_unit에서 처음 호출될 때 한 번만 실행)
+    if node.type == 'translation_unit' and results and analyze_callers:
+        # 먼저 모든 함수 정의를 찾아서 위치 정보와 함께 저장
+        all_function_definitions = {}
+        def find_all_defs(n):
+            if n.type == 'function_definition':
+                decl = n.child_by_field_name('declarator')
+                if decl:
+                    func_name = find_identifier_in_declarator(decl, code)
+                    if func_name:
+                        all_function_definitions[func_name] = {'node': n}
+            for child_n in n.children:
+                find_all_defs(child_n)
+        find_all_defs(node)
+
+        # 각 함수를 순회하며 호출하는 함수(caller)를 찾음
+        for res_item in results:
+            target_func_name = res_item['func_name']
+            
+            # 전체 AST를 순회하며 target_func_name을 호출하는 함수들을 찾음
+            callers_found = [] # 현재 target_func_name에 대한 호출자들
+            
+            def find_call_sites(n, current_enclosing_func_name=None, current_enclosing_func_node=None):
+                if n.type == 'function_definition':
+                    decl_node = n.child_by_field_name('declarator')
+                    if decl_node:
+                        # 현재 탐색 중인 함수의 이름을 가져옴
+                        current_enclosing_func_name = find_identifier_in_declarator(decl_node, code)
+                        current_enclosing_func_node = n # 현재 함수의 전체 노드 저장
+
+                if n.type == 'call_expression':
+                    func_identifier_node = n.child_by_field_name('function')
+                    if func_identifier_node and func_identifier_node.type == 'identifier':
+                        called_func_name = code[func_identifier_node.start_byte:func_identifier_node.end_byte].decode(errors='ignore')
+                        if called_func_name == target_func_name and current_enclosing_func_name and current_enclosing_func_name != target_func_name: # 자기 자신 호출은 제외
+                            # 호출자 정보가 all_function_definitions에 있는지 확인
+                            if current_enclosing_func_name in all_function_definitions:
+                                caller_def_node = all_function_definitions[current_enclosing_func_name]['node']
+                                existing_caller_names = [c['func_name'] for c in callers_found]
+                                if current_enclosing_func_name not in existing_caller_names:
+                                    call_line = source.line_of(func_identifier_node.start_byte)
+                                    snippet_code, snippet_start, snippet_end = source.snippet(
+                                        caller_def_node.start_byte, caller_def_node.end_byte, [call_line], context_lines
+                                    )
+                                    callers_found.append({
+                                        'func_name': current_enclosing_func_name,
+                                        'code': snippet_code,
+                                        'start_line': snippet_start,
+                                        'end_line': snippet_end,
+                                        'call_line': call_line
+                                    })
+                                    if debug:
+                                        print(f"[DEBUG] Caller found: {current_enclosing_func_name} calls {target_func_name} at line {call_line}")
+                
+                for child_n in n.children:
+                    find_call_sites(child_n, current_enclosing_func_name, current_enclosing_func_node)
+
+            find_call_sites(node) # translation_unit부터 다시 탐색 시작
+            res_item['callers'] = callers_found
+            if debug and callers_found:
+                 print(f"[DEBUG] Function {target_func_name} is called by: {[c['func_name'] for c in callers_found]}")
+
+    return results
+
+
+# 방문 시 하위 노드를 보지 않는 타입 (identifier가 들어있지 않음)
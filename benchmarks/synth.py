@@ -0,0 +1,150 @@
+"""벤치마크용 합성 C 소스 생성기 (항상 같은 결과를 내도록 seed 고정)"""
+import os
+import random
+
+ENUM_NAME = 'EEPROM_BENCH_MODE'
+
+
+def make_function(name, body_lines, use_enum, rng, callee=None):
+    lines = [f"int {name}(int arg) {{", "    int value = arg;"]
+    for i in range(body_lines):
+        if use_enum and i == body_lines // 2:
+            lines.append(f"    value += GetEEPROMValue({ENUM_NAME});")
+        elif callee and i == 0:
+            lines.append(f"    value += {callee}(value);")
+        else:
+            lines.append(f"    value = value * {rng.randint(1, 9)} + {i}; /* filler */")
+    lines.append("    return value;")
+    lines.append("}")
+    return lines
+
+
+def make_c_source(total_lines, func_lines=20, hit_ratio=0.2, seed=0):
+    """
+    total_lines 줄 내외의 C 소스를 생성한다.
+
+    Args:
+        total_lines (int): 목표 줄 수
+        func_lines (int): 함수 하나의 본문 줄 수
+        hit_ratio (float): ENUM을 사용하는 함수의 비율
+        seed (int): 난수 seed
+    Returns:
+        str: 생성된 C 소스
+    """
+    rng = random.Random(seed)
+    out = [f"typedef enum {{ {ENUM_NAME} = 0 }} bench_enum_t;", ""]
+    idx = 0
+    while len(out) < total_lines:
+        use_enum = rng.random() < hit_ratio
+        callee = f"func_{idx - 1}" if idx and rng.random() < 0.3 else None
+        out.extend(make_function(f"func_{idx}", func_lines, use_enum, rng, callee))
+        out.append("")
+        idx += 1
+    return "\n".join(out) + "\n"
+
+
+def make_else_if_chain(depth):
+    """depth 단계의 else-if 체인을 가진 함수 하나 (재귀 깊이 시험용)"""
+    lines = ["int deep_chain(int v) {", f"    if (v == {ENUM_NAME}) {{ return -1; }}"]
+    for i in range(depth):
+        lines.append(f"    else if (v == {i}) {{ return {i}; }}")
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+# make_project 기본값 (bench_pipeline의 --scale 프리셋이 덮어씀)
+PROJECT_DEFAULTS = {
+    'files': 10,          # .c 파일 수
+    'lines': 1000,        # 파일당 목표 줄 수 (호출자 함수 제외)
+    'func_lines': 20,     # 함수 본문 줄 수
+    'hit_ratio': 0.2,     # ENUM을 쓰는 함수 비율
+    'fan_in': 2,          # ENUM을 쓰는 함수마다 다른 파일에 두는 호출자 수
+    'nesting': 2,         # 함수 본문을 감싸는 if 블록 깊이
+    'pp_density': 0.1,    # #ifdef/#else/#endif로 감싼 함수 비율
+    'files_per_dir': 50,  # 폴더 하나에 넣는 파일 수 (폴더 탐색 시간용)
+    'seed': 0,
+}
+
+
+def _module_functions(file_no, params, rng):
+    """파일 하나의 함수 목록 [(이름, ENUM 사용 여부, 줄 리스트)]"""
+    funcs = []
+    out_lines = 0
+    idx = 0
+    nesting = params['nesting']
+    while out_lines < params['lines']:
+        name = f"m{file_no}_func_{idx}"
+        use_enum = rng.random() < params['hit_ratio']
+        lines = [f"int {name}(int arg) {{", "    int value = arg;"]
+        for depth in range(nesting):
+            lines.append("    " * (depth + 1) + f"if (value > {depth}) {{")
+        indent = "    " * (nesting + 1)
+        body = params['func_lines']
+        for i in range(body):
+            if use_enum and i == body // 2:
+                lines.append(f"{indent}value += GetEEPROMValue({ENUM_NAME});")
+            elif i == 0 and idx and rng.random() < 0.3:
+                lines.append(f"{indent}value += m{file_no}_func_{idx - 1}(value);")
+            else:
+                lines.append(f"{indent}value = value * {rng.randint(1, 9)} + {i}; /* filler */")
+        if rng.random() < params['pp_density']:
+            # 본문 일부를 빌드 조건으로 감싼다 (전처리/빌드 변형 비용)
+            at = 2 + nesting + body // 3
+            lines[at:at + 1] = [f"#ifdef BENCH_FEATURE_{idx % 8}", lines[at], "#else",
+                                f"{indent}value -= {idx};", "#endif"]
+        for depth in reversed(range(nesting)):
+            lines.append("    " * (depth + 1) + "}")
+        lines.append("    return value;")
+        lines.append("}")
+        lines.append("")
+        funcs.append((name, use_enum, lines))
+        out_lines += len(lines)
+        idx += 1
+    return funcs
+
+
+def make_project(root, **params):
+    """
+    합성 C 프로젝트를 root 아래에 만든다. 같은 인자면 항상 같은 파일을 만든다.
+
+    파일은 files_per_dir개씩 dir_NNN 폴더에 나누어 두고, ENUM을 쓰는 함수마다 뒤따르는 fan_in개 파일에
+    그 함수를 부르는 호출자 함수를 하나씩 추가한다 (다른 파일 호출자 검색 비용).
+
+    Args:
+        root (str): 만들 폴더 (없으면 생성)
+        **params: PROJECT_DEFAULTS의 키
+    Returns:
+        dict: 실제 인자와 만든 프로젝트 크기 ('total_files', 'total_lines', 'total_bytes', 'hit_funcs')
+    """
+    params = dict(PROJECT_DEFAULTS, **params)
+    files = params['files']
+    modules = [_module_functions(i, params, random.Random(params['seed'] * 1_000_003 + i)) for i in range(files)]
+
+    extra = [[] for _ in range(files)]  # 파일별로 덧붙일 다른 파일 호출자 함수
+    hit_funcs = 0
+    for i, funcs in enumerate(modules):
+        for name, use_enum, _ in funcs:
+            if not use_enum:
+                continue
+            hit_funcs += 1
+            for k in range(1, min(params['fan_in'], files - 1) + 1):
+                extra[(i + k) % files] += [f"int call_{name}_{k}(void) {{", f"    return {name}({k});", "}", ""]
+
+    total_lines = total_bytes = 0
+    for i, funcs in enumerate(modules):
+        folder = os.path.join(root, f"dir_{i // params['files_per_dir']:03d}")
+        os.makedirs(folder, exist_ok=True)
+        lines = ["#include \"bench.h\"", f"#define MODULE_ID {i}", ""]
+        for _, _, func_lines in funcs:
+            lines.extend(func_lines)
+        lines.extend(extra[i])
+        text = "\n".join(lines) + "\n"
+        with open(os.path.join(folder, f"module_{i:05d}.c"), 'w', encoding='utf-8', newline='\n') as f:
+            f.write(text)
+        total_lines += len(lines)
+        total_bytes += len(text)
+    with open(os.path.join(root, 'bench.h'), 'w', encoding='utf-8', newline='\n') as f:
+        f.write(f"typedef enum {{ {ENUM_NAME} = 0 }} bench_enum_t;\nint GetEEPROMValue(int id);\n")
+
+    return dict(params, total_files=files, total_lines=total_lines, total_bytes=total_bytes, hit_funcs=hit_funcs)
@@ -0,0 +1,872 @@
+"""
+라이브러리 진입점. 명령행(main.py)/GUI/분석 서버 모두 analyze(AnalysisConfig)를 부르는 얇은 껍데기다.
+
+    from eep_checker.api import AnalysisConfig, analyze
+    result = analyze(AnalysisConfig(enum='EEPROM_A', from_value='0', to_value='1', path='src'))
+    result.html_file, result.stats[0].total_funcs, result.files[0].elapsed
+
+분석 한 번의 상태는 모두 이 호출 안에 있으므로 (파서도 스레드마다 따로) 한 프로세스에서
+분석 여러 개를 스레드로 동시에 돌릴 수 있다. 이때는 output_dir을 분석마다 다르게 준다.
+"""
+import contextlib
+import dataclasses
+import datetime
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+from eep_checker.report import HtmlReportWriter
+from eep_checker.csv_report import CsvReportWriter
+from eep_checker.ndjson_report import NdjsonReportWriter
+from eep_checker.prompt import make_llm_prompt
+from eep_checker.targets import parse_enum_spec
+from eep_checker.variants import parse_variant_spec
+from eep_checker.macros import MacroIndex, resolve_aliases
+from eep_checker.index import IdentifierIndex, default_index_path
+from eep_checker.cancel import AnalysisCancelled
+from eep_checker.parallel import iter_analyze_files, resolve_jobs
+from eep_checker.prefilter import build_prefilter
+from eep_checker.cache import ResultCache, encode_results, decode_results
+from eep_checker.manifest import Manifest, iter_analyze_incremental
+from eep_checker.callgraph import collect_call_graph, CallerResolver, SourceLoader
+from eep_checker.spool import RecordSpool
+from eep_checker.records import as_dict, bind_source, detach_sources
+from eep_checker.dedup import FunctionClusters, merge_callers
+from eep_checker.profiling import Profiler, print_profile, DEFAULT_TOP
+from eep_checker.tokens import DEFAULT_TOKENIZER, get_tokenizer
+from utils import find_c_files, PromptFileWriter, get_analysis_stats, print_analysis_stats, print_cache_stats, get_prefilter_stats, print_prefilter_stats, print_prompt_packing, print_duplicate_clusters
+
+
+@dataclass
+class AnalysisConfig:
+    """분석 설정 (main.py 명령행 옵션과 같은 의미, 기본값도 같음)"""
+    enum: Union[str, List[str]]                 # --enum (쉼표/공백 구분 목록, "@파일", glob 패턴)
+    from_value: str                             # --from
+    to_value: str                               # --to
+    path: str                                   # --path
+    encoding: str = 'utf-8'
+    debug: bool = False
+    query_engine: bool = False                  # --query (tree-sitter 쿼리 캡처 엔진)
+    target_lines: Optional[str] = None          # 숫자, "caller", "caller:N"
+    max_tokens: Optional[int] = None            # --max-tokens (파일당 토큰 예산으로 프롬프트 분할)
+    dedup: bool = True                          # False면 --no-dedup (같은 함수 복사본도 프롬프트를 따로 만듦)
+    tokenizer: str = DEFAULT_TOKENIZER          # --tokenizer (approx, tiktoken[:인코딩], 모듈:함수)
+    context_lines: Optional[int] = None
+    csv: bool = False
+    html_mode: str = 'auto'
+    ndjson: bool = False
+    variants: Optional[List[str]] = None        # --variant 값들
+    macro_aliases: bool = False                 # --macro-aliases (분석 전에 모든 .c/.h의 #define을 읽음)
+    include_headers: bool = False
+    prefilter: bool = True                      # False면 --no-prefilter
+    cache: bool = True                          # False면 --no-cache
+    clear_cache: bool = False
+    jobs: int = 1                               # 0이면 CPU 코어 수
+    find_caller: bool = False
+    caller_depth: int = 1
+    use_index: bool = False                     # query 명령 (식별자 색인으로 답함)
+    index_path: Optional[str] = None            # --index (기본: cache_dir/index 아래 분석 폴더별 파일)
+    output_dir: str = 'outputs'
+    cache_dir: Optional[str] = None             # 기본: output_dir/.cache
+    profile: bool = False                       # --profile (단계별 시간, 느린 파일, 최대 메모리, Chrome trace)
+    profile_top: int = DEFAULT_TOP              # --profile-top
+    profile_memory: bool = True                 # False면 --no-tracemalloc
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'AnalysisConfig':
+        names = {f.name for f in dataclasses.fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+    def relative_to(self, base_dir) -> 'AnalysisConfig':
+        """
+        상대 경로(분석 폴더, 출력/캐시/색인 경로, --enum/--variant의 "@파일")를 base_dir 기준으로 바꾼 사본.
+        분석 서버가 프로세스 현재 폴더를 바꾸지 않고 요청한 쪽 폴더 기준으로 실행할 때 쓴다.
+        """
+        def absolute(path):
+            return None if path is None else os.path.join(base_dir, path)
+
+        def at_files(value):
+            return re.sub(r'(?<![^,\s])@([^,\s]+)', lambda m: '@' + os.path.join(base_dir, m.group(1)), value)
+
+        enum = self.enum
+        if isinstance(enum, str):
+            enum = at_files(enum)
+        elif enum is not None:
+            enum = [at_files(value) for value in enum]
+        variants = self.variants
+        if variants is not None:
+            variants = ['@' + os.path.join(base_dir, value.strip()[1:]) if value.strip().startswith('@') else value
+                        for value in variants]
+        return dataclasses.replace(self, enum=enum, variants=variants, path=absolute(self.path),
+                                   output_dir=absolute(self.output_dir), cache_dir=absolute(self.cache_dir),
+                                   index_path=absolute(self.index_path))
+
+    def resolved_cache_dir(self) -> str:
+        return self.cache_dir or os.path.join(self.output_dir, '.cache')
+
+    def resolved_index_path(self) -> str:
+        return self.index_path or default_index_path(self.path, self.encoding,
+                                                     os.path.join(self.resolved_cache_dir(), 'index'))
+
+
+@dataclass
+class EnumStats:
+    """ENUM 하나의 분석 통계 (utils.get_analysis_stats와 같은 값)"""
+    enum_name: str
+    total_files: int
+    total_funcs: int
+    total_enums: int
+    cache_hits: Optional[int] = None
+    cache_misses: Optional[int] = None
+    variant_counts: Optional[Dict[str, int]] = None  # 빌드 변형 -> 영향 함수 수 (--variant)
+
+
+@dataclass(slots=True)
+class FileTiming:
+    """파일 하나의 분석 정보 (parallel.analyze_file의 info)"""
+    file: str
+    size: int
+    elapsed: float
+    skipped: bool = False         # 사전 필터로 건너뜀
+    cache: Optional[str] = None   # 'hit', 'miss', 'manifest' 또는 None
+    error: Optional[str] = None
+
+
+@dataclass
+class AnalysisResult:
+    """analyze() 결과. 파일 경로는 output_dir 기준 경로 그대로"""
+    prompt_files: List[str] = field(default_factory=list)
+    html_file: Optional[str] = None
+    csv_file: Optional[str] = None
+    ndjson_file: Optional[str] = None
+    stats: List[EnumStats] = field(default_factory=list)     # 보고서와 같은 ENUM 순서
+    files: List[FileTiming] = field(default_factory=list)    # 분석한 파일 순서
+    prefilter: Optional[dict] = None                          # utils.get_prefilter_stats (사전 필터를 썼을 때)
+    index: Optional[dict] = None                              # IdentifierIndex.update 반환값 (index/query)
+    profile: Optional[dict] = None                            # Profiler.report (profile=True일 때)
+    prompt_packing: Dict[str, dict] = field(default_factory=dict)  # ENUM -> PromptFileWriter.packing (--max-tokens)
+    duplicates: List[dict] = field(default_factory=list)     # FunctionClusters.duplicates (dedup=True일 때)
+    error_logs: List[str] = field(default_factory=list)
+    cancelled: bool = False
+    elapsed: float = 0.0
+
+    def to_dict(self) -> dict:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'AnalysisResult':
+        """to_dict() 결과(분석 서버 응답)로 되돌린다. 없는 키는 기본값"""
+        names = {f.name for f in dataclasses.fields(cls)}
+        values = {key: value for key, value in data.items() if key in names}
+        values['stats'] = [EnumStats(**s) for s in values.get('stats') or ()]
+        values['files'] = [FileTiming(**f) for f in values.get('files') or ()]
+        return cls(**values)
+
+
+def _parse_target_lines(config, log_error):
+    """--target-lines 값을 (분할 모드, 호출자 없는 파일의 목표 줄 수 또는 None)으로"""
+    parsed_split_mode = "lines" # 기본 분할 모드
+    parsed_target_lines_for_regular = None
+    if not config.target_lines:
+        return parsed_split_mode, parsed_target_lines_for_regular
+
+    target_lines = str(config.target_lines)
+    val_lower = target_lines.lower()
+    if val_lower.startswith("caller"):
+        if config.find_caller:
+            parsed_split_mode = "caller"
+            parts = val_lower.split(':', 1)
+            if len(parts) > 1 and parts[1].isdigit():
+                num = int(parts[1])
+                if num > 0:
+                    parsed_target_lines_for_regular = num
+                else:
+                    log_error(f'[Warning] "--target-lines caller:N"에서 N은 양의 정수여야 합니다. (입력: {target_lines}). 호출자 없는 파일은 분할하지 않습니다.')
+                    # parsed_target_lines_for_regular is None (분할 안함)
+            # "caller"만 입력된 경우, parsed_target_lines_for_regular는 None (호출자 없는 파일 분할 안함)
+        else:
+            log_error(f'[Warning] "--target-lines {target_lines}" 옵션은 "--find-caller" 옵션과 함께 사용해야 합니다. 기본 분할 없음으로 진행합니다.')
+            # parsed_split_mode = "lines", parsed_target_lines_for_regular = None (분할 안 함)
+    else:
+        try:
+            num_val = int(target_lines)
+            if num_val > 0:
+                parsed_target_lines_for_regular = num_val
+            else:
+                log_error("[Warning] '--target-lines' 값은 양의 정수여야 합니다. 기본 라인 분할 없음으로 진행합니다.")
+                # parsed_target_lines_for_regular is None (분할 안 함)
+        except ValueError:
+            log_error(f'[Warning] "--target-lines" 값 "{target_lines}"이(가) 유효한 숫자나 "caller" 또는 "caller:N" 형식이 아닙니다. 기본 분할 없음으로 진행합니다.')
+            # parsed_split_mode = "lines", parsed_target_lines_for_regular = None (분할 안 함)
+    return parsed_split_mode, parsed_target_lines_for_regular
+
+
+def _parse_max_tokens(config, target_lines_for_regular, log_error):
+    """--max-tokens/--tokenizer 확인. (파일당 토큰 예산 또는 None, 토크나이저, 호출자 없는 파일의 목표 줄 수)"""
+    if config.max_tokens is None:
+        return None, None, target_lines_for_regular
+    if config.max_tokens <= 0:
+        log_error("[Warning] '--max-tokens' 값은 양의 정수여야 합니다. 토큰 분할 없이 진행합니다.")
+        return None, None, target_lines_for_regular
+    try:
+        tokenizer = get_tokenizer(config.tokenizer)
+    except ValueError as e:
+        log_error(f"[Warning] {str(e)}. approx 추정으로 진행합니다.")
+        tokenizer = get_tokenizer(DEFAULT_TOKENIZER)
+    if target_lines_for_regular is not None:
+        log_error("[Warning] '--max-tokens'를 주면 '--target-lines'의 줄 수는 쓰지 않고 토큰 예산으로 나눕니다.")
+    return config.max_tokens, tokenizer, None
+
+
+class _Run:
+    """analyze()/update_index() 호출 하나의 진행 상황/에러 기록"""
+
+    def __init__(self, config, progress_callback, cancel):
+        self.start_time = time.time()
+        self.result = AnalysisResult()
+        self.config = config
+        self.progress_callback = progress_callback
+        self.cancel = cancel
+        self.label = 'INDEX'   # Chrome trace 파일 이름 (분석이면 ENUM 이름/묶음 이름)
+        self.profiler = Profiler(memory=config.profile_memory) if config.profile else None
+        # close()가 정리할 것: 이 실행이 연 색인(서버 색인 제외), 잡고 있는 서버 분석 폴더,
+        # 매니페스트, 호출자 대기 결과, 보고서 작성기
+        self.owned_index = None
+        self.workspace_lock = None
+        self.manifest = None
+        self.pending = None
+        self.outputs = None
+
+    def phase(self, name):
+        """--profile일 때 구간 하나를 잰다 (아니면 아무것도 안 함)"""
+        return self.profiler.phase(name) if self.profiler is not None else contextlib.nullcontext()
+
+    def tick(self, name, t0):
+        """t0부터 지금까지를 name 단계 시간에 더하고(trace에는 안 남김) 지금 시각을 반환"""
+        t1 = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.add(name, t0, t1, trace=False)
+        return t1
+
+    def update_progress(self, status, progress=None):
+        """진행 상황 업데이트"""
+        if self.progress_callback:
+            elapsed = time.time() - self.start_time
+            self.progress_callback(status, elapsed, progress)
+
+    def log_error(self, message):
+        """에러 로깅"""
+        self.result.error_logs.append(message)
+        print(message)
+
+    def check_cancel(self):
+        """취소 요청이 있으면 AnalysisCancelled (파일 사이마다 호출)"""
+        if self.cancel is not None:
+            self.cancel.check()
+
+    def on_file_done(self, done, total):
+        self.check_cancel()
+        self.update_progress(f"열심히 파일 분석 중... ({done}/{total})", int((done / total) * 100))
+
+    def discard_outputs(self):
+        """쓰던 보고서/프롬프트 파일을 지운다 (취소)"""
+        if self.outputs is not None:
+            self.outputs.discard()
+
+    def close(self):
+        """
+        analyze()가 연 것을 정리한다 (성공/에러/취소 모두).
+        매니페스트는 에러/취소로 멈춰도 그때까지 분석한 파일을 저장해 다음 실행에서 다시 분석하지 않게 한다.
+        """
+        if self.pending is not None:
+            self.pending.close()
+            self.pending = None
+        if self.outputs is not None:
+            self.outputs.close()
+        try:
+            if self.manifest is not None:
+                self.manifest.save()
+                self.manifest = None
+        finally:
+            if self.owned_index is not None:
+                self.owned_index.close()
+                self.owned_index = None
+            if self.workspace_lock is not None:
+                self.workspace_lock.release()
+                self.workspace_lock = None
+
+    def cancelled(self):
+        self.log_error("[Warning] 분석이 취소되었습니다.")
+        self.result.cancelled = True
+        return self.finish()
+
+    def finish(self):
+        self.result.elapsed = time.time() - self.start_time
+        if self.profiler is not None:
+            report = self.result.profile = self.profiler.report(self.result.files, self.config.profile_top)
+            if not self.result.cancelled:
+                os.makedirs(self.config.output_dir, exist_ok=True)
+                now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                report['trace_file'] = self.profiler.write_trace(
+                    os.path.join(self.config.output_dir, f"{self.label}_Profile_{now}.json"))
+            print_profile(report)
+        return self.result
+
+    def check_path(self, path):
+        """분석 폴더 검증. 문제가 있으면 에러를 기록하고 False"""
+        if not os.path.exists(path):
+            self.log_error(f"[Error] 지정된 경로가 존재하지 않습니다: {path}")
+            return False
+        if not os.path.isdir(path):
+            self.log_error(f"[Error] 지정된 경로가 디렉터리가 아닙니다: {path}")
+            return False
+        return True
+
+    def open_index(self, config, warm):
+        """
+        식별자 색인을 최신으로 맞춘다 (헤더까지 모든 파일, 바뀐 파일만 다시 파싱).
+        서버 상태(warm)의 색인은 close()까지 그 분석 폴더를 잡아 두고, 직접 연 색인은 close()가 닫는다.
+
+        Returns:
+            tuple: (IdentifierIndex, 색인한 파일 목록). 실패하거나 취소되면 (None, None)
+        """
+        index_path = config.resolved_index_path()
+        self.update_progress("식별자 색인 갱신 중...", 0)
+
+        def on_index_done(done, total):
+            self.check_cancel()
+            self.update_progress(f"식별자 색인 중... ({done}/{total})", int((done / total) * 100))
+
+        index = None
+        try:
+            if warm is not None:
+                workspace = warm.workspace(config.path, config.encoding, index_path)
+                # 같은 분석 폴더를 쓰는 다른 요청이 끝나기를 기다린다 (기다리는 동안에도 취소 가능)
+                while not workspace.lock.acquire(timeout=0.2):
+                    self.check_cancel()
+                self.workspace_lock = workspace.lock
+                index = workspace.index
+                with self.phase('index'):
+                    index_files, index_stats = workspace.refresh(jobs=resolve_jobs(config.jobs),
+                                                                 on_file_done=on_index_done)
+            else:
+                index = self.owned_index = IdentifierIndex(index_path, config.encoding)
+                dirs = index.dir_index()
+                with self.phase('walk'):
+                    index_files = find_c_files(config.path, include_headers=True, dir_index=dirs)
+                index.save_dir_index(dirs)
+                with self.phase('index'):
+                    index_stats = index.update(index_files, config.path, jobs=resolve_jobs(config.jobs),
+                                               on_file_done=on_index_done)
+        except sqlite3.Error as e:
+            self.log_error(f"[Error] 식별자 색인을 열 수 없습니다: {index_path} → {str(e)}")
+            return None, None
+        except AnalysisCancelled:
+            # 색인 갱신은 트랜잭션 하나라 취소하면 이전 상태로 남는다
+            self.cancelled()
+            return None, None
+        print(f"식별자 색인: 새로 색인 {index_stats['indexed']}개, 변경 없음 {index_stats['unchanged']}개, "
+              f"삭제 {index_stats['removed']}개 ({index_path})")
+        self.result.index = index_stats
+        return index, index_files
+
+
+def update_index(config: AnalysisConfig, progress_callback=None, cancel=None, warm=None) -> AnalysisResult:
+    """
+    식별자 색인만 만들거나 갱신한다 (index 명령). config에서는 path, encoding, jobs, index_path/cache_dir만 쓴다.
+
+    Returns:
+        AnalysisResult: index에 IdentifierIndex.update 반환값, error_logs에 파싱 실패한 파일
+    """
+    run = _Run(config, progress_callback, cancel)
+    try:
+        if not run.check_path(config.path):
+            return run.finish()
+        index, _ = run.open_index(config, warm)
+        if index is None:
+            return run.finish()
+        for error in run.result.index['errors']:
+            run.log_error(error)
+    finally:
+        run.close()
+    elapsed = time.time() - run.start_time
+    run.update_progress(f"색인 완료! (총 {elapsed:.1f}초)", 100)
+    print(f"총 수행 시간: {elapsed:.2f}초")
+    return run.finish()
+
+
+def analyze(config: AnalysisConfig, progress_callback=None, cancel=None, on_results=None, warm=None) -> AnalysisResult:
+    """
+    EEPROM ENUM 영향 함수를 분석하고 보고서/프롬프트 파일을 쓴다.
+
+    Args:
+        config (AnalysisConfig): 분석 설정
+        progress_callback (callable, optional): 진행 상황을 알려주는 콜백 함수.
+            callback(status: str, elapsed: float, progress: int) 형식으로 호출됨.
+        cancel (CancelToken, optional): 취소 토큰. 파일 사이마다 확인하고, 취소되면 만들던 보고서를 지우고 끝냄
+        on_results (callable, optional): ENUM 사용 함수를 찾은 파일마다 on_results(rows)로 바로 알려줌.
+            rows는 {'enum', 'file', 'func_name', 'start_line', 'end_line', 'enum_count'} dict 리스트
+            (호출자 분석/보고서 작성 전에 불리므로 분석 중에 결과를 보여줄 때 사용)
+        warm (WarmState, optional): 분석 서버가 실행 사이에 유지하는 상태.
+            주어지면 색인/파일 내용을 다시 읽지 않고 쓰며, 색인으로 답할 수 있는 분석은 색인(query)으로 답함.
+            빌드 변형/디버그/쿼리 엔진/캐시 끄기/사전 필터 끄기를 주면 색인 없이 파일을 직접 파싱한다
+    Returns:
+        AnalysisResult: 출력 파일 경로, ENUM별 통계, 파일별 소요 시간, 에러 로그
+    """
+    run = _Run(config, progress_callback, cancel)
+    try:
+        return _analyze(run, config, on_results, warm)
+    except AnalysisCancelled:
+        run.discard_outputs()
+        return run.cancelled()
+    finally:
+        run.close()
+
+
+def _analyze(run, config, on_results, warm):
+    """analyze() 본체. 열어 둔 색인/매니페스트/임시 파일은 run에 맡기고 run.close()가 정리한다"""
+    result = run.result
+    log_error = run.log_error
+
+    # 서버에서도 색인이 답할 수 없는 옵션(파싱 방식/캐시/사전 필터를 정하는 옵션)은 직접 파싱해서 그대로 따른다
+    use_index = config.use_index or (warm is not None and not config.variants and not config.debug
+                                     and not config.query_engine and config.cache and config.prefilter)
+    try:
+        targets = parse_enum_spec(config.enum)
+    except ValueError as e:
+        log_error(f"[Error] {str(e)}")
+        return run.finish()
+    run.label = targets.label
+    variants = None
+    if config.variants and use_index:
+        log_error("[Error] query 명령은 --variant를 지원하지 않습니다. 빌드 변형별 분석은 analyze로 실행하세요.")
+        return run.finish()
+    if config.variants:
+        try:
+            variants = parse_variant_spec(config.variants)
+        except ValueError as e:
+            log_error(f"[Error] {str(e)}")
+            return run.finish()
+
+    # 경로 검증
+    if not run.check_path(config.path):
+        return run.finish()
+
+    index = None
+    index_files = None
+    if use_index:
+        index, index_files = run.open_index(config, warm)
+        if index is None:
+            return run.finish()
+
+    caller_depth = config.caller_depth
+    if caller_depth < 1:
+        log_error("[Warning] '--caller-depth' 값은 양의 정수여야 합니다. 1로 진행합니다.")
+        caller_depth = 1
+    elif caller_depth > 1 and not config.find_caller:
+        log_error('[Warning] "--caller-depth" 옵션은 "--find-caller" 옵션과 함께 사용해야 합니다. 호출자 분석 없이 진행합니다.')
+
+    cache_dir = config.resolved_cache_dir()
+    if config.clear_cache:
+        ResultCache(cache_dir).clear()
+        Manifest.clear(cache_dir)
+    # 디버그 출력은 파싱할 때만 나오므로 --debug에서는 캐시/매니페스트를 쓰지 않음 (query는 색인만 사용)
+    cache = None if not config.cache or config.debug or index is not None else ResultCache(cache_dir)
+    if config.macro_aliases:
+        _load_macro_aliases(run, config, targets, index, cache)
+
+    analyze_options = {
+        'encoding': config.encoding,
+        'debug': config.debug,
+        'query_mode': config.query_engine,
+        'analyze_callers': config.find_caller,
+        'context_lines': config.context_lines,
+        'include_headers': config.include_headers,
+        'prefilter': build_prefilter(targets, config.encoding) if config.prefilter and index is None else None,
+        'cache': cache,
+        'variants': variants,
+        'fingerprints': config.dedup,
+        'profile': config.profile,
+        'profile_memory': config.profile and config.profile_memory,
+    }
+    manifest = None
+    if cache is not None:
+        analyze_options['cache_context'] = cache.make_context(targets, analyze_options)
+        # 이전 실행의 매니페스트 (바뀐 폴더/파일만 다시 읽음)
+        manifest = run.manifest = Manifest.load(cache.cache_dir, config.path, analyze_options['cache_context'])
+
+    run.update_progress(f"C, H 파일 검색 중 (인코딩: {config.encoding})...", 0)
+    if index_files is not None:
+        c_files = [f for f in index_files if config.include_headers or f.endswith('.c')]
+    else:
+        with run.phase('walk'):
+            c_files = find_c_files(config.path, include_headers=config.include_headers,
+                                   dir_index=manifest.dirs if manifest is not None else None)
+    if not c_files:
+        log_error(f"[Warning] 지정된 경로에서 C/H 파일을 찾을 수 없습니다: {config.path}")
+        return run.finish()
+
+    print(f"총 {len(c_files)}개의 {'C/H' if config.include_headers else 'C'} 파일을 찾았습니다.")
+
+    jobs = resolve_jobs(config.jobs)
+    if jobs > 1:
+        print(f"{min(jobs, len(c_files))}개 프로세스로 병렬 분석합니다.")
+
+    # 프롬프트 분할 옵션 (프롬프트는 결과가 나오는 대로 파일에 쓰므로 분석 전에 정함)
+    split_mode, target_lines_for_regular = _parse_target_lines(config, log_error)
+    max_tokens, tokenizer, target_lines_for_regular = _parse_max_tokens(config, target_lines_for_regular, log_error)
+    outputs = run.outputs = _Outputs(run, targets, variants, caller_depth, split_mode, target_lines_for_regular,
+                                     max_tokens, tokenizer)
+
+    # 결과 레코드는 코드 위치만 들고 있고, 보고서/프롬프트를 쓸 때 이 loader로 코드를 잘라낸다
+    if index is not None and warm is not None:
+        # 파일 내용을 요청 사이에 유지
+        loader = warm.workspace(config.path, config.encoding, config.resolved_index_path()).loader
+    else:
+        loader = SourceLoader(config.path, config.encoding, variants=variants)
+    summary = {}
+    if index is not None:
+        # 색인에서 바로 파일별 결과를 만든다 (ENUM이 나오는 파일의 코드만 읽음, 호출 간선도 색인에서)
+        outcome_iter = index.outcomes(c_files, config.path, targets, loader, context_lines=config.context_lines,
+                                      with_calls=config.find_caller)
+    elif manifest is not None:
+        outcome_iter = iter_analyze_incremental(c_files, config.path, targets, analyze_options, manifest, summary,
+                                                jobs=jobs, on_file_done=run.on_file_done)
+    else:
+        outcome_iter = iter_analyze_files(c_files, config.path, targets, analyze_options,
+                                          jobs=jobs, on_file_done=run.on_file_done)
+
+    try:
+        file_infos = _process_files(run, outcome_iter, outputs, loader, on_results, manifest, summary, c_files,
+                                    analyze_options, caller_depth, jobs)
+    except AnalysisCancelled:
+        raise
+    except Exception as e:
+        log_error(f"[Error] 보고서/프롬프트 생성 실패 → {str(e)}")
+        outputs.discard()
+        return run.finish()
+    if cache is not None:
+        cache.prune()
+
+    if analyze_options['prefilter'] is not None:
+        result.prefilter = get_prefilter_stats(file_infos)
+        print_prefilter_stats(result.prefilter)
+
+    for enum_name in targets.names:
+        if enum_name not in outputs.stats_results:
+            log_error(f"[Warning] ENUM '{enum_name}'을(를) 사용하는 함수를 찾을 수 없습니다.")
+    if not outputs.stats_results:
+        outputs.discard()
+        if targets.patterns:
+            log_error(f"[Warning] 패턴 {', '.join(targets.patterns)}에 해당하는 ENUM 사용 함수를 찾을 수 없습니다.")
+        return run.finish()
+    if not _write_outputs(run, outputs, file_infos):
+        return run.finish()
+
+    elapsed = time.time() - run.start_time
+    run.update_progress(f"분석 완료! (총 {elapsed:.1f}초)", 100)
+    print(f"총 수행 시간: {elapsed:.2f}초")
+    return run.finish()
+
+
+def _load_macro_aliases(run, config, targets, index, cache):
+    """ENUM으로 펼쳐지는 #define 별칭 표를 만들어 targets에 넣는다 (--macro-aliases)"""
+    if index is not None:
+        # 색인에 저장된 #define 정의로 별칭 표를 만든다
+        definitions = index.macro_definitions()
+    else:
+        # 헤더까지 모든 파일의 #define으로 별칭 표를 만든다 (캐시를 쓰면 바뀐 파일만 다시 읽음)
+        run.update_progress("#define 별칭 검색 중...", 0)
+        with run.phase('macros'):
+            macro_index = MacroIndex.load(cache.cache_dir, config.path, config.encoding) if cache is not None else MacroIndex()
+            macro_files = find_c_files(config.path, include_headers=True,
+                                       dir_index=macro_index.dirs if cache is not None else None)
+            macro_index.update(macro_files, config.path, config.encoding)
+            macro_index.save()
+        definitions = macro_index.definitions()
+    alias_table = resolve_aliases(definitions, targets)
+    if alias_table:
+        targets.set_aliases(alias_table)
+        print(f"ENUM으로 펼쳐지는 #define 별칭 {len(alias_table)}개: {', '.join(targets.alias_names[:10])}"
+              + (" ..." if len(alias_table) > 10 else ""))
+
+
+def _process_files(run, outcome_iter, outputs, loader, on_results, manifest, summary, c_files, analyze_options,
+                   caller_depth, jobs):
+    """
+    파일별 분석 결과를 파일 순서대로 받아 작성기에 넘긴다 (병렬 실행이어도 순차 실행과 같은 순서).
+    호출자를 붙이려면 프로젝트 전체 호출 그래프가 있어야 하므로, 그동안 결과는 임시 파일에 두었다가
+    호출 그래프를 만든 뒤 호출자를 붙여 넘긴다.
+
+    Returns:
+        list: 파일별 info (통계용)
+    """
+    config = run.config
+    result = run.result
+    pending = run.pending = RecordSpool() if config.find_caller else None
+    callee_names = set()
+    outcomes = []   # 파일별 (rel_path, {}, 에러, info) - 결과 없이 호출 그래프/통계용 정보만
+    file_infos = []
+    files_start = time.perf_counter()
+    try:
+        for rel_path, parser_results, error, info in outcome_iter:
+            run.check_cancel()
+            outcomes.append((rel_path, {}, error, info))
+            file_infos.append(info)
+            result.files.append(FileTiming(rel_path, info['size'], info['elapsed'], info['skipped'],
+                                           info.get('cache'), error))
+            if run.profiler is not None:
+                run.profiler.add_file(rel_path, info)
+            if error:
+                run.log_error(error)
+                continue
+            if not any(parser_results.values()):
+                continue
+            if on_results is not None:
+                on_results(_result_rows(parser_results))
+            if pending is not None:
+                pending.append(None, (rel_path, encode_results(parser_results)))
+                callee_names.update(r['func_name'] for results in parser_results.values() for r in results)
+            else:
+                bind_source(parser_results, loader)
+                outputs.emit(parser_results)
+    finally:
+        outcome_iter.close()  # 중간에 멈추면(취소/에러) 병렬 분석도 바로 정리
+    if run.profiler is not None:
+        run.profiler.add('files', files_start, time.perf_counter())
+    if summary:
+        print(f"증분 분석: 변경/추가 {summary['changed']}개, 변경 없음 {summary['unchanged']}개, 삭제 {summary['removed']}개")
+
+    if pending is not None and callee_names:
+        # 프로젝트 전체 호출 그래프로 호출자 연결 (다른 파일의 호출자 포함)
+        run.update_progress("호출자 검색 중...", 90)
+        with run.phase('callers'):
+            graph, filled = collect_call_graph(outcomes, c_files, config.path, analyze_options, callee_names,
+                                               max_depth=caller_depth, jobs=jobs)
+        if manifest is not None:
+            for i in filled:
+                manifest.update_calls(outcomes[i][0], outcomes[i][3]['calls'])
+        resolver = CallerResolver(graph, loader, context_lines=config.context_lines, log_error=run.log_error,
+                                  max_depth=caller_depth)
+        for rel_path, blob in pending.iter_section(None):
+            run.check_cancel()
+            parser_results, _ = decode_results(blob, rel_path, loader)
+            t = time.perf_counter()
+            resolver.attach(parser_results)
+            run.tick('callers', t)
+            outputs.emit(parser_results)
+    return file_infos
+
+
+def _result_rows(parser_results):
+    """on_results로 넘길 파일 하나의 결과 요약 (코드 없이)"""
+    return [{'enum': enum_name, 'file': r['file'], 'func_name': r['func_name'], 'start_line': r['start_line'],
+             'end_line': r['end_line'], 'enum_count': r['enum_count']}
+            for enum_name, results in parser_results.items() for r in results]
+
+
+def _write_outputs(run, outputs, file_infos):
+    """통계를 출력하고 보고서/프롬프트 파일을 마무리한다. 보고서/프롬프트를 쓰지 못했으면 False"""
+    config = run.config
+    result = run.result
+    # 지정한 이름 순서, 패턴으로 찾은 이름은 가나다순
+    enum_order = [name for name in outputs.targets.order(outputs.stats_results) if name in outputs.stats_results]
+
+    # 통계 정보 수집 및 출력
+    stats = None
+    for enum_name in enum_order:
+        stats = get_analysis_stats(enum_name, outputs.stats_results[enum_name], file_infos)
+        print_analysis_stats(stats)
+        enum_stats = EnumStats(**stats)
+        if outputs.variants is not None:
+            enum_stats.variant_counts = {variant: outputs.variant_counts.get((enum_name, variant), 0)
+                                         for variant in outputs.variants.names}
+            print("빌드 변형별 영향 함수: " + ", ".join(
+                f"{variant} {count}개" for variant, count in enum_stats.variant_counts.items()))
+        result.stats.append(enum_stats)
+    if stats is not None:
+        print_cache_stats(stats)
+    if outputs.clusters is not None:
+        result.duplicates = outputs.clusters.duplicates()
+        if result.duplicates:
+            print_duplicate_clusters(result.duplicates)
+
+    run.update_progress("HTML 보고서 생성 중...", 95)
+    try:
+        # HTML 보고서 저장 (여러 ENUM이면 ENUM별 섹션으로 나눈 하나의 보고서)
+        with run.phase('html'):
+            result.html_file = outputs.html_writer.close(enum_order, duplicates=result.duplicates)
+
+        # CSV 보고서 저장 (--csv 옵션이 있을 때만)
+        if outputs.writers['csv'] is not None:
+            run.update_progress("CSV 보고서 생성 중...", 97)
+            try:
+                with run.phase('csv'):
+                    result.csv_file = outputs.writers['csv'].close(enum_order)
+            except Exception as e:
+                run.log_error(f"[Error] CSV 보고서 생성 실패 → {str(e)}")
+        if outputs.writers['ndjson'] is not None:
+            with run.phase('ndjson'):
+                result.ndjson_file = outputs.writers['ndjson'].close()
+    except Exception as e:
+        run.log_error(f"[Error] HTML 보고서 생성 실패 → {str(e)}")
+        outputs.discard()
+        result.html_file = result.csv_file = result.ndjson_file = None
+        return False
+
+    run.update_progress("프롬프트 파일 생성 중...", 98)
+    try:
+        # 프롬프트 분할 저장 (ENUM별로 별도 파일)
+        with run.phase('prompt'):
+            prompt_files = outputs.close_prompts()
+    except Exception as e:
+        run.log_error(f"[Error] 프롬프트 파일 생성 실패 → {str(e)}")
+        outputs.discard()
+        result.html_file = result.csv_file = result.ndjson_file = None
+        return False
+    result.prompt_files = prompt_files
+
+    # 결과 출력
+    if prompt_files:
+        if len(prompt_files) > 1:
+            print(f"ENUM별 프롬프트 파일 {len(prompt_files)}개가 저장되었습니다 (ENUM {len(outputs.prompt_writers)}개):")
+            for f_path in prompt_files: # 변수명 변경
+                print(f"- {f_path}")
+        else:
+            print(f"프롬프트 파일이 생성되었습니다: {prompt_files[0]}")
+        for enum_name, packing in result.prompt_packing.items():
+            print_prompt_packing(enum_name, packing)
+    else:
+        # 프롬프트 데이터는 있지만 파일이 생성 안된 경우 (예: 모든 프롬프트가 비어있거나 오류로 저장 실패)
+        if outputs.prompt_writers:
+            print("프롬프트 내용이 있었으나 파일로 저장되지 못했습니다. 에러 로그를 확인해주세요.")
+        # else: all_results 자체가 없어서 llm_prompts_data도 비어있는 경우는 이미 위에서 처리됨
+    return True
+
+
+class _Outputs:
+    """
+    analyze() 한 번의 보고서/프롬프트 작성기 묶음. 결과를 모아 두지 않고 파일 단위로 흘려보낸다.
+    통계용 값(ENUM별 파일/사용 횟수, 빌드 변형별 함수 수)만 메모리에 남긴다.
+    """
+
+    def __init__(self, run, targets, variants, caller_depth, split_mode, target_lines_for_regular, max_tokens,
+                 tokenizer):
+        config = run.config
+        self.run = run
+        self.targets = targets
+        self.variants = variants
+        self.output_dir = config.output_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        batch = not targets.is_single
+        # 함수명 뒤에 붙는 열: 빌드 변형(--variant), 거친 #define 별칭
+        extra_columns = [key for key, enabled in (('variants', variants is not None),
+                                                  ('macros', bool(targets.aliases)))
+                         if enabled]
+        self.html_writer = HtmlReportWriter(targets.label, self.output_dir, batch=batch, mode=config.html_mode,
+                                            extra_columns=extra_columns)
+        self.writers = {'csv': None, 'ndjson': None}
+        if config.csv:
+            self.writers['csv'] = CsvReportWriter(targets.label, self.output_dir, batch=batch,
+                                                  with_depth=config.find_caller and caller_depth > 1,
+                                                  extra_columns=extra_columns)
+        if config.ndjson:
+            self.writers['ndjson'] = NdjsonReportWriter(targets.label, self.output_dir)
+        self.prompt_options = {'split_mode': split_mode, 'target_lines_for_regular_files': target_lines_for_regular,
+                               'find_caller_active': config.find_caller, 'max_tokens': max_tokens,
+                               'tokenizer': tokenizer}
+        self.prompt_writers = {}    # ENUM 이름 -> PromptFileWriter (결과가 처음 나온 순서)
+        # 같은 함수 묶기: 묶음의 대표 결과만 ENUM별로 모아 두었다가 모든 위치를 안 뒤에 프롬프트로 쓴다
+        # (나머지 복사본의 호출자는 (ENUM 이름, 지문) 구역에 모아 대표 프롬프트에 합친다)
+        self.clusters = FunctionClusters() if config.dedup else None
+        self.prompt_spool = RecordSpool() if config.dedup else None
+        self.stats_results = {}     # ENUM 이름 -> 통계용 [{'file', 'enum_count'}] (코드 없이)
+        self.variant_counts = {}    # (ENUM 이름, 빌드 변형) -> 영향 함수 수 (--variant)
+
+    def discard(self):
+        """쓰던 보고서/프롬프트 파일을 지운다 (에러/취소)"""
+        self.html_writer.discard()
+        for writer in list(self.writers.values()) + list(self.prompt_writers.values()):
+            if writer is not None:
+                writer.discard()
+        self.close()
+
+    def close(self):
+        if self.prompt_spool is not None:
+            self.prompt_spool.close()
+
+    def add_prompt(self, prompt_writer, enum_name, r, locations=None):
+        config = self.run.config
+        from_value, to_value = self.targets.values_for(enum_name, config.from_value, config.to_value)
+        prompt_text = make_llm_prompt(
+            r['file'], r['func_name'], enum_name, from_value, to_value, r['code'],
+            callers=r.get('callers'), variants=r.get('variants'), macros=r.get('macros'), locations=locations
+        )
+        prompt_writer.add(prompt_text, bool(r.get('callers')))
+
+    def emit(self, parser_results):
+        """파일 하나의 ENUM별 결과를 보고서/프롬프트 작성기에 넘긴다"""
+        detach_sources(parser_results)
+        tick = self.run.tick
+        writers = self.writers
+        for enum_name, enum_results in parser_results.items():
+            if not enum_results:
+                continue
+            prompt_writer = self.prompt_writers.get(enum_name)
+            if prompt_writer is None:
+                prompt_writer = self.prompt_writers[enum_name] = PromptFileWriter(
+                    os.path.join(self.output_dir, f"{enum_name}_LLM_Prompts_{self.now}.txt"), **self.prompt_options)
+            for r in enum_results:
+                if self.run.config.debug:
+                    print(f"함수명 추출 결과: {r['func_name']} ({enum_name})")
+                self.stats_results.setdefault(enum_name, []).append({'file': r['file'], 'enum_count': r['enum_count']})
+                for variant in r.get('variants') or ():
+                    self.variant_counts[enum_name, variant] = self.variant_counts.get((enum_name, variant), 0) + 1
+                t = time.perf_counter()
+                self.html_writer.add(enum_name, r)
+                t = tick('html', t)
+                if writers['csv'] is not None:
+                    try:
+                        writers['csv'].add(enum_name, r)
+                    except Exception as e:
+                        self.run.log_error(f"[Error] CSV 보고서 생성 실패 → {str(e)}")
+                        writers['csv'].discard()
+                        writers['csv'] = None
+                    t = tick('csv', t)
+                if writers['ndjson'] is not None:
+                    writers['ndjson'].add(enum_name, r)
+                    t = tick('ndjson', t)
+                if self.clusters is None:
+                    self.add_prompt(prompt_writer, enum_name, r)
+                elif self.clusters.add(enum_name, r):
+                    self.prompt_spool.append(enum_name, as_dict(r))  # 코드(호출자 코드 포함)도 이때 읽어 둔다
+                else:
+                    for caller in r.get('callers') or ():
+                        caller = as_dict(caller)
+                        caller.setdefault('file', r['file'])
+                        self.prompt_spool.append((enum_name, r['fingerprint']), caller)
+                tick('prompt', t)
+
+    def close_prompts(self):
+        """묶어 둔 대표 결과까지 프롬프트로 쓰고 ENUM별 프롬프트 파일을 닫는다. 프롬프트 파일 목록 반환"""
+        prompt_files = []
+        for enum_name, prompt_writer in self.prompt_writers.items():
+            if self.prompt_spool is not None:
+                for r in self.prompt_spool.iter_section(enum_name):
+                    copies = (enum_name, r.get('fingerprint'))
+                    if self.prompt_spool.count(copies):
+                        r['callers'] = merge_callers(r['file'], r.get('callers'),
+                                                     self.prompt_spool.iter_section(copies))
+                    self.add_prompt(prompt_writer, enum_name, r,
+                                    self.clusters.locations(enum_name, r.get('fingerprint')))
+            prompt_files.extend(prompt_writer.close())
+            if prompt_writer.packing is not None:
+                self.run.result.prompt_packing[enum_name] = prompt_writer.packing
+        self.close()
+        return prompt_files
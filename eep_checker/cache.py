@@ -0,0 +1,224 @@
+import hashlib
+import marshal
+import os
+import shutil
+import threading
+import zlib
+from eep_checker import __version__
+from eep_checker.records import ResultRecord
+
+# 캐시 항목 직렬화 형식이나 결과 내용이 바뀌면 올린다 (도구 버전과 함께 키에 포함)
+CACHE_FORMAT = 8
+DEFAULT_CACHE_DIR = os.path.join('outputs', '.cache')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# cache_dir 아래 결과 항목 폴더. 매니페스트/매크로 표/색인/서버 상태 파일은 다른 폴더라 prune/clear가 건드리지 않는다
+RESULTS_DIR = 'results'
+# 결과 폴더 전체 크기 (마지막으로 합산한 값)와, 그 뒤에 put()이 쓴 크기를 한 줄씩 덧붙이는 기록
+_SIZE_FILE = 'size'
+_SIZE_LOG = 'size.log'
+
+
+def content_digest(data) -> bytes:
+    """파일 내용 해시 (매니페스트에서 touch만 된 파일을 알아볼 때 사용)"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def encode_results(results_by_enum, calls=None) -> bytes:
+    """
+    파일 하나의 ENUM별 결과(와 호출 간선 목록)를 바이너리로 직렬화한다.
+    결과 레코드를 튜플로 바꾼 뒤(ResultRecord.pack) marshal + zlib으로 압축한다.
+    코드 문자열과 파일 이름은 저장하지 않는다 (코드는 위치만, 내용이 같으면 경로가 달라도 같은 항목을 사용).
+    """
+    packed = {}
+    for enum_name, results in results_by_enum.items():
+        packed[enum_name] = [r.pack() for r in results]
+    return zlib.compress(marshal.dumps((packed, calls)))
+
+
+def decode_results(blob: bytes, file_name: str, source=None):
+    """
+    encode_results의 역변환. 결과마다 file_name을 다시 붙이고, 코드를 읽을 source(SourceLoader 등)를 연결한다.
+
+    Returns:
+        tuple: (ENUM별 결과 dict, 호출 간선 리스트 또는 None)
+    """
+    packed, calls = marshal.loads(zlib.decompress(blob))
+    results_by_enum = {}
+    for enum_name, records in packed.items():
+        results_by_enum[enum_name] = [ResultRecord.unpack(record, file_name, source) for record in records]
+    return results_by_enum, calls
+
+
+class ResultCache:
+    """
+    파일별 분석 결과를 디스크에 저장하는 내용 주소 기반(content-addressed) 캐시.
+
+    키는 파일 내용 해시 + 분석 대상 ENUM + 결과에 영향을 주는 옵션 + 도구 버전의 해시이며,
+    항목은 cache_dir/results 아래 키 앞 두 글자 하위 폴더에 파일 하나로 저장한다.
+    조회할 때 파일 수정 시각을 갱신하고, 전체 크기가 max_bytes를 넘으면
+    가장 오래 쓰지 않은 항목부터 지운다 (LRU).
+    전체 크기는 폴더를 매번 훑지 않도록 size 파일(합계)과 size.log(put()마다 쓴 크기 한 줄)로 따라간다.
+    워커 프로세스에서도 그대로 쓸 수 있도록 경로 정보만 가진다.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.results_dir = os.path.join(cache_dir, RESULTS_DIR)
+        self.max_bytes = max_bytes
+
+    def make_context(self, targets, options) -> bytes:
+        """파일 내용 외에 결과를 바꾸는 값들을 하나의 바이트열로 만든다"""
+        parts = [
+            f"v={__version__}/{CACHE_FORMAT}",
+            "names=" + ",".join(sorted(targets.names)),
+            "patterns=" + ",".join(sorted(targets.patterns)),
+            f"encoding={options.get('encoding')}",
+            f"context_lines={options.get('context_lines')}",
+            f"analyze_callers={bool(options.get('analyze_callers'))}",
+            f"include_headers={bool(options.get('include_headers'))}",
+            f"calls_only={bool(options.get('calls_only'))}",
+            f"fingerprints={bool(options.get('fingerprints'))}",
+            f"variants={options['variants'].key() if options.get('variants') else ''}",
+            "aliases=" + ";".join(f"{alias.decode()}:{','.join(enum for enum, _ in via)}"
+                                  for alias, via in sorted(targets.aliases.items())),
+        ]
+        return "\n".join(parts).encode()
+
+    def key(self, data, context: bytes) -> str:
+        """파일 원본 바이트와 make_context 값으로 캐시 키를 만든다"""
+        h = hashlib.sha256(context)
+        h.update(b'\0')
+        h.update(data)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.results_dir, key[:2], key[2:] + '.bin')
+
+    def get(self, key: str, file_name: str):
+        """캐시된 (결과, 호출 간선)을 반환. 없거나 읽을 수 없으면 None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                blob = f.read()
+            cached = decode_results(blob, file_name)
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            return None
+        try:
+            os.utime(path)  # LRU 순서 갱신
+        except OSError:
+            pass
+        return cached
+
+    def put(self, key: str, results_by_enum, calls=None):
+        """결과를 저장. 임시 파일에 쓴 뒤 교체하므로 여러 프로세스가 동시에 써도 안전"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            blob = encode_results(results_by_enum, calls)
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+            # 한 줄 덧붙이기는 여러 프로세스가 동시에 해도 섞이지 않는다 (같은 키를 다시 쓰면 많게 세지만 prune에서 바로잡음)
+            with open(os.path.join(self.results_dir, _SIZE_LOG), 'a', encoding='ascii') as f:
+                f.write(f"{len(blob)}\n")
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _tracked_size(self):
+        """
+        기록해 둔 결과 폴더 크기 (합계 + 그 뒤에 쓴 크기). 기록이 없으면 None.
+        덧붙인 기록은 이름을 바꿔 떼어 낸 뒤 합계에 합쳐 다시 저장한다.
+        """
+        size_path = os.path.join(self.results_dir, _SIZE_FILE)
+        try:
+            with open(size_path, 'r', encoding='ascii') as f:
+                total = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return None
+        log_path = os.path.join(self.results_dir, _SIZE_LOG)
+        taken = f"{log_path}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            os.replace(log_path, taken)
+        except OSError:
+            return total  # 새로 쓴 항목이 없음 (또는 다른 프로세스가 쓰는 중이라 다음에 합침)
+        try:
+            with open(taken, 'r', encoding='ascii') as f:
+                total += sum(int(line) for line in f if line.strip().isdigit())
+            os.remove(taken)
+        except OSError:
+            pass
+        self._save_size(total)
+        return total
+
+    def _save_size(self, total):
+        try:
+            os.makedirs(self.results_dir, exist_ok=True)
+            with open(os.path.join(self.results_dir, _SIZE_FILE), 'w', encoding='ascii') as f:
+                f.write(str(total))
+        except OSError:
+            pass
+
+    def _remove_legacy_entries(self):
+        """예전 배치(cache_dir 바로 아래 두 글자 폴더)의 결과 항목을 지운다"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            if len(name) == 2 and all(c in '0123456789abcdef' for c in name) and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def prune(self) -> int:
+        """
+        결과 폴더 크기가 max_bytes 이하가 될 때까지 오래된 항목을 지운다. 지운 항목 수 반환.
+        기록해 둔 크기가 한도 안이면 폴더를 훑지 않는다.
+        """
+        total = self._tracked_size()
+        if total is None:
+            self._remove_legacy_entries()  # 크기 기록이 없는 첫 실행 (예전 배치에서 올라온 경우 포함)
+        elif total <= self.max_bytes:
+            return 0
+        # 아래에서 직접 합산하므로 지금까지 덧붙인 기록은 버린다 (합산 중에 쓴 항목은 많게 세어질 뿐)
+        try:
+            os.remove(os.path.join(self.results_dir, _SIZE_LOG))
+        except OSError:
+            pass
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.results_dir):
+            for name in files:
+                if not name.endswith('.bin'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        removed = 0
+        if total <= self.max_bytes:
+            self._save_size(total)
+            return removed
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._save_size(total)
+        return removed
+
+    def clear(self):
+        """결과 항목 전체 삭제 (cache_dir의 다른 폴더/파일은 그대로 둔다)"""
+        shutil.rmtree(self.results_dir, ignore_errors=True)
+        self._remove_legacy_entries()
@@ -0,0 +1,310 @@
+import os
+from collections import OrderedDict
+from eep_checker.parallel import analyze_files
+from eep_checker.prefilter import Prefilter
+from eep_checker.source import SourceBuffer, load_source, source_bytes
+from eep_checker.variants import scan_directives, variant_holes
+from eep_checker.targets import EnumTargets
+from eep_checker.records import CallerRecord
+
+
+class CallGraph:
+    """
+    프로젝트 전체 호출 그래프 (호출 대상 이름 -> 호출자 간선 목록).
+
+    파일마다 파싱할 때 수집한 호출 간선(parser._call_edges)을 파일 순서대로 합친다.
+    호출자 코드는 들고 있지 않고 위치(파일, 정의 byte 범위)만 기록해 두었다가
+    실제로 보고서에 들어가는 호출자만 SourceLoader로 잘라낸다.
+    빌드 변형별 분석의 간선(variants.analyze_variants)은 호출 위치가 활성인 변형 이름들을 함께 기록한다.
+    """
+
+    def __init__(self):
+        # 호출 대상 -> [(파일 순서, 파일, 호출자, 호출 라인, 정의 시작 byte, 끝 byte, 같은 파일 정의 여부,
+        #               변형 이름 튜플 또는 None(변형 구분 없음))]
+        self.callers = {}
+        self.edge_count = 0
+
+    def add_file(self, order, rel_path, edges):
+        for callee, caller_name, call_line, start_byte, end_byte, local, *variants in edges:
+            self.callers.setdefault(callee, []).append(
+                (order, rel_path, caller_name, call_line, start_byte, end_byte, local,
+                 variants[0] if variants else None)
+            )
+        self.edge_count += len(edges)
+
+    def callers_of(self, func_name, file_name):
+        """
+        func_name의 호출자 간선 목록. 같은 파일의 호출자를 먼저(호출 순서대로),
+        다른 파일의 호출자는 파일 순서대로 반환한다.
+        호출한 파일에 같은 이름의 함수가 따로 정의되어 있으면 그 함수를 부른 것으로 보고 제외한다.
+        """
+        edges = self.callers.get(func_name, ())
+        same_file = [e for e in edges if e[1] == file_name]
+        other_files = [e for e in edges if e[1] != file_name and not e[6]]
+        return same_file + other_files
+
+
+def build_call_graph(outcomes):
+    """analyze_files 결과(파일 순서)에서 호출 그래프를 만든다."""
+    graph = CallGraph()
+    for order, (rel_path, _, error, info) in enumerate(outcomes):
+        if error is None and info.get('calls'):
+            graph.add_file(order, rel_path, info['calls'])
+    return graph
+
+
+def fill_missing_calls(outcomes, c_files, base_path, options, callee_names, jobs=1, on_file_done=None):
+    """
+    사전 필터로 건너뛰어 호출 간선이 없는 파일 중, 호출 대상 이름(callee_names)이
+    나오는 파일만 골라 호출 간선을 수집하고 outcomes의 info['calls']를 채운다.
+
+    Returns:
+        list: 호출 간선을 새로 채운 파일의 outcomes 인덱스 리스트
+    """
+    missing = [i for i, (_, _, error, info) in enumerate(outcomes)
+               if error is None and info.get('calls') is None]
+    if not missing or not callee_names:
+        return []
+    callee_targets = EnumTargets(sorted(callee_names))
+    call_options = dict(options, calls_only=True)
+    if options.get('prefilter') is not None:
+        call_options['prefilter'] = Prefilter(callee_targets)
+    if options.get('cache') is not None:
+        call_options['cache_context'] = options['cache'].make_context(EnumTargets(), call_options)
+    fresh = analyze_files([c_files[i] for i in missing], base_path, callee_targets, call_options,
+                          jobs=jobs, on_file_done=on_file_done)
+    filled = []
+    for i, (rel_path, _, error, info) in zip(missing, fresh):
+        if error is None and info.get('calls') is not None:
+            outcomes[i][3]['calls'] = info['calls']
+            filled.append(i)
+    return filled
+
+
+def collect_call_graph(outcomes, c_files, base_path, options, root_names, max_depth=1, jobs=1):
+    """
+    호출 그래프를 만든다. 사전 필터로 건너뛴 파일은 찾아야 할 호출 대상 이름이 나오는
+    파일만 단계별로 호출 간선을 채운다 (1단계: root_names, 2단계: 1단계 호출자 이름, ...).
+
+    Returns:
+        tuple: (CallGraph, 호출 간선을 새로 채운 파일의 outcomes 인덱스 리스트)
+    """
+    filled = []
+    seen_names = set(root_names)
+    new_names = set(root_names)
+    for level in range(1, max_depth + 1):
+        filled += fill_missing_calls(outcomes, c_files, base_path, options, new_names, jobs=jobs)
+        graph = build_call_graph(outcomes)
+        if level == max_depth:
+            break
+        next_names = {edge[2] for name in new_names for edge in graph.callers.get(name, ())} - seen_names
+        if not next_names:
+            break
+        seen_names |= next_names
+        new_names = next_names
+    return graph, filled
+
+
+class SourceLoader:
+    """
+    호출자 코드를 잘라내기 위해 파일을 파서와 같은 방식(load_source: 전처리기 지시문을 지운 원본 바이트)으로 읽는다.
+    빌드 변형별 결과(variants가 있는 결과)는 그 변형의 활성 구간만 보이도록 읽는다.
+    최근에 읽은 파일 몇 개만 SourceBuffer로 들고 있는다.
+    """
+
+    def __init__(self, base_path, encoding, max_files=64, variants=None):
+        self.base_path = base_path
+        self.encoding = encoding
+        self.max_files = max_files
+        self.variants = variants
+        self._buffers = OrderedDict()
+
+    def get(self, rel_path, variants=None):
+        # 한 결과의 변형들은 코드 범위 안의 활성 구간이 같으므로 첫 번째 변형으로 읽는다
+        variant = variants[0] if variants and self.variants is not None else None
+        key = rel_path if variant is None else (rel_path, variant)
+        source = self._buffers.get(key)
+        if source is not None:
+            self._buffers.move_to_end(key)
+            return source
+        # 오래 들고 있는 버퍼라 mmap 대신 읽어 둔다 (분석 중 파일이 바뀌어도 안전)
+        with open(os.path.join(self.base_path, rel_path), 'rb') as f:
+            data = f.read()
+        if variant is None:
+            source = load_source(data, self.encoding)
+        else:
+            data, encoding = source_bytes(data, self.encoding)
+            holes = variant_holes(scan_directives(data), self.variants.defines[variant], len(data))
+            source = SourceBuffer(data, encoding, holes)
+        self._buffers[key] = source
+        if len(self._buffers) > self.max_files:
+            self._buffers.popitem(last=False)
+        return source
+
+    def forget(self, rel_paths):
+        """rel_paths 파일의 버퍼를 버린다 (파일이 바뀐 뒤 다시 읽도록, 오래 쓰는 loader에서 사용)"""
+        rel_paths = set(rel_paths)
+        for key in [k for k in self._buffers if (k if isinstance(k, str) else k[0]) in rel_paths]:
+            del self._buffers[key]
+
+
+def attach_callers(results_by_enum, graph, loader, context_lines=None, log_error=None, max_depth=1):
+    """
+    결과마다 호출 그래프에서 호출자를 찾아 'callers'를 채운다.
+    max_depth가 2 이상이면 호출자의 호출자까지 너비 우선으로 max_depth 단계까지 찾는다.
+    같은 함수가 여러 ENUM 결과에 나와도 호출자 목록은 한 번만 만든다.
+    빌드 변형별 결과는 그 결과의 변형에서 호출 경로가 활성인 호출자만 붙인다.
+    """
+    CallerResolver(graph, loader, context_lines, log_error, max_depth).attach(results_by_enum)
+
+
+class CallerResolver:
+    """
+    호출 그래프 역방향 탐색기.
+    함수별 직접 호출자 목록과 호출자 코드 위치는 모든 결과가 함께 쓰도록 한 번만 만든다.
+    (함수, 파일, 남은 단계)별 간접 호출자 목록도 기억해 두므로, ENUM을 쓰는 함수 여럿이 같은 상위 호출자를
+    거쳐도 그 상위 호출자는 한 번만 펼친다.
+    빌드 변형별 결과는 결과의 변형 중 호출 경로의 모든 호출 위치가 활성인 변형만 따라가고,
+    호출자 코드도 그 변형의 활성 구간으로 잘라낸다.
+    호출자 코드는 CallerRecord가 읽을 때 loader에서 잘라내므로 같은 호출자 코드가 결과마다 복사되지 않는다.
+    결과를 파일 단위로 흘려보내며 attach()를 여러 번 불러도 되도록 캐시는 최근 max_cached개만 들고 있는다.
+    """
+
+    def __init__(self, graph, loader, context_lines=None, log_error=None, max_depth=1, max_cached=4096):
+        self.graph = graph
+        self.loader = loader
+        self.context_lines = context_lines
+        self.log_error = log_error
+        self.max_depth = max_depth
+        self.max_cached = max_cached
+        self._direct = {}              # (함수 이름, 파일) -> 직접 호출자 간선 목록
+        # (파일, 정의 시작 byte, 끝 byte, 호출 라인, 코드를 읽을 변형) -> SourceBuffer.snippet_span() 값
+        self._snippets = OrderedDict()
+        self._levels = OrderedDict()    # (함수 이름, 파일, 남은 단계, 변형들) -> 단계별 호출자 항목 (caller_levels 결과)
+        self._callers = OrderedDict()   # (함수 이름, 파일, 변형들) -> transitive_callers 결과
+
+    def _remember(self, cache, key, value):
+        cache[key] = value
+        if len(cache) > self.max_cached:
+            cache.popitem(last=False)
+        return value
+
+    def attach(self, results_by_enum):
+        """results_by_enum의 결과마다 'callers'를 채운다"""
+        for results in results_by_enum.values():
+            for r in results:
+                variants = r.get('variants')
+                variants = None if variants is None else tuple(variants)
+                key = (r['func_name'], r['file'], variants)
+                callers = self._callers.get(key)
+                if callers is None:
+                    callers = self._remember(self._callers, key,
+                                             self.transitive_callers(r['func_name'], r['file'], self.max_depth,
+                                                                     variants))
+                else:
+                    self._callers.move_to_end(key)
+                r['callers'] = callers
+
+    def direct_callers(self, func_name, file_name):
+        key = (func_name, file_name)
+        edges = self._direct.get(key)
+        if edges is None:
+            edges = self._direct[key] = self.graph.callers_of(func_name, file_name)
+        return edges
+
+    def snippet(self, rel_path, start_byte, end_byte, call_line, variants=None):
+        # loader는 변형 목록의 첫 번째 변형으로 읽는다 (간선의 변형들은 호출자 코드 범위의 활성 구간이 같음)
+        key = (rel_path, start_byte, end_byte, call_line, variants[0] if variants else None)
+        if key in self._snippets:
+            self._snippets.move_to_end(key)
+            return self._snippets[key]
+        try:
+            source = self.loader.get(rel_path, variants)
+        except OSError as e:
+            if self.log_error:
+                self.log_error(f"[Warning] 호출자 코드 읽기 실패: {rel_path} → {str(e)}")
+            return self._remember(self._snippets, key, None)
+        return self._remember(self._snippets, key,
+                              source.snippet_span(start_byte, end_byte, [call_line], self.context_lines))
+
+    def caller_levels(self, func_name, file_name, max_depth, variants=None):
+        """
+        func_name의 호출자를 단계별로 모은 목록 [[1단계 항목...], [2단계 항목...], ...] (빈 단계 전까지).
+        항목은 (파일, 호출자, 호출 라인, 코드 위치, 호출된 함수, 호출자부터 func_name까지의 함수 이름 튜플,
+        호출 경로가 활성인 변형 튜플 또는 None)이다.
+
+        n단계 호출자는 1단계 호출자들의 (n-1)단계 목록을 1단계 순서대로 이어 붙인 것이고,
+        (함수, 파일, 남은 단계, 변형들)별로 기억해 두므로 공통 상위 호출자는 한 번만 펼친다.
+        이미 나온 (파일, 함수)와 func_name 자신은 다시 넣지 않으므로 순환 호출에서도 끝나고,
+        각 호출자는 가장 가까운 단계에 (변형별로) 한 번만 나온다.
+        variants를 주면 그 변형 중 호출 위치가 활성인 변형이 남는 간선만 따라간다.
+        """
+        key = (func_name, file_name, max_depth, variants)
+        levels = self._levels.get(key)
+        if levels is not None:
+            self._levels.move_to_end(key)
+            return levels
+        seen = {(file_name, func_name): None}
+        first = []
+        for _, rel_path, caller_name, call_line, start_byte, end_byte, _, edge_variants in \
+                self.direct_callers(func_name, file_name):
+            active = variants
+            if variants is not None and edge_variants is not None:
+                active = tuple(v for v in variants if v in edge_variants)
+                if not active:
+                    continue
+            active = _unseen(seen, (rel_path, caller_name), active)
+            if active is False:
+                continue
+            span = self.snippet(rel_path, start_byte, end_byte, call_line, active)
+            if span is not None:
+                first.append((rel_path, caller_name, call_line, span, func_name, (caller_name, func_name), active))
+        levels = [first] if first else []
+        if first and max_depth > 1:
+            upper = [self.caller_levels(caller_name, rel_path, max_depth - 1, active)
+                     for rel_path, caller_name, _, _, _, _, active in first]
+            for depth in range(1, max_depth):
+                level = []
+                for caller_levels in upper:
+                    if depth > len(caller_levels):
+                        continue
+                    for rel_path, caller_name, call_line, span, callee, path, active in caller_levels[depth - 1]:
+                        active = _unseen(seen, (rel_path, caller_name), active)
+                        if active is False:
+                            continue
+                        level.append((rel_path, caller_name, call_line, span, callee, path + (func_name,), active))
+                if not level:
+                    break
+                levels.append(level)
+        return self._remember(self._levels, key, levels)
+
+    def transitive_callers(self, func_name, file_name, max_depth=1, variants=None):
+        """
+        func_name을 직접/간접적으로 호출하는 함수 목록 (깊이 순, caller_levels로 찾음).
+        path는 호출자에서 func_name까지의 함수 이름 목록이다.
+        variants(결과의 변형 튜플)를 주면 호출자마다 호출 경로가 활성인 변형 목록이 붙는다.
+        """
+        # 코드는 보고서/프롬프트에서 읽을 때 loader로 잘라낸다
+        return [CallerRecord(caller_name, span, call_line, file=rel_path, depth=depth, callee=callee,
+                             path=list(path), source=self.loader,
+                             variants=None if active is None else list(active))
+                for depth, level in enumerate(self.caller_levels(func_name, file_name, max_depth, variants), 1)
+                for rel_path, caller_name, call_line, span, callee, path, active in level]
+
+
+def _unseen(seen, node, variants):
+    """
+    caller_levels의 중복 확인. node(파일, 함수)가 아직 나오지 않은 변형들을 기록하고 반환한다.
+    변형 구분이 없으면(variants가 None) 처음 나올 때만 None을 반환하고, 새 변형이 없으면 False.
+    """
+    if node not in seen:
+        seen[node] = None if variants is None else set(variants)
+        return variants
+    covered = seen[node]
+    if covered is None or variants is None:
+        return False
+    rest = tuple(v for v in variants if v not in covered)
+    if not rest:
+        return False
+    covered.update(rest)
+    return rest
@@ -0,0 +1,43 @@
+import threading
+
+
+class AnalysisCancelled(Exception):
+    """분석 도중 취소 요청을 받았을 때 (CancelToken.check)"""
+
+
+class CancelToken:
+    """
+    협조적 취소 토큰. 다른 스레드(GUI, 서버 연결)에서 cancel()을 부르면
+    분석 쪽이 파일 사이마다 check()로 확인하고 AnalysisCancelled로 멈춘다.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """취소를 요청한다. on_cancel로 등록한 함수는 처음 한 번만 불린다"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """취소될 때 부를 함수를 등록한다 (이미 취소되었으면 바로 부름)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def check(self):
+        if self._event.is_set():
+            raise AnalysisCancelled()
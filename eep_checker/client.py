@@ -0,0 +1,153 @@
+import json
+import os
+import secrets
+import socket
+import threading
+from eep_checker.api import AnalysisConfig, AnalysisResult
+
+# 실행 중인 분석 서버의 주소/토큰을 적어 두는 파일 (서버를 띄운 폴더 기준)
+STATE_FILE = os.path.join('outputs', '.cache', 'server.json')
+CONNECT_TIMEOUT = 0.5
+
+
+def send_message(sock_file, message):
+    """JSON 메시지 하나를 한 줄로 보낸다 (줄 단위 JSON-RPC)"""
+    sock_file.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+    sock_file.flush()
+
+
+def read_message(sock_file):
+    """메시지 하나를 읽는다. 연결이 끊겼으면 None"""
+    line = sock_file.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def read_state(state_file=STATE_FILE):
+    """서버 상태 파일 {'pid', 'host', 'port', 'token', ...}. 없거나 읽을 수 없으면 None"""
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ServerConnection:
+    """
+    분석 서버 연결 하나. 요청(call)마다 진행 상황/로그 알림을 콜백으로 넘기고 최종 결과를 반환한다.
+    서버는 요청을 하나씩 처리하므로 한 연결에서도 요청을 차례로 보낸다.
+    """
+
+    def __init__(self, state, timeout=CONNECT_TIMEOUT):
+        self.state = state
+        self.sock = socket.create_connection((state['host'], state['port']), timeout=timeout)
+        self.sock.settimeout(None)
+        self.file = self.sock.makefile('rwb')
+        self._next_id = 0
+
+    def call(self, method, params=None, on_progress=None, on_log=None, on_results=None):
+        """
+        요청을 보내고 응답을 기다린다.
+
+        Raises:
+            ConnectionError: 응답 전에 연결이 끊긴 경우
+            RuntimeError: 서버가 에러로 응답한 경우
+        """
+        self._next_id += 1
+        send_message(self.file, {'jsonrpc': '2.0', 'id': self._next_id, 'method': method,
+                                 'params': dict(params or {}, token=self.state['token'])})
+        while True:
+            message = read_message(self.file)
+            if message is None:
+                raise ConnectionError("분석 서버 연결이 끊겼습니다")
+            if message.get('id') == self._next_id:
+                if 'error' in message:
+                    raise RuntimeError(message['error'].get('message', '분석 서버 에러'))
+                return message.get('result')
+            # 알림 (id 없음)
+            params = message.get('params') or {}
+            if message.get('method') == 'progress' and on_progress:
+                on_progress(params.get('status'), params.get('elapsed'), params.get('progress'))
+            elif message.get('method') == 'log' and on_log:
+                on_log(params.get('text', ''))
+            elif message.get('method') == 'results' and on_results:
+                on_results(params.get('rows', []))
+
+    def close(self):
+        try:
+            self.file.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def connect(state_file=STATE_FILE):
+    """실행 중인 분석 서버에 연결한다. 서버가 없거나 응답하지 않으면 None"""
+    state = read_state(state_file)
+    if not state:
+        return None
+    try:
+        conn = ServerConnection(state)
+    except OSError:
+        return None
+    try:
+        conn.sock.settimeout(CONNECT_TIMEOUT * 4)
+        conn.call('ping')
+        conn.sock.settimeout(None)
+    except (OSError, ValueError, RuntimeError):
+        conn.close()
+        return None
+    return conn
+
+
+def _send_cancel(state, key):
+    try:
+        conn = ServerConnection(state)
+    except OSError:
+        return
+    try:
+        conn.call('cancel', {'cancel_key': key})
+    except (OSError, ValueError, RuntimeError):
+        pass
+    finally:
+        conn.close()
+
+
+def run_remote(request, progress_callback=None, log=None, cancel=None, on_results=None, state_file=STATE_FILE):
+    """
+    분석 서버에 분석을 맡긴다. 상대 경로(분석 폴더, 출력 파일 등)는 이 프로세스의 현재 폴더 기준이다.
+
+    Args:
+        request (list or AnalysisConfig): main.py에 넘길 인자 (프로그램 이름 제외) 또는 분석 설정
+        progress_callback (callable, optional): analyze(progress_callback=...)와 같은 형식
+        log (callable, optional): 서버가 출력한 텍스트를 받을 함수 (예: 화면 출력)
+        cancel (CancelToken, optional): 취소하면 서버에 취소 요청을 보낸다 (다른 연결, 별도 스레드)
+        on_results (callable, optional): analyze(on_results=...)와 같은 형식
+    Returns:
+        AnalysisResult or None: 실행 중인 서버가 없으면 None
+    Raises:
+        SystemExit: 인자 오류 (직접 실행했을 때의 argparse와 같은 종료 코드)
+    """
+    conn = connect(state_file)
+    if conn is None:
+        return None
+    key = secrets.token_hex(8)  # 이 요청만 취소하도록 서버에 알려 주는 키
+    if cancel is not None:
+        cancel.on_cancel(lambda: threading.Thread(target=_send_cancel, args=(conn.state, key), daemon=True).start())
+    if isinstance(request, AnalysisConfig):
+        params = {'config': request.to_dict(), 'cwd': os.getcwd(), 'cancel_key': key}
+    else:
+        params = {'argv': list(request), 'cwd': os.getcwd(), 'cancel_key': key}
+    try:
+        result = conn.call('analyze', params, on_progress=progress_callback, on_log=log, on_results=on_results)
+    except (OSError, RuntimeError) as e:
+        message = f"[Error] 분석 서버 요청 실패 → {str(e)}"
+        if log:
+            log(message + '\n')
+        return AnalysisResult(error_logs=[message])
+    finally:
+        conn.close()
+    if result.get('exit_code') is not None:
+        raise SystemExit(result['exit_code'])
+    return AnalysisResult.from_dict(result)
@@ -2,6 +2,137 @@ import csv
 import os
 import datetime
 from typing import List, Dict
+from eep_checker.spool import RecordSpool
+from eep_checker.records import as_dict, EXTRA_COLUMNS, extra_values
+
+CSV_HEADER = [
+    '타입', '파일경로', '함수명', 'ENUM 사용횟수 (호출대상인 경우)',
+    '시작 라인', '끝 라인', 'ENUM 사용 라인 (호출대상인 경우)', '호출 대상 함수', '호출 라인 (호출자인 경우)',
+    '코드'
+]
+# --caller-depth로 간접 호출자가 있을 때만 붙이는 열
+CSV_DEPTH_HEADER = ['호출 깊이', '호출 경로']
+
+def _has_transitive_callers(results: List[Dict]) -> bool:
+    """간접 호출자(깊이 2 이상)가 있는지 여부"""
+    return any(c.get('depth', 1) > 1 for r in results for c in r.get('callers') or ())
+
+def _result_rows(r: Dict, with_depth: bool = False, extra_columns=()) -> List[List]:
+    """
+    결과 하나(Enum 사용 함수 + 호출자들)의 CSV 행 목록을 만든다.
+    추가 열(extra_columns, 빌드 변형 등)은 호출자 행에도 호출된 함수의 값을 쓴다.
+    단 호출자에 따로 있는 값(호출 경로가 활성인 빌드 변형)은 호출자 값을 쓴다.
+    """
+    # ENUM 사용 라인들을 쉼표로 구분된 문자열로 변환
+    enum_lines_str = ', '.join(map(str, r['enum_lines']))
+
+    # 1. Enum 사용 함수 정보 기록
+    rows = [[
+        'Enum 사용 함수', # 타입
+        r['file'],
+        r['func_name'],
+        r['enum_count'],
+        r['start_line'],
+        r['end_line'],
+        enum_lines_str,
+        '', # 호출 대상 함수 (본인이므로 비워둠)
+        '', # 호출 라인 (본인이므로 비워둠)
+        r['code'].replace('\n', '\\n')
+    ] + (['', ''] if with_depth else [])]
+
+    # 2. 호출자(Caller) 정보 기록
+    if r.get('callers'):
+        for caller in r['callers']:
+            rows.append([
+                '호출 함수', # 타입
+                caller.get('file', r['file']), # 호출자가 포함된 파일
+                caller['func_name'],
+                '', # Enum 사용 횟수 (호출자이므로 비워둠)
+                caller['start_line'],
+                caller['end_line'],
+                '', # Enum 사용 라인 (호출자이므로 비워둠)
+                caller.get('callee', r['func_name']), # 호출 대상 함수명 (간접 호출자는 바로 호출하는 함수)
+                caller['call_line'], # 호출 라인
+                caller['code'].replace('\n', '\\n')
+            ] + ([caller.get('depth', 1), ' → '.join(caller.get('path') or [caller['func_name'], r['func_name']])]
+                 if with_depth else []))
+    if extra_columns:
+        rows[0].extend(extra_values(r, extra_columns))
+        for row, caller in zip(rows[1:], r.get('callers') or ()):
+            row.extend(extra_values(caller, extra_columns, owner=r))
+    return rows
+
+def _csv_path(name: str, output_dir: str) -> str:
+    now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(output_dir, f"{name}_Output_{now}.csv")
+
+class CsvReportWriter:
+    """
+    결과를 하나씩 받아 CSV 보고서를 쓰는 스트리밍 작성기.
+
+    단일 ENUM 보고서는 받은 결과를 바로 파일에 쓴다. 여러 ENUM 보고서(batch)는 ENUM별로 묶어 써야 하므로
+    결과를 임시 파일(RecordSpool)에 쌓아 두었다가 close()에서 ENUM 순서대로 쓴다.
+    깊이 열(with_depth)과 추가 열(extra_columns, EXTRA_COLUMNS 키 목록)은 헤더에 들어가므로 처음에 정한다.
+    """
+
+    def __init__(self, label: str, output_dir: str = '.', batch: bool = False, with_depth: bool = False,
+                 extra_columns=()):
+        self.filepath = _csv_path(label, output_dir)
+        self.batch = batch
+        self.with_depth = with_depth
+        self.extra_columns = tuple(extra_columns)
+        self._file = None
+        self._writer = None
+        self._spool = RecordSpool() if batch else None
+
+    def _open(self):
+        self._file = open(self.filepath, 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file)
+        # 헤더 작성
+        self._writer.writerow((['ENUM'] if self.batch else []) + CSV_HEADER
+                              + (CSV_DEPTH_HEADER if self.with_depth else [])
+                              + [EXTRA_COLUMNS[key] for key in self.extra_columns])
+
+    def add(self, enum_name: str, r: Dict):
+        if self.batch:
+            self._spool.append(enum_name, as_dict(r))
+            return
+        if self._writer is None:
+            self._open()
+        self._writer.writerows(_result_rows(r, self.with_depth, self.extra_columns))
+
+    def close(self, enum_order=None) -> str:
+        """
+        CSV 파일을 마무리하고 경로를 반환한다.
+
+        Args:
+            enum_order (list, optional): batch 보고서의 ENUM 순서 (기본: 결과가 처음 들어온 순서)
+        """
+        try:
+            if self._writer is None:
+                self._open()
+            if self.batch:
+                # ENUM별로 묶어서 기록
+                for enum_name in (self._spool.sections() if enum_order is None else enum_order):
+                    for r in self._spool.iter_section(enum_name):
+                        self._writer.writerows([enum_name] + row for row in _result_rows(r, self.with_depth, self.extra_columns))
+        finally:
+            self.discard(remove=False)
+        print(f"CSV 보고서가 생성되었습니다: {self.filepath}")
+        return self.filepath
+
+    def discard(self, remove: bool = True):
+        """열린 파일/임시 파일을 정리한다. remove이면 쓰던 CSV 파일도 지운다"""
+        if self._spool is not None:
+            self._spool.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if remove:
+                try:
+                    os.remove(self.filepath)
+                except OSError:
+                    pass
 
 def save_csv_report(enum_name: str, results: List[Dict], output_dir: str = '.'):
     """분석 결과를 CSV 파일로 저장합니다.
@@ -14,53 +145,28 @@ def save_csv_report(enum_name: str, results: List[Dict], output_dir: str = '.'):
     Returns:
         str: 생성된 CSV 파일의 경로
     """
-    now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"{enum_name}_Output_{now}.csv"
-    filepath = os.path.join(output_dir, filename)
+    writer = CsvReportWriter(enum_name, output_dir, with_depth=_has_transitive_callers(results),
+                             extra_columns=[key for key in EXTRA_COLUMNS if any(r.get(key) for r in results)])
+    for r in results:
+        writer.add(enum_name, r)
+    return writer.close()
+
+def save_batch_csv_report(label: str, results_by_enum: Dict[str, List[Dict]], output_dir: str = '.'):
+    """여러 ENUM의 분석 결과를 ENUM 열을 추가한 하나의 CSV 파일로 저장합니다.
     
-    with open(filepath, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.writer(f)
-        # 헤더 작성
-        writer.writerow([
-            '타입', '파일경로', '함수명', 'ENUM 사용횟수 (호출대상인 경우)',
-            '시작 라인', '끝 라인', 'ENUM 사용 라인 (호출대상인 경우)', '호출 대상 함수', '호출 라인 (호출자인 경우)',
-            '코드'
-        ])
-        
-        # 데이터 작성
-        for r in results:
-            # ENUM 사용 라인들을 쉼표로 구분된 문자열로 변환
-            enum_lines_str = ', '.join(map(str, r['enum_lines']))
-            
-            # 1. Enum 사용 함수 정보 기록
-            writer.writerow([
-                'Enum 사용 함수', # 타입
-                r['file'],
-                r['func_name'],
-                r['enum_count'],
-                r['start_line'],
-                r['end_line'],
-                enum_lines_str,
-                '', # 호출 대상 함수 (본인이므로 비워둠)
-                '', # 호출 라인 (본인이므로 비워둠)
-                r['code'].replace('\n', '\\n')
-            ])
-
-            # 2. 호출자(Caller) 정보 기록
-            if r.get('callers'):
-                for caller in r['callers']:
-                    writer.writerow([
-                        '호출 함수', # 타입
-                        r['file'], # 호출자가 포함된 파일 (Enum 사용 함수와 동일 파일 가정)
-                        caller['func_name'],
-                        '', # Enum 사용 횟수 (호출자이므로 비워둠)
-                        caller['start_line'],
-                        caller['end_line'],
-                        '', # Enum 사용 라인 (호출자이므로 비워둠)
-                        r['func_name'], # 호출 대상 함수명
-                        caller['call_line'], # 호출 라인
-                        caller['code'].replace('\n', '\\n')
-                    ])
+    Args:
+        label (str): 파일명에 쓸 이름
+        results_by_enum (Dict[str, List[Dict]]): ENUM 이름 -> 분석 결과 리스트
+        output_dir (str): 출력 디렉토리 경로
     
-    print(f"CSV 보고서가 생성되었습니다: {filepath}")
-    return filepath 
\ No newline at end of file
+    Returns:
+        str: 생성된 CSV 파일의 경로
+    """
+    with_depth = any(_has_transitive_callers(results) for results in results_by_enum.values())
+    extra_columns = [key for key in EXTRA_COLUMNS
+                     if any(r.get(key) for results in results_by_enum.values() for r in results)]
+    writer = CsvReportWriter(label, output_dir, batch=True, with_depth=with_depth, extra_columns=extra_columns)
+    for enum_name, results in results_by_enum.items():
+        for r in results:
+            writer.add(enum_name, r)
+    return writer.close(list(results_by_enum))
@@ -0,0 +1,63 @@
+class FunctionClusters:
+    """
+    여러 파일에 복사된 같은 함수를 (ENUM, AST 지문)으로 묶는다.
+    결과를 받은 순서대로 add()하면 묶음의 첫 함수만 대표로 쓰고 나머지는 위치만 기록한다.
+    지문이 없는 결과(dict 결과 등)는 묶지 않는다.
+    """
+
+    def __init__(self):
+        self._locations = {}  # (ENUM 이름, 지문) -> [(파일, 시작 라인, 끝 라인)] (받은 순서)
+        self._names = {}      # (ENUM 이름, 지문) -> 대표 함수 이름
+
+    def add(self, enum_name, r) -> bool:
+        """결과 하나의 위치를 기록하고, 묶음의 첫 함수(또는 지문이 없는 결과)이면 True"""
+        fingerprint = r.get('fingerprint')
+        if not fingerprint:
+            return True
+        key = (enum_name, fingerprint)
+        location = (r['file'], r['start_line'], r['end_line'])
+        locations = self._locations.get(key)
+        if locations is None:
+            self._locations[key] = [location]
+            self._names[key] = r['func_name']
+            return True
+        locations.append(location)
+        return False
+
+    def locations(self, enum_name, fingerprint) -> list:
+        """묶음의 모든 위치 [(파일, 시작 라인, 끝 라인)] (대표 함수가 처음). 없으면 빈 리스트"""
+        return self._locations.get((enum_name, fingerprint), [])
+
+    def duplicates(self) -> list:
+        """
+        두 곳 이상에 있는 묶음 목록. 복사본이 많은 순서 (같으면 처음 나온 순서).
+
+        Returns:
+            list: [{'enum', 'func_name', 'fingerprint', 'count', 'locations': [{'file', 'start_line', 'end_line'}]}]
+        """
+        clusters = [{'enum': enum_name, 'func_name': self._names[enum_name, fingerprint], 'fingerprint': fingerprint,
+                     'count': len(locations),
+                     'locations': [{'file': file, 'start_line': start, 'end_line': end}
+                                   for file, start, end in locations]}
+                    for (enum_name, fingerprint), locations in self._locations.items() if len(locations) > 1]
+        clusters.sort(key=lambda c: -c['count'])
+        return clusters
+
+
+def merge_callers(file_name, callers, more_callers) -> list:
+    """
+    묶음 대표 함수의 호출자에 다른 복사본들의 호출자를 합친다 (대표 것이 먼저, 나머지는 받은 순서).
+    같은 파일의 호출자는 file이 비어 있으므로 대표 파일(file_name)로 채워 어느 복사본을 부르는지 남긴다.
+    같은 호출 위치(파일, 함수, 라인, 단계, 경로)는 한 번만 남긴다.
+    """
+    merged = []
+    seen = set()
+    for caller in list(callers or ()) + list(more_callers):
+        caller = dict(caller)
+        caller.setdefault('file', file_name)
+        key = (caller['file'], caller['func_name'], caller['call_line'], caller.get('depth', 1),
+               caller.get('callee'), tuple(caller.get('path') or ()))
+        if key not in seen:
+            seen.add(key)
+            merged.append(caller)
+    return merged
@@ -0,0 +1,421 @@
+import hashlib
+import marshal
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from eep_checker import parser
+from eep_checker.cache import content_digest
+from eep_checker.source import read_file, load_source
+from eep_checker.macros import scan_macro_definitions
+from eep_checker.records import ResultRecord
+
+# 색인 스키마나 저장하는 사실(facts) 규칙이 바뀌면 올린다
+INDEX_FORMAT = 2
+DEFAULT_INDEX_DIR = os.path.join('outputs', '.cache', 'index')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER, size INTEGER, digest BLOB, error TEXT
+);
+CREATE TABLE IF NOT EXISTS idents (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+-- identifier 사용 위치 (rowid 순서 = 파일 안 문서 순서), scope는 가장 안쪽 결과 후보 번호 (없으면 -1)
+CREATE TABLE IF NOT EXISTS occurrences (ident INTEGER NOT NULL, file INTEGER NOT NULL, scope INTEGER, line INTEGER);
+CREATE INDEX IF NOT EXISTS occurrences_ident ON occurrences (ident, file);
+-- 결과 후보 (함수/struct/전역 선언). parent는 바깥 후보 번호, top은 최상위 노드 여부,
+-- fingerprint는 parser.ast_fingerprint 값
+CREATE TABLE IF NOT EXISTS scopes (
+    file INTEGER NOT NULL, seq INTEGER NOT NULL, kind TEXT, name TEXT, parent INTEGER,
+    start_byte INTEGER, end_byte INTEGER, start_line INTEGER, end_line INTEGER, top INTEGER, fingerprint TEXT,
+    PRIMARY KEY (file, seq)
+) WITHOUT ROWID;
+-- 최상위 선언/struct에서 ident를 쓰면 전역 enum 변수로 보는 이름 (var)
+CREATE TABLE IF NOT EXISTS globals (file INTEGER NOT NULL, scope INTEGER, ident TEXT, var TEXT);
+CREATE INDEX IF NOT EXISTS globals_file ON globals (file, ident);
+-- 호출 간선 (parser._call_edges 형식, seq는 파일 안 순서)
+CREATE TABLE IF NOT EXISTS calls (
+    file INTEGER NOT NULL, seq INTEGER, callee TEXT, caller TEXT, line INTEGER,
+    start_byte INTEGER, end_byte INTEGER, local INTEGER
+);
+CREATE INDEX IF NOT EXISTS calls_file ON calls (file);
+-- #define 별칭 표용 매크로 정의 (본문 identifier는 공백으로 구분)
+CREATE TABLE IF NOT EXISTS macros (file INTEGER NOT NULL, name TEXT, body TEXT);
+CREATE INDEX IF NOT EXISTS macros_file ON macros (file);
+'''
+_FILE_TABLES = ('occurrences', 'scopes', 'globals', 'calls', 'macros')
+
+
+def default_index_path(root_dir, encoding, index_dir=DEFAULT_INDEX_DIR):
+    """분석 폴더/인코딩마다 색인 파일 하나"""
+    h = hashlib.sha256(os.path.abspath(root_dir).encode())
+    h.update(b'\0' + encoding.encode())
+    return os.path.join(index_dir, h.hexdigest()[:32] + '.sqlite')
+
+
+def index_file(path, encoding):
+    """
+    파일 하나를 읽고 파싱하여 색인에 넣을 사실을 모은다.
+
+    Returns:
+        tuple: (digest, extract_identifier_facts 결과 + 'macros', 에러 메시지 또는 None)
+    """
+    try:
+        _, data = read_file(path)
+    except OSError as e:
+        return None, None, f"[Error] 파일 읽기 실패: {path} → {str(e)}"
+    try:
+        digest = content_digest(data)
+        facts = parser.extract_identifier_facts_file(load_source(data, encoding))
+        facts['macros'] = scan_macro_definitions(data, encoding)
+    except Exception as e:
+        return None, None, f"[Warning] 파일 파싱 실패: {path} → {str(e)}"
+    finally:
+        if not isinstance(data, bytes):
+            data.close()
+    return digest, facts, None
+
+
+def _index_file_args(args):
+    return index_file(*args)
+
+
+class IdentifierIndex:
+    """
+    ENUM과 상관없는 프로젝트 식별자 색인 (SQLite).
+
+    모든 .c/.h 파일을 한 번 파싱해 identifier마다 (파일, 둘러싼 함수/struct/전역 선언, 라인)을 기록하고,
+    결과 후보의 위치, 최상위 enum 변수 정보, 호출 간선, #define 정의도 함께 저장한다.
+    update()는 수정 시각/크기(touch만 된 파일은 내용 해시)가 바뀐 파일만 다시 파싱한다.
+    outcomes()는 색인만으로 analyze_file과 같은 형식의 파일별 결과를 만든다 (ENUM이 나오는 파일의 코드만 읽음).
+    파일 목록과 호출 간선은 한 번 읽으면 다음 update()에서 바뀐 파일이 있을 때까지 메모리에 들고 있는다
+    (분석 서버처럼 색인을 오래 열어 두고 여러 번 조회할 때 다시 읽지 않음).
+
+    check_same_thread=False이면 다른 스레드에서도 쓸 수 있다 (동시에 쓰지 않도록 호출하는 쪽에서 순서를 맞춤).
+    """
+
+    def __init__(self, path, encoding='utf-8', check_same_thread=True):
+        self.path = path
+        self.encoding = encoding
+        self._check_same_thread = check_same_thread
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = self._connect()
+        stored = self._meta('format')
+        if stored is not None and (stored != str(INDEX_FORMAT) or self._meta('encoding') != encoding):
+            # 형식/인코딩이 다른 색인은 버리고 새로 만든다
+            self.db.close()
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.remove(path + suffix)
+                except OSError:
+                    pass
+            self.db = self._connect()
+        with self.db:
+            self.db.executescript(_SCHEMA)
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('format', ?), ('encoding', ?)",
+                            (str(INDEX_FORMAT), encoding))
+        self._ident_ids = None
+        self._files = None
+        self._calls = None
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=self._check_same_thread)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def _meta(self, key):
+        try:
+            row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    def close(self):
+        self.db.close()
+
+    def dir_index(self):
+        """find_c_files(dir_index=...)에 넘길 폴더 목록 인덱스 (색인 파일에 함께 저장)"""
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'dirs'").fetchone()
+        try:
+            return marshal.loads(row[0]) if row else {}
+        except (ValueError, EOFError, TypeError):
+            return {}
+
+    def save_dir_index(self, dirs):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('dirs', ?)", (marshal.dumps(dirs),))
+
+    # ---- 색인 갱신 ----
+
+    def _intern(self, names):
+        """identifier 이름들의 id (없으면 추가)"""
+        if self._ident_ids is None:
+            self._ident_ids = dict(self.db.execute('SELECT name, id FROM idents'))
+        ids = self._ident_ids
+        new = [name for name in dict.fromkeys(names) if name not in ids]
+        if new:
+            next_id = (max(ids.values()) if ids else 0) + 1
+            rows = [(next_id + i, name) for i, name in enumerate(new)]
+            self.db.executemany('INSERT INTO idents (id, name) VALUES (?, ?)', rows)
+            ids.update((name, i) for i, name in rows)
+        return ids
+
+    def _store(self, file_id, facts):
+        occurrences = facts['occurrences']
+        ids = self._intern(ident for ident, _, _ in occurrences)
+        self.db.executemany('INSERT INTO occurrences VALUES (?, ?, ?, ?)',
+                            ((ids[ident], file_id, scope, line) for ident, scope, line in occurrences))
+        self.db.executemany(
+            'INSERT INTO scopes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            ((file_id, seq, kind, name, parent, start, end, start_line, end_line, int(top), fingerprint)
+             for seq, (kind, name, parent, start, end, start_line, end_line, top, fingerprint)
+             in enumerate(facts['scopes'])))
+        self.db.executemany('INSERT INTO globals VALUES (?, ?, ?, ?)',
+                            ((file_id, scope, ident, var) for scope, ident, var in facts['globals']))
+        self.db.executemany('INSERT INTO calls VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                            ((file_id, seq) + tuple(edge[:5]) + (int(edge[5]),)
+                             for seq, edge in enumerate(facts['calls'])))
+        self.db.executemany('INSERT INTO macros VALUES (?, ?, ?)',
+                            ((file_id, name, ' '.join(idents)) for name, idents in facts['macros']))
+
+    def _clear_files(self, file_ids):
+        for start in range(0, len(file_ids), 500):
+            chunk = file_ids[start:start + 500]
+            marks = ','.join('?' * len(chunk))
+            for table in _FILE_TABLES:
+                self.db.execute(f'DELETE FROM {table} WHERE file IN ({marks})', chunk)
+
+    def update(self, files, base_path, jobs=1, on_file_done=None):
+        """
+        files(.c/.h 경로 목록)에 맞춰 색인을 갱신한다. 바뀐 파일만 다시 파싱하고 없어진 파일은 지운다.
+        바뀐 파일의 이전 사실은 파싱 전에 한 번에 지운다 (파일마다 지우면 사용 위치 테이블을 매번 훑음).
+
+        Returns:
+            dict: {'indexed': 다시 파싱한 파일 수, 'unchanged': 그대로인 파일 수, 'removed': 지운 파일 수,
+                   'errors': 에러 메시지 리스트, 'changed': 다시 파싱했거나 지운 파일의 상대 경로 리스트}
+        """
+        stored = {path: (file_id, mtime_ns, size, digest) for file_id, path, mtime_ns, size, digest
+                  in self.db.execute('SELECT id, path, mtime_ns, size, digest FROM files')}
+        changed = []  # (상대 경로, 경로, stat)
+        touched = []  # 수정 시각만 바뀐 파일 (stat, id)
+        seen = set()
+        for path in files:
+            rel_path = os.path.relpath(path, base_path)
+            seen.add(rel_path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = stored.get(rel_path)
+            if entry is not None and entry[2] == st.st_size:
+                if entry[1] == st.st_mtime_ns:
+                    continue
+                # touch만 된 파일은 내용 해시가 같으면 다시 파싱하지 않는다
+                try:
+                    with open(path, 'rb') as f:
+                        if content_digest(f.read()) == entry[3]:
+                            touched.append((st.st_mtime_ns, entry[0]))
+                            continue
+                except OSError:
+                    pass
+            changed.append((rel_path, path, st))
+        removed_paths = [rel_path for rel_path in stored if rel_path not in seen]
+        removed = [stored[rel_path][0] for rel_path in removed_paths]
+        stale = [stored[rel_path][0] for rel_path, _, _ in changed if rel_path in stored]
+
+        errors = []
+        indexed = 0
+        if changed or removed:
+            self._files = self._calls = None
+        with self.db:
+            self.db.executemany('UPDATE files SET mtime_ns = ? WHERE id = ?', touched)
+            if removed or stale:
+                self._clear_files(removed + stale)
+                self.db.executemany('DELETE FROM files WHERE id = ?', ((file_id,) for file_id in removed))
+            if jobs > 1 and len(changed) > 1:
+                pool = ProcessPoolExecutor(max_workers=min(jobs, len(changed)))
+                fresh = pool.map(_index_file_args, [(path, self.encoding) for _, path, _ in changed], chunksize=4)
+            else:
+                pool = None
+                fresh = (index_file(path, self.encoding) for _, path, _ in changed)
+            try:
+                for done, ((rel_path, path, st), (digest, facts, error)) in enumerate(zip(changed, fresh), 1):
+                    if on_file_done:
+                        on_file_done(done, len(changed))
+                    # 에러가 난 파일은 수정 시각을 비워 두어 다음 갱신에서 다시 시도한다
+                    row = (None if error else st.st_mtime_ns, st.st_size, digest, error)
+                    entry = stored.get(rel_path)
+                    if entry is not None:
+                        file_id = entry[0]
+                        self.db.execute('UPDATE files SET mtime_ns = ?, size = ?, digest = ?, error = ? WHERE id = ?',
+                                        row + (file_id,))
+                    else:
+                        file_id = self.db.execute(
+                            'INSERT INTO files (path, mtime_ns, size, digest, error) VALUES (?, ?, ?, ?, ?)',
+                            (rel_path,) + row).lastrowid
+                    if error is not None:
+                        errors.append(error)
+                        continue
+                    self._store(file_id, facts)
+                    indexed += 1
+            finally:
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+        return {'indexed': indexed, 'unchanged': len(seen) - len(changed), 'removed': len(removed),
+                'errors': errors, 'changed': [rel_path for rel_path, _, _ in changed] + removed_paths}
+
+    # ---- 조회 ----
+
+    def file_ids(self):
+        """{상대 경로: (id, 크기, 에러 메시지 또는 None)}"""
+        if self._files is None:
+            self._files = {path: (file_id, size, error) for file_id, path, size, error
+                           in self.db.execute('SELECT id, path, size, error FROM files')}
+        return self._files
+
+    def macro_definitions(self):
+        """모든 파일의 (매크로 이름, 본문 identifier 튜플) (macros.resolve_aliases 입력)"""
+        for name, body in self.db.execute(
+                'SELECT m.name, m.body FROM macros m JOIN files f ON f.id = m.file ORDER BY f.path, m.rowid'):
+            yield name, tuple(body.split())
+
+    def matching_idents(self, targets):
+        """targets(별칭 포함)에 걸리는 identifier의 {id: 이름}"""
+        names = targets.names + targets.alias_names
+        found = {}
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            found.update(self.db.execute(
+                f"SELECT id, name FROM idents WHERE name IN ({','.join('?' * len(chunk))})", chunk))
+        for pattern in targets.patterns:
+            glob = pattern.replace('[!', '[^')
+            for ident_id, name in self.db.execute('SELECT id, name FROM idents WHERE name GLOB ?', (glob,)):
+                if targets.match(name.encode('latin-1')):
+                    found[ident_id] = name
+        return found
+
+    def hits(self, targets):
+        """
+        targets 사용 위치를 파일별로 묶는다.
+
+        Returns:
+            dict: 파일 id -> [(identifier 이름, 후보 번호, 라인)] (문서 순서)
+        """
+        idents = self.matching_idents(targets)
+        rows = []
+        ident_ids = list(idents)
+        for start in range(0, len(ident_ids), 500):
+            chunk = ident_ids[start:start + 500]
+            rows += self.db.execute(f"SELECT file, rowid, ident, scope, line FROM occurrences "
+                                    f"WHERE ident IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+        rows.sort()
+        by_file = {}
+        for file_id, _, ident_id, scope, line in rows:
+            by_file.setdefault(file_id, []).append((idents[ident_id], scope, line))
+        return by_file
+
+    def calls_by_file(self):
+        """{파일 id: 호출 간선 리스트} (parser._call_edges 형식)"""
+        if self._calls is None:
+            edges = {}
+            for file_id, callee, caller, line, start, end, local in self.db.execute(
+                    'SELECT file, callee, caller, line, start_byte, end_byte, local FROM calls ORDER BY file, seq'):
+                edges.setdefault(file_id, []).append((callee, caller, line, start, end, bool(local)))
+            self._calls = edges
+        return self._calls
+
+    def file_results(self, file_id, rel_path, hits, targets, loader, context_lines=None):
+        """
+        색인에 기록된 사실로 파일 하나의 ENUM별 결과를 만든다.
+        parser.extract_functions_with_enums(_results_by_enum)와 같은 규칙을 따른다.
+        """
+        scopes = self.db.execute('SELECT seq, name, parent, start_byte, end_byte, fingerprint FROM scopes '
+                                 'WHERE file = ? ORDER BY seq', (file_id,)).fetchall()
+        parents = [row[2] for row in scopes]
+
+        def enclosing(scope):
+            while scope != -1:
+                yield scope
+                scope = parents[scope]
+
+        found_names = set()
+        scope_hits = {}    # 후보 번호 -> {ENUM 이름: 라인 목록}
+        scope_macros = {}  # 후보 번호 -> {ENUM 이름: {별칭 경로: None}}
+        for ident, scope, line in hits:
+            for enum_name, chain in targets.resolve(ident.encode('latin-1')):
+                found_names.add(enum_name)
+                for s in enclosing(scope):
+                    scope_hits.setdefault(s, {}).setdefault(enum_name, []).append(line)
+                    if chain is not None:
+                        scope_macros.setdefault(s, {}).setdefault(enum_name, {})[chain] = None
+
+        # 최상위 선언/struct에서 ENUM을 쓰는 전역 enum 변수와, 그 변수를 쓰는 후보 (via_var)
+        via_var = {}
+        for enum_name in found_names:
+            var_names = {var for (var,) in self.db.execute(
+                'SELECT var FROM globals WHERE file = ? AND ident = ?', (file_id, enum_name))}
+            var_names = [v for v in var_names if not targets.match(v.encode('latin-1'))]
+            if not var_names:
+                continue
+            marks = ','.join('?' * len(var_names))
+            for (scope,) in self.db.execute(
+                    f"SELECT DISTINCT o.scope FROM occurrences o JOIN idents i ON i.id = o.ident "
+                    f"WHERE o.file = ? AND i.name IN ({marks})", [file_id] + var_names):
+                for s in enclosing(scope):
+                    via_var.setdefault(s, set()).add(enum_name)
+
+        source = loader.get(rel_path)
+        by_enum = {}
+        for enum_name in targets.order(found_names):
+            results = []
+            seen_ranges = set()
+            for seq, name, _, start, end, fingerprint in scopes:
+                lines = scope_hits.get(seq, {}).get(enum_name)
+                if not ((lines or enum_name in via_var.get(seq, ())) and name):
+                    continue
+                if (start, end) in seen_ranges:
+                    continue
+                seen_ranges.add((start, end))
+                enum_lines = sorted(lines) if lines else []
+                span = source.snippet_span(start, end, enum_lines, context_lines)
+                macros = scope_macros.get(seq, {}).get(enum_name)
+                results.append(ResultRecord(name, span, enum_lines, file=rel_path, source=loader,
+                                            macros=list(macros) if macros else None, fingerprint=fingerprint))
+            by_enum[enum_name] = results
+        return by_enum
+
+    def outcomes(self, c_files, base_path, targets, loader, context_lines=None, with_calls=False):
+        """
+        c_files 순서로 analyze_file과 같은 형식 (rel_path, 결과, 에러, info)을 하나씩 내보낸다.
+        ENUM이 나오지 않는 파일은 빈 결과이며, with_calls이면 info['calls']에 색인의 호출 간선을 담는다.
+        """
+        files = self.file_ids()
+        hits = self.hits(targets)
+        calls = self.calls_by_file() if with_calls else {}
+        for cfile in c_files:
+            rel_path = os.path.relpath(cfile, base_path)
+            start = time.perf_counter()
+            entry = files.get(rel_path)
+            info = {'size': 0, 'skipped': False, 'elapsed': 0.0, 'cache': None, 'calls': None}
+            if entry is None:
+                yield rel_path, None, f"[Error] 색인에 없는 파일입니다: {rel_path}", info
+                continue
+            file_id, info['size'], error = entry
+            if error is not None:
+                yield rel_path, None, error, info
+                continue
+            if with_calls:
+                info['calls'] = calls.get(file_id, [])
+            results = {}
+            if file_id in hits:
+                try:
+                    results = self.file_results(file_id, rel_path, hits[file_id], targets, loader, context_lines)
+                except OSError as e:
+                    yield rel_path, None, f"[Error] 파일 읽기 실패: {rel_path} → {str(e)}", info
+                    continue
+            info['elapsed'] = time.perf_counter() - start
+            yield rel_path, results, None, info
+
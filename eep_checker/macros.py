@@ -0,0 +1,170 @@
+import hashlib
+import marshal
+import os
+import re
+import threading
+from collections import deque
+from eep_checker.source import read_file, source_bytes
+from eep_checker.variants import scan_directives
+
+# 별칭 인덱스 저장 형식이 바뀌면 올린다
+MACRO_INDEX_FORMAT = 1
+
+_MACRO_HEAD = re.compile(r'([A-Za-z_]\w*)(\([^)]*\))?')
+_IDENT = re.compile(r'(?<!\w)[A-Za-z_]\w*')
+_STRING = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'')
+
+
+def scan_macro_definitions(data, encoding='utf-8'):
+    """
+    파일 하나의 #define에서 (매크로 이름, 본문에 나오는 identifier 튜플) 목록을 만든다.
+    문자열/문자 상수 안의 이름과 함수형 매크로의 인자 이름은 빼고, 본문에 identifier가 없는 매크로는 넣지 않는다.
+    """
+    data, _ = source_bytes(data, encoding)
+    definitions = []
+    for kind, arg, _, _ in scan_directives(data):
+        if kind != 'define':
+            continue
+        m = _MACRO_HEAD.match(arg)
+        if m is None:
+            continue
+        name = m.group(1)
+        params = set(_IDENT.findall(m.group(2))) if m.group(2) else set()
+        params.add(name)
+        idents = tuple(dict.fromkeys(i for i in _IDENT.findall(_STRING.sub(' ', arg[m.end():])) if i not in params))
+        if idents:
+            definitions.append((name, idents))
+    return definitions
+
+
+def resolve_aliases(definitions, targets):
+    """
+    프로젝트 전체 #define 목록에서 대상 ENUM으로 펼쳐지는 매크로(별칭)를 찾는다.
+
+    본문에 대상 ENUM이 나오는 매크로에서 시작해, 그 매크로를 본문에 쓰는 매크로로 더 이상 늘지 않을 때까지
+    넓혀 간다 (별칭의 별칭, 순환 정의도 한 번씩만 방문). 같은 이름이 여러 곳에서 다르게 정의되어 있으면
+    모든 정의를 합쳐서 본다. 이름 자체가 대상 ENUM인 매크로는 별칭으로 보지 않는다.
+
+    Args:
+        definitions: (매크로 이름, 본문 identifier 튜플)의 iterable (scan_macro_definitions 반환값들)
+        targets (EnumTargets): 분석 대상 ENUM
+
+    Returns:
+        dict: 별칭 이름 -> {ENUM 이름: 별칭 경로 튜플 (사용한 별칭부터 ENUM 바로 앞 별칭까지, 가장 짧은 경로)}
+    """
+    users = {}  # identifier -> 본문에 그 identifier를 쓰는 매크로 이름들
+    for name, idents in definitions:
+        if targets.match(name.encode()):
+            continue
+        for ident in idents:
+            users.setdefault(ident, {})[name] = None
+
+    table = {}
+    queue = deque()
+
+    def reach(alias, enum_name, chain):
+        reached = table.setdefault(alias, {})
+        if enum_name not in reached:
+            reached[enum_name] = chain
+            queue.append((alias, enum_name, chain))
+
+    for ident in sorted(users):
+        if targets.match(ident.encode()):
+            for alias in users[ident]:
+                reach(alias, ident, (alias,))
+    while queue:
+        alias, enum_name, chain = queue.popleft()
+        for user in users.get(alias, ()):
+            reach(user, enum_name, (user,) + chain)
+    return table
+
+
+class MacroIndex:
+    """
+    프로젝트의 파일별 #define 목록 인덱스.
+
+    files: {루트 기준 상대 경로: (mtime_ns, size, scan_macro_definitions 반환값)}
+    dirs: find_c_files(dir_index=...)가 쓰는 폴더 목록 인덱스
+
+    수정 시각/크기가 그대로인 파일은 다시 읽지 않으므로, 별칭 표를 실행마다 새로 만들어도
+    바뀐 파일만 읽는다. 분석 대상 ENUM과 상관없이 분석 폴더/인코딩마다 파일 하나로 저장한다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.files = {}
+        self.dirs = {}
+
+    @classmethod
+    def load(cls, cache_dir, root_dir, encoding):
+        """저장된 인덱스를 읽는다. 없거나 형식이 다르면 빈 인덱스"""
+        h = hashlib.sha256(os.path.abspath(root_dir).encode())
+        h.update(b'\0' + encoding.encode())
+        index = cls(os.path.join(cache_dir, 'macros', h.hexdigest()[:32] + '.bin'))
+        try:
+            with open(index.path, 'rb') as f:
+                data = marshal.load(f)
+            if data.get('format') == MACRO_INDEX_FORMAT:
+                index.files = data['files']
+                index.dirs = data['dirs']
+        except (OSError, ValueError, EOFError, TypeError, KeyError, AttributeError):
+            pass
+        return index
+
+    def save(self):
+        """인덱스 저장 (임시 파일에 쓴 뒤 교체). path가 없으면 저장하지 않음"""
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        data = {'format': MACRO_INDEX_FORMAT, 'files': self.files, 'dirs': self.dirs}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                marshal.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def update(self, files, base_path, encoding):
+        """
+        files(절대/상대 경로 목록)의 #define 목록을 최신으로 맞춘다. 바뀐 파일만 다시 읽고 없어진 파일은 지운다.
+
+        Returns:
+            int: 다시 읽은 파일 수
+        """
+        seen = set()
+        scanned = 0
+        for path in files:
+            rel_path = os.path.relpath(path, base_path)
+            seen.add(rel_path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.files.pop(rel_path, None)
+                continue
+            entry = self.files.get(rel_path)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                continue
+            try:
+                _, data = read_file(path)
+            except OSError:
+                self.files.pop(rel_path, None)
+                continue
+            try:
+                definitions = scan_macro_definitions(data, encoding)
+            finally:
+                if not isinstance(data, bytes):
+                    data.close()
+            self.files[rel_path] = (st.st_mtime_ns, st.st_size, definitions)
+            scanned += 1
+        for rel_path in [p for p in self.files if p not in seen]:
+            del self.files[rel_path]
+        return scanned
+
+    def definitions(self):
+        """모든 파일의 (매크로 이름, 본문 identifier 튜플)을 경로 순서로 내보낸다"""
+        for rel_path in sorted(self.files):
+            yield from self.files[rel_path][2]
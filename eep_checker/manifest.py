@@ -0,0 +1,188 @@
+import hashlib
+import marshal
+import os
+import shutil
+import threading
+from eep_checker.cache import encode_results, decode_results, content_digest
+from eep_checker.parallel import iter_analyze_files
+from eep_checker.records import detach_sources
+
+# 매니페스트 저장 형식이 바뀌면 올린다
+MANIFEST_FORMAT = 6
+# cache_dir 아래 매니페스트 폴더
+MANIFESTS_DIR = 'manifests'
+
+
+class Manifest:
+    """
+    이전 실행에서 본 파일/폴더 상태와 파일별 결과를 기록한 매니페스트.
+
+    files: {루트 기준 상대 경로: (mtime_ns, size, 내용 해시 또는 None, 결과/호출 간선 바이너리)}
+    dirs: find_c_files(dir_index=...)가 쓰는 폴더 목록 인덱스
+
+    같은 분석 폴더와 같은 분석 조건(context)마다 파일 하나로 저장한다.
+    """
+
+    def __init__(self, path, context: bytes):
+        self.path = path
+        self.context = context
+        self.files = {}
+        self.dirs = {}
+
+    @classmethod
+    def load(cls, cache_dir, root_dir, context: bytes):
+        """저장된 매니페스트를 읽는다. 없거나 형식/조건이 다르면 빈 매니페스트"""
+        h = hashlib.sha256(os.path.abspath(root_dir).encode())
+        h.update(b'\0')
+        h.update(context)
+        manifest = cls(os.path.join(cache_dir, MANIFESTS_DIR, h.hexdigest()[:32] + '.bin'), context)
+        try:
+            with open(manifest.path, 'rb') as f:
+                data = marshal.load(f)
+            if data.get('format') == MANIFEST_FORMAT and data.get('context') == context:
+                manifest.files = data['files']
+                manifest.dirs = data['dirs']
+        except (OSError, ValueError, EOFError, TypeError, KeyError, AttributeError):
+            pass
+        return manifest
+
+    @staticmethod
+    def clear(cache_dir):
+        """cache_dir의 매니페스트 전체 삭제"""
+        shutil.rmtree(os.path.join(cache_dir, MANIFESTS_DIR), ignore_errors=True)
+
+    def save(self):
+        """매니페스트 저장 (임시 파일에 쓴 뒤 교체)"""
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        data = {'format': MANIFEST_FORMAT, 'context': self.context, 'files': self.files, 'dirs': self.dirs}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                marshal.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def reuse(self, rel_path, cfile):
+        """
+        파일이 바뀌지 않았으면 저장된 결과를 반환한다.
+
+        Returns:
+            tuple: ((결과 dict, 호출 간선 리스트) 또는 None, 현재 os.stat 결과 또는 None)
+        """
+        unchanged, st = self.check(rel_path, cfile)
+        return (self.stored(rel_path) if unchanged else None), st
+
+    def check(self, rel_path, cfile):
+        """
+        파일이 이전 실행 이후 바뀌지 않았는지 확인한다.
+        수정 시각/크기가 같으면 바뀌지 않은 것으로 보고, 크기만 같으면 내용 해시까지 비교한다.
+
+        Returns:
+            tuple: (바뀌지 않았는지 여부, 현재 os.stat 결과 또는 None)
+        """
+        try:
+            st = os.stat(cfile)
+        except OSError:
+            return False, None
+        entry = self.files.get(rel_path)
+        if entry is None:
+            return False, st
+        mtime_ns, size, digest, blob = entry
+        if size != st.st_size:
+            return False, st
+        if mtime_ns != st.st_mtime_ns:
+            # touch만 된 파일 (내용이 같으면 다시 파싱하지 않음)
+            if digest is None:
+                return False, st
+            try:
+                with open(cfile, 'rb') as f:
+                    if content_digest(f.read()) != digest:
+                        return False, st
+            except OSError:
+                return False, st
+            self.files[rel_path] = (st.st_mtime_ns, size, digest, blob)
+        return True, st
+
+    def stored(self, rel_path):
+        """저장된 (결과 dict, 호출 간선 리스트)"""
+        return decode_results(self.files[rel_path][3], rel_path)
+
+    def update_calls(self, rel_path, calls):
+        """저장된 항목에 나중에 수집한 호출 간선을 채운다"""
+        entry = self.files.get(rel_path)
+        if entry is None:
+            return
+        mtime_ns, size, digest, blob = entry
+        results_by_enum, _ = decode_results(blob, rel_path)
+        self.files[rel_path] = (mtime_ns, size, digest, encode_results(results_by_enum, calls))
+
+    def record(self, rel_path, st, digest, results_by_enum, calls=None):
+        self.files[rel_path] = (st.st_mtime_ns, st.st_size, digest, encode_results(results_by_enum, calls))
+
+
+def analyze_incremental(c_files, base_path, targets, options, manifest, jobs=1, on_file_done=None):
+    """
+    매니페스트와 비교해 추가/변경된 파일만 analyze_files로 분석하고,
+    바뀌지 않은 파일은 저장된 결과를 쓴다. 없어진 파일은 매니페스트에서 지운다.
+
+    Returns:
+        tuple: (c_files 순서의 analyze_file 반환값 리스트,
+                {'unchanged': 재사용 파일 수, 'changed': 다시 분석한 파일 수, 'removed': 없어진 파일 수})
+    """
+    summary = {}
+    outcomes = []
+    for outcome in iter_analyze_incremental(c_files, base_path, targets, options, manifest, summary,
+                                            jobs=jobs, on_file_done=on_file_done):
+        if outcome[1]:
+            detach_sources(outcome[1])  # 결과 코드는 미리 읽어 두고 파일 버퍼는 놓는다
+        outcomes.append(outcome)
+    return outcomes, summary
+
+
+def iter_analyze_incremental(c_files, base_path, targets, options, manifest, summary, jobs=1, on_file_done=None):
+    """
+    analyze_incremental의 스트리밍 버전. 파일별 결과를 c_files 순서대로 하나씩 내보내고,
+    끝까지 내보낸 뒤 summary dict에 {'unchanged', 'changed', 'removed'}를 채운다.
+    바뀌지 않은 파일의 저장된 결과는 내보낼 차례가 되었을 때 푼다.
+    """
+    rel_paths = [os.path.relpath(cfile, base_path) for cfile in c_files]
+    stats_by_index = {}
+    pending = []
+    for i, cfile in enumerate(c_files):
+        unchanged, st = manifest.check(rel_paths[i], cfile)
+        if not unchanged:
+            stats_by_index[i] = st
+            pending.append(i)
+
+    options = dict(options, record_digest=True)
+    fresh = iter_analyze_files([c_files[i] for i in pending], base_path, targets, options,
+                               jobs=jobs, on_file_done=on_file_done)
+    try:
+        for i, rel_path in enumerate(rel_paths):
+            if i not in stats_by_index:
+                results, calls = manifest.stored(rel_path)
+                st_size = manifest.files[rel_path][1]
+                info = {'size': st_size, 'skipped': False, 'elapsed': 0.0, 'cache': 'manifest', 'calls': calls}
+                yield rel_path, results, None, info
+                continue
+            outcome = next(fresh)
+            rel_path, results, error, info = outcome
+            st = stats_by_index[i]
+            if error is None and st is not None:
+                manifest.record(rel_path, st, info.get('digest'), results, info['calls'])
+            else:
+                # 에러가 난 파일은 다음 실행에서 다시 시도
+                manifest.files.pop(rel_path, None)
+            yield outcome
+    finally:
+        fresh.close()  # 중간에 멈추면(취소 등) 병렬 분석도 바로 정리
+
+    seen = set(rel_paths)
+    removed = [path for path in manifest.files if path not in seen]
+    for path in removed:
+        del manifest.files[path]
+    summary.update({'unchanged': len(c_files) - len(pending), 'changed': len(pending), 'removed': len(removed)})
@@ -0,0 +1,61 @@
+import json
+import os
+import datetime
+from typing import Dict
+from eep_checker.records import as_dict
+
+class NdjsonReportWriter:
+    """
+    결과를 하나씩 받는 대로 한 줄짜리 JSON 객체로 이어 쓰는 NDJSON 보고서 작성기.
+    각 줄은 {'enum': ENUM 이름, 결과 dict의 키들...} 형식이며 결과가 나온 순서(파일 순서)로 기록한다.
+    """
+
+    def __init__(self, label: str, output_dir: str = '.'):
+        now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.filepath = os.path.join(output_dir, f"{label}_Output_{now}.ndjson")
+        self._file = None
+
+    def add(self, enum_name: str, r: Dict):
+        if self._file is None:
+            self._file = open(self.filepath, 'w', encoding='utf-8', newline='\n')
+        record = {'enum': enum_name}
+        record.update(as_dict(r))
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write('\n')
+
+    def close(self) -> str:
+        """파일을 마무리하고 경로를 반환한다"""
+        if self._file is None:
+            self._file = open(self.filepath, 'w', encoding='utf-8', newline='\n')
+        self._file.close()
+        self._file = None
+        print(f"NDJSON 보고서가 생성되었습니다: {self.filepath}")
+        return self.filepath
+
+    def discard(self):
+        """쓰던 파일을 닫고 지운다"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            try:
+                os.remove(self.filepath)
+            except OSError:
+                pass
+
+def save_ndjson_report(label: str, results_by_enum: Dict, output_dir: str = '.'):
+    """
+    분석 결과를 NDJSON(줄마다 JSON 객체 하나) 파일로 저장합니다.
+
+    Args:
+        label (str): 파일명에 쓸 이름
+        results_by_enum (Dict[str, List[Dict]]): ENUM 이름 -> 분석 결과 리스트
+        output_dir (str): 출력 디렉토리 경로
+
+    Returns:
+        str: 생성된 NDJSON 파일의 경로
+    """
+    writer = NdjsonReportWriter(label, output_dir)
+    for enum_name, results in results_by_enum.items():
+        for r in results:
+            writer.add(enum_name, r)
+    return writer.close()
@@ -0,0 +1,225 @@
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from eep_checker import parser
+from eep_checker.source import read_file, load_source, source_bytes
+from eep_checker.profiling import lap, file_profile
+from eep_checker.cache import content_digest
+from eep_checker.variants import analyze_variants
+from eep_checker.records import detach_sources
+
+# 워커 프로세스별 분석 설정 (initializer에서 한 번만 설정)
+_worker_args = None
+
+
+def analyze_file(cfile, base_path, targets, options):
+    """
+    C 파일 하나를 읽고 파싱하여 ENUM별 결과를 반환한다.
+
+    Args:
+        cfile (str): 분석할 파일 경로
+        base_path (str): 상대 경로 계산 기준 폴더
+        targets (EnumTargets): 분석 대상 ENUM
+        options (dict): encoding, debug, query_mode, analyze_callers, context_lines,
+            prefilter (Prefilter 또는 None), cache (ResultCache 또는 None), cache_context,
+            record_digest (True이면 info['digest']에 내용 해시 기록),
+            calls_only (True이면 ENUM은 찾지 않고 호출 간선만 수집),
+            variants (BuildVariants 또는 None, 빌드 변형별 분석),
+            fingerprints (True이면 결과에 AST 지문을 담음, 같은 함수 묶기),
+            profile (True이면 단계별 구간을 info['profile']에 기록, --profile),
+            profile_memory (True이면 워커 프로세스에서도 tracemalloc 사용)
+
+    Returns:
+        tuple: (rel_path, {ENUM 이름: 결과 리스트} 또는 None, 에러 메시지 또는 None,
+                {'size': 바이트 수, 'skipped': 사전 필터로 건너뛰었는지, 'elapsed': 소요 시간(초),
+                 'cache': 'hit'/'miss' 또는 None(캐시 미사용),
+                 'calls': 호출 간선 리스트 또는 None(수집하지 않음),
+                 'profile': profiling.file_profile() 값 (options['profile']일 때만)})
+    """
+    rel_path = os.path.relpath(cfile, base_path)
+    encoding = options['encoding']
+    prefilter = options.get('prefilter')
+    cache = options.get('cache')
+    start = time.perf_counter()
+    info = {'size': 0, 'skipped': False, 'elapsed': 0.0, 'cache': None, 'calls': None}
+    events = None
+    if options.get('profile'):
+        events = []
+        info['profile'] = file_profile(events)
+
+    # 파일 읽기 시도 (지정된 인코딩 사용)
+    try:
+        if prefilter is not None:
+            info['size'], data = prefilter.scan_file(cfile)
+            t = lap(events, 'prefilter', start)
+            if data is None:
+                # 대상 ENUM이 나올 수 없는 파일은 디코딩/파싱하지 않음
+                info['skipped'] = True
+                info['elapsed'] = t - start
+                return rel_path, {}, None, info
+        else:
+            info['size'], data = read_file(cfile)
+            t = lap(events, 'read', start)
+        if options.get('record_digest'):
+            info['digest'] = content_digest(data)
+
+        # 내용이 같은 파일을 이전에 분석했다면 캐시된 결과 사용
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.key(data, options['cache_context'])
+            cached = cache.get(cache_key, rel_path)
+            t = lap(events, 'cache', t)
+            if cached is not None:
+                info['cache'] = 'hit'
+                info['elapsed'] = t - start
+                results, info['calls'] = cached
+                return rel_path, results, None, info
+            info['cache'] = 'miss'
+        # 디코딩하지 않고 원본 바이트를 그대로 파싱 (코드 조각만 보고서에 쓸 때 디코딩)
+        variants = options.get('variants')
+        source = None
+        if variants is None:
+            # 원본 그대로 파싱할 수 없는 인코딩만 UTF-8로 옮긴 뒤 지시문 줄을 지운다 (load_source와 같음)
+            data, source_encoding = source_bytes(data, encoding)
+            t = lap(events, 'decode', t)
+            source = load_source(data, source_encoding)
+            lap(events, 'preprocess', t)
+    except UnicodeDecodeError as e:
+        return rel_path, None, f"[Error] 파일 읽기 실패 ({encoding} 인코딩): {rel_path} → {str(e)}", info
+    except Exception as e:
+        return rel_path, None, f"[Error] 파일 읽기 실패: {rel_path} → {str(e)}", info
+
+    # 파싱 시도 (호출자 분석 시 호출자는 프로젝트 전체 호출 그래프에서 붙이므로 간선만 수집)
+    calls = [] if options['analyze_callers'] else None
+    try:
+        if options.get('calls_only') and source is not None:
+            results = {}
+            calls = parser.extract_call_edges_file(source, query_mode=options['query_mode'])
+        elif options.get('calls_only'):
+            def extract_calls(variant_source, ranges, edges):
+                edges.extend(parser.extract_call_edges_file(variant_source, query_mode=options['query_mode'],
+                                                            active_ranges=ranges))
+                return {}
+            results, calls = analyze_variants(data, encoding, variants, extract_calls, want_calls=True)
+        elif source is None:
+            def extract(variant_source, ranges, edges):
+                return parser.extract_functions_with_enums_file(
+                    variant_source, targets, file_name=rel_path, debug=options['debug'],
+                    query_mode=options['query_mode'], analyze_callers=options['analyze_callers'],
+                    context_lines=options['context_lines'], call_edges=edges, active_ranges=ranges,
+                    profile=events, fingerprints=options.get('fingerprints', False),
+                )
+            results, calls = analyze_variants(data, encoding, variants, extract, want_calls=calls is not None)
+        else:
+            results = parser.extract_functions_with_enums_file(
+                source,
+                targets,
+                file_name=rel_path,
+                debug=options['debug'],
+                query_mode=options['query_mode'],
+                analyze_callers=options['analyze_callers'],
+                context_lines=options['context_lines'],
+                call_edges=calls,
+                profile=events,
+                fingerprints=options.get('fingerprints', False),
+            )
+    except Exception as e:
+        return rel_path, None, f"[Warning] 파일 파싱 실패: {rel_path} → {str(e)}", info
+    info['calls'] = calls
+    if cache_key is not None:
+        cache.put(cache_key, results, calls)
+    info['elapsed'] = time.perf_counter() - start
+    return rel_path, results, None, info
+
+
+def _init_worker(base_path, targets, options):
+    """워커 프로세스 초기화. tree-sitter 파서는 프로세스마다 parser 모듈을 import할 때 따로 만들어진다."""
+    global _worker_args
+    _worker_args = (base_path, targets, options)
+    if options.get('profile_memory') and not tracemalloc.is_tracing():
+        tracemalloc.start()  # 워커별 최대 메모리 (info['profile']['peak'])
+
+
+def _analyze_in_worker(cfile):
+    return analyze_file(cfile, *_worker_args)
+
+
+def resolve_jobs(jobs):
+    """--jobs 값 해석. 0 이하이면 CPU 코어 수를 사용"""
+    if jobs is None:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def analyze_files(c_files, base_path, targets, options, jobs=1, on_file_done=None):
+    """
+    여러 C 파일을 분석한다. jobs > 1이면 프로세스 풀에서 병렬로 처리한다.
+
+    Args:
+        c_files (list): 분석할 파일 경로 리스트
+        base_path (str): 상대 경로 계산 기준 폴더
+        targets (EnumTargets): 분석 대상 ENUM
+        options (dict): analyze_file에 넘길 분석 옵션
+        jobs (int): 워커 프로세스 수
+        on_file_done (callable, optional): 파일 하나가 끝날 때마다 on_file_done(done, total) 호출
+
+    Returns:
+        list: c_files 순서의 analyze_file 반환값 리스트 (결과 코드는 미리 읽어 두고 파일 버퍼는 놓는다)
+    """
+    outcomes = []
+    for outcome in iter_analyze_files(c_files, base_path, targets, options, jobs=jobs, on_file_done=on_file_done):
+        if outcome[1]:
+            detach_sources(outcome[1])
+        outcomes.append(outcome)
+    return outcomes
+
+
+def iter_analyze_files(c_files, base_path, targets, options, jobs=1, on_file_done=None):
+    """
+    analyze_files의 스트리밍 버전. 파일별 결과를 c_files 순서대로 하나씩 내보낸다.
+
+    병렬 모드에서는 큰 파일부터 먼저 보내 작업이 한 워커에 몰리지 않게 하고,
+    먼저 끝난 파일의 결과는 앞 순서의 파일이 끝날 때까지만 들고 있다가 순서대로 내보내므로
+    보고서가 순차 실행과 같다.
+    """
+    total = len(c_files)
+    jobs = min(jobs, total)
+    if jobs <= 1:
+        for i, cfile in enumerate(c_files, 1):
+            if on_file_done:
+                on_file_done(i, total)
+            yield analyze_file(cfile, base_path, targets, options)
+        return
+
+    def file_size(index):
+        try:
+            return os.path.getsize(c_files[index])
+        except OSError:
+            return 0
+
+    order = sorted(range(total), key=lambda i: (-file_size(i), i))
+    finished = {}
+    next_index = 0
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(base_path, targets, options))
+    try:
+        futures = {pool.submit(_analyze_in_worker, c_files[i]): i for i in order}
+        for done, future in enumerate(as_completed(futures), 1):
+            index = futures.pop(future)
+            try:
+                finished[index] = future.result()
+            except Exception as e:
+                # 워커 프로세스 자체가 죽은 경우 등
+                rel_path = os.path.relpath(c_files[index], base_path)
+                finished[index] = (rel_path, None, f"[Warning] 파일 파싱 실패: {rel_path} → {str(e)}",
+                                   {'size': 0, 'skipped': False, 'elapsed': 0.0, 'cache': None, 'calls': None})
+            if on_file_done:
+                on_file_done(done, total)
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+    finally:
+        # 끝까지 읽지 않고 멈추면(취소 등) 아직 시작하지 않은 파일은 버리고 실행 중인 파일만 기다린다
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -1,23 +1,49 @@
-import hashlib # 해시 라이브러리 추가
+import hashlib
+import threading
+import time
+from array import array
 from tree_sitter_languages import get_language, get_parser
 from tree_sitter import Language, Parser
-from utils import remove_preprocessor_directives # 추가된 import
+from eep_checker.source import SourceBuffer, load_source
+from eep_checker.targets import EnumTargets
+from eep_checker.records import ResultRecord, CallerRecord, BufferSource
+from eep_checker.profiling import lap
 
 c_lang = get_language('c')
 parser = get_parser('c')
+_local = threading.local()
 
-# 함수 정의와 identifier를 모두 찾는 쿼리로 수정
-FUNCTION_QUERY = """
-(function_definition
-  declarator: (function_declarator
-    declarator: (identifier) @function_name)
-  body: (compound_statement) @function_body)
-
-(identifier) @identifier
+def thread_parser():
+    """
+    이 스레드 전용 C 파서. Parser는 스레드 사이에 공유할 수 없고 빌드 변형 분석은 included_ranges를 바꾸므로,
+    한 프로세스에서 분석 여러 개를 동시에 돌려도 서로 건드리지 않도록 스레드마다 따로 만든다.
+    """
+    p = getattr(_local, 'parser', None)
+    if p is None:
+        p = _local.parser = parser if threading.current_thread() is threading.main_thread() else get_parser('c')
+    return p
+
+# 쿼리 모드(--query)에서 결과 후보 노드를 찾는 쿼리
+CANDIDATE_QUERY = """
+(function_definition) @function_definition
+(struct_specifier) @struct_specifier
+(declaration) @declaration
 """
-
-# 쿼리 객체 생성
-query = c_lang.query(FUNCTION_QUERY)
+# 특정 identifier 사용 위치 / 특정 함수 호출 위치를 찾는 쿼리 (이름은 #eq?, #match? 조건으로 지정)
+IDENTIFIER_EQ_QUERY = """((identifier) @hit (#eq? @hit "{name}"))"""
+IDENTIFIER_MATCH_QUERY = """((identifier) @hit (#match? @hit "{regex}"))"""
+CALL_QUERY = """(call_expression function: (identifier) @callee)"""
+
+_query_cache = {}
+
+def get_query(source_text):
+    """쿼리 문자열을 컴파일하여 캐시해두고 반환"""
+    q = _query_cache.get(source_text)
+    if q is None:
+        if len(_query_cache) > 256:
+            _query_cache.clear()
+        q = _query_cache[source_text] = c_lang.query(source_text)
+    return q
 
 def find_identifier_in_declarator(node, code):
     """declarator 노드에서 identifier(변수명 혹은 함수명)를 찾아 반환"""
@@ -29,104 +55,85 @@ def find_identifier_in_declarator(node, code):
             return result
     return None
 
-def get_enclosing_function_name(node, code):
-    """
-    현재 노드에서 가장 가까운 부모 중 function_definition이 있으면
-    그 함수 이름을 리턴. 없으면 None.
-    """
-    parent = node.parent
-    while parent:
-        if parent.type == 'function_definition':
-            decl = parent.child_by_field_name('declarator')
-            if decl: # declarator가 없을 수도 있음 (예: 익명 함수)
-                 # 함수 선언부에서 실제 함수 이름을 정확히 추출하도록 수정
-                func_name_node = decl.child_by_field_name('declarator') # function_declarator의 declarator
-                if func_name_node and func_name_node.type == 'identifier':
-                    return code[func_name_node.start_byte:func_name_node.end_byte].decode(errors='ignore')
-                # 포인터 함수 등의 경우 identifier가 더 깊이 있을 수 있음
-                return find_identifier_in_declarator(decl, code)
-        parent = parent.parent
-    return None
-
-def collect_enum_global_vars(root, code, target_enum):
+def check_enum_declaration(decl_node, code, target_enum):
     """
-    전역 선언부(translation_unit 아래의 declaration)와 struct 내부 선언에서
-    target_enum을 타입으로 쓰거나 선언의 일부로 사용하는 변수 이름들을 모두 수집하여 반환한다.
+    declaration 노드 안에서 target_enum을 쓰고 있는지 판별하고,
+    그 선언의 declarator에서 변수 이름을 추출한다.
+    (found 여부, 변수 이름) 튜플을 반환
     """
-    enum_vars = set()
-
-    # helper: declaration 노드 안에서 "target_enum"을 쓰고 있는지 판별하고, 그 선언의 declarator에서 변수 이름 추출
-    def check_declaration(decl_node):
-        found_enum_type = False
-        # 먼저 재귀로 자식 탐색 (identifier가 하위 노드에 있을 수 있음)
-        for child in decl_node.children:
-            if child.type == 'identifier':
-                text = code[child.start_byte:child.end_byte].decode(errors='ignore')
-                if text == target_enum:
+    found_enum_type = False
+    # 먼저 재귀로 자식 탐색 (identifier가 하위 노드에 있을 수 있음)
+    for child in decl_node.children:
+        if child.type == 'identifier':
+            text = code[child.start_byte:child.end_byte].decode(errors='ignore')
+            if text == target_enum:
+                found_enum_type = True
+                break
+        # declaration 내부의 다른 declaration은 검사하지 않음 (무한 루프 방지)
+        elif child.type not in ['declaration', 'field_declaration']:
+            f, var = check_enum_declaration(child, code, target_enum) # 자식 노드에서 enum을 찾으면 그 결과를 사용
+            if f: # var는 None일 수 있으므로 f만 체크
+                if var:
+                    return True, var
+                else:
                     found_enum_type = True
                     break
-            # declaration 내부의 다른 declaration은 검사하지 않음 (무한 루프 방지)
-            elif child.type not in ['declaration', 'field_declaration']:
-                f, var = check_declaration(child) # 자식 노드에서 enum을 찾으면 그 결과를 사용
-                if f: # var는 None일 수 있으므로 f만 체크
-                    if var:
-                        return True, var
-                    else:
-                        found_enum_type = True
-                        break
-
-        if found_enum_type:
-            var_name_node = decl_node.child_by_field_name('declarator')
-            if not var_name_node:
-                init_decl = decl_node.child_by_field_name('init_declarator')
-                if init_decl:
-                    var_name_node = init_decl.child_by_field_name('declarator')
-
-            if var_name_node:
-                var_name = find_identifier_in_declarator(var_name_node, code)
-                if var_name:
-                    return True, var_name
-        return False, None
 
-    # translation_unit 하위에서 모든 declaration 노드 순회
-    for child in root.children:
-        if child.type == 'declaration':
-            f, var = check_declaration(child)
-            if f and var:
-                enum_vars.add(var)
-
-        if child.type == 'struct_specifier':
-            body_node = child.child_by_field_name('body') # field_declaration_list
-            if body_node:
-                for fdecl_item in body_node.children: # field_declaration or comment etc.
-                    if fdecl_item.type == 'field_declaration':
-                        # 1. field_declaration 전체에서 target_enum 사용 여부 확인
-                        enum_present_in_fdecl, _, _ = has_enum_in_function(fdecl_item, code, target_enum)
-                        
-                        if enum_present_in_fdecl:
-                            # 2. target_enum이 사용되었다면, 이 field_declaration에서 모든 declarator(변수명) 추출
-                            # field_declaration의 자식들(type specifiers 다음 declarators)을 순회
-                            for fdecl_child in fdecl_item.children:
-                                # declarator 역할을 할 수 있는 노드 타입들
-                                declarator_types = [
-                                    'field_identifier', 'identifier', 
-                                    'pointer_declarator', 'array_declarator', 
-                                    'function_declarator', 'parenthesized_declarator'
-                                ]
-                                if fdecl_child.type in declarator_types:
-                                    var_name = find_identifier_in_declarator(fdecl_child, code)
-                                    if var_name:
-                                        enum_vars.add(var_name)
-    return enum_vars
-
-def has_enum_in_function(node, code, target_enum):
+    if found_enum_type:
+        var_name_node = decl_node.child_by_field_name('declarator')
+        if not var_name_node:
+            init_decl = decl_node.child_by_field_name('init_declarator')
+            if init_decl:
+                var_name_node = init_decl.child_by_field_name('declarator')
+
+        if var_name_node:
+            var_name = find_identifier_in_declarator(var_name_node, code)
+            if var_name:
+                return True, var_name
+    return False, None
+
+def collect_enum_struct_fields(struct_node, code, target_enum, source=None):
+    """
+    struct_specifier의 field_declaration 중 target_enum을 사용하는 선언의
+    모든 멤버 변수 이름을 set으로 반환
+    """
+    field_names = set()
+    body_node = struct_node.child_by_field_name('body') # field_declaration_list
+    if not body_node:
+        return field_names
+    for fdecl_item in body_node.children: # field_declaration or comment etc.
+        if fdecl_item.type == 'field_declaration':
+            # 1. field_declaration 전체에서 target_enum 사용 여부 확인
+            enum_present_in_fdecl, _, _ = has_enum_in_function(fdecl_item, code, target_enum, source=source)
+
+            if enum_present_in_fdecl:
+                # 2. target_enum이 사용되었다면, 이 field_declaration에서 모든 declarator(변수명) 추출
+                # field_declaration의 자식들(type specifiers 다음 declarators)을 순회
+                for fdecl_child in fdecl_item.children:
+                    # declarator 역할을 할 수 있는 노드 타입들
+                    declarator_types = [
+                        'field_identifier', 'identifier',
+                        'pointer_declarator', 'array_declarator',
+                        'function_declarator', 'parenthesized_declarator'
+                    ]
+                    if fdecl_child.type in declarator_types:
+                        var_name = find_identifier_in_declarator(fdecl_child, code)
+                        if var_name:
+                            field_names.add(var_name)
+    return field_names
+
+def has_enum_in_function(node, code, target_enum, source=None):
     """
     node 내부에서 (1) target_enum이 직접 등장하는지
     (2) 자식 노드 검사하며 identifier가 target_enum인지 카운트하는 로직.
     enum_count와 found 여부, 그리고 ENUM이 사용된 라인 번호 목록을 반환
+
+    source(SourceBuffer)를 넘기면 줄 번호 계산에 미리 만든 줄 인덱스를 사용한다.
     """
     enum_count = 0
     enum_lines = []  # ENUM이 사용된 라인 번호들을 저장
+    if source is None:
+        source = SourceBuffer(code)
 
     def visit_node(n):
         nonlocal enum_count
@@ -138,8 +145,7 @@ def has_enum_in_function(node, code, target_enum):
             text = code[n.start_byte:n.end_byte].decode(errors='ignore')
             if text == target_enum:
                 # ENUM이 사용된 라인 번호 계산
-                line_number = code.count(b'\n', 0, n.start_byte) + 1
-                enum_lines.append(line_number)
+                enum_lines.append(source.line_of(n.start_byte))
                 enum_count += 1
         for c in n.children:
             visit_node(c)
@@ -170,214 +176,508 @@ def debug_print_function_node(node, code, depth=0, debug=False):
         if not is_field_child:
             debug_print_function_node(child_node, code, depth + 1, debug=debug)
 
-def extract_functions_with_enum(node, code, target_enum, enum_vars=None, debug=False, analyze_callers=False, context_lines=None):
-    """
-    AST의 node를 재귀 탐색하면서,
-    1) 전역에서 enum을 쓰는 변수들(enum_vars) 수집 (최상위 호출 시)
-    2) 함수 정의, struct 정의, declaration 노드에서
-       (a) target_enum 직접 사용 or
-       (b) enum_vars 중 하나라도 사용되는 경우
-       결과 리스트에 포함한다.
+SKIP_NODE_TYPES = frozenset(('comment', 'string_literal', 'string', 'char_literal'))
+# 결과 후보가 되는 노드 타입
+CANDIDATE_NODE_TYPES = frozenset(('function_definition', 'struct_specifier', 'declaration'))
+# 지문에서 하위 노드 대신 전체 텍스트를 하나의 토큰으로 보는 타입 (문자열 내용은 노드가 아님)
+ATOMIC_NODE_TYPES = SKIP_NODE_TYPES - {'comment'}
+FINGERPRINT_SIZE = 8
+
 
-    context_lines 값이 주어지면, ENUM 사용 라인을 중심으로 해당 줄수만큼
-    앞뒤 맥락을 포함한다. 호출자 함수 정보에도 동일하게 적용된다.
+def ast_fingerprint(node, code):
     """
-    if enum_vars is None:
-        if node.type == 'translation_unit':
-            enum_vars = collect_enum_global_vars(node, code, target_enum)
-            if debug:
-                print(f"[DEBUG] 전역에서 수집된 enum 변수들: {enum_vars}")
+    노드 서브트리의 지문 (16자리 hex). 주석을 빼고 리프 토큰(문자열/문자 리터럴은 통째로)의 텍스트를
+    문서 순서로 해시하므로 공백/줄바꿈/주석만 다른 함수는 지문이 같다.
+    extract_identifier_facts, extract_functions_with_enums(fingerprints=True)가 방문하면서
+    같은 규칙으로 계산한 값과 같다. 방문하지 않는 쿼리 엔진(--query)만 이 함수로 따로 계산한다.
+    """
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+    cursor = node.walk()
+    depth = 0
+    while True:
+        n = cursor.node
+        n_type = n.type
+        if n_type != 'comment':
+            if n_type not in ATOMIC_NODE_TYPES and cursor.goto_first_child():
+                depth += 1
+                continue
+            digest.update(code[n.start_byte:n.end_byte] + b'\0')
+        while depth and not cursor.goto_next_sibling():
+            cursor.goto_parent()
+            depth -= 1
+        if not depth:
+            return digest.hexdigest()
+
+
+class _Candidate:
+    """단일 패스 방문 중 열려 있는 결과 후보 노드(함수/struct/전역 선언)의 집계 상태"""
+    __slots__ = ('depth', 'seq', 'node', 'name', 'hits', 'idents', 'via_var', 'macros',
+                 'first_leaf', 'last_leaf', 'fingerprint')
+
+    def __init__(self, depth, seq, node, name):
+        self.depth = depth
+        self.seq = seq
+        self.node = node
+        self.name = name
+        self.hits = {}        # ENUM 이름 -> 사용 라인 목록
+        self.idents = set()   # enum_vars 검사용 identifier(bytes) 집합
+        self.via_var = set()  # enum_vars를 통해 사용한 ENUM 이름들
+        self.macros = {}      # ENUM 이름 -> #define 별칭 경로들 (순서 유지용 dict)
+        self.first_leaf = self.last_leaf = 0  # 방문 중 모은 리프 토큰 배열에서 이 후보의 구간
+        self.fingerprint = None
+
+    def fingerprint_of(self, code, leaves):
+        """
+        후보의 AST 지문 (ast_fingerprint와 같은 값). 여러 ENUM 결과에 나와도 한 번만 계산한다.
+        leaves(방문 중 모은 리프 토큰 (시작, 끝 byte) 배열)가 있으면 서브트리를 다시 훑지 않는다.
+        """
+        if self.fingerprint is None:
+            if leaves is None:
+                self.fingerprint = ast_fingerprint(self.node, code)
+            else:
+                digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+                digest.update(b''.join(code[leaves[i]:leaves[i + 1]] + b'\0'
+                                       for i in range(self.first_leaf, self.last_leaf, 2)))
+                self.fingerprint = digest.hexdigest()
+        return self.fingerprint
+
+    def add_hit(self, enum_name, line, chain):
+        lines = self.hits.get(enum_name)
+        if lines is None:
+            self.hits[enum_name] = [line]
         else:
-            enum_vars = set()
+            lines.append(line)
+        if chain is not None:
+            self.macros.setdefault(enum_name, {})[chain] = None
+
+def _declaration_name(node, code):
+    """declaration 노드의 (첫 번째) 변수 이름"""
+    var_name_node = node.child_by_field_name('declarator')
+    if not var_name_node:
+        init_decl = node.child_by_field_name('init_declarator')
+        if init_decl:
+            var_name_node = init_decl.child_by_field_name('declarator')
+    if var_name_node:
+        return find_identifier_in_declarator(var_name_node, code)
+    return None
 
-    results = []
+def _collect_top_level_vars(cand, code, source, found_vars):
+    """최상위 선언/struct에서 ENUM을 직접 쓰면 ENUM별 전역 enum 변수 수집"""
+    for enum_name in cand.hits:
+        if cand.node.type == 'declaration':
+            f, var = check_enum_declaration(cand.node, code, enum_name)
+            if f and var:
+                found_vars.setdefault(enum_name, set()).add(var)
+        elif cand.node.type == 'struct_specifier':
+            fields = collect_enum_struct_fields(cand.node, code, enum_name, source=source)
+            if fields:
+                found_vars.setdefault(enum_name, set()).update(fields)
 
-    if node.type in ['function_definition', 'struct_specifier', 'declaration']:
-        # 1) 노드별 이름 추출
-        name = None
-        if node.type == 'function_definition':
-            decl = node.child_by_field_name('declarator')
-            if decl:
-                name = find_identifier_in_declarator(decl, code)
+def _as_targets(target_enum, enum_vars):
+    """단일 ENUM 인자를 여러 ENUM 엔진 인자로 변환"""
+    return EnumTargets([target_enum]), (None if enum_vars is None else {target_enum: enum_vars})
 
-        elif node.type == 'struct_specifier':
-            name_node = node.child_by_field_name('name')
-            if name_node:
-                name = code[name_node.start_byte:name_node.end_byte].decode(errors='ignore')
-            else:
-                name = "(anonymous struct)"
-
-        elif node.type == 'declaration':
-            func_parent_name = get_enclosing_function_name(node, code)
-            if func_parent_name is None:
-                # 전역 선언인 경우에만 변수명 추출
-                var_name_node = node.child_by_field_name('declarator')
-                if not var_name_node:
-                    init_decl = node.child_by_field_name('init_declarator')
-                    if init_decl:
-                        var_name_node = init_decl.child_by_field_name('declarator')
-                if var_name_node:
-                    name = find_identifier_in_declarator(var_name_node, code)
+def extract_functions_with_enum(node, code, target_enum, enum_vars=None, debug=False, analyze_callers=False, context_lines=None, source=None):
+    """
+    TreeCursor 기반 단일 패스 반복 방문으로 target_enum 사용 함수/struct/전역 선언을 찾는다.
+    (benchmarks/recursive_engine.py의 기존 재귀 엔진과 같은 결과를 반환)
+    """
+    targets, enum_vars = _as_targets(target_enum, enum_vars)
+    return extract_functions_with_enums(
+        node, code, targets, enum_vars=enum_vars, debug=debug,
+        analyze_callers=analyze_callers, context_lines=context_lines, source=source,
+    )[target_enum]
+
+def extract_functions_with_enums(node, code, targets, enum_vars=None, debug=False, analyze_callers=False, context_lines=None, source=None, call_edges=None, fingerprints=False):
+    """
+    TreeCursor 기반 단일 패스 반복 방문으로 여러 ENUM(targets)의 사용 위치를 한 번에 찾는다.
+
+    한 번의 방문에서 다음을 함께 처리한다.
+    - 둘러싼 함수 이름을 스택으로 들고 내려가 지역 선언 여부 판단
+    - identifier 바이트를 미리 인코딩한 ENUM 이름/패턴(과 #define 별칭)과 직접 비교 (디코딩 없음)
+    - 열린 후보 노드마다 ENUM별 사용 라인, enum_vars 검사용 identifier 집계
+    - analyze_callers일 때 함수 정의와 호출 위치 수집
+    - fingerprints일 때 리프 토큰 위치를 모아 결과 후보의 AST 지문 계산 (같은 함수 묶기)
+
+    재귀를 쓰지 않으므로 깊은 else-if 체인에서도 재귀 한도에 걸리지 않는다.
+
+    Args:
+        targets (EnumTargets): 찾을 ENUM 이름/패턴
+        enum_vars (dict, optional): ENUM 이름 -> 전역 enum 변수 이름 set.
+            None이면 translation_unit에서 직접 수집한다.
+        call_edges (list, optional): 주어지면 호출자를 결과에 붙이지 않고 호출 간선을 여기에 담는다.
+        fingerprints (bool): 결과에 AST 지문(fingerprint)을 담을지 여부
+    Returns:
+        dict: ENUM 이름 -> 결과 리스트 (지정한 이름은 결과가 없어도 포함)
+    """
+    if source is None:
+        source = SourceBuffer(code)
+
+    match = targets.match
+    aliases = targets.aliases
+    is_tu = node.type == 'translation_unit'
+    collect_vars = enum_vars is None and is_tu
+    found_vars = {}
+    found_names = set()
+
+    open_cands = []   # 현재 열려 있는 후보 (바깥 -> 안쪽)
+    closed = []       # 닫힌 후보 (결과 판정은 enum_vars 확정 후)
+    func_ctx = []     # (depth, 함수 이름) - 둘러싼 함수 문맥
+    func_defs = {}    # 함수 이름 -> function_definition 노드 (마지막 정의 우선)
+    calls = []        # (호출 대상 bytes, 호출한 함수 이름, 호출 위치 byte)
+    leaves = array('I') if fingerprints else None  # 주석을 뺀 리프 토큰 (시작, 끝 byte) - 지문용
+    seq = 0
+
+    def leave(depth):
+        while open_cands and open_cands[-1].depth == depth:
+            cand = open_cands.pop()
+            if leaves is not None:
+                cand.last_leaf = len(leaves)
+            closed.append(cand)
+            if collect_vars and cand.hits and depth == 1:
+                _collect_top_level_vars(cand, code, source, found_vars)
+        if func_ctx and func_ctx[-1][0] == depth:
+            func_ctx.pop()
+
+    cursor = node.walk()
+    depth = 0  # cursor.depth는 매번 스택을 훑으므로 직접 추적
+    while True:
+        n = cursor.node
+        n_type = n.type
+        descend = True
+
+        if n_type == 'identifier':
+            start = n.start_byte
+            ident = code[start:n.end_byte]
+            if match(ident):
+                line = source.line_of(start)
+                if aliases and ident in aliases:
+                    # 별칭은 가리키는 ENUM마다 사용으로 세고 거친 별칭 경로를 남긴다
+                    for enum_name, chain in aliases[ident]:
+                        found_names.add(enum_name)
+                        for cand in open_cands:
+                            cand.add_hit(enum_name, line, chain)
+                else:
+                    enum_name = ident.decode()
+                    found_names.add(enum_name)
+                    for cand in open_cands:
+                        lines = cand.hits.get(enum_name)
+                        if lines is None:
+                            cand.hits[enum_name] = [line]
+                        else:
+                            lines.append(line)
             else:
-                # 함수 내부 선언일 경우, 함수 단위에서만 결과에 남도록 name을 None으로 유지
-                name = None
-
-        # 2) 직접 enum(target_enum) 사용 여부 + 개수 + 라인 번호
-        found_direct, enum_count_direct, enum_lines = has_enum_in_function(node, code, target_enum)
-
-        # 3) enum_vars 목록에 든 변수가 쓰였는지 검사
-        found_via_var = False
-        if enum_vars:
-            def visit_for_var(n):
-                nonlocal found_via_var
-                if found_via_var:
-                    return
-                if n.type in ['comment', 'string_literal']:
-                    return
-                if n.type == 'identifier':
-                    txt = code[n.start_byte:n.end_byte].decode(errors='ignore')
-                    if txt in enum_vars:
-                        found_via_var = True
-                        return
-                for c_node in n.children:
-                    if found_via_var:
-                        return
-                    visit_for_var(c_node)
-            visit_for_var(node)
-
-        # 4) "직접 enum 사용"이나 "enum_vars 통해 사용" 중 하나라도 있으면 결과에 추가
-        #    단, name이 None인 경우(== 함수 내부 선언이었다면)에는 추가하지 않음
-        if (found_direct or found_via_var) and name:
-            node_code = code[node.start_byte:node.end_byte].decode(errors="ignore")
-            start_line = code.count(b"\n", 0, node.start_byte) + 1
-            end_line = start_line + node_code.count("\n")
-
-            snippet_code = node_code
-            snippet_start = start_line
-            snippet_end = end_line
-
-            if context_lines is not None and enum_lines:
-                min_line = max(start_line, min(enum_lines) - context_lines)
-                max_line = min(end_line, max(enum_lines) + context_lines)
-                rel_start = max(0, min_line - start_line)
-                rel_end = max(0, max_line - start_line)
-                lines = node_code.splitlines()
-                snippet_code = "\n".join(lines[rel_start : rel_end + 1])
-                snippet_start = min_line
-                snippet_end = max_line
-
-            results.append({
-                "func_name": name,
-                "code": snippet_code,
-                "enum_count": enum_count_direct,
-                "start_line": snippet_start,
-                "end_line": snippet_end,
-                "enum_lines": enum_lines,
-                "callers": [],
-            })
-            if debug:
-                print(
-                    f"[DEBUG] 포함됨: {name}, direct={enum_count_direct}, via_var={found_via_var}, enum_vars={enum_vars}, lines={enum_lines}"
-                )
-
-    # 5) 하위 노드 재귀 호출 (enum_vars를 그대로 넘겨줌)
-    for child_node in node.children:
-        results.extend(
-            extract_functions_with_enum(
-                child_node,
-                code,
-                target_enum,
-                enum_vars,
-                debug=debug,
-                analyze_callers=analyze_callers,
-                context_lines=context_lines,
-            )
-        )
-
-    # 함수 호출 관계 분석 (extract_functions_with_enum이 translation_unit에서 처음 호출될 때 한 번만 실행)
-    if node.type == 'translation_unit' and results and analyze_callers:
-        # 먼저 모든 함수 정의를 찾아서 위치 정보와 함께 저장
-        all_function_definitions = {}
-        def find_all_defs(n):
-            if n.type == 'function_definition':
+                for cand in open_cands:
+                    cand.idents.add(ident)
+        elif n_type in SKIP_NODE_TYPES:
+            descend = False
+        elif n_type in CANDIDATE_NODE_TYPES:
+            name = None
+            if n_type == 'function_definition':
                 decl = n.child_by_field_name('declarator')
                 if decl:
-                    func_name = find_identifier_in_declarator(decl, code)
-                    if func_name:
-                        func_code = code[n.start_byte:n.end_byte].decode(errors='ignore')
-                        start_line = code.count(b'\n', 0, n.start_byte) + 1
-                        end_line = start_line + func_code.count('\n')
-                        all_function_definitions[func_name] = {
-                            'node': n,
-                            'code': func_code,
-                            'start_line': start_line,
-                            'end_line': end_line
-                        }
-            for child_n in n.children:
-                find_all_defs(child_n)
-        find_all_defs(node)
-
-        # 각 함수를 순회하며 호출하는 함수(caller)를 찾음
-        for res_item in results:
-            target_func_name = res_item['func_name']
-            
-            # 전체 AST를 순회하며 target_func_name을 호출하는 함수들을 찾음
-            callers_found = [] # 현재 target_func_name에 대한 호출자들
-            
-            def find_call_sites(n, current_enclosing_func_name=None, current_enclosing_func_node=None):
-                if n.type == 'function_definition':
-                    decl_node = n.child_by_field_name('declarator')
-                    if decl_node:
-                        # 현재 탐색 중인 함수의 이름을 가져옴
-                        current_enclosing_func_name = find_identifier_in_declarator(decl_node, code)
-                        current_enclosing_func_node = n # 현재 함수의 전체 노드 저장
-
-                if n.type == 'call_expression':
-                    func_identifier_node = n.child_by_field_name('function')
-                    if func_identifier_node and func_identifier_node.type == 'identifier':
-                        called_func_name = code[func_identifier_node.start_byte:func_identifier_node.end_byte].decode(errors='ignore')
-                        if called_func_name == target_func_name and current_enclosing_func_name and current_enclosing_func_name != target_func_name: # 자기 자신 호출은 제외
-                            # 호출자 정보가 all_function_definitions에 있는지 확인
-                            if current_enclosing_func_name in all_function_definitions:
-                                caller_info_def = all_function_definitions[current_enclosing_func_name]
-                                call_line = code.count(b'\n', 0, func_identifier_node.start_byte) + 1
-
-                                snippet_code = caller_info_def['code']
-                                snippet_start = caller_info_def['start_line']
-                                snippet_end = caller_info_def['end_line']
-
-                                if context_lines is not None:
-                                    min_line = max(caller_info_def['start_line'], call_line - context_lines)
-                                    max_line = min(caller_info_def['end_line'], call_line + context_lines)
-                                    rel_start = max(0, min_line - caller_info_def['start_line'])
-                                    rel_end = max(0, max_line - caller_info_def['start_line'])
-                                    lines_list = caller_info_def['code'].splitlines()
-                                    snippet_code = "\n".join(lines_list[rel_start : rel_end + 1])
-                                    snippet_start = min_line
-                                    snippet_end = max_line
-
-                                existing_caller_names = [c['func_name'] for c in callers_found]
-                                if current_enclosing_func_name not in existing_caller_names:
-                                    callers_found.append({
-                                        'func_name': current_enclosing_func_name,
-                                        'code': snippet_code,
-                                        'start_line': snippet_start,
-                                        'end_line': snippet_end,
-                                        'call_line': call_line
-                                    })
-                                    if debug:
-                                        print(f"[DEBUG] Caller found: {current_enclosing_func_name} calls {target_func_name} at line {call_line}")
-                
-                for child_n in n.children:
-                    find_call_sites(child_n, current_enclosing_func_name, current_enclosing_func_node)
-
-            find_call_sites(node) # translation_unit부터 다시 탐색 시작
-            res_item['callers'] = callers_found
-            if debug and callers_found:
-                 print(f"[DEBUG] Function {target_func_name} is called by: {[c['func_name'] for c in callers_found]}")
-
+                    name = find_identifier_in_declarator(decl, code)
+                    func_ctx.append((depth, name))
+                    if name:
+                        func_defs[name] = n
+            elif n_type == 'struct_specifier':
+                name_node = n.child_by_field_name('name')
+                name = source.node_text(name_node) if name_node else "(anonymous struct)"
+            elif not (func_ctx and func_ctx[-1][1]):
+                # 전역 선언인 경우에만 변수명 추출 (함수 내부 선언은 함수 단위로만 결과에 남음)
+                name = _declaration_name(n, code)
+            if name or (collect_vars and depth == 1):
+                cand = _Candidate(depth, seq, n, name)
+                if leaves is not None:
+                    cand.first_leaf = len(leaves)
+                open_cands.append(cand)
+                seq += 1
+        elif n_type == 'call_expression' and analyze_callers:
+            fn = n.child_by_field_name('function')
+            if fn and fn.type == 'identifier' and func_ctx and func_ctx[-1][1]:
+                calls.append((code[fn.start_byte:fn.end_byte], func_ctx[-1][1], fn.start_byte))
+
+        if descend and cursor.goto_first_child():
+            depth += 1
+            continue
+        if leaves is not None and n_type != 'comment':
+            # 리프 또는 통째로 보는 노드(문자열 리터럴 등) - ast_fingerprint와 같은 토큰
+            leaves.append(n.start_byte)
+            leaves.append(n.end_byte)
+        leave(depth)
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                break
+            depth -= 1
+            leave(depth)
+        else:
+            continue
+        break
+
+    if collect_vars:
+        enum_vars = found_vars
+        if debug:
+            print(f"[DEBUG] 전역에서 수집된 enum 변수들: {enum_vars}")
+    for enum_name, var_names in (enum_vars or {}).items():
+        var_bytes = {v.encode() for v in var_names}
+        if not var_bytes:
+            continue
+        for cand in closed:
+            if not var_bytes.isdisjoint(cand.idents):
+                cand.via_var.add(enum_name)
+
+    return _results_by_enum(targets, found_names, closed, calls if is_tu and analyze_callers else None,
+                            func_defs, source, context_lines, debug, enum_vars, call_edges, fingerprints, leaves)
+
+def _results_by_enum(targets, found_names, candidates, calls, func_defs, source, context_lines, debug, enum_vars, call_edges=None, fingerprints=False, leaves=None):
+    """
+    ENUM별 결과 리스트를 만들고 (calls가 주어지면) 호출자 정보를 붙인다.
+    call_edges 리스트가 주어지면 호출자를 붙이지 않고 파일의 호출 간선(_call_edges)만 담는다.
+    (프로젝트 전체 호출 그래프에서 파일 경계를 넘어 호출자를 찾을 때 사용)
+    fingerprints이면 결과에 AST 지문을 담는다 (leaves: 방문 엔진이 모은 리프 토큰 위치, 쿼리 엔진은 None).
+    """
+    candidates = sorted(candidates, key=lambda c: c.seq)
+    if calls is not None and call_edges is not None:
+        call_edges.extend(_call_edges(calls, func_defs, source))
+        calls = None
+    calls_by_callee = None
+    by_enum = {}
+    for enum_name in targets.order(found_names):
+        results = _build_results(candidates, enum_name, source, context_lines, debug,
+                                 (enum_vars or {}).get(enum_name), fingerprints, leaves)
+        if results and calls is not None:
+            if calls_by_callee is None:
+                calls_by_callee = _index_calls(calls)
+            _attach_callers(results, calls_by_callee, func_defs, source, context_lines, debug)
+        by_enum[enum_name] = results
+    return by_enum
+
+def _build_results(candidates, enum_name, source, context_lines, debug=False, enum_vars=None, fingerprints=False, leaves=None):
+    """
+    집계가 끝난 후보 목록(방문 순서로 정렬됨)에서 enum_name의 결과(ResultRecord) 리스트를 만든다.
+    직접 사용 또는 enum_vars 경유 사용(via_var)이 있고 이름이 있는 후보만 포함한다.
+    #define 별칭으로 사용했으면 거친 별칭 경로를 결과의 macros에 담는다.
+    """
+    results = []
+    code_source = BufferSource(source)
+    seen_ranges = set()  # 같은 노드(byte 범위)는 한 번만 결과로 만든다
+    for cand in candidates:
+        lines = cand.hits.get(enum_name)
+        via_var = enum_name in cand.via_var
+        if not ((lines or via_var) and cand.name):
+            continue
+        node_range = (cand.node.start_byte, cand.node.end_byte)
+        if node_range in seen_ranges:
+            continue
+        seen_ranges.add(node_range)
+        enum_lines = sorted(lines) if lines else []
+        # 코드는 위치만 기록하고 보고서/프롬프트에서 읽을 때 잘라낸다
+        span = source.snippet_span(cand.node.start_byte, cand.node.end_byte, enum_lines, context_lines)
+        macros = cand.macros.get(enum_name)
+        results.append(ResultRecord(cand.name, span, enum_lines, source=code_source,
+                                    macros=list(macros) if macros else None,
+                                    fingerprint=cand.fingerprint_of(source.data, leaves) if fingerprints else None))
+        if debug:
+            print(
+                f"[DEBUG] 포함됨: {cand.name} ({enum_name}), direct={len(enum_lines)}, via_var={via_var}, enum_vars={enum_vars}, lines={enum_lines}"
+            )
     return results
 
+def _index_calls(calls):
+    """호출 위치 목록 [(호출 대상 bytes, 호출한 함수 이름, 호출 위치 byte)]을 호출 대상별로 묶음"""
+    calls_by_callee = {}
+    for callee, caller_name, call_byte in calls:
+        calls_by_callee.setdefault(callee, []).append((caller_name, call_byte))
+    return calls_by_callee
+
+def _call_edges(calls, func_defs, source):
+    """
+    호출 위치 목록을 파일의 호출 간선 목록으로 바꾼다.
+    _attach_callers와 같은 규칙(자기 호출 제외, 호출 대상별로 호출자 하나, 정의가 있는 호출자만,
+    같은 이름이면 마지막 정의)을 적용하고, 호출자 코드는 위치만 기록한다.
+
+    Returns:
+        list: 문서 순서의 (호출 대상, 호출자, 호출 라인, 호출자 정의 시작 byte, 끝 byte,
+              호출 대상이 같은 파일에 정의되어 있는지)
+    """
+    edges = []
+    seen = set()
+    for callee, caller_name, call_byte in calls:
+        callee = callee.decode(errors='ignore')
+        if caller_name == callee or (callee, caller_name) in seen or caller_name not in func_defs:
+            continue
+        seen.add((callee, caller_name))
+        caller_node = func_defs[caller_name]
+        edges.append((callee, caller_name, source.line_of(call_byte), caller_node.start_byte, caller_node.end_byte,
+                      callee in func_defs))
+    return edges
+
+def _attach_callers(results, calls_by_callee, func_defs, source, context_lines, debug=False):
+    """
+    호출 대상별로 묶인 호출 위치(_index_calls)로 각 결과의 callers를 채운다.
+    func_defs는 함수 이름 -> function_definition 노드.
+    """
+    for res_item in results:
+        target_func_name = res_item['func_name']
+        callers_found = []
+        seen_callers = set()
+        for caller_name, call_byte in calls_by_callee.get(target_func_name.encode(), ()):
+            # 자기 자신 호출은 제외, 정의를 찾을 수 있는 호출자만 포함
+            if caller_name == target_func_name or caller_name in seen_callers or caller_name not in func_defs:
+                continue
+            seen_callers.add(caller_name)
+            caller_node = func_defs[caller_name]
+            call_line = source.line_of(call_byte)
+            span = source.snippet_span(caller_node.start_byte, caller_node.end_byte, [call_line], context_lines)
+            callers_found.append(CallerRecord(caller_name, span, call_line, source=res_item.source))
+            if debug:
+                print(f"[DEBUG] Caller found: {caller_name} calls {target_func_name} at line {call_line}")
+        res_item['callers'] = callers_found
+        if debug and callers_found:
+            print(f"[DEBUG] Function {target_func_name} is called by: {[c['func_name'] for c in callers_found]}")
+
+def _sweep_captures(captures, on_open, on_point):
+    """
+    문서 순서로 정렬된 쿼리 캡처를 훑으며 범위 노드(후보)의 열림/닫힘을 스택으로 관리한다.
+    on_open(node, capture_name, stack)이 반환한 프레임은 스택에 쌓이고,
+    범위 노드가 아닌 캡처는 on_point(node, capture_name, stack)으로 전달된다.
+    """
+    stack = []
+    for n, cap in captures:
+        start = n.start_byte
+        while stack and stack[-1].node.end_byte <= start:
+            stack.pop()
+        frame = on_open(n, cap, stack)
+        if frame is not None:
+            stack.append(frame)
+        else:
+            on_point(n, cap, stack)
+
+class _QueryFrame(_Candidate):
+    """쿼리 모드에서 스택에 쌓이는 후보 프레임 (함수 문맥 정보 포함)"""
+    __slots__ = ('kind', 'has_decl', 'ctx_name')
+
+def extract_functions_with_enum_query(node, code, target_enum, enum_vars=None, debug=False, analyze_callers=False, context_lines=None, source=None):
+    """tree-sitter 쿼리 캡처 기반 엔진 (--query). extract_functions_with_enum과 같은 결과를 반환한다."""
+    targets, enum_vars = _as_targets(target_enum, enum_vars)
+    return extract_functions_with_enums_query(
+        node, code, targets, enum_vars=enum_vars, debug=debug,
+        analyze_callers=analyze_callers, context_lines=context_lines, source=source,
+    )[target_enum]
+
+def extract_functions_with_enums_query(node, code, targets, enum_vars=None, debug=False, analyze_callers=False, context_lines=None, source=None, call_edges=None, fingerprints=False):
+    """
+    tree-sitter 쿼리 캡처 기반 엔진 (--query). extract_functions_with_enums와 같은 결과를 반환한다.
+
+    후보 노드(함수/struct/선언), 대상 ENUM identifier(#eq?/#match? 조건),
+    호출 위치를 한 번의 네이티브 쿼리 순회로 캡처하고, 파이썬에서는
+    바이트 범위 스택으로 캡처를 후보별로 묶기만 한다.
+    enum_vars 경유 사용은 #match? 조건 쿼리로 해당 이름만 캡처한다.
+    """
+    if source is None:
+        source = SourceBuffer(code)
+
+    is_tu = node.type == 'translation_unit'
+    collect_vars = enum_vars is None and is_tu
+
+    # 후보, ENUM 사용 위치, (필요 시) 호출 위치를 한 번의 쿼리 순회로 캡처
+    if targets.is_single and not targets.aliases:
+        query_text = CANDIDATE_QUERY + IDENTIFIER_EQ_QUERY.format(name=targets.names[0])
+    else:
+        query_text = CANDIDATE_QUERY + IDENTIFIER_MATCH_QUERY.format(regex=targets.query_regex())
+    if analyze_callers and is_tu:
+        query_text += CALL_QUERY
+    captures = get_query(query_text).captures(node)
+    captures.sort(key=lambda c: (c[0].start_byte, -c[0].end_byte))
+    calls = []  # (호출 대상 bytes, 호출한 함수 이름, 호출 위치 byte)
+    found_names = set()
+
+    frames = []
+    seq = 0
+
+    def enclosing_ctx(stack):
+        """스택에서 가장 가까운 (declarator가 있는) 함수의 이름"""
+        for frame in reversed(stack):
+            if frame.kind == 'function_definition' and frame.has_decl:
+                return frame.ctx_name
+        return None
+
+    def on_open(n, cap, stack):
+        nonlocal seq
+        if cap == 'hit' or cap == 'callee':
+            return None
+        name = None
+        has_decl = False
+        if cap == 'function_definition':
+            decl = n.child_by_field_name('declarator')
+            if decl:
+                has_decl = True
+                name = find_identifier_in_declarator(decl, code)
+        elif cap == 'struct_specifier':
+            name_node = n.child_by_field_name('name')
+            name = source.node_text(name_node) if name_node else "(anonymous struct)"
+        elif not enclosing_ctx(stack):
+            name = _declaration_name(n, code)
+        frame = _QueryFrame(0, seq, n, name)
+        frame.kind = cap
+        frame.has_decl = has_decl
+        frame.ctx_name = name
+        seq += 1
+        frames.append(frame)
+        return frame
+
+    def on_hit(n, cap, stack):
+        if cap == 'callee':
+            ctx_name = enclosing_ctx(stack)
+            if ctx_name:
+                calls.append((code[n.start_byte:n.end_byte], ctx_name, n.start_byte))
+            return
+        line = source.line_of(n.start_byte)
+        for enum_name, chain in targets.resolve(code[n.start_byte:n.end_byte]):
+            found_names.add(enum_name)
+            for frame in stack:
+                frame.add_hit(enum_name, line, chain)
+
+    _sweep_captures(captures, on_open, on_hit)
+
+    if collect_vars:
+        enum_vars = {}
+        for frame in frames:
+            if frame.hits and frame.node.parent == node:
+                _collect_top_level_vars(frame, code, source, enum_vars)
+        if debug:
+            print(f"[DEBUG] 전역에서 수집된 enum 변수들: {enum_vars}")
+
+    # enum_vars 경유 사용: 변수 이름들만 캡처하여 같은 방식으로 후보에 묶음
+    var_targets = {}  # 변수 이름 bytes -> 그 변수로 이어지는 ENUM 이름들
+    for enum_name, var_names in (enum_vars or {}).items():
+        for v in var_names:
+            if v.isidentifier():
+                var_targets.setdefault(v.encode(), set()).add(enum_name)
+    if var_targets:
+        regex = '^(' + '|'.join(sorted(v.decode() for v in var_targets)) + ')$'
+        var_caps = [(f.node, f.kind) for f in frames]
+        var_caps += get_query(IDENTIFIER_MATCH_QUERY.format(regex=regex)).captures(node)
+        var_caps.sort(key=lambda c: (c[0].start_byte, -c[0].end_byte))
+        frame_by_id = {f.node.id: f for f in frames}
+
+        def on_var_open(n, cap, stack):
+            return frame_by_id[n.id] if cap != 'hit' else None
+
+        def on_var(n, cap, stack):
+            reached = var_targets[code[n.start_byte:n.end_byte]]
+            for frame in stack:
+                frame.via_var |= reached
+
+        _sweep_captures(var_caps, on_var_open, on_var)
+
+    func_defs = {}
+    for frame in frames:
+        if frame.kind == 'function_definition' and frame.name:
+            func_defs[frame.name] = frame.node
+    return _results_by_enum(targets, found_names, frames, calls if is_tu and analyze_callers else None,
+                            func_defs, source, context_lines, debug, enum_vars, call_edges, fingerprints)
+
 
 def find_all_identifiers(node, code, debug=False):
     identifiers = []
@@ -429,77 +729,292 @@ def extract_functions_with_enum_file(
     analyze_callers=False,
     context_lines=None,
 ):
-    # 전처리기 지시문 제거
-    cleaned_code = remove_preprocessor_directives(code)
-    
+    """파일 하나에서 target_enum을 사용하는 함수/선언 목록을 반환"""
+    return extract_functions_with_enums_file(
+        code,
+        EnumTargets([target_enum]),
+        file_name=file_name,
+        debug=debug,
+        query_mode=query_mode,
+        analyze_callers=analyze_callers,
+        context_lines=context_lines,
+    )[target_enum]
+
+def extract_functions_with_enums_file(
+    code,
+    targets,
+    file_name=None,
+    debug=False,
+    query_mode=False,
+    analyze_callers=False,
+    context_lines=None,
+    call_edges=None,
+    active_ranges=None,
+    profile=None,
+    fingerprints=False,
+):
+    """
+    파일 하나를 한 번만 전처리/파싱하여 여러 ENUM(targets)의 사용 위치를 찾는다.
+    analyze_callers와 함께 call_edges 리스트를 주면 같은 파일 호출자를 붙이는 대신
+    파일의 호출 간선을 call_edges에 담는다 (프로젝트 전체 호출 그래프용).
+
+    code는 load_source()로 만든 SourceBuffer(전처리기 지시문을 지운 원본 바이트)이며,
+    문자열을 주면 UTF-8 소스로 보고 같은 방식으로 전처리한다.
+    active_ranges(tree-sitter Range 리스트)를 주면 그 구간만 파싱한다 (빌드 변형별 분석).
+    profile(리스트)을 주면 'parse'/'extract' 구간을 (단계, 시작, 끝)으로 덧붙인다 (--profile).
+    fingerprints이면 결과에 AST 지문을 담는다 (같은 함수 묶기).
+
+    Returns:
+        dict: ENUM 이름 -> 결과 리스트
+    """
+    source = load_source(code.encode('utf-8')) if isinstance(code, str) else code
+    code_bytes = source.data
+
     if debug:
-        print("\n--- Original Code ---")
-        print(code[:500]) # 처음 500자만 출력
         print("\n--- Cleaned Code (after preprocessor removal) ---")
-        print(cleaned_code[:500]) # 처음 500자만 출력
-        
-    code_bytes = bytes(cleaned_code, "utf8") # 수정된 코드로 바이트 변환
-    tree = parser.parse(code_bytes)
+        print(source.text(0, 500)) # 처음 500바이트만 출력
+
+    t0 = time.perf_counter()
+    ts_parser = thread_parser()
+    if active_ranges is None:
+        tree = ts_parser.parse(code_bytes)
+    else:
+        ts_parser.set_included_ranges(active_ranges)
+        try:
+            tree = ts_parser.parse(code_bytes)
+        finally:
+            ts_parser.set_included_ranges([])
+    t1 = lap(profile, 'parse', t0)
 
     if debug:
         print("\nParsed tree structure (from cleaned code):")
         debug_print_tree(tree.root_node, code_bytes)
         print("\nSearching for functions...")
 
-    results = extract_functions_with_enum(
+    engine = extract_functions_with_enums_query if query_mode else extract_functions_with_enums
+    results_by_enum = engine(
         tree.root_node,
         code_bytes,
-        target_enum,
+        targets,
         enum_vars=None,
         debug=debug,
         analyze_callers=analyze_callers,
         context_lines=context_lines,
+        source=source,
+        call_edges=call_edges,
+        fingerprints=fingerprints,
     )
+    lap(profile, 'extract', t1)
+    return {
+        enum_name: _finalize_results(results, file_name, enum_name, debug)
+        for enum_name, results in results_by_enum.items()
+    }
+
+def _declaration_vars(node, code):
+    """
+    최상위 declaration 안의 identifier마다 check_enum_declaration(node, identifier)가 돌려줄 변수 이름을 한 번에 구한다.
+    (식별자 색인에서 ENUM마다 선언을 다시 훑지 않도록 방문 규칙을 그대로 따라 모든 이름을 함께 계산)
 
-    unique_results = []
-    seen_results_hashes = set() # 해시를 저장할 set
+    Returns:
+        dict: identifier 문자열 -> 변수 이름 (check_enum_declaration이 (True, 변수 이름)을 돌려주는 것만)
+    """
+    decided = {}
+    for child in node.children:
+        if child.type == 'identifier':
+            decided.setdefault(code[child.start_byte:child.end_byte].decode(errors='ignore'), True)
+        elif child.type not in ('declaration', 'field_declaration'):
+            for ident, var in _declaration_vars(child, code).items():
+                decided.setdefault(ident, var)
+    if not decided:
+        return decided
+    var_name = None
+    var_name_node = node.child_by_field_name('declarator')
+    if not var_name_node:
+        init_decl = node.child_by_field_name('init_declarator')
+        if init_decl:
+            var_name_node = init_decl.child_by_field_name('declarator')
+    if var_name_node:
+        var_name = find_identifier_in_declarator(var_name_node, code)
+    # True: 이 노드의 직접 자식으로 찾음 -> 이 노드의 declarator 이름 (없으면 못 찾은 것으로 봄)
+    return {ident: (var_name if var is True else var) for ident, var in decided.items()
+            if (var_name if var is True else var)}
+
+def _struct_field_vars(struct_node, code):
+    """
+    최상위 struct의 field_declaration마다 collect_enum_struct_fields 규칙으로
+    identifier 문자열 -> 그 identifier를 쓰는 선언의 멤버 이름들을 구한다.
+    """
+    fields = {}
+    body_node = struct_node.child_by_field_name('body')
+    if not body_node:
+        return fields
+    declarator_types = ('field_identifier', 'identifier', 'pointer_declarator', 'array_declarator',
+                        'function_declarator', 'parenthesized_declarator')
+    for fdecl_item in body_node.children:
+        if fdecl_item.type != 'field_declaration':
+            continue
+        names = []
+        for fdecl_child in fdecl_item.children:
+            if fdecl_child.type in declarator_types:
+                var_name = find_identifier_in_declarator(fdecl_child, code)
+                if var_name:
+                    names.append(var_name)
+        if not names:
+            continue
+        idents = set()
+        stack = [fdecl_item]
+        while stack:
+            n = stack.pop()
+            if n.type in SKIP_NODE_TYPES:
+                continue
+            if n.type == 'identifier':
+                idents.add(code[n.start_byte:n.end_byte].decode(errors='ignore'))
+            stack.extend(n.children)
+        for ident in idents:
+            fields.setdefault(ident, set()).update(names)
+    return fields
+
+def extract_identifier_facts(node, code, source=None):
+    """
+    ENUM과 상관없이 파일 하나의 identifier 사용 위치, 결과 후보(함수/struct/전역 선언), 호출 간선을 모두 기록한다.
+    (식별자 색인용. extract_functions_with_enums와 같은 방문 규칙을 따르므로, 색인에서 어떤 ENUM을 찾아도
+    그 ENUM으로 파일을 직접 분석한 결과와 같다)
+
+    Returns:
+        dict: {
+            'scopes': [(종류, 이름 또는 None, 바깥 후보 번호 또는 -1, 시작 byte, 끝 byte, 시작 라인, 끝 라인, 최상위 여부,
+                        지문)], 후보 번호는 리스트 위치 (방문 순서), 지문은 ast_fingerprint와 같은 값
+            'occurrences': [(identifier, 가장 안쪽 후보 번호 또는 -1, 라인)] (문서 순서),
+            'globals': [(후보 번호, identifier, 변수 이름)] - 최상위 선언/struct에서 그 identifier를 쓰면
+                전역 enum 변수로 보는 이름 (_collect_top_level_vars 규칙),
+            'calls': _call_edges 형식의 호출 간선,
+        }
+    """
+    if source is None:
+        source = SourceBuffer(code)
+
+    scopes = []
+    digests = []      # 후보 번호 -> 지문 해시 (방문하면서 열린 후보마다 리프 토큰을 넣음)
+    occurrences = []
+    global_vars = []
+    open_scopes = []  # (depth, 후보 번호)
+    func_ctx = []
+    func_defs = {}
+    calls = []
+
+    def leave(depth):
+        while open_scopes and open_scopes[-1][0] == depth:
+            open_scopes.pop()
+        if func_ctx and func_ctx[-1][0] == depth:
+            func_ctx.pop()
+
+    cursor = node.walk()
+    depth = 0
+    while True:
+        n = cursor.node
+        n_type = n.type
+        descend = True
+
+        if n_type == 'identifier':
+            start = n.start_byte
+            # identifier는 ASCII라고 보고, 아닌 바이트도 잃지 않도록 latin-1로 저장
+            occurrences.append((code[start:n.end_byte].decode('latin-1'),
+                                open_scopes[-1][1] if open_scopes else -1, source.line_of(start)))
+        elif n_type in SKIP_NODE_TYPES:
+            descend = False
+            if n_type != 'comment' and open_scopes:
+                token = code[n.start_byte:n.end_byte] + b'\0'
+                for _, seq in open_scopes:
+                    digests[seq].update(token)
+        elif n_type in CANDIDATE_NODE_TYPES:
+            name = None
+            if n_type == 'function_definition':
+                decl = n.child_by_field_name('declarator')
+                if decl:
+                    name = find_identifier_in_declarator(decl, code)
+                    func_ctx.append((depth, name))
+                    if name:
+                        func_defs[name] = n
+            elif n_type == 'struct_specifier':
+                name_node = n.child_by_field_name('name')
+                name = source.node_text(name_node) if name_node else "(anonymous struct)"
+            elif not (func_ctx and func_ctx[-1][1]):
+                name = _declaration_name(n, code)
+            if name or depth == 1:
+                seq = len(scopes)
+                scopes.append((n_type, name, open_scopes[-1][1] if open_scopes else -1, n.start_byte, n.end_byte,
+                               source.line_of(n.start_byte), source.line_of(n.end_byte), depth == 1))
+                digests.append(hashlib.blake2b(digest_size=FINGERPRINT_SIZE))
+                open_scopes.append((depth, seq))
+                if depth == 1 and n_type == 'declaration':
+                    global_vars.extend((seq, ident, var) for ident, var in _declaration_vars(n, code).items())
+                elif depth == 1 and n_type == 'struct_specifier':
+                    global_vars.extend((seq, ident, var) for ident, names in _struct_field_vars(n, code).items()
+                                       for var in sorted(names))
+        elif n_type == 'call_expression':
+            fn = n.child_by_field_name('function')
+            if fn and fn.type == 'identifier' and func_ctx and func_ctx[-1][1]:
+                calls.append((code[fn.start_byte:fn.end_byte], func_ctx[-1][1], fn.start_byte))
+
+        if descend:
+            if cursor.goto_first_child():
+                depth += 1
+                continue
+            if open_scopes:
+                token = code[n.start_byte:n.end_byte] + b'\0'
+                for _, seq in open_scopes:
+                    digests[seq].update(token)
+        leave(depth)
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                break
+            depth -= 1
+            leave(depth)
+        else:
+            continue
+        break
+
+    scopes = [scope + (digest.hexdigest(),) for scope, digest in zip(scopes, digests)]
+    return {'scopes': scopes, 'occurrences': occurrences, 'globals': global_vars,
+            'calls': _call_edges(calls, func_defs, source) if node.type == 'translation_unit' else []}
+
+def extract_identifier_facts_file(source):
+    """SourceBuffer(load_source 결과) 하나를 파싱하여 extract_identifier_facts 결과를 반환"""
+    tree = thread_parser().parse(source.data)
+    return extract_identifier_facts(tree.root_node, source.data, source)
+
+def extract_call_edges_file(code, query_mode=False, active_ranges=None):
+    """
+    대상 ENUM 없이 파일 하나의 호출 간선만 수집한다.
+    (ENUM을 쓰지 않아 사전 필터로 건너뛴 파일에서 호출자를 찾을 때 사용)
+    active_ranges를 주면 그 구간만 파싱한다 (빌드 변형별 분석).
+
+    Returns:
+        list: _call_edges 형식의 호출 간선 리스트
+    """
+    call_edges = []
+    extract_functions_with_enums_file(
+        code, EnumTargets(), query_mode=query_mode, analyze_callers=True, call_edges=call_edges,
+        active_ranges=active_ranges,
+    )
+    return call_edges
+
+def _finalize_results(results, file_name, enum_name, debug=False):
+    """
+    한 파일의 결과에 파일 이름을 붙인다.
+    결과는 AST 노드마다 한 번만 만들어지고(_build_results) 줄 번호도 노드 위치에서 바로 구하므로
+    코드 조각을 다시 찾거나 해시할 필요가 없다.
+    """
     for r in results:
-        # 주의: r['code']는 전처리된 코드의 일부일 수 있음.
-        # 원본 코드에서 위치를 찾으려면, 전처리된 코드와 원본 코드 간의 매핑이 필요하나,
-        # 여기서는 단순화를 위해 전처리된 코드를 기준으로 결과를 생성.
-        # 또는, r['code']를 원본 코드에서 다시 추출하는 방법도 고려할 수 있으나 복잡도 증가.
-        # 현재는 전처리된 코드를 그대로 사용.
-        code_str = r.get('code', '') 
-        
-        # 코드 문자열을 UTF-8로 인코딩하여 해시 생성
-        code_hash = hashlib.md5(code_str.encode('utf-8')).hexdigest()
-        
-        # func_name, code_hash, enum_count를 기준으로 중복 식별
-        identifier_tuple = (r.get('func_name'), code_hash, r.get('enum_count'))
-        
-        if identifier_tuple not in seen_results_hashes:
-            # 라인 번호 계산 (cleaned_code 기준)
-            # 원본 코드의 라인 번호와 달라질 수 있음에 유의
-            lines = cleaned_code.split('\n')
-            start_pos = cleaned_code.find(code_str) # cleaned_code에서 찾아야 함
-            if start_pos != -1:
-                start_line = cleaned_code[:start_pos].count('\n') + 1
-                end_line = start_line + code_str.count('\n')
-                r['start_line'] = start_line
-                r['end_line'] = end_line
-            else:
-                # 만약 못찾는 경우 (이론상 발생하면 안됨), 0으로 설정
-                r['start_line'] = 0 
-                r['end_line'] = 0
-            
-            unique_results.append(r)
-            seen_results_hashes.add(identifier_tuple)
-    
-    final_results = []
-    for r_unique in unique_results:
-        r_unique['file'] = file_name or ''
-        final_results.append(r_unique)
+        r['file'] = file_name or ''
+        for caller in r['callers']:
+            caller['file'] = r['file']
 
     if debug:
-        if final_results:
-            print(f"\nFound {len(final_results)} unique functions/declarations using the target ENUM")
-            for res_debug in final_results:
+        if results:
+            print(f"\nFound {len(results)} unique functions/declarations using {enum_name}")
+            for res_debug in results:
                 print(f"- {res_debug['func_name']} ({res_debug['enum_count']} uses) at lines {res_debug['start_line']}-{res_debug['end_line']}")
         else:
-            print("\nNo functions/declarations with target ENUM found")
-    return final_results
+            print(f"\nNo functions/declarations with {enum_name} found")
+    return results
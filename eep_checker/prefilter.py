@@ -0,0 +1,88 @@
+import re
+from eep_checker.targets import glob_to_regex
+from eep_checker.source import read_file
+
+IDENT_BYTES = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_')
+
+
+def _trie_regex(words):
+    """
+    이름 목록을 공통 접두사로 묶은 정규식으로 만든다. (EEPROM_(?:A|B(?:OOT)?) 형태)
+
+    정규식 엔진이 트라이를 따라가므로 이름이 많아도 위치마다 한 번만 비교하며,
+    모든 이름이 같은 접두사로 시작하면 re 모듈의 리터럴 접두사 검색도 그대로 적용된다.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        end = '' in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not end:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if end else body
+
+    return build(trie)
+
+
+class Prefilter:
+    """
+    파싱 전에 원본 바이트만 보고 대상 ENUM이 나올 수 없는 파일을 걸러낸다.
+
+    identifier 단위로 비교하므로 EEPROM_MODE_X 안의 EEPROM_MODE는 히트로 보지 않는다.
+    주석/문자열 안의 이름은 히트로 보지만, 이 단계는 "확실히 없는 파일"만
+    건너뛰면 되므로 결과에는 영향이 없다.
+    """
+
+    def __init__(self, targets):
+        parts = []
+        names = targets.names + targets.alias_names  # 별칭만 쓰는 파일도 걸러내지 않음
+        if names:
+            parts.append(_trie_regex(names))
+        parts.extend(glob_to_regex(p) for p in targets.patterns)
+        body = parts[0] if len(parts) == 1 else '(?:' + '|'.join(parts) + ')'
+        self.regex = re.compile((body + '(?![A-Za-z0-9_])').encode())
+
+    def may_match(self, data) -> bool:
+        """bytes 또는 mmap에 대상 ENUM identifier가 있을 수 있는지 여부"""
+        for m in self.regex.finditer(data):
+            start = m.start()
+            # identifier 중간에서 시작한 매칭은 제외 (앞 바이트 검사)
+            if start == 0 or data[start - 1] not in IDENT_BYTES:
+                return True
+        return False
+
+    def scan_file(self, path):
+        """
+        파일을 검사하고 히트 가능성이 있으면 원본 바이트를 반환한다.
+
+        Returns:
+            tuple: (파일 크기, 원본 바이트(read_file()과 같이 큰 파일은 mmap) 또는 None(건너뛸 파일))
+        """
+        size, data = read_file(path)
+        if self.may_match(data):
+            return size, data
+        if not isinstance(data, bytes):
+            data.close()
+        return size, None
+
+
+def build_prefilter(targets, encoding):
+    """
+    targets용 Prefilter를 만든다. ENUM 이름(ASCII)이 원본 바이트에 그대로
+    나타나지 않는 인코딩(UTF-16 등)이면 거를 수 없으므로 None을 반환한다.
+    """
+    try:
+        if 'A_z0'.encode(encoding) != b'A_z0':
+            return None
+    except (LookupError, UnicodeError):
+        return None
+    return Prefilter(targets)
+
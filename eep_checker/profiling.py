@@ -0,0 +1,149 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# 보고서에 보여줄 단계 순서 (나머지는 뒤에 이름순)
+#  - 파일 단계(prefilter~extract)는 파일마다 analyze_file이 info['profile']에 담아 오며, 병렬이면 워커 시간을 모두 더한 값
+#  - html/csv/ndjson/prompt는 결과를 쓸 때마다 더한 시간 (코드 잘라내기/디코딩 포함)
+PHASE_ORDER = ('walk', 'macros', 'index', 'files', 'prefilter', 'read', 'cache', 'decode', 'preprocess', 'parse',
+               'extract', 'callers', 'html', 'csv', 'ndjson', 'prompt', 'report')
+FILE_PHASES = frozenset(('prefilter', 'read', 'cache', 'decode', 'preprocess', 'parse', 'extract'))
+DEFAULT_TOP = 10
+
+
+def lap(events, name, t0):
+    """
+    events 리스트에 (단계, 시작, 끝)을 기록하고 끝 시각을 반환한다. events가 None이면(--profile 아님) 기록하지 않는다.
+    시각은 time.perf_counter() 값이다 (시스템 전체 단조 시계라 워커 프로세스끼리도 비교할 수 있다).
+    """
+    t1 = time.perf_counter()
+    if events is not None:
+        events.append((name, t0, t1))
+    return t1
+
+
+def file_profile(events):
+    """analyze_file이 info['profile']에 담는 값 (워커 프로세스 pid와 tracemalloc 최대 메모리 포함)"""
+    return {'pid': os.getpid(), 'events': events,
+            'peak': tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None}
+
+
+class Profiler:
+    """
+    --profile 계측. 단계별 누적 시간, Chrome trace 이벤트, tracemalloc 최대 메모리를 모은다.
+    분석 한 번에 하나씩 만들며, tracemalloc은 프로세스 전체 값이므로 이미 켜져 있으면 그대로 쓴다.
+    tracemalloc은 할당이 많은 파이썬 코드(추출 등)를 몇 배 느리게 하므로 시간만 볼 때는 memory=False.
+    """
+
+    def __init__(self, memory=True):
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.totals = {}         # 단계 -> [초, 횟수]
+        self.events = []         # (단계, pid, 시작, 끝, args) - trace에 쓸 구간
+        self.worker_peaks = {}   # 워커 pid -> tracemalloc 최대 메모리
+        self.memory = memory
+        self._own_tracing = memory and not tracemalloc.is_tracing()
+        if self._own_tracing:
+            tracemalloc.start()
+
+    def add(self, name, t0, t1, pid=None, args=None, trace=True):
+        total = self.totals.get(name)
+        if total is None:
+            total = self.totals[name] = [0.0, 0]
+        total[0] += t1 - t0
+        total[1] += 1
+        if trace:
+            self.events.append((name, pid or self.pid, t0, t1, args))
+
+    @contextmanager
+    def phase(self, name, trace=True, **args):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, t0, time.perf_counter(), args=args or None, trace=trace)
+
+    def add_file(self, rel_path, info):
+        """analyze_file의 info['profile'] (파일 단계 구간)을 합친다"""
+        profile = info.get('profile')
+        if not profile:
+            return
+        pid = profile['pid']
+        args = {'file': rel_path, 'size': info['size']}
+        for name, t0, t1 in profile['events']:
+            self.add(name, t0, t1, pid=pid, args=args)
+        if profile['peak'] is not None and pid != self.pid:
+            self.worker_peaks[pid] = max(self.worker_peaks.get(pid, 0), profile['peak'])
+
+    def stop(self):
+        """tracemalloc 최대 메모리(바이트)를 읽고, 이 Profiler가 켰으면 끈다"""
+        peak = tracemalloc.get_traced_memory()[1] if self.memory and tracemalloc.is_tracing() else None
+        if self._own_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self._own_tracing = False
+        return peak
+
+    def report(self, files, top=DEFAULT_TOP):
+        """
+        프로파일 결과 dict (AnalysisResult.profile).
+
+        Args:
+            files (list): AnalysisResult.files (FileTiming 리스트)
+            top (int): 가장 오래 걸린 파일 몇 개를 담을지
+        Returns:
+            dict: {'wall', 'phases': {단계: {'seconds', 'count'}}, 'slowest_files': [{'file', 'size', 'elapsed'}],
+                   'peak_memory' (바이트, memory=False면 None), 'worker_peak_memory': {pid: 바이트}, 'trace_file'}
+        """
+        wall = time.perf_counter() - self.origin
+        names = [name for name in PHASE_ORDER if name in self.totals]
+        names += sorted(name for name in self.totals if name not in PHASE_ORDER)
+        slowest = sorted(files, key=lambda f: f.elapsed, reverse=True)[:top]
+        return {
+            'wall': wall,
+            'phases': {name: {'seconds': self.totals[name][0], 'count': self.totals[name][1]} for name in names},
+            'slowest_files': [{'file': f.file, 'size': f.size, 'elapsed': f.elapsed} for f in slowest],
+            'peak_memory': self.stop(),
+            'worker_peak_memory': dict(self.worker_peaks),
+            'trace_file': None,
+        }
+
+    def write_trace(self, path):
+        """Chrome trace-event JSON (chrome://tracing, https://ui.perfetto.dev). 워커마다 별도 프로세스 트랙"""
+        pids = sorted({event[1] for event in self.events} | {self.pid}, key=lambda pid: (pid != self.pid, pid))
+        trace = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': pid,
+                  'args': {'name': 'main' if pid == self.pid else f'worker {i} (pid {pid})'}}
+                 for i, pid in enumerate(pids)]
+        for name, pid, t0, t1, args in self.events:
+            event = {'name': name, 'cat': 'file' if name in FILE_PHASES else 'phase', 'ph': 'X', 'pid': pid, 'tid': pid,
+                     'ts': round((t0 - self.origin) * 1e6, 1), 'dur': round((t1 - t0) * 1e6, 1)}
+            if args:
+                event['args'] = args
+            trace.append(event)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return path
+
+
+def print_profile(report):
+    """--profile 결과 출력"""
+    wall = report['wall'] or 1e-9
+    print("\n=== 프로파일 ===")
+    print(f"{'단계':<12}{'시간(초)':>10}{'횟수':>9}{'비율':>8}")
+    for name, phase in report['phases'].items():
+        print(f"{name:<12}{phase['seconds']:>10.3f}{phase['count']:>9}{phase['seconds'] / wall:>8.1%}")
+    print(f"{'(전체)':<12}{report['wall']:>10.3f}")
+    print("파일 단계(prefilter~extract)는 파일마다 더한 값이라 병렬 분석이면 전체 시간보다 클 수 있습니다.")
+    if report['slowest_files']:
+        print(f"\n가장 오래 걸린 파일 {len(report['slowest_files'])}개:")
+        for f in report['slowest_files']:
+            print(f"  {f['elapsed']:8.3f}초 {f['size'] / 1024:10.1f} KB  {f['file']}")
+    if report['peak_memory'] is not None:
+        memory = f"\n최대 메모리 (tracemalloc): {report['peak_memory'] / 1024 / 1024:.1f} MB"
+        if report['worker_peak_memory']:
+            memory += f" (워커 최대 {max(report['worker_peak_memory'].values()) / 1024 / 1024:.1f} MB)"
+        print(memory)
+        print("tracemalloc을 켜면 파이썬 코드 단계가 느려집니다. 시간만 보려면 --no-tracemalloc")
+    if report['trace_file']:
+        print(f"Chrome trace: {report['trace_file']} (chrome://tracing 또는 https://ui.perfetto.dev 에서 열기)")
@@ -1,8 +1,16 @@
-def make_llm_prompt(file_name, func_name, enum_name, from_value, to_value, code, callers=None):
-    """Return a concise prompt for LLM analysis."""
+def make_llm_prompt(file_name, func_name, enum_name, from_value, to_value, code, callers=None, variants=None,
+                    macros=None, locations=None):
+    """Return a concise prompt for LLM analysis.
 
+    locations: 같은 함수가 복사된 모든 위치 [(파일, 시작 라인, 끝 라인)] (두 곳 이상일 때만 표시)
+    호출자의 variants가 함수의 변형 중 일부뿐이면 호출자에 그 변형들을 표시한다.
+    """
+
+    variant_note = f" | Variants: {', '.join(variants)}" if variants else ''
+    macro_note = f" | Via macro: {', '.join(macros)}" if macros else ''
+    copies_note = f" | Copies: {len(locations)}" if locations and len(locations) > 1 else ''
     prompt = f"""
-[File: {file_name}] | Function: {func_name} | Enum: {enum_name} {from_value} → {to_value}]
+[File: {file_name}] | Function: {func_name} | Enum: {enum_name} {from_value} → {to_value}{variant_note}{macro_note}{copies_note}]
 
 - {func_name}의 역할과 {enum_name} 사용 위치를 2문장 이내로 요약
 - {enum_name} 변경 시 예상 영향과 놓치기 쉬운 엣지 케이스 정리
@@ -18,9 +26,29 @@ def make_llm_prompt(file_name, func_name, enum_name, from_value, to_value, code,
     if callers:
         prompt += "\n\n--- 호출자 함수 요약 ---"
         for caller in callers:
+            depth = caller.get('depth', 1)
+            caller_variants = caller.get('variants')
+            caller_variant_note = (f" | Variants: {', '.join(caller_variants)}"
+                                   if caller_variants and list(caller_variants) != list(variants or ()) else '')
+            if depth > 1:
+                # 간접 호출자: 호출 경로와 바로 호출하는 함수를 함께 표시
+                path = ' → '.join(caller['path'])
+                prompt += f"""
+
+[Caller (depth {depth}): {caller['func_name']} in {caller.get('file', file_name)}, line {caller['call_line']} | Path: {path}{caller_variant_note}]
+
+- {caller['func_name']}의 역할과 {caller['callee']} 호출 이유를 2문장 이내로 설명
+- {func_name} 수정이 호출 경로를 따라 {caller['func_name']}에 미칠 영향과 확인 포인트
+
+```c
+// Code for: {caller['func_name']}
+{caller['code']}
+```
+"""
+                continue
             prompt += f"""
 
-[Caller: {caller['func_name']} in {file_name}, line {caller['call_line']}]
+[Caller: {caller['func_name']} in {caller.get('file', file_name)}, line {caller['call_line']}{caller_variant_note}]
 
 - {caller['func_name']}의 역할과 {func_name} 호출 이유를 2문장 이내로 설명
 - {func_name} 수정 시 {caller['func_name']}에 미칠 영향과 확인 포인트
@@ -30,4 +58,9 @@ def make_llm_prompt(file_name, func_name, enum_name, from_value, to_value, code,
 {caller['code']}
 ```
 """
+
+    if copies_note:
+        prompt += f"\n\n--- 같은 함수가 있는 위치 ({len(locations)}곳) ---\n"
+        prompt += "공백/주석만 다르고 코드는 같습니다. 한 번만 분석하고, 위치마다 따로 확인할 점이 있으면 함께 적어주세요.\n"
+        prompt += ''.join(f"- {loc_file}: {start}-{end}\n" for loc_file, start, end in locations)
     return prompt 
\ No newline at end of file
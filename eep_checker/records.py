@@ -0,0 +1,223 @@
+from array import array
+
+# 분석 옵션에 따라 결과에 생기는 선택 항목과 보고서 열 헤더 (보고서에서는 함수명 뒤에 이 순서로 둔다)
+EXTRA_COLUMNS = {'variants': '빌드 변형', 'macros': '매크로 경유'}
+
+
+class BufferSource:
+    """파일 하나의 SourceBuffer를 레코드의 코드 소스로 쓴다 (파싱 직후, 같은 프로세스 안에서만 사용)"""
+    __slots__ = ('buffer',)
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def get(self, rel_path, variants=None):
+        return self.buffer
+
+
+class _Record:
+    """
+    결과/호출자 레코드 공통 부분. __slots__로 필드만 저장하고 dict처럼 r['key'], r.get()으로 읽는다.
+
+    코드 문자열은 저장하지 않고 (코드 시작/끝 byte, 모드)만 들고 있다가 'code'를 읽을 때
+    source.get(파일)의 SourceBuffer에서 잘라 디코딩한다. source는 파싱 직후에는 BufferSource,
+    캐시/다른 프로세스에서 온 결과에는 실행 단위의 SourceLoader가 연결된다.
+    BufferSource는 파일 버퍼 전체를 붙잡으므로 결과를 오래 들고 있을 때는 detach_sources()로
+    코드만 읽어 두고 연결을 끊는다.
+    """
+    __slots__ = ()
+    _keys = ()
+    _optional = ()  # 값이 None이면 없는 키로 보는 항목
+    variants = None  # 빌드 변형별 분석(--variant)에서 결과가 나온 변형 이름 목록
+
+    @property
+    def code(self) -> str:
+        if self._code is not None:
+            return self._code
+        if self.source is None:
+            raise ValueError(f"코드를 읽을 소스가 연결되지 않은 결과입니다: {self.file} {self.func_name}")
+        return self.source.get(self.file, self.variants).span_text(self.code_start, self.code_end, self.code_mode)
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None and key in self._optional:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self._keys or key == 'code':
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._keys and not (key in self._optional and getattr(self, key) is None)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return [key for key in self._keys if key in self]
+
+
+class CallerRecord(_Record):
+    """
+    호출자 하나. file은 호출자가 있는 파일, depth/callee/path는 프로젝트 호출 그래프로 찾은
+    호출자(--caller-depth)에만 있다. variants는 빌드 변형별 분석에서 이 호출 경로가 활성인 변형 이름 목록이며,
+    코드도 그 변형의 활성 구간으로 잘라낸다.
+    """
+    __slots__ = ('func_name', 'file', 'start_line', 'end_line', 'call_line', 'depth', 'callee', 'path',
+                 'code_start', 'code_end', 'code_mode', 'source', 'variants', '_code')
+    _keys = ('func_name', 'code', 'start_line', 'end_line', 'call_line', 'file', 'depth', 'callee', 'path',
+             'variants')
+    _optional = ('file', 'depth', 'callee', 'path', 'variants')
+
+    def __init__(self, func_name, span, call_line, file=None, depth=None, callee=None, path=None, source=None,
+                 variants=None):
+        """span: SourceBuffer.snippet_span() 반환값 (코드 시작 byte, 끝 byte, 모드, start_line, end_line)"""
+        self.func_name = func_name
+        self.code_start, self.code_end, self.code_mode, self.start_line, self.end_line = span
+        self.call_line = call_line
+        self.file = file
+        self.depth = depth
+        self.callee = callee
+        self.path = path
+        self.source = source
+        self.variants = variants
+        self._code = None
+
+    def pack(self, owner_file=None):
+        """직렬화용 튜플. 호출된 함수와 같은 파일(owner_file)이면 파일 이름은 저장하지 않는다"""
+        return (self.func_name, (self.code_start, self.code_end, self.code_mode, self.start_line, self.end_line),
+                self.call_line, None if self.file == owner_file else self.file, self.depth, self.callee, self.path,
+                None if self.variants is None else tuple(self.variants))
+
+    @classmethod
+    def unpack(cls, packed, source=None):
+        func_name, span, call_line, file, depth, callee, path, *rest = packed  # 변형이 없던 이전 형식도 읽음
+        variants = rest[0] if rest else None
+        return cls(func_name, span, call_line, file, depth, callee, None if path is None else list(path), source,
+                   None if variants is None else list(variants))
+
+    def __reduce__(self):
+        # 다른 프로세스로 보낼 때 코드 소스(파일 내용)는 보내지 않음
+        return CallerRecord.unpack, (self.pack(),)
+
+
+class ResultRecord(_Record):
+    """
+    ENUM을 사용하는 함수/선언 하나.
+    enum_lines는 array('I')로 저장하고, enum_count는 enum_lines 길이로 계산한다.
+    variants는 빌드 변형별 분석에서만 있고, 코드는 그 변형의 활성 구간으로 잘라낸다.
+    macros는 ENUM을 #define 별칭으로 사용했을 때 거친 별칭 경로 목록이다 (예: 'SLOT → BOOT_SLOT').
+    fingerprint는 공백/주석을 뺀 AST 지문(parser.ast_fingerprint)으로, 여러 파일에 복사된 같은 함수를 묶는 데 쓴다.
+    """
+    __slots__ = ('func_name', 'file', 'start_line', 'end_line', '_enum_lines', 'callers',
+                 'code_start', 'code_end', 'code_mode', 'source', 'variants', 'macros', 'fingerprint', '_code')
+    _keys = ('func_name', 'code', 'enum_count', 'start_line', 'end_line', 'enum_lines', 'callers', 'file',
+             'variants', 'macros', 'fingerprint')
+    _optional = ('file', 'variants', 'macros', 'fingerprint')
+
+    def __init__(self, func_name, span, enum_lines, file=None, callers=None, source=None, variants=None,
+                 macros=None, fingerprint=None):
+        """span: SourceBuffer.snippet_span() 반환값 (코드 시작 byte, 끝 byte, 모드, start_line, end_line)"""
+        self.func_name = func_name
+        self.code_start, self.code_end, self.code_mode, self.start_line, self.end_line = span
+        self._enum_lines = array('I', enum_lines)
+        self.file = file
+        self.callers = [] if callers is None else callers
+        self.source = source
+        self.variants = variants
+        self.macros = macros
+        self.fingerprint = fingerprint
+        self._code = None
+
+    @property
+    def enum_lines(self):
+        return list(self._enum_lines)
+
+    @enum_lines.setter
+    def enum_lines(self, lines):
+        self._enum_lines = array('I', lines)
+
+    @property
+    def enum_count(self) -> int:
+        return len(self._enum_lines)
+
+    def __setitem__(self, key, value):
+        if key == 'enum_count':
+            raise KeyError(key)
+        super().__setitem__(key, value)
+
+    def pack(self):
+        """파일 이름과 코드 소스를 뺀 직렬화용 튜플 (marshal 가능)"""
+        return (self.func_name, (self.code_start, self.code_end, self.code_mode, self.start_line, self.end_line),
+                self._enum_lines.tobytes(), tuple(c.pack(self.file) for c in self.callers),
+                None if self.variants is None else tuple(self.variants),
+                None if self.macros is None else tuple(self.macros), self.fingerprint)
+
+    @classmethod
+    def unpack(cls, packed, file=None, source=None):
+        func_name, span, enum_lines, callers, variants, macros, fingerprint = packed
+        lines = array('I')
+        lines.frombytes(enum_lines)
+        record = cls(func_name, span, lines, file, [CallerRecord.unpack(c, source) for c in callers], source,
+                     None if variants is None else list(variants), None if macros is None else list(macros),
+                     fingerprint)
+        for caller in record.callers:
+            if caller.file is None:
+                caller.file = file
+        return record
+
+    def __reduce__(self):
+        return ResultRecord.unpack, (self.pack(), self.file)
+
+
+def bind_source(results_by_enum, source):
+    """코드 소스가 없는 레코드(캐시/워커 프로세스에서 온 결과)에 source를 연결한다"""
+    for results in results_by_enum.values():
+        for r in results:
+            if isinstance(r, _Record):
+                if r.source is None:
+                    r.source = source
+                for caller in r.callers:
+                    if caller.source is None:
+                        caller.source = source
+
+
+def detach_sources(results_by_enum):
+    """
+    BufferSource(파일 버퍼 전체)가 연결된 레코드는 코드를 읽어 레코드에 담고 연결을 끊는다.
+    결과를 작성기에 넘기거나 목록으로 모아 둘 때 불러, 결과가 나온 파일 수만큼 버퍼가 남지 않게 한다.
+    SourceLoader가 연결된 레코드는 loader가 최근 파일 몇 개만 들고 있으므로 그대로 둔다.
+    """
+    for results in results_by_enum.values():
+        for r in results:
+            if not isinstance(r, _Record):
+                continue
+            for record in (r, *r.callers):
+                if isinstance(record.source, BufferSource):
+                    record._code = record.code
+                    record.source = None
+
+
+def extra_values(r, extra_columns, owner=None) -> list:
+    """
+    결과의 추가 열(EXTRA_COLUMNS 키) 값들. 목록은 쉼표로 이어 붙인다.
+    owner(호출자 행이면 호출된 결과)를 주면 r에 없는 항목은 owner 값을 쓴다.
+    """
+    return [', '.join((r.get(key) if owner is None or key in r else owner.get(key)) or ()) for key in extra_columns]
+
+
+def as_dict(r) -> dict:
+    """레코드를 (호출자까지) 일반 dict로 바꾼다. 코드도 이때 읽는다. dict는 그대로 반환"""
+    if not isinstance(r, _Record):
+        return r
+    d = {key: r[key] for key in r.keys()}
+    if 'callers' in d:
+        d['callers'] = [as_dict(c) for c in d['callers']]
+    return d
@@ -3,53 +3,170 @@ import datetime
 import os
 import json
 from typing import List, Dict
+from eep_checker.spool import RecordSpool
+from eep_checker.records import as_dict, EXTRA_COLUMNS, extra_values
+from eep_checker.virtual_report import (
+    VIRTUAL_THRESHOLD, VIRTUAL_STYLE, VIRTUAL_SCRIPT, virtual_table,
+    CodeShardWriter, virtual_rows, section_row, rows_json,
+)
+
+# 페이지 틀에서 테이블 행이 들어갈 자리
+_ROWS_MARKER = '\0EEP_ROWS\0'
+
+# 기본(inline) 보고서의 결과 테이블(_inline_table()로 추가 열을 채움)과 테이블 스크립트.
+# 모든 코드를 숨긴 행으로 페이지에 넣는다.
+_INLINE_TABLE = '''                    <table id="resultTable">
+                        <thead>
+                            <tr>
+                                <th>파일명</th>
+                                <th>함수명</th>%(extra_th)s
+                                <th style="width:100px">사용 횟수</th>
+                                <th style="width:100px">라인 범위</th>
+                                <th style="width:150px">ENUM 위치</th>
+                                <th style="width:100px">코드 보기</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            ''' + _ROWS_MARKER + '''
+                        </tbody>
+                    </table>
+'''
+# 추가 열(EXTRA_COLUMNS)의 헤더. 검색이 파일명/함수명 열 번호를 쓰므로 그 뒤에 둔다
+_EXTRA_TH = '''
+                                <th style="width:140px">%s</th>'''
+
+_INLINE_SCRIPT = r'''        function toggleCode(idx) {
+            const codeRow = document.getElementById(`code_${idx}`);
+            const btn = document.querySelector(`button[onclick="toggleCode(${idx})"]`);
+            const isOpening = codeRow.style.display === 'none';
+            
+            codeRow.style.display = isOpening ? 'table-row' : 'none';
+            btn.textContent = isOpening ? '접기' : '보기';
+            btn.dataset.state = isOpening ? 'opened' : 'closed';
+            
+            if (isOpening) {
+                // 코드가 표시될 때 Prism.js 하이라이팅 실행
+                Prism.highlightAllUnder(codeRow);
+            }
+        }
 
-def save_html_report(enum_name: str, results: List[Dict], output_dir: str = '.'):
-    now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"{enum_name}_Output_{now}.html"
-    filepath = os.path.join(output_dir, filename)
+        // 검색 기능
+        const searchField = document.getElementById('searchField');
+        const searchType = document.getElementById('searchType');
+        const resultTable = document.getElementById('resultTable');
+        const tbody = resultTable.getElementsByTagName('tbody')[0];
+        const allRows = tbody.getElementsByTagName('tr'); // Live collection
 
-    total_files = len(set(r['file'] for r in results))
-    total_funcs = len(results)
-    total_enums = sum(r['enum_count'] for r in results)
-    enum_name_esc = html.escape(enum_name)
+        function filterTable() {
+            const searchText = searchField.value.toLowerCase();
+            const type = searchType.value;
+            const tbody = resultTable.getElementsByTagName('tbody')[0];
+            const allRows = tbody.getElementsByTagName('tr'); // Live collection
 
-    # 차트 데이터 준비
-    file_data = {}
-    for r in results:
-        if r['file'] not in file_data:
-            file_data[r['file']] = 0
-        file_data[r['file']] += r['enum_count']
-    
-    chart_data = {
-        'files': list(file_data.keys()),
-        'counts': list(file_data.values())
-    }
+            // Pass 1: Filter main rows (enum func and caller) and highlight
+            for (let i = 0; i < allRows.length; i++) {
+                const row = allRows[i];
+                if (row.id.startsWith('code_') || row.classList.contains('enum-section')) continue; // Skip code/section rows in this pass
 
-    # JavaScript에서 사용할 데이터를 JSON으로 변환
-    chart_data_json = json.dumps(chart_data)
-    results_json = json.dumps([{
-        'func_name': r['func_name'],
-        'enum_count': r['enum_count']
-    } for r in results])
+                let cellText = '';
+                let isSearchTarget = false;
+                let columnIndex = (type === 'file') ? 0 : 1;
 
-    # 테이블 행 HTML 생성
+                if (row.classList.contains('caller-row')) {
+                    if (type === 'function') { // Caller rows searched by function name
+                        const cell = row.getElementsByTagName('td')[1];
+                        if (cell) cellText = cell.textContent.toLowerCase();
+                        isSearchTarget = true;
+                    }
+                } else { // Enum func row
+                    const cell = row.getElementsByTagName('td')[columnIndex];
+                    if (cell) cellText = cell.textContent.toLowerCase();
+                    isSearchTarget = true;
+                }
+
+                let isMatch = !isSearchTarget || !searchText || cellText.includes(searchText);
+                
+                // For caller rows not directly searched (e.g., by file), initially assume they are not hidden by search itself
+                if (row.classList.contains('caller-row') && type === 'file') {
+                    isMatch = true; // Will be handled by parent enum func row visibility in Pass 2
+                }
+
+                row.classList.toggle('hidden', !isMatch);
+
+                // Highlight
+                const highlightCellIndex = row.classList.contains('caller-row') ? 1 : columnIndex;
+                const cellToHighlight = row.getElementsByTagName('td')[highlightCellIndex];
+                if (cellToHighlight) {
+                    cellToHighlight.innerHTML = cellToHighlight.textContent; // Clear previous
+                    if (isMatch && searchText && isSearchTarget) {
+                        cellToHighlight.innerHTML = cellToHighlight.textContent.replace(
+                            new RegExp(searchText, 'gi'),
+                            match => `<span class="highlight">${match}</span>`
+                        );
+                    }
+                }
+            }
+
+            // Pass 2: Adjust visibility of dependent rows (code rows, caller rows based on parent enum func)
+            let currentEnumFuncRowIsHidden = false;
+            for (let i = 0; i < allRows.length; i++) {
+                const row = allRows[i];
+
+                if (row.classList.contains('enum-section')) { // ENUM section title row
+                    continue;
+                } else if (row.id.startsWith('code_')) { // This is a code row
+                    const id_part = row.id.substring(5); // e.g., "0_enum_func"
+                    const button = document.querySelector(`button[onclick="toggleCode('${id_part}')"]`);
+                    if (button) {
+                        const displayRowForButton = button.closest('tr');
+                        if (displayRowForButton && displayRowForButton.classList.contains('hidden')) {
+                            row.style.display = 'none';
+                            button.textContent = '보기';
+                            button.dataset.state = 'closed';
+                        }
+                    }
+                } else if (!row.classList.contains('caller-row')) { // This is an Enum Func Row
+                    currentEnumFuncRowIsHidden = row.classList.contains('hidden');
+                } else { // This is a Caller Row
+                    if (currentEnumFuncRowIsHidden) {
+                        row.classList.add('hidden');
+                    }
+                }
+            }
+        }
+
+        searchField.addEventListener('input', filterTable);
+        searchType.addEventListener('change', filterTable);
+'''
+
+def _inline_table(extra_columns=()) -> str:
+    return _INLINE_TABLE % {'extra_th': ''.join(_EXTRA_TH % EXTRA_COLUMNS[key] for key in extra_columns)}
+
+def _build_table_rows(results: List[Dict], id_prefix: str = '', start: int = 0, extra_columns=()) -> List[str]:
+    """
+    결과 리스트의 테이블 행(함수 행, 코드 행, 호출자 행) HTML 목록을 만든다. 행 번호는 start부터 매긴다.
+    extra_columns(EXTRA_COLUMNS 키 목록) 열은 함수명 뒤에 넣는다.
+    """
     table_rows = []
-    for i, r in enumerate(results):
+    cols = 6 + len(extra_columns)
+    for idx, r in enumerate(results, start):
+        i = f"{id_prefix}{idx}"
         # ENUM 사용 라인들을 문자열로 변환
         enum_lines_str = ', '.join(map(str, r['enum_lines']))
+        extra_td = ''.join(f"""
+            <td title="{html.escape(value)}">{html.escape(value)}</td>""" for value in extra_values(r, extra_columns))
         
         row = f"""
         <tr>
             <td title="{html.escape(str(r['file']))}">{html.escape(str(r['file']))}</td>
-            <td title="{html.escape(str(r['func_name']))}">{html.escape(str(r['func_name']))}</td>
+            <td title="{html.escape(str(r['func_name']))}">{html.escape(str(r['func_name']))}</td>{extra_td}
             <td>{html.escape(str(r['enum_count']))}</td>
             <td>{r['start_line']}-{r['end_line']}</td>
             <td title="ENUM 사용 위치: {enum_lines_str}">{enum_lines_str}</td>
             <td><button class="btn toggle-btn" onclick="toggleCode('{i}_enum_func')" data-state="closed">보기</button></td>
         </tr>
         <tr id="code_{i}_enum_func" class="code-row" style="display:none">
-            <td colspan="6">
+            <td colspan="{cols}">
                 <div class="code-container">
                     <div class="code-preview">
                         <pre class="line-numbers"><code class="language-c">{html.escape(r['code'])}</code></pre>
@@ -63,17 +180,27 @@ def save_html_report(enum_name: str, results: List[Dict], output_dir: str = '.')
         # 호출자 정보 추가
         if r.get('callers'):
             for j, caller in enumerate(r['callers']):
+                # 다른 파일의 호출자는 파일 경로를 함께 표시
+                caller_file = caller.get('file', r['file'])
+                caller_file_html = '' if caller_file == r['file'] else f" {html.escape(str(caller_file))}"
+                # 간접 호출자(--caller-depth)는 깊이만큼 들여쓰고 호출 경로 표시
+                depth = caller.get('depth', 1)
+                caller_label = "└ 호출:" if depth == 1 else f"└ 호출 (깊이 {depth}):"
+                path_html = '' if depth == 1 else html.escape(' → '.join(caller['path']))
+                path_title = f' title=\"{path_html}\"' if path_html else ''
+                # 추가 열은 호출자에 있는 값만 (빌드 변형별 분석에서 호출 경로가 활성인 변형)
+                caller_extra_td = ''.join(f"<td>{html.escape(value)}</td>" for value in extra_values(caller, extra_columns))
                 caller_row = f"""
                 <tr class=\"caller-row\">
-                    <td colspan=\"1\" style=\"padding-left: 30px;\"><em>└ 호출:</em></td>
-                    <td title=\"{html.escape(str(caller['func_name']))}\">{html.escape(str(caller['func_name']))}</td>
+                    <td colspan=\"1\" style=\"padding-left: {30 + (depth - 1) * 15}px;\"><em>{caller_label}</em>{caller_file_html}</td>
+                    <td title=\"{html.escape(str(caller['func_name']))}\">{html.escape(str(caller['func_name']))}</td>{caller_extra_td}
                     <td></td> 
                     <td>{caller['start_line']}-{caller['end_line']} (호출: L{caller['call_line']})</td>
-                    <td></td>
+                    <td{path_title}>{path_html}</td>
                     <td><button class=\"btn toggle-btn\" onclick=\"toggleCode('{i}_caller_{j}')\" data-state=\"closed\">보기</button></td>
                 </tr>
                 <tr id=\"code_{i}_caller_{j}\" class=\"code-row caller-code-row\" style=\"display:none\">
-                    <td colspan=\"6\">
+                    <td colspan=\"{cols}\">
                         <div class=\"code-container\">
                             <div class=\"code-preview\">
                                 <pre class=\"line-numbers\"><code class=\"language-c\">{html.escape(caller['code'])}</code></pre>
@@ -83,6 +210,219 @@ def save_html_report(enum_name: str, results: List[Dict], output_dir: str = '.')
                 </tr>
                 """
                 table_rows.append(caller_row)
+    return table_rows
+
+def _clusters_html(duplicates: List[Dict], batch: bool = False) -> str:
+    """
+    같은 함수 묶음(FunctionClusters.duplicates) 표. 묶음이 없으면 빈 문자열.
+    batch 보고서면 ENUM 열을 넣는다.
+    """
+    if not duplicates:
+        return ''
+    rows = []
+    for c in duplicates:
+        locations = '<br>'.join(f"{html.escape(str(loc['file']))}: {loc['start_line']}-{loc['end_line']}"
+                                for loc in c['locations'])
+        enum_td = f"<td>{html.escape(c['enum'])}</td>" if batch else ''
+        rows.append(f"""
+                            <tr>
+                                <td title="{html.escape(c['func_name'])}">{html.escape(c['func_name'])}</td>{enum_td}
+                                <td>{c['count']}</td>
+                                <td class="locations">{locations}</td>
+                            </tr>""")
+    enum_th = '<th style="width:160px">ENUM</th>' if batch else ''
+    return f"""
+            <div class="table-container clusters">
+                <div class="chart-title">같은 함수 묶음 (공백/주석만 다른 복사본)</div>
+                <table id="clusterTable">
+                    <thead>
+                        <tr>
+                            <th style="width:200px">함수명</th>{enum_th}
+                            <th style="width:100px">복사본 수</th>
+                            <th>위치</th>
+                        </tr>
+                    </thead>
+                    <tbody>{''.join(rows)}
+                    </tbody>
+                </table>
+            </div>
+"""
+
+def _section_row(enum_name: str, func_count: int, enum_total: int, cols: int = 6) -> str:
+    return f"""
+        <tr class="enum-section">
+            <td colspan="{cols}"><strong>{html.escape(enum_name)}</strong> — 함수 {func_count}개, 사용 {enum_total}회</td>
+        </tr>
+        """
+
+class HtmlReportWriter:
+    """
+    결과를 하나씩 받아 HTML 보고서를 쓰는 스트리밍 작성기.
+
+    통계와 차트 데이터는 모든 결과를 본 뒤에야 정해지므로, 받은 결과는 임시 파일(RecordSpool)에
+    ENUM별로 쌓아 두고 파일별 사용 횟수만 메모리에 집계한다. close()에서 통계가 들어간 페이지 앞부분을
+    쓴 뒤 ENUM 순서대로 결과를 하나씩 읽어 행을 이어 쓰므로 전체 행을 한 번에 메모리에 만들지 않는다.
+
+    mode:
+        'inline': 모든 코드를 숨긴 행으로 페이지에 넣는 기존 보고서
+        'virtual': 보이는 행만 그리는 가상 스크롤 테이블. 코드는 보고서 옆 폴더의 조각 파일에 두고
+            '보기'를 누를 때 읽어서 그 블록만 하이라이트한다 (결과가 아주 많은 보고서용)
+        'auto': 결과(함수) 수가 VIRTUAL_THRESHOLD를 넘으면 'virtual', 아니면 'inline'
+    extra_columns: 함수명 뒤에 넣을 추가 열 (EXTRA_COLUMNS 키 목록, 예: --variant의 'variants')
+    """
+
+    def __init__(self, label: str, output_dir: str = '.', batch: bool = False, mode: str = 'inline',
+                 extra_columns=()):
+        self.label = label
+        self.output_dir = output_dir
+        self.batch = batch
+        self.mode = mode
+        self.extra_columns = tuple(extra_columns)
+        self._spool = RecordSpool()
+        self._file_counts = {}  # ENUM 이름 -> {파일: ENUM 사용 횟수} (결과 순서)
+
+    def add(self, enum_name: str, r: Dict):
+        self._spool.append(enum_name, as_dict(r))
+        counts = self._file_counts.setdefault(enum_name, {})
+        counts[r['file']] = counts.get(r['file'], 0) + r['enum_count']
+
+    def close(self, enum_order=None, duplicates=None) -> str:
+        """
+        보고서 파일을 쓰고 경로를 반환한다.
+
+        Args:
+            enum_order (list, optional): ENUM 섹션 순서 (기본: 결과가 처음 들어온 순서)
+            duplicates (list, optional): 결과 표 아래에 보여줄 같은 함수 묶음 (FunctionClusters.duplicates)
+        """
+        if enum_order is None:
+            enum_order = self._spool.sections()
+        try:
+            file_data = {}
+            for enum_name in enum_order:
+                for file_name, count in self._file_counts.get(enum_name, {}).items():
+                    file_data[file_name] = file_data.get(file_name, 0) + count
+            total_funcs = sum(self._spool.count(enum_name) for enum_name in enum_order)
+            virtual = self.mode == 'virtual' or (self.mode == 'auto' and total_funcs > VIRTUAL_THRESHOLD)
+
+            now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"{self.label}_Output_{now}"
+            filepath = os.path.join(self.output_dir, filename + '.html')
+            page_options = {'table_html': _inline_table(self.extra_columns)}
+            if virtual:
+                code_dir = filename + '_code'
+                page_options = {
+                    'table_html': virtual_table(_ROWS_MARKER, code_dir, self.extra_columns),
+                    'table_script': VIRTUAL_SCRIPT,
+                    'extra_style': VIRTUAL_STYLE,
+                }
+            page = _html_page(self.label, len(file_data), total_funcs, sum(file_data.values()), file_data,
+                              enum_count=len(enum_order) if self.batch else None,
+                              clusters_html=_clusters_html(duplicates, self.batch),
+                              cluster_count=len(duplicates) if duplicates else None, **page_options)
+            page_head, page_tail = page.split(_ROWS_MARKER)
+
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(page_head)
+                if virtual:
+                    self._write_virtual_rows(f, enum_order, os.path.join(self.output_dir, code_dir))
+                else:
+                    self._write_inline_rows(f, enum_order)
+                f.write(page_tail)
+        finally:
+            self.discard()
+
+        print(f"HTML 보고서가 생성되었습니다: {filepath}")
+        return filepath
+
+    def _write_inline_rows(self, f, enum_order):
+        for e, enum_name in enumerate(enum_order):
+            id_prefix = ''
+            if self.batch:
+                f.write(_section_row(enum_name, self._spool.count(enum_name),
+                                     sum(self._file_counts.get(enum_name, {}).values()),
+                                     cols=6 + len(self.extra_columns)))
+                id_prefix = f"{e}_"
+            for idx, r in enumerate(self._spool.iter_section(enum_name)):
+                f.write(''.join(_build_table_rows([r], id_prefix, start=idx, extra_columns=self.extra_columns)))
+
+    def _write_virtual_rows(self, f, enum_order, code_dir):
+        shards = CodeShardWriter(code_dir)
+        try:
+            for enum_name in enum_order:
+                if self.batch:
+                    f.write(rows_json([section_row(enum_name, self._spool.count(enum_name),
+                                                   sum(self._file_counts.get(enum_name, {}).values()))]))
+                for r in self._spool.iter_section(enum_name):
+                    f.write(rows_json(virtual_rows(r, shards, self.extra_columns)))
+        finally:
+            shards.close()
+
+    def discard(self):
+        """보고서를 쓰지 않고 임시 파일을 정리한다"""
+        self._spool.close()
+
+def save_html_report(enum_name: str, results: List[Dict], output_dir: str = '.', mode: str = 'inline'):
+    writer = HtmlReportWriter(enum_name, output_dir, mode=mode,
+                              extra_columns=[key for key in EXTRA_COLUMNS if any(r.get(key) for r in results)])
+    for r in results:
+        writer.add(enum_name, r)
+    return writer.close([enum_name])
+
+def save_batch_html_report(label: str, results_by_enum: Dict[str, List[Dict]], output_dir: str = '.', mode: str = 'inline'):
+    """
+    여러 ENUM의 분석 결과를 ENUM별 섹션으로 나누어 하나의 HTML 보고서로 저장합니다.
+
+    Args:
+        label (str): 보고서 파일명/제목에 쓸 이름
+        results_by_enum (Dict[str, List[Dict]]): ENUM 이름 -> 분석 결과 리스트
+        output_dir (str): 출력 디렉토리 경로
+        mode (str): 'inline', 'virtual', 'auto' (HtmlReportWriter 참고)
+
+    Returns:
+        str: 생성된 HTML 파일의 경로
+    """
+    extra_columns = [key for key in EXTRA_COLUMNS
+                     if any(r.get(key) for results in results_by_enum.values() for r in results)]
+    writer = HtmlReportWriter(label, output_dir, batch=True, mode=mode, extra_columns=extra_columns)
+    for enum_name, results in results_by_enum.items():
+        for r in results:
+            writer.add(enum_name, r)
+    return writer.close(list(results_by_enum))
+
+def _html_page(enum_name: str, total_files: int, total_funcs: int, total_enums: int, file_data: Dict, enum_count=None,
+               table_html: str = None, table_script: str = _INLINE_SCRIPT, extra_style: str = '',
+               clusters_html: str = '', cluster_count=None) -> str:
+    """테이블 행 자리에 _ROWS_MARKER가 들어간 보고서 페이지 전체를 만든다."""
+    if table_html is None:
+        table_html = _inline_table()
+    enum_name_esc = html.escape(enum_name)
+
+    # 차트 데이터 준비
+    chart_data = {
+        'files': list(file_data.keys()),
+        'counts': list(file_data.values())
+    }
+
+    # JavaScript에서 사용할 데이터를 JSON으로 변환
+    chart_data_json = json.dumps(chart_data)
+
+    # 여러 ENUM 보고서인 경우 ENUM 개수 표시
+    enum_count_html = ''
+    if enum_count is not None:
+        enum_count_html = f"""<div class="stat-item">
+                        <div class="stat-label">ENUM 수</div>
+                        <div class="stat-value">{enum_count}</div>
+                    </div>
+                    """
+
+    # 같은 함수 묶음이 있으면 묶음 수 표시
+    cluster_count_html = ''
+    if cluster_count:
+        cluster_count_html = f"""
+                    <div class="stat-item">
+                        <div class="stat-label">같은 함수 묶음</div>
+                        <div class="stat-value">{cluster_count}</div>
+                    </div>"""
 
     html_content = f"""
     <!DOCTYPE html>
@@ -242,6 +582,16 @@ def save_html_report(enum_name: str, results: List[Dict], output_dir: str = '.')
             .caller-code-row td {{
                  background-color: #f0f0f0; /* 호출자 코드 행 배경색 */
             }}
+            .clusters {{
+                margin-top: 20px;
+            }}
+            .clusters td.locations {{
+                white-space: normal;
+            }}
+            .enum-section td {{
+                background-color: var(--hover); /* ENUM별 섹션 제목 행 */
+                color: var(--primary);
+            }}
 
             .code-row > td {{
                 padding: 0;
@@ -376,14 +726,14 @@ def save_html_report(enum_name: str, results: List[Dict], output_dir: str = '.')
             .toggle-btn[data-state="opened"] {{
                 background-color: #666;
             }}
-        </style>
+{extra_style}        </style>
     </head>
     <body>
         <div class="container">
             <div class="header">
                 <h1>🙂 ENUM: <span style="color:var(--primary)">{enum_name_esc}</span></h1>
                 <div class="stats">
-                    <div class="stat-item">
+                    {enum_count_html}<div class="stat-item">
                         <div class="stat-label">분석 파일 수</div>
                         <div class="stat-value">{total_files}</div>
                     </div>
@@ -394,7 +744,7 @@ def save_html_report(enum_name: str, results: List[Dict], output_dir: str = '.')
                     <div class="stat-item">
                         <div class="stat-label">ENUM 사용 총 횟수</div>
                         <div class="stat-value">{total_enums}</div>
-                    </div>
+                    </div>{cluster_count_html}
                 </div>
             </div>
 
@@ -414,24 +764,9 @@ def save_html_report(enum_name: str, results: List[Dict], output_dir: str = '.')
                         <input type="text" class="search-field" id="searchField" 
                                placeholder="검색어를 입력하세요..." />
                     </div>
-                    <table id="resultTable">
-                        <thead>
-                            <tr>
-                                <th>파일명</th>
-                                <th>함수명</th>
-                                <th style="width:100px">사용 횟수</th>
-                                <th style="width:100px">라인 범위</th>
-                                <th style="width:150px">ENUM 위치</th>
-                                <th style="width:100px">코드 보기</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {''.join(table_rows)}
-                        </tbody>
-                    </table>
-                </div>
+{table_html}                </div>
             </div>
-        </div>
+{clusters_html}        </div>
 
         <script>
         // 차트 데이터
@@ -528,112 +863,9 @@ def save_html_report(enum_name: str, results: List[Dict], output_dir: str = '.')
                     .style("opacity", 0);
             }});
 
-        function toggleCode(idx) {{
-            const codeRow = document.getElementById(`code_${{idx}}`);
-            const btn = document.querySelector(`button[onclick="toggleCode(${{idx}})"]`);
-            const isOpening = codeRow.style.display === 'none';
-            
-            codeRow.style.display = isOpening ? 'table-row' : 'none';
-            btn.textContent = isOpening ? '접기' : '보기';
-            btn.dataset.state = isOpening ? 'opened' : 'closed';
-            
-            if (isOpening) {{
-                // 코드가 표시될 때 Prism.js 하이라이팅 실행
-                Prism.highlightAllUnder(codeRow);
-            }}
-        }}
-
-        // 검색 기능
-        const searchField = document.getElementById('searchField');
-        const searchType = document.getElementById('searchType');
-        const resultTable = document.getElementById('resultTable');
-        const tbody = resultTable.getElementsByTagName('tbody')[0];
-        const allRows = tbody.getElementsByTagName('tr'); // Live collection
-
-        function filterTable() {{
-            const searchText = searchField.value.toLowerCase();
-            const type = searchType.value;
-            const tbody = resultTable.getElementsByTagName('tbody')[0];
-            const allRows = tbody.getElementsByTagName('tr'); // Live collection
-
-            // Pass 1: Filter main rows (enum func and caller) and highlight
-            for (let i = 0; i < allRows.length; i++) {{
-                const row = allRows[i];
-                if (row.id.startsWith('code_')) continue; // Skip code rows in this pass
-
-                let cellText = '';
-                let isSearchTarget = false;
-                let columnIndex = (type === 'file') ? 0 : 1;
-
-                if (row.classList.contains('caller-row')) {{
-                    if (type === 'function') {{ // Caller rows searched by function name
-                        const cell = row.getElementsByTagName('td')[1];
-                        if (cell) cellText = cell.textContent.toLowerCase();
-                        isSearchTarget = true;
-                    }}
-                }} else {{ // Enum func row
-                    const cell = row.getElementsByTagName('td')[columnIndex];
-                    if (cell) cellText = cell.textContent.toLowerCase();
-                    isSearchTarget = true;
-                }}
-
-                let isMatch = !isSearchTarget || !searchText || cellText.includes(searchText);
-                
-                // For caller rows not directly searched (e.g., by file), initially assume they are not hidden by search itself
-                if (row.classList.contains('caller-row') && type === 'file') {{
-                    isMatch = true; // Will be handled by parent enum func row visibility in Pass 2
-                }}
-
-                row.classList.toggle('hidden', !isMatch);
-
-                // Highlight
-                const highlightCellIndex = row.classList.contains('caller-row') ? 1 : columnIndex;
-                const cellToHighlight = row.getElementsByTagName('td')[highlightCellIndex];
-                if (cellToHighlight) {{
-                    cellToHighlight.innerHTML = cellToHighlight.textContent; // Clear previous
-                    if (isMatch && searchText && isSearchTarget) {{
-                        cellToHighlight.innerHTML = cellToHighlight.textContent.replace(
-                            new RegExp(searchText, 'gi'),
-                            match => `<span class="highlight">${{match}}</span>`
-                        );
-                    }}
-                }}
-            }}
-
-            // Pass 2: Adjust visibility of dependent rows (code rows, caller rows based on parent enum func)
-            let currentEnumFuncRowIsHidden = false;
-            for (let i = 0; i < allRows.length; i++) {{
-                const row = allRows[i];
-
-                if (row.id.startsWith('code_')) {{ // This is a code row
-                    const id_part = row.id.substring(5); // e.g., "0_enum_func"
-                    const button = document.querySelector(`button[onclick="toggleCode('${{id_part}}')"]`);
-                    if (button) {{
-                        const displayRowForButton = button.closest('tr');
-                        if (displayRowForButton && displayRowForButton.classList.contains('hidden')) {{
-                            row.style.display = 'none';
-                            button.textContent = '보기';
-                            button.dataset.state = 'closed';
-                        }}
-                    }}
-                }} else if (!row.classList.contains('caller-row')) {{ // This is an Enum Func Row
-                    currentEnumFuncRowIsHidden = row.classList.contains('hidden');
-                }} else {{ // This is a Caller Row
-                    if (currentEnumFuncRowIsHidden) {{
-                        row.classList.add('hidden');
-                    }}
-                }}
-            }}
-        }}
-
-        searchField.addEventListener('input', filterTable);
-        searchType.addEventListener('change', filterTable);
-        </script>
+{table_script}        </script>
     </body>
     </html>
     """
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"HTML 보고서가 생성되었습니다: {filepath}")
+    return html_content
@@ -0,0 +1,344 @@
+import contextlib
+import io
+import json
+import os
+import secrets
+import socketserver
+import sys
+import threading
+from eep_checker import __version__
+from eep_checker.api import AnalysisConfig
+from eep_checker.callgraph import SourceLoader
+from eep_checker.cancel import CancelToken
+from eep_checker.client import STATE_FILE, send_message, read_message
+from eep_checker.index import IdentifierIndex
+
+DEFAULT_WATCH_INTERVAL = 2.0
+# 서버가 들고 있는 파일 내용(SourceBuffer) 수와 색인 SQLite 페이지 캐시 크기
+LOADER_FILES = 4096
+INDEX_CACHE_KIB = 256 * 1024
+
+
+class Workspace:
+    """
+    분석 폴더 하나의 상태. 색인(파일별 사실, 호출 간선)과 파일 내용을 요청 사이에 메모리에 들고 있는다.
+    색인과 파일 내용은 lock을 잡은 요청/파일 감시 하나만 쓴다 (api._Run.open_index가 분석 동안 잡음).
+    """
+
+    def __init__(self, root, encoding, index_path, find_files):
+        self.root = os.path.abspath(root)
+        self.encoding = encoding
+        self.lock = threading.Lock()
+        self.index = IdentifierIndex(index_path, encoding, check_same_thread=False)
+        self.index.db.execute(f'PRAGMA cache_size = -{INDEX_CACHE_KIB}')
+        self.dirs = self.index.dir_index()
+        self.loader = SourceLoader(self.root, encoding, max_files=LOADER_FILES)
+        self.files = []
+        self._find_files = find_files
+
+    def refresh(self, jobs=1, on_file_done=None):
+        """
+        파일 목록과 색인을 최신으로 맞추고, 바뀐 파일의 내용 버퍼를 버린다.
+
+        Returns:
+            tuple: (헤더를 포함한 모든 .c/.h 파일 경로 리스트, IdentifierIndex.update 반환값)
+        """
+        files = self._find_files(self.root, include_headers=True, dir_index=self.dirs)
+        stats = self.index.update(files, self.root, jobs=jobs, on_file_done=on_file_done)
+        if stats['changed'] or files != self.files:
+            self.index.save_dir_index(self.dirs)
+        self.loader.forget(stats['changed'])
+        self.files = files
+        return files, stats
+
+    def close(self):
+        self.index.close()
+
+
+class WarmState:
+    """
+    분석 서버가 실행 사이에 유지하는 상태 (분석 폴더/인코딩/색인 파일별 Workspace).
+    main(warm=...)에 넘기면 index/query 명령이 새로 열지 않고 이 상태를 쓴다.
+    """
+
+    def __init__(self, find_files):
+        self.find_files = find_files
+        self.workspaces = {}
+        self._lock = threading.Lock()
+
+    def workspace(self, root, encoding, index_path):
+        key = (os.path.abspath(root), encoding, os.path.abspath(index_path))
+        with self._lock:
+            workspace = self.workspaces.get(key)
+            if workspace is None:
+                workspace = self.workspaces[key] = Workspace(root, encoding, index_path, self.find_files)
+        return workspace
+
+    def poll(self):
+        """
+        열려 있는 분석 폴더의 변경 사항을 색인에 반영한다 (파일 감시 스레드에서 주기적으로 호출).
+        요청이 쓰고 있는 폴더는 건너뛴다 (요청이 시작할 때 직접 갱신함).
+        """
+        changed = 0
+        with self._lock:
+            workspaces = list(self.workspaces.values())
+        for workspace in workspaces:
+            if not workspace.lock.acquire(blocking=False):
+                continue
+            try:
+                _, stats = workspace.refresh()
+            finally:
+                workspace.lock.release()
+            changed += len(stats['changed'])
+        return changed
+
+    def close(self):
+        """모든 분석 폴더를 닫는다 (실행 중인 요청이 끝나기를 기다림)"""
+        with self._lock:
+            workspaces, self.workspaces = list(self.workspaces.values()), {}
+        for workspace in workspaces:
+            with workspace.lock:
+                workspace.close()
+
+
+class _LogWriter(io.TextIOBase):
+    """print 출력을 줄 단위 'log' 알림으로 클라이언트에 보낸다"""
+
+    def __init__(self, send):
+        self.send = send
+        self.pending = ''
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.pending += text
+        if '\n' in self.pending:
+            lines, _, self.pending = self.pending.rpartition('\n')
+            self.send({'jsonrpc': '2.0', 'method': 'log', 'params': {'text': lines + '\n'}})
+        return len(text)
+
+    def flush(self):
+        if self.pending:
+            self.send({'jsonrpc': '2.0', 'method': 'log', 'params': {'text': self.pending}})
+            self.pending = ''
+
+
+class _RequestOutput(io.TextIOBase):
+    """
+    sys.stdout/sys.stderr 자리에 두고, 요청을 처리하는 스레드의 print 출력만 그 요청의 로그로 보낸다.
+    다른 스레드(파일 감시, 다른 요청)의 출력은 원래 스트림으로 간다.
+    """
+
+    def __init__(self, stream, local):
+        self.stream = stream
+        self._local = local
+
+    @property
+    def encoding(self):
+        return getattr(self.stream, 'encoding', None)
+
+    def _target(self):
+        return getattr(self._local, 'log', None) or self.stream
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """연결 하나. 줄 단위 JSON-RPC 요청을 차례로 처리한다"""
+
+    def handle(self):
+        while True:
+            try:
+                message = read_message(self.rfile)
+            except (OSError, ValueError):
+                return
+            if message is None:
+                return
+            request_id = message.get('id')
+            params = message.get('params') or {}
+            if not secrets.compare_digest(str(params.get('token', '')), self.server.token):
+                self.reply(request_id, error='토큰이 맞지 않습니다')
+                return
+            method = message.get('method')
+            try:
+                if method == 'ping':
+                    roots = sorted({key[0] for key in list(self.server.warm.workspaces)})
+                    self.reply(request_id, {'pid': os.getpid(), 'version': __version__, 'workspaces': roots})
+                elif method == 'analyze':
+                    self.reply(request_id, self.analyze(params))
+                elif method == 'cancel':
+                    # 실행 중인 분석을 취소 (분석 요청과 다른 연결로 받음)
+                    self.reply(request_id, {'cancelled': self.server.cancel(params.get('cancel_key'))})
+                elif method == 'shutdown':
+                    self.reply(request_id, {})
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                else:
+                    self.reply(request_id, error=f"알 수 없는 요청입니다: {method}")
+            except OSError:
+                return
+
+    def send(self, message):
+        try:
+            send_message(self.wfile, message)
+        except OSError:
+            pass  # 클라이언트가 먼저 끊어도 실행 중인 분석은 끝까지 마친다
+
+    def reply(self, request_id, result=None, error=None):
+        if error is not None:
+            self.send({'jsonrpc': '2.0', 'id': request_id, 'error': {'code': -32000, 'message': error}})
+        else:
+            self.send({'jsonrpc': '2.0', 'id': request_id, 'result': result})
+
+    def analyze(self, params):
+        """
+        run(argv=... 또는 config=...)을 서버 상태(warm)로 실행한다.
+        상대 경로는 클라이언트의 현재 폴더(cwd) 기준으로 풀고, 이 스레드의 출력은 'log' 알림으로 보낸다.
+        """
+        def progress_callback(status, elapsed, progress=None):
+            self.send({'jsonrpc': '2.0', 'method': 'progress',
+                       'params': {'status': status, 'elapsed': elapsed, 'progress': progress}})
+
+        def on_results(rows):
+            self.send({'jsonrpc': '2.0', 'method': 'results', 'params': {'rows': rows}})
+
+        result = {'prompt_files': [], 'error_logs': []}
+        log = _LogWriter(self.send)
+        cancel = CancelToken()
+        key = params.get('cancel_key') or secrets.token_hex(8)
+        with self.server.active_request(key, cancel), self.server.capture_output(log):
+            try:
+                config = AnalysisConfig.from_dict(params['config']) if params.get('config') else None
+                result = self.server.run(
+                    progress_callback=progress_callback, argv=params.get('argv', []), warm=self.server.warm,
+                    cancel=cancel, on_results=on_results, config=config, cwd=params.get('cwd')).to_dict()
+            except SystemExit as e:  # 인자 오류 (argparse)
+                result['exit_code'] = e.code
+            except Exception as e:
+                print(f"[Error] 분석 실패 → {str(e)}")
+                result['error_logs'] = [f"[Error] 분석 실패 → {str(e)}"]
+            log.flush()
+        return result
+
+
+class AnalysisServer(socketserver.ThreadingTCPServer):
+    """
+    로컬 분석 서버. 연결과 분석 요청은 스레드마다 따로 실행하고, 같은 분석 폴더의 색인은
+    Workspace.lock으로 요청/파일 감시가 하나씩 쓴다. 요청 스레드의 출력은 그 요청의 클라이언트로 보낸다.
+
+    run: main.run과 같은 형식의 분석 함수 (progress_callback, argv, warm, cancel, on_results, config, cwd 인자,
+         AnalysisResult 반환)
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, run, warm, interval=DEFAULT_WATCH_INTERVAL):
+        super().__init__(address, _Handler)
+        self.run = run
+        self.warm = warm
+        self.interval = interval
+        self.token = secrets.token_hex(16)
+        self._active = {}  # 취소 키 -> 실행 중인 분석 요청의 CancelToken
+        self._active_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        # print 출력을 요청 스레드별로 나눈다 (프로세스 전체 stdout을 요청마다 바꾸지 않음)
+        self._output = threading.local()
+        self._streams = (sys.stdout, sys.stderr)
+        sys.stdout = _RequestOutput(sys.stdout, self._output)
+        sys.stderr = _RequestOutput(sys.stderr, self._output)
+
+    @contextlib.contextmanager
+    def capture_output(self, log):
+        """with 안에서 이 스레드의 print 출력을 log로 보낸다"""
+        self._output.log = log
+        try:
+            yield
+        finally:
+            self._output.log = None
+
+    @contextlib.contextmanager
+    def active_request(self, key, cancel):
+        """with 안에서 cancel(key)로 이 요청을 취소할 수 있게 한다"""
+        with self._active_lock:
+            self._active[key] = cancel
+        try:
+            yield
+        finally:
+            with self._active_lock:
+                self._active.pop(key, None)
+
+    def cancel(self, key=None):
+        """key 요청(없으면 실행 중인 모든 요청)을 취소한다. 취소한 요청이 있으면 True"""
+        with self._active_lock:
+            tokens = list(self._active.values()) if key is None else [self._active.get(key)]
+        tokens = [token for token in tokens if token is not None]
+        for token in tokens:
+            token.cancel()
+        return bool(tokens)
+
+    def start_watching(self):
+        if self.interval and self.interval > 0:
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        # 요청이 없을 때도 바뀐 파일을 미리 다시 파싱해 둔다 (요청마다 한 번 더 확인하므로 정확성과는 무관)
+        while not self._stop.wait(self.interval):
+            try:
+                changed = self.warm.poll()
+            except Exception as e:
+                print(f"[Warning] 파일 변경 확인 실패 → {str(e)}")
+                continue
+            if changed:
+                print(f"파일 변경 {changed}개를 색인에 반영했습니다.")
+
+    def server_close(self):
+        self._stop.set()
+        super().server_close()
+        self.warm.close()
+        sys.stdout, sys.stderr = self._streams
+
+
+def serve(run, find_files, host='127.0.0.1', port=0, interval=DEFAULT_WATCH_INTERVAL, state_file=STATE_FILE):
+    """
+    분석 서버를 띄우고 종료될 때까지 요청을 처리한다 (Ctrl+C 또는 'shutdown' 요청으로 종료).
+    주소와 토큰은 state_file에 적어 두고, 같은 폴더에서 실행한 main.py/gui.py가 읽어 자동으로 연결한다.
+
+    Args:
+        run (callable): main.run
+        find_files (callable): utils.find_c_files
+        port (int): 0이면 빈 포트를 고른다
+        interval (float): 파일 변경 확인 간격(초). 0이면 요청 때만 확인
+    """
+    server = AnalysisServer((host, port), run, WarmState(find_files), interval)
+    host, port = server.server_address[:2]
+    state = {'pid': os.getpid(), 'host': host, 'port': port, 'token': server.token, 'version': __version__}
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    fd = os.open(state_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    print(f"분석 서버 실행 중: {host}:{port} (pid {os.getpid()}, 상태 파일 {state_file}). Ctrl+C로 종료")
+    server.start_watching()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                ours = json.load(f).get('token') == server.token
+            if ours:
+                os.remove(state_file)
+        except (OSError, ValueError):
+            pass
+        print("분석 서버를 종료했습니다.")
@@ -0,0 +1,223 @@
+import codecs
+import mmap
+import re
+from array import array
+from bisect import bisect_right
+
+# 이 크기 이상인 파일은 mmap으로 읽는다 (작은 파일은 그냥 읽는 편이 빠름)
+MMAP_THRESHOLD = 1 << 20
+
+_NEWLINE = re.compile(b'\n')
+# 줄 전체를 지우는 조건부 컴파일 지시문 (#if, #ifdef, #ifndef, #else, #elif, #endif)
+_DIRECTIVE = re.compile(rb'^[ \t\f\v]*#[ \t\f\v]*(?:if|ifdef|ifndef|else|elif|endif)[^\n]*', re.MULTILINE)
+# ASCII와 호환되지만 두 번째 바이트가 '\\' 등 ASCII 영역에 올 수 있는 인코딩.
+# 원본 바이트를 그대로 파싱하면 문자열/문자 리터럴 경계가 틀어지므로 UTF-8로 옮긴 뒤 파싱한다.
+_TRANSCODE_ENCODINGS = frozenset({
+    'shift_jis', 'cp932', 'shift_jis_2004', 'shift_jisx0213', 'euc_jis_2004',
+    'big5', 'big5hkscs', 'cp950', 'gbk', 'gb18030', 'johab',
+})
+
+# SourceBuffer.snippet_span()의 코드 조각 모드
+SPAN_RAW = 0
+SPAN_LINES = 1
+SPAN_LINES_TRIM = 2
+
+
+class SourceBuffer:
+    """
+    파일 하나의 소스 바이트와 줄 시작 오프셋 인덱스.
+
+    줄 인덱스는 생성 시 한 번만 만들고, 이후 모든 줄 번호 계산과
+    코드 조각 추출은 bisect로 O(log n)에 처리한다.
+    (매번 code.count(b'\\n', 0, offset)를 호출하던 방식 대체)
+    """
+    __slots__ = ('data', 'line_starts', 'encoding', 'holes')
+
+    def __init__(self, data, encoding: str = 'utf-8', holes=None, line_starts=None):
+        """
+        Args:
+            data: 소스 바이트 (bytes 또는 mmap)
+            encoding (str): 코드 조각을 꺼낼 때 디코딩할 인코딩
+            holes (array): 코드 조각에서 빼고 보여줄 바이트 범위 [시작0, 끝0, 시작1, 끝1, ...]
+                (load_source()가 공백으로 지운 전처리기 지시문 줄, 빌드 변형에서 비활성인 구간)
+            line_starts (array, optional): 같은 data로 만든 다른 SourceBuffer의 줄 인덱스 (공유)
+        """
+        self.data = data
+        self.encoding = encoding
+        self.holes = holes or array('I')
+        # line_starts[i] = (i+1)번째 줄이 시작하는 바이트 오프셋
+        if line_starts is None:
+            line_starts = array('I', [0])
+            line_starts.extend(m.end() for m in _NEWLINE.finditer(data))
+        self.line_starts = line_starts
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    def line_of(self, offset: int) -> int:
+        """바이트 오프셋이 속한 줄 번호(1부터 시작)를 반환"""
+        return bisect_right(self.line_starts, offset)
+
+    def line_start(self, line: int) -> int:
+        """해당 줄의 시작 바이트 오프셋"""
+        return self.line_starts[line - 1]
+
+    def line_end(self, line: int) -> int:
+        """해당 줄의 끝 바이트 오프셋 (줄바꿈 문자 제외)"""
+        if line < len(self.line_starts):
+            return self.line_starts[line] - 1
+        return len(self.data)
+
+    def text(self, start: int, end: int) -> str:
+        """바이트 범위를 문자열로 디코딩하여 반환 (지운 지시문 줄은 빈 줄, 줄바꿈은 '\n'으로)"""
+        data = self._bytes(start, end) if self.holes else self.data[start:end]
+        text = data.decode(self.encoding, errors='replace')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n')
+        return text
+
+    def _bytes(self, start: int, end: int) -> bytes:
+        """바이트 범위에서 holes 구간을 뺀 바이트열 (구간 안의 줄바꿈은 남겨 줄 수를 유지)"""
+        holes = self.holes
+        # start를 포함하거나 start 뒤에 오는 첫 구간의 시작 인덱스
+        i = bisect_right(holes, start) & ~1
+        pieces = []
+        pos = start
+        while i < len(holes) and holes[i] < end:
+            if holes[i] > pos:
+                pieces.append(self.data[pos:holes[i]])
+            hole_end = min(holes[i + 1], end)
+            if hole_end > pos:
+                pieces.append(b'\n' * self.data[max(holes[i], pos):hole_end].count(b'\n'))
+            pos = max(pos, holes[i + 1])
+            i += 2
+        if pos < end:
+            pieces.append(self.data[pos:end])
+        return b''.join(pieces)
+
+    def node_text(self, node) -> str:
+        return self.text(node.start_byte, node.end_byte)
+
+    def line_span(self, start: int, end: int):
+        """바이트 범위 [start, end)의 (시작 줄, 끝 줄)을 반환"""
+        return self.line_of(start), self.line_of(end)
+
+    def snippet(self, start: int, end: int, focus_lines=None, context_lines=None):
+        """
+        바이트 범위 [start, end)의 코드 조각과 줄 범위를 반환한다.
+
+        context_lines와 focus_lines(ENUM 사용 라인, 호출 라인 등)가 주어지면
+        해당 줄들을 중심으로 앞뒤 context_lines 줄만 잘라낸다.
+        범위를 벗어나지 않도록 노드의 시작/끝 줄로 제한한다.
+
+        Returns:
+            tuple: (code, start_line, end_line)
+        """
+        code_start, code_end, mode, start_line, end_line = self.snippet_span(start, end, focus_lines, context_lines)
+        return self.span_text(code_start, code_end, mode), start_line, end_line
+
+    def snippet_span(self, start: int, end: int, focus_lines=None, context_lines=None):
+        """
+        snippet()이 잘라낼 위치만 계산한다. 코드 문자열은 span_text()로 필요할 때 만든다.
+
+        Returns:
+            tuple: (코드 시작 byte, 끝 byte, 모드, start_line, end_line)
+                모드: SPAN_RAW(그대로 디코딩), SPAN_LINES(줄 단위로 자른 조각, 줄바꿈 '\n'으로 통일),
+                SPAN_LINES_TRIM(SPAN_LINES + 마지막 빈 줄 제외)
+        """
+        start_line, end_line = self.line_span(start, end)
+        if context_lines is None or not focus_lines:
+            return start, end, SPAN_RAW, start_line, end_line
+
+        min_line = max(start_line, min(focus_lines) - context_lines)
+        max_line = min(end_line, max(focus_lines) + context_lines)
+        if max_line < min_line:
+            return start, start, SPAN_LINES, min_line, max_line
+        win_start = max(start, self.line_start(min_line))
+        win_end = min(end, self.line_end(max_line))
+        # 노드가 줄바꿈 직후에 끝나면 마지막 빈 줄은 노드에 속하지 않음
+        mode = SPAN_LINES_TRIM if win_end == end == self.line_start(max_line) else SPAN_LINES
+        return win_start, win_end, mode, min_line, max_line
+
+    def span_text(self, start: int, end: int, mode: int = 0) -> str:
+        """snippet_span()으로 계산한 위치의 코드 문자열"""
+        if mode == SPAN_RAW:
+            return self.text(start, end)
+        # 줄 단위로 잘라낸 결과와 동일하게 줄바꿈을 '\n'으로 통일 (빈 줄 유지)
+        lines = self.text(start, end).split('\n')
+        if len(lines) > 1 and mode == SPAN_LINES_TRIM:
+            lines.pop()
+        return "\n".join(line.rstrip('\r') for line in lines)
+
+
+def decode_source(data, encoding: str) -> str:
+    """open(..., 'r', errors='replace')로 읽은 것과 같은 문자열로 디코딩 (줄바꿈 통일 포함)"""
+    text = codecs.decode(data, encoding, errors='replace')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def parses_raw(encoding: str) -> bool:
+    """이 인코딩의 파일을 디코딩하지 않고 원본 바이트 그대로 파싱해도 되는지 여부"""
+    name = codecs.lookup(encoding).name
+    try:
+        if 'A_z0#"\'\\\n'.encode(name) != b'A_z0#"\'\\\n':
+            return False  # UTF-16 등 ASCII와 호환되지 않는 인코딩
+    except UnicodeError:
+        return False
+    return name not in _TRANSCODE_ENCODINGS
+
+
+def read_file(path):
+    """
+    파일 원본을 읽는다. MMAP_THRESHOLD 이상이면 복사하지 않고 mmap(ACCESS_COPY)으로 매핑하며,
+    이 매핑에 쓴 내용(지시문 지우기)은 바뀐 페이지만 메모리에 복사되고 파일에는 반영되지 않는다.
+
+    Returns:
+        tuple: (파일 크기, bytes 또는 mmap)
+    """
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if size >= MMAP_THRESHOLD:
+            return size, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        f.seek(0)
+        return size, f.read()
+
+
+def source_bytes(data, encoding: str):
+    """
+    파서에 넘길 바이트와 코드 조각을 디코딩할 인코딩. 원본 그대로 파싱할 수 없는 인코딩(parses_raw)만
+    UTF-8로 옮긴다.
+
+    Returns:
+        tuple: (bytes 또는 mmap, 인코딩)
+    """
+    if parses_raw(encoding):
+        return data, encoding
+    return decode_source(data, encoding).encode('utf-8'), 'utf-8'
+
+
+def load_source(data, encoding: str = 'utf-8') -> SourceBuffer:
+    """
+    파일 원본 바이트(bytes 또는 read_file()의 mmap)로 파서 입력용 SourceBuffer를 만든다.
+
+    조건부 컴파일 지시문 줄은 같은 길이의 공백으로 지워 byte 위치와 줄 번호가 원본 파일과 같게 유지하고,
+    지운 위치는 holes로 기억해 코드 조각에서는 빈 줄로 보이게 한다.
+    원본 바이트를 그대로 파싱하고 디코딩은 보고서에 나가는 코드 조각에만 적용한다.
+    원본 그대로 파싱할 수 없는 인코딩(parses_raw)만 UTF-8로 옮긴 뒤 파싱한다.
+    """
+    data, encoding = source_bytes(data, encoding)
+    holes = array('I')
+    if isinstance(data, mmap.mmap):
+        for m in _DIRECTIVE.finditer(data):
+            holes.extend(m.span())
+        for i in range(0, len(holes), 2):
+            data[holes[i]:holes[i + 1]] = b' ' * (holes[i + 1] - holes[i])
+    else:
+        def blank(m):
+            holes.extend(m.span())
+            return b' ' * (m.end() - m.start())
+        data = _DIRECTIVE.sub(blank, data)
+    return SourceBuffer(data, encoding, holes)
@@ -0,0 +1,54 @@
+import marshal
+import struct
+import tempfile
+from array import array
+
+_LENGTH = struct.Struct('<I')
+
+
+class RecordSpool:
+    """
+    레코드(marshal로 직렬화 가능한 값)를 구역(section)별로 임시 파일에 쌓아 두었다가
+    나중에 구역 순서를 정해 다시 읽는다.
+
+    결과를 메모리에 모아 두지 않고 스트리밍으로 보고서를 쓰면서도,
+    ENUM별 섹션처럼 전체를 다 본 뒤에야 순서/통계가 정해지는 출력에 사용한다.
+    메모리에는 레코드 위치(구역별 오프셋 배열)만 남는다.
+    """
+
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._offsets = {}  # 구역 -> array('Q') 레코드 시작 위치
+        self._end = 0
+
+    def append(self, section, record):
+        blob = marshal.dumps(record)
+        self._file.seek(self._end)
+        self._file.write(_LENGTH.pack(len(blob)))
+        self._file.write(blob)
+        self._offsets.setdefault(section, array('Q')).append(self._end)
+        self._end += _LENGTH.size + len(blob)
+
+    def sections(self):
+        """레코드가 있는 구역 목록 (처음 추가된 순서)"""
+        return list(self._offsets)
+
+    def count(self, section) -> int:
+        return len(self._offsets.get(section, ()))
+
+    def iter_section(self, section):
+        """구역의 레코드를 추가한 순서대로 하나씩 읽는다"""
+        for offset in self._offsets.get(section, ()):
+            self._file.seek(offset)
+            size, = _LENGTH.unpack(self._file.read(_LENGTH.size))
+            yield marshal.loads(self._file.read(size))
+
+    def get(self, section, position):
+        """구역의 position번째(0부터) 레코드 하나를 읽는다"""
+        self._file.seek(self._offsets[section][position])
+        size, = _LENGTH.unpack(self._file.read(_LENGTH.size))
+        return marshal.loads(self._file.read(size))
+
+    def close(self):
+        self._file.close()
+        self._offsets = {}
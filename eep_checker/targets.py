@@ -0,0 +1,184 @@
+import os
+import re
+
+# glob 패턴으로 취급할 문자
+GLOB_CHARS = set('*?[')
+# ENUM 이름은 C identifier, glob 패턴은 identifier 문자와 glob 문자만 허용 (쿼리 문자열에 그대로 들어간다)
+IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+GLOB_PATTERN_RE = re.compile(r'[A-Za-z0-9_*?\[\]!-]+')
+# 여러 ENUM을 한 번에 분석할 때 보고서 파일명에 쓰는 이름
+BATCH_LABEL = 'ENUM_BATCH'
+
+
+def glob_to_regex(pattern: str) -> str:
+    """ENUM 이름용 glob 패턴(*, ?, [..])을 정규식 문자열로 변환 (identifier 문자만 매칭)"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '*':
+            out.append('[A-Za-z0-9_]*')
+        elif ch == '?':
+            out.append('[A-Za-z0-9_]')
+        elif ch == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(ch))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end
+        else:
+            out.append(re.escape(ch))
+        i += 1
+    return ''.join(out)
+
+
+class EnumTargets:
+    """
+    분석 대상 ENUM 이름 목록.
+
+    정확한 이름(names)과 glob 패턴(patterns)을 함께 담고,
+    파서가 identifier 바이트를 바로 비교할 수 있도록 미리 인코딩해 둔다.
+    values에는 이름별 (변경 전, 변경 후) 값을 따로 지정할 수 있다.
+    aliases는 대상 ENUM으로 펼쳐지는 #define 별칭이며 set_aliases()로 정한다.
+    """
+
+    def __init__(self, names=(), patterns=(), values=None, spec=None):
+        self.names = list(dict.fromkeys(names))
+        self.patterns = list(dict.fromkeys(patterns))
+        self.values = dict(values or {})
+        self.spec = spec
+        self.exact = frozenset(n.encode() for n in self.names)
+        self.aliases = {}  # 별칭 bytes -> ((ENUM 이름, 별칭 경로 문자열), ...)
+        self.regex = None
+        if self.patterns:
+            self.regex = re.compile('|'.join(glob_to_regex(p) for p in self.patterns).encode())
+
+    def __repr__(self):
+        return f"EnumTargets(names={self.names}, patterns={self.patterns})"
+
+    def __bool__(self):
+        return bool(self.names or self.patterns)
+
+    @property
+    def is_single(self) -> bool:
+        """패턴 없이 이름 하나만 지정되었는지 여부 (기존 단일 ENUM 모드)"""
+        return len(self.names) == 1 and not self.patterns
+
+    @property
+    def label(self) -> str:
+        """보고서/프롬프트 파일명에 쓰는 이름"""
+        return self.names[0] if self.is_single else BATCH_LABEL
+
+    def set_aliases(self, alias_table):
+        """
+        #define 별칭 표(macros.resolve_aliases 반환값)를 등록한다. 별칭도 match()에 걸리고,
+        파서는 resolve()로 별칭이 가리키는 ENUM 이름을 얻는다.
+        """
+        self.aliases = {
+            alias.encode(): tuple((enum_name, ' → '.join(chain)) for enum_name, chain in sorted(reached.items()))
+            for alias, reached in alias_table.items()
+        }
+        self.exact = frozenset(n.encode() for n in self.names) | frozenset(self.aliases)
+
+    @property
+    def alias_names(self):
+        """등록된 별칭 이름 목록 (정렬)"""
+        return sorted(alias.decode() for alias in self.aliases)
+
+    def resolve(self, ident: bytes):
+        """
+        match()에 걸린 identifier가 가리키는 ((ENUM 이름, 별칭 경로 또는 None), ...).
+        ENUM 이름을 직접 쓴 경우는 별칭 경로가 None이다.
+        """
+        via = self.aliases.get(ident)
+        if via is None:
+            return ((ident.decode(), None),)
+        return via
+
+    def match(self, ident: bytes) -> bool:
+        """identifier 바이트가 대상 ENUM(또는 그 별칭)인지 여부"""
+        if ident in self.exact:
+            return True
+        return self.regex is not None and self.regex.fullmatch(ident) is not None
+
+    def query_regex(self) -> str:
+        """tree-sitter 쿼리 #match? 조건에 쓸 정규식"""
+        parts = [re.escape(n) for n in self.names + self.alias_names] + [glob_to_regex(p) for p in self.patterns]
+        return '^(' + '|'.join(parts) + ')$'
+
+    def values_for(self, name, default_from, default_to):
+        """ENUM별 (변경 전, 변경 후) 값. 따로 지정하지 않았으면 기본값 사용"""
+        return self.values.get(name, (default_from, default_to))
+
+    def order(self, found_names):
+        """보고서 출력 순서: 지정한 이름 순서 다음 패턴으로 찾은 이름(가나다순)"""
+        extra = sorted(n for n in found_names if n not in self.names)
+        return self.names + extra
+
+
+def read_enum_names_file(path):
+    """
+    ENUM 이름 파일을 읽는다. 한 줄에 하나씩 "NAME" 또는 "NAME FROM TO" 형식이며,
+    빈 줄과 '#'으로 시작하는 줄은 무시한다.
+
+    Returns:
+        tuple: (이름/패턴 리스트, {이름: (변경 전, 변경 후)})
+    """
+    entries = []
+    values = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            entries.append(parts[0])
+            if len(parts) >= 3:
+                values[parts[0]] = (parts[1], parts[2])
+    return entries, values
+
+
+def parse_enum_spec(values) -> EnumTargets:
+    """
+    --enum 인자(들)를 EnumTargets로 변환한다.
+
+    - 쉼표/공백으로 구분한 이름 목록: "EEPROM_A,EEPROM_B"
+    - 이름 파일: "@names.txt"
+    - glob 패턴: "EEPROM_CFG_*"
+
+    Raises:
+        ValueError: 이름이 하나도 없거나, C identifier가 아닌 이름이 있거나, 이름 파일을 찾을 수 없는 경우
+    """
+    if isinstance(values, str):
+        values = [values]
+    names, patterns, per_enum_values = [], [], {}
+    for value in values:
+        for token in re.split(r'[,\s]+', value.strip()):
+            if not token:
+                continue
+            if token.startswith('@'):
+                path = token[1:]
+                if not os.path.isfile(path):
+                    raise ValueError(f"ENUM 이름 파일을 찾을 수 없습니다: {path}")
+                entries, file_values = read_enum_names_file(path)
+                per_enum_values.update(file_values)
+            else:
+                entries = [token]
+            for entry in entries:
+                if GLOB_CHARS & set(entry):
+                    if not GLOB_PATTERN_RE.fullmatch(entry):
+                        raise ValueError(f"ENUM 패턴에 쓸 수 없는 문자가 있습니다: {entry} "
+                                         f"(영문자, 숫자, _와 glob 문자 *, ?, [...]만 사용)")
+                    patterns.append(entry)
+                elif IDENTIFIER_RE.fullmatch(entry):
+                    names.append(entry)
+                else:
+                    raise ValueError(f"ENUM 이름이 C identifier가 아닙니다: {entry} "
+                                     f"(영문자 또는 _로 시작하고 영문자, 숫자, _만 사용)")
+    if not names and not patterns:
+        raise ValueError("분석할 ENUM 이름이 없습니다.")
+    return EnumTargets(names, patterns, per_enum_values, spec=' '.join(values))
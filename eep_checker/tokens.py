@@ -0,0 +1,71 @@
+import importlib
+
+# 토큰 수 추정기 이름 (--tokenizer)
+DEFAULT_TOKENIZER = 'approx'
+# approx: ASCII 몇 글자를 토큰 하나로 셀지. C 코드는 기호가 많아 영어 문장(약 4글자)보다 짧게 잡는다
+APPROX_ASCII_CHARS = 3
+
+
+def approx_tokens(text):
+    """
+    토크나이저 없이 토큰 수를 빠르게 어림한다 (넉넉하게 잡아 모델 한도를 넘지 않게).
+    ASCII는 APPROX_ASCII_CHARS글자당 1토큰, 한글 등 ASCII가 아닌 글자는 글자당 1토큰.
+    """
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    return -(-ascii_chars // APPROX_ASCII_CHARS) + (len(text) - ascii_chars)
+
+
+def get_tokenizer(spec=DEFAULT_TOKENIZER):
+    """
+    --tokenizer 값을 "텍스트 -> 토큰 수" 함수로 바꾼다.
+      - approx: approx_tokens (기본)
+      - tiktoken 또는 tiktoken:인코딩: tiktoken 패키지 (기본 인코딩 cl100k_base)
+      - 모듈:함수: import해서 쓸 함수 (예: mytok:count_tokens)
+
+    Raises:
+        ValueError: 알 수 없는 이름이거나 불러올 수 없는 경우
+    """
+    if callable(spec):
+        return spec
+    spec = (spec or DEFAULT_TOKENIZER).strip()
+    if spec == 'approx':
+        return approx_tokens
+    name, _, arg = spec.partition(':')
+    if name == 'tiktoken':
+        try:
+            import tiktoken
+        except ImportError:
+            raise ValueError("tiktoken 패키지가 설치되어 있지 않습니다 (pip install tiktoken 또는 --tokenizer approx)")
+        encoding = tiktoken.get_encoding(arg or 'cl100k_base')
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    if arg:
+        try:
+            func = getattr(importlib.import_module(name), arg)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"토크나이저를 불러올 수 없습니다: {spec} ({str(e)})")
+        if callable(func):
+            return func
+    raise ValueError(f"알 수 없는 토크나이저입니다: {spec} (approx, tiktoken[:인코딩], 모듈:함수 중 하나)")
+
+
+def pack_first_fit_decreasing(sizes, capacity):
+    """
+    크기 목록을 용량 capacity인 상자에 first-fit-decreasing으로 담는다 (큰 것부터, 들어가는 첫 상자에).
+    혼자서도 용량을 넘는 항목은 자기 상자 하나를 따로 쓴다.
+
+    Returns:
+        list: 상자마다 항목 번호 리스트 (상자는 첫 항목 번호 순, 상자 안은 번호 순 - 원래 순서 유지)
+    """
+    bins = []      # [남은 용량, [항목 번호]]
+    for i in sorted(range(len(sizes)), key=lambda i: (-sizes[i], i)):
+        size = sizes[i]
+        for slot in bins:
+            if slot[0] >= size:
+                slot[0] -= size
+                slot[1].append(i)
+                break
+        else:
+            bins.append([capacity - size, [i]])
+    packed = [sorted(items) for _, items in bins]
+    packed.sort(key=lambda items: items[0])
+    return packed
@@ -0,0 +1,479 @@
+import os
+import re
+from array import array
+from tree_sitter import Range
+from eep_checker.source import SourceBuffer, source_bytes
+
+# 조건부 컴파일/매크로 정의 지시문 (줄 끝 '\'로 이어지는 줄 포함)
+_DIRECTIVE_LINE = re.compile(
+    rb'^[ \t\f\v]*#[ \t\f\v]*(ifdef|ifndef|if|elifdef|elifndef|elif|else|endif|define|undef)\b'
+    rb'((?:[^\n]*\\\r?\n)*[^\n]*)',
+    re.MULTILINE,
+)
+_CONTINUATION = re.compile(r'\\\r?\n')
+_COMMENT = re.compile(r'/\*.*?\*/|//.*', re.DOTALL)
+_MACRO_NAME = re.compile(r'\s*([A-Za-z_]\w*)(\()?')
+_TOKEN = re.compile(r'''\s*(?:
+    (?P<num>0[xX][0-9A-Fa-f]+|0[bB][01]+|\d+)[uUlL]*
+  | (?P<char>'(?:\\.|[^\\'])')
+  | (?P<ident>[A-Za-z_]\w*)
+  | (?P<op>&&|\|\||<<|>>|<=|>=|==|!=|[-+*/%<>!~&|^?:()])
+)''', re.VERBOSE)
+_CHAR_ESCAPES = {'n': 10, 't': 9, 'r': 13, '0': 0, '\\': 92, "'": 39, '"': 34, 'a': 7, 'b': 8, 'f': 12, 'v': 11}
+# 이항 연산자 우선순위 (낮은 것부터)
+_BINARY = (('||',), ('&&',), ('|',), ('^',), ('&',), ('==', '!='), ('<', '>', '<=', '>='), ('<<', '>>'),
+           ('+', '-'), ('*', '/', '%'))
+# 함수형 매크로 (인자를 펼치지 않으므로 조건식에 나오면 평가하지 않음)
+FUNCTION_MACRO = None
+
+
+class PreprocError(ValueError):
+    """#if 조건식을 평가할 수 없음 (지원하지 않는 문법, 함수형 매크로 등)"""
+
+
+class BuildVariants:
+    """
+    빌드 변형 목록. 변형 이름 -> {매크로 이름: 값 문자열} (-DNAME은 값 '1').
+    변형 순서는 지정한 순서이며 보고서의 변형 목록도 이 순서를 따른다.
+    """
+
+    def __init__(self, defines):
+        self.defines = dict(defines)
+        self.names = list(self.defines)
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    def __repr__(self):
+        return f"BuildVariants({self.names})"
+
+    def __len__(self):
+        return len(self.names)
+
+    def key(self) -> str:
+        """캐시 키에 넣을 정의 전체 문자열"""
+        return ';'.join(name + ':' + ','.join(f"{k}={v}" for k, v in sorted(macros.items()))
+                        for name, macros in self.defines.items())
+
+    def sort(self, names):
+        """변형 이름 목록을 지정한 순서로 정렬"""
+        return sorted(names, key=self._index.__getitem__)
+
+
+def _parse_defines(tokens):
+    macros = {}
+    for token in tokens:
+        name, sep, value = token.partition('=')
+        if not re.fullmatch(r'[A-Za-z_]\w*', name):
+            raise ValueError(f"매크로 이름이 올바르지 않습니다: {token}")
+        macros[name] = value if sep else '1'
+    return macros
+
+
+def read_variants_file(path):
+    """
+    빌드 변형 파일을 읽는다. 한 줄에 "변형이름 MACRO1 MACRO2=값 ..." 형식이며,
+    빈 줄과 '#'으로 시작하는 줄은 무시한다.
+
+    Returns:
+        dict: 변형 이름 -> {매크로 이름: 값}
+    """
+    defines = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.lstrip().startswith('#'):
+                continue
+            parts = line.split()
+            if parts:
+                defines[parts[0]] = _parse_defines(parts[1:])
+    return defines
+
+
+def parse_variant_spec(values) -> BuildVariants:
+    """
+    --variant 인자(들)를 BuildVariants로 변환한다.
+
+    - "이름:MACRO1,MACRO2=값" (매크로가 없으면 "이름:" 또는 "이름")
+    - 변형 파일: "@variants.txt"
+
+    Raises:
+        ValueError: 형식이 잘못되었거나 변형 파일을 찾을 수 없는 경우
+    """
+    if isinstance(values, str):
+        values = [values]
+    defines = {}
+    for value in values:
+        value = value.strip()
+        if value.startswith('@'):
+            path = value[1:]
+            if not os.path.isfile(path):
+                raise ValueError(f"빌드 변형 파일을 찾을 수 없습니다: {path}")
+            defines.update(read_variants_file(path))
+            continue
+        name, _, body = value.partition(':')
+        name = name.strip()
+        if not name:
+            raise ValueError(f"빌드 변형 이름이 없습니다: {value}")
+        defines[name] = _parse_defines(t for t in re.split(r'[,\s]+', body) if t)
+    if not defines:
+        raise ValueError("빌드 변형이 없습니다.")
+    return BuildVariants(defines)
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise PreprocError(f"해석할 수 없는 조건식: {text[pos:]}")
+        pos = m.end()
+        kind = m.lastgroup
+        tokens.append((kind, m.group(kind)))
+    return tokens
+
+
+def _number(kind, text):
+    if kind == 'char':
+        body = text[1:-1]
+        if body.startswith('\\'):
+            if body[1:] not in _CHAR_ESCAPES:
+                raise PreprocError(f"지원하지 않는 문자 상수: {text}")
+            return _CHAR_ESCAPES[body[1:]]
+        return ord(body)
+    if text[:2] in ('0x', '0X'):
+        return int(text, 16)
+    if text[:2] in ('0b', '0B'):
+        return int(text[2:], 2)
+    if len(text) > 1 and text[0] == '0':
+        return int(text, 8)
+    return int(text)
+
+
+def _expand(tokens, macros, expanding=frozenset()):
+    """defined와 매크로를 펼친 토큰 목록. 정의되지 않은 이름은 0"""
+    out = []
+    i = 0
+    while i < len(tokens):
+        kind, text = tokens[i]
+        i += 1
+        if kind != 'ident':
+            out.append((kind, text))
+            continue
+        if text == 'defined':
+            paren = i < len(tokens) and tokens[i] == ('op', '(')
+            j = i + 1 if paren else i
+            if j >= len(tokens) or tokens[j][0] != 'ident':
+                raise PreprocError("defined 뒤에 매크로 이름이 없습니다")
+            if paren and (j + 1 >= len(tokens) or tokens[j + 1] != ('op', ')')):
+                raise PreprocError("defined( 뒤에 ')'가 없습니다")
+            out.append(('num', '1' if tokens[j][1] in macros else '0'))
+            i = j + 2 if paren else j + 1
+        elif text in macros and text not in expanding:
+            value = macros[text]
+            if value is FUNCTION_MACRO:
+                raise PreprocError(f"함수형 매크로는 평가하지 않습니다: {text}")
+            out.extend(_expand(_tokenize(value), macros, expanding | {text}))
+        elif i < len(tokens) and tokens[i] == ('op', '('):
+            # __has_include(...) 같은 알 수 없는 함수형 이름
+            raise PreprocError(f"알 수 없는 함수형 이름: {text}")
+        else:
+            out.append(('num', '0'))
+    return out
+
+
+class _Evaluator:
+    """토큰 목록을 C 전처리기 규칙(정수 연산, 참=1)으로 계산하는 재귀 하강 파서"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][1] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        if self.pos >= len(self.tokens):
+            raise PreprocError("조건식이 끝나지 않았습니다")
+        kind, text = self.tokens[self.pos]
+        if expected is not None and text != expected:
+            raise PreprocError(f"'{expected}'가 필요합니다: {text}")
+        self.pos += 1
+        return kind, text
+
+    def conditional(self):
+        cond = self.binary(0)
+        if self.peek() != '?':
+            return cond
+        self.take('?')
+        then = self.conditional()
+        self.take(':')
+        other = self.conditional()
+        return then if cond else other
+
+    def binary(self, level):
+        if level == len(_BINARY):
+            return self.unary()
+        left = self.binary(level + 1)
+        while self.peek() in _BINARY[level]:
+            _, op = self.take()
+            left = _apply(op, left, self.binary(level + 1))
+        return left
+
+    def unary(self):
+        op = self.peek()
+        if op in ('!', '~', '-', '+'):
+            self.take()
+            value = self.unary()
+            return {'!': lambda v: int(not v), '~': lambda v: ~v, '-': lambda v: -v, '+': lambda v: v}[op](value)
+        kind, text = self.take()
+        if text == '(':
+            value = self.conditional()
+            self.take(')')
+            return value
+        if kind in ('num', 'char'):
+            return _number(kind, text)
+        raise PreprocError(f"값이 필요합니다: {text}")
+
+
+def _apply(op, a, b):
+    if op in ('/', '%'):
+        if b == 0:
+            raise PreprocError("0으로 나누기")
+        q = abs(a) // abs(b) * (1 if (a < 0) == (b < 0) else -1)  # C처럼 0 쪽으로 버림
+        return q if op == '/' else a - b * q
+    if op in ('<<', '>>') and b < 0:
+        raise PreprocError("음수 시프트")
+    return {
+        '||': lambda: int(bool(a or b)), '&&': lambda: int(bool(a and b)),
+        '|': lambda: a | b, '^': lambda: a ^ b, '&': lambda: a & b,
+        '==': lambda: int(a == b), '!=': lambda: int(a != b),
+        '<': lambda: int(a < b), '>': lambda: int(a > b), '<=': lambda: int(a <= b), '>=': lambda: int(a >= b),
+        '<<': lambda: a << b, '>>': lambda: a >> b,
+        '+': lambda: a + b, '-': lambda: a - b, '*': lambda: a * b,
+    }[op]()
+
+
+def evaluate_condition(expr: str, macros: dict) -> bool:
+    """
+    #if/#elif 조건식을 평가한다. 정의되지 않은 이름은 0, defined X / defined(X)를 지원하고
+    매크로 값은 object-like 매크로만 펼친다.
+
+    Raises:
+        PreprocError: 평가할 수 없는 조건식
+    """
+    tokens = _expand(_tokenize(expr), macros)
+    if not tokens:
+        raise PreprocError("빈 조건식")
+    evaluator = _Evaluator(tokens)
+    value = evaluator.conditional()
+    if evaluator.pos != len(tokens):
+        raise PreprocError(f"조건식 뒤에 남은 토큰: {tokens[evaluator.pos][1]}")
+    return bool(value)
+
+
+def scan_directives(data):
+    """
+    파일에서 조건부 컴파일/매크로 정의 지시문을 한 번에 찾는다.
+
+    Returns:
+        list: 문서 순서의 (종류, 인자 문자열(주석/줄 이음 제거), 시작 byte, 끝 byte(줄바꿈 제외))
+    """
+    directives = []
+    for m in _DIRECTIVE_LINE.finditer(data):
+        arg = _CONTINUATION.sub(' ', m.group(2).decode('latin-1'))
+        directives.append((m.group(1).decode(), _COMMENT.sub(' ', arg).strip(), m.start(), m.end()))
+    return directives
+
+
+def _define(macros, arg):
+    m = _MACRO_NAME.match(arg)
+    if m is None:
+        return
+    if m.group(2):
+        macros[m.group(1)] = FUNCTION_MACRO
+    else:
+        macros[m.group(1)] = arg[m.end():].strip()
+
+
+def _condition(kind, arg, macros):
+    """조건 지시문의 참/거짓. 평가할 수 없으면 None"""
+    try:
+        if kind in ('ifdef', 'elifdef', 'ifndef', 'elifndef'):
+            m = _MACRO_NAME.match(arg)
+            if m is None:
+                return None
+            return (m.group(1) in macros) == (kind in ('ifdef', 'elifdef'))
+        return evaluate_condition(arg, macros)
+    except PreprocError:
+        return None
+
+
+def variant_holes(directives, defines, size) -> array:
+    """
+    변형 하나의 비활성 구간(holes)을 만든다. 조건 지시문 줄과 조건이 거짓인 구간이 들어간다.
+    파일 안의 #define/#undef도 활성 구간에 있으면 이후 조건에 반영한다 (include guard 등).
+    평가할 수 없는 조건(PreprocError)은 기존처럼 모든 분기를 활성으로 둔다.
+
+    Args:
+        directives (list): scan_directives() 반환값
+        defines (dict): 변형의 매크로 정의
+        size (int): 파일 크기
+
+    Returns:
+        array: [시작0, 끝0, 시작1, 끝1, ...] (SourceBuffer holes 형식, 겹치지 않고 정렬됨)
+    """
+    macros = dict(defines)
+    holes = array('I')
+    # 조건 블록마다 [바깥이 활성인지, 이미 참인 분기가 있었는지, 평가할 수 없는 조건인지]
+    stack = []
+    active = True
+    inactive_start = 0
+
+    def add_hole(start, end):
+        if holes and holes[-1] >= start:
+            holes[-1] = max(holes[-1], end)
+        elif end > start:
+            holes.extend((start, end))
+
+    for kind, arg, start, end in directives:
+        if kind in ('define', 'undef'):
+            if active:
+                if kind == 'define':
+                    _define(macros, arg)
+                else:
+                    m = _MACRO_NAME.match(arg)
+                    if m:
+                        macros.pop(m.group(1), None)
+            continue
+        if not active:
+            add_hole(inactive_start, start)
+        if kind in ('if', 'ifdef', 'ifndef'):
+            cond = _condition(kind, arg, macros) if active else False
+            stack.append([active, bool(cond), active and cond is None])
+            active = active and cond is not False
+        elif stack:
+            frame = stack[-1]
+            parent, taken, unknown = frame
+            if kind == 'endif':
+                stack.pop()
+                active = parent
+            elif not parent:
+                active = False
+            elif unknown:
+                active = True
+            elif kind == 'else':
+                active = not taken
+                frame[1] = True
+            elif taken:
+                active = False
+            else:
+                cond = _condition(kind, arg, macros)
+                if cond is None:
+                    frame[2] = True
+                active = cond is not False
+                frame[1] = bool(cond)
+        add_hole(start, end)
+        if not active:
+            inactive_start = end
+    if not active:
+        add_hole(inactive_start, size)
+    return holes
+
+
+def active_ranges(source: SourceBuffer):
+    """source.holes를 뺀 나머지 구간의 tree-sitter included ranges. holes가 없으면 None"""
+    holes = source.holes
+    if not holes:
+        return None
+
+    def point(offset):
+        line = source.line_of(offset)
+        return (line - 1, offset - source.line_start(line))
+
+    ranges = []
+    pos = 0
+    for i in range(0, len(holes), 2):
+        if holes[i] > pos:
+            ranges.append(Range(point(pos), point(holes[i]), pos, holes[i]))
+        pos = holes[i + 1]
+    size = len(source.data)
+    if pos < size or not ranges:
+        ranges.append(Range(point(pos), point(size), pos, size))
+    return ranges
+
+
+def _holes_within(holes, start, end) -> tuple:
+    """[start, end) 안에 걸친 holes 구간 (코드 조각 내용 비교용)"""
+    within = []
+    for i in range(0, len(holes), 2):
+        if holes[i] < end and holes[i + 1] > start:
+            within.extend((max(holes[i], start), min(holes[i + 1], end)))
+    return tuple(within)
+
+
+def analyze_variants(data, encoding, variants, extract, want_calls=False):
+    """
+    파일 하나를 빌드 변형별로 분석한다. 파일은 한 번만 읽고 지시문도 한 번만 찾은 뒤,
+    변형마다 활성 구간 마스크(holes)만 계산해 마스크가 같은 변형끼리 한 번만 파싱한다.
+    파싱은 같은 원본 바이트에 활성 구간만 included ranges로 지정하므로 변형마다 파일을 복사하지 않는다.
+
+    변형마다 나온 결과 중 같은 함수/위치/코드(비활성 구간 포함)인 것은 하나로 합치고
+    record.variants에 해당 변형 이름들을 담는다. 호출 간선도 같은 방식으로 합쳐
+    간선 끝에 호출 위치가 활성인 변형 이름 튜플을 붙인다 (호출자 함수 코드가 다른 변형끼리는 따로 둔다).
+
+    Args:
+        data: 파일 원본 (bytes 또는 mmap)
+        encoding (str): 소스 인코딩
+        variants (BuildVariants): 빌드 변형
+        extract (callable): extract(source, active_ranges, call_edges) -> {ENUM 이름: 결과 리스트}
+        want_calls (bool): 호출 간선도 모을지
+
+    Returns:
+        tuple: ({ENUM 이름: 결과 리스트}, 호출 간선 리스트 또는 None)
+            호출 간선은 _call_edges 형식 뒤에 (변형 이름들,)을 붙인 튜플이다.
+    """
+    data, encoding = source_bytes(data, encoding)
+    directives = scan_directives(data)
+    groups = {}  # 마스크 -> 변형 이름 목록
+    for name in variants.names:
+        mask = variant_holes(directives, variants.defines[name], len(data))
+        groups.setdefault(mask.tobytes(), (mask, []))[1].append(name)
+
+    line_starts = None
+    merged = {}  # ENUM 이름 -> {결과 키: 결과}
+    edge_variants = {}  # (간선, 호출자 코드 범위의 비활성 구간) -> [간선, 변형 이름들] (처음 나온 순서)
+    for mask, names in groups.values():
+        source = SourceBuffer(data, encoding, mask, line_starts)
+        line_starts = source.line_starts
+        edges = [] if want_calls else None
+        for enum_name, results in extract(source, active_ranges(source), edges).items():
+            bucket = merged.setdefault(enum_name, {})
+            for r in results:
+                key = (r.func_name, r.code_start, r.code_end, r.code_mode, r.start_line, r.end_line,
+                       r._enum_lines.tobytes(), _holes_within(mask, r.code_start, r.code_end))
+                same = bucket.get(key)
+                if same is None:
+                    r.variants = list(names)
+                    bucket[key] = r
+                else:
+                    same.variants.extend(names)
+        for edge in edges or ():
+            key = (edge, _holes_within(mask, edge[3], edge[4]))
+            same = edge_variants.get(key)
+            if same is None:
+                edge_variants[key] = [edge, list(names)]
+            else:
+                same[1].extend(names)
+
+    results_by_enum = {}
+    for enum_name, bucket in merged.items():
+        results = list(bucket.values())
+        if len(groups) > 1:
+            results.sort(key=lambda r: (r.code_start, -r.code_end))
+            for r in results:
+                r.variants = variants.sort(r.variants)
+        results_by_enum[enum_name] = results
+    calls = None
+    if want_calls:
+        calls = [edge + (tuple(variants.sort(names)),) for edge, names in edge_variants.values()]
+    return results_by_enum, calls
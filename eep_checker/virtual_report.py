@@ -0,0 +1,395 @@
+import json
+import os
+from typing import Dict, List
+from eep_checker.records import EXTRA_COLUMNS, extra_values
+
+# 결과(함수) 수가 이보다 많으면 auto 모드에서 가상 스크롤 보고서로 만든다
+VIRTUAL_THRESHOLD = 2000
+# 코드 조각 파일(shard) 하나에 넣을 최대 코드 수 / 크기
+SHARD_MAX_CODES = 256
+SHARD_MAX_BYTES = 1024 * 1024
+
+
+class CodeShardWriter:
+    """
+    함수/호출자 코드를 보고서 옆 폴더의 조각 파일(c00000.js, c00001.js, ...)에 나누어 쓴다.
+
+    조각 파일은 eepCodeShard(번호, [코드, ...]) 를 부르는 스크립트라서, 브라우저가 file://로 연
+    보고서에서도 <script> 태그로 읽을 수 있다 (fetch는 file://에서 막히는 브라우저가 많음).
+    """
+
+    def __init__(self, code_dir: str):
+        self.code_dir = code_dir
+        self.shard = -1
+        self._file = None
+        self._count = 0
+        self._bytes = 0
+
+    def add(self, code: str):
+        """코드를 쓰고 (조각 번호, 조각 안 위치)를 반환한다"""
+        if self._file is None or self._count >= SHARD_MAX_CODES or self._bytes >= SHARD_MAX_BYTES:
+            self._next_shard()
+        text = json.dumps(code, ensure_ascii=False)
+        self._file.write(('' if self._count == 0 else ',\n') + text)
+        position = self._count
+        self._count += 1
+        self._bytes += len(text)
+        return self.shard, position
+
+    def _next_shard(self):
+        self._close_shard()
+        if self.shard < 0:
+            os.makedirs(self.code_dir, exist_ok=True)
+        self.shard += 1
+        self._file = open(os.path.join(self.code_dir, f"c{self.shard:05d}.js"), 'w', encoding='utf-8')
+        self._file.write(f"eepCodeShard({self.shard}, [\n")
+        self._count = 0
+        self._bytes = 0
+
+    def _close_shard(self):
+        if self._file is not None:
+            self._file.write("\n]);\n")
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._close_shard()
+
+
+def _line_count(code: str) -> int:
+    return code.count('\n') + 1
+
+
+def virtual_rows(r: Dict, shards: CodeShardWriter, extra_columns=()) -> List[list]:
+    """
+    결과 하나를 가상 테이블 행 데이터로 바꾼다. 코드는 조각 파일에 쓰고 행에는 위치만 남긴다.
+
+    함수 행: [0, 파일, 함수, 사용 횟수, 시작 라인, 끝 라인, ENUM 사용 라인, 조각 번호, 조각 안 위치, 코드 줄 수
+             , extra_columns 열 값들...]
+    호출자 행: [1, 파일(같은 파일이면 ''), 함수, 시작 라인, 끝 라인, 호출 라인, 깊이, 호출 경로, 조각 번호, 위치, 코드 줄 수]
+    """
+    shard, position = shards.add(r['code'])
+    rows = [[0, str(r['file']), str(r['func_name']), r['enum_count'], r['start_line'], r['end_line'],
+             ', '.join(map(str, r['enum_lines'])), shard, position, _line_count(r['code'])]]
+    rows[0].extend(extra_values(r, extra_columns))
+    for caller in r.get('callers') or ():
+        shard, position = shards.add(caller['code'])
+        caller_file = caller.get('file', r['file'])
+        depth = caller.get('depth', 1)
+        rows.append([1, '' if caller_file == r['file'] else str(caller_file), str(caller['func_name']),
+                     caller['start_line'], caller['end_line'], caller['call_line'], depth,
+                     '' if depth == 1 else ' → '.join(caller['path']), shard, position, _line_count(caller['code'])])
+    return rows
+
+
+def section_row(enum_name: str, func_count: int, enum_total: int) -> list:
+    """ENUM 섹션 행: [2, ENUM 이름, 함수 수, 사용 횟수]"""
+    return [2, enum_name, func_count, enum_total]
+
+
+def rows_json(rows: List[list]) -> str:
+    """<script> 안에 넣을 행 데이터 (</script>로 끊기지 않도록 '</'를 이스케이프)"""
+    return ''.join(json.dumps(row, ensure_ascii=False).replace('</', '<\\/') + ',\n' for row in rows)
+
+
+VIRTUAL_STYLE = '''
+            /* 가상 스크롤 테이블 */
+            .vhead, .vrow {
+                display: grid;
+                grid-template-columns: minmax(0, 1fr) minmax(0, 1fr) 100px 170px 150px 100px;
+                align-items: center;
+                height: 36px;
+                border-bottom: 1px solid var(--border);
+            }
+
+            .vhead {
+                background: var(--bg);
+                font-weight: 600;
+                height: 40px;
+            }
+
+            .vhead > div, .vrow > div {
+                padding: 0 12px;
+                overflow: hidden;
+                text-overflow: ellipsis;
+                white-space: nowrap;
+            }
+
+            .vtable.extra1 .vhead, .vtable.extra1 .vrow {
+                grid-template-columns: minmax(0, 1fr) minmax(0, 1fr) 140px 100px 170px 150px 100px;
+            }
+
+            .vtable.extra2 .vhead, .vtable.extra2 .vrow {
+                grid-template-columns: minmax(0, 1fr) minmax(0, 1fr) 140px 140px 100px 170px 150px 100px;
+            }
+
+            .vrow:hover {
+                background: var(--hover);
+            }
+
+            .vrow.caller-row {
+                background: rgba(0, 120, 215, 0.03);
+                font-size: 0.95em;
+            }
+
+            .vrow.enum-section {
+                display: block;
+                line-height: 36px;
+                padding: 0 12px;
+                background: var(--bg);
+            }
+
+            .vscroll {
+                height: 70vh;
+                overflow-y: auto;
+                position: relative;
+            }
+
+            .vspacer {
+                position: relative;
+            }
+
+            .vwindow {
+                position: absolute;
+                top: 0;
+                left: 0;
+                right: 0;
+            }
+
+            .vcode {
+                overflow: auto;
+                border-bottom: 1px solid var(--border);
+            }
+
+            .vcode pre[class*="language-"] {
+                margin: 0;
+                border-radius: 0;
+                min-height: 100%;
+                box-sizing: border-box;
+            }
+'''
+
+VIRTUAL_TABLE = '''                    <div id="resultTable" class="vtable%(table_class)s">
+                        <div class="vhead">
+                            <div>파일명</div>
+                            <div>함수명</div>%(extra_head)s
+                            <div>사용 횟수</div>
+                            <div>라인 범위</div>
+                            <div>ENUM 위치</div>
+                            <div>코드 보기</div>
+                        </div>
+                        <div id="vscroll" class="vscroll">
+                            <div id="vspacer" class="vspacer"><div id="vwindow" class="vwindow"></div></div>
+                        </div>
+                    </div>
+                    <script>
+                    const ROWS = [
+%(rows)s];
+                    const CODE_DIR = %(code_dir)s;
+                    </script>
+'''
+
+
+
+def virtual_table(rows: str, code_dir: str, extra_columns=()) -> str:
+    """가상 테이블 틀. rows 자리에 행 데이터가 들어가고, 함수명 뒤에 extra_columns 열을 둔다"""
+    return VIRTUAL_TABLE % {
+        'rows': rows, 'code_dir': json.dumps(code_dir),
+        'table_class': f' extra{len(extra_columns)}" data-extra="{len(extra_columns)}' if extra_columns else '',
+        'extra_head': ''.join(f'\n                            <div>{EXTRA_COLUMNS[key]}</div>' for key in extra_columns),
+    }
+
+# 보이는 행만 그리는 테이블 스크립트.
+# 행 높이가 고정이고 펼친 코드 블록 높이도 줄 수로 정해지므로 누적 위치(offsets)만으로 보이는 구간을 찾는다.
+VIRTUAL_SCRIPT = r'''        const ROW_H = 36, LINE_H = 19, CODE_PAD = 32, CODE_MAX = 420, OVERSCAN = 400;
+        const vscroll = document.getElementById('vscroll');
+        const vspacer = document.getElementById('vspacer');
+        const vwindow = document.getElementById('vwindow');
+        const EXTRA_COLUMNS = Number(document.getElementById('resultTable').dataset.extra || 0);
+        const searchField = document.getElementById('searchField');
+        const searchType = document.getElementById('searchType');
+
+        // 코드 조각 파일: 처음 펼칠 때 <script>로 읽고, 하이라이트한 결과는 다시 쓰도록 보관
+        const shards = new Map();
+        const shardWaiters = new Map();
+        const highlighted = new Map();
+        function eepCodeShard(id, codes) {
+            shards.set(id, codes);
+            (shardWaiters.get(id) || []).forEach(([resolve]) => resolve(codes));
+            shardWaiters.delete(id);
+        }
+        function loadShard(id) {
+            if (shards.has(id)) return Promise.resolve(shards.get(id));
+            return new Promise((resolve, reject) => {
+                if (!shardWaiters.has(id)) {
+                    shardWaiters.set(id, []);
+                    const script = document.createElement('script');
+                    script.src = `${CODE_DIR}/c${String(id).padStart(5, '0')}.js`;
+                    script.onerror = () => {
+                        (shardWaiters.get(id) || []).forEach(([, fail]) => fail(new Error(script.src)));
+                        shardWaiters.delete(id);
+                        script.remove();
+                    };
+                    document.head.appendChild(script);
+                }
+                shardWaiters.get(id).push([resolve, reject]);
+            });
+        }
+
+        function esc(s) {
+            return String(s).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'}[c]));
+        }
+        function escRegExp(s) {
+            return s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+        }
+        function mark(text, re) {
+            text = String(text);
+            if (!re) return esc(text);
+            let out = '', last = 0;
+            text.replace(re, (m, offset) => {
+                out += esc(text.slice(last, offset)) + `<span class="highlight">${esc(m)}</span>`;
+                last = offset + m.length;
+                return m;
+            });
+            return out + esc(text.slice(last));
+        }
+
+        const codeRef = row => row[0] === 0 ? [row[7], row[8], row[9]] : [row[8], row[9], row[10]];
+        const codeHeight = row => Math.min(codeRef(row)[2] * LINE_H + CODE_PAD, CODE_MAX);
+
+        const expanded = new Set();
+        let items = [];              // 행 번호, 펼친 코드 블록은 ~행 번호
+        let offsets = new Float64Array(1);
+        let searchRe = null;
+
+        // 검색: 함수 행은 파일명/함수명으로, 호출자 행은 함수명으로 찾고 함수 행이 숨겨지면 호출자도 숨긴다
+        function visibleRows() {
+            const text = searchField.value.toLowerCase();
+            const type = searchType.value;
+            searchRe = text ? new RegExp(escRegExp(text), 'gi') : null;
+            if (!text) return ROWS.map((_, i) => i);
+            const result = [];
+            let parentVisible = true;
+            for (let i = 0; i < ROWS.length; i++) {
+                const row = ROWS[i];
+                if (row[0] === 2) { result.push(i); continue; }
+                if (row[0] === 0) {
+                    parentVisible = String(type === 'file' ? row[1] : row[2]).toLowerCase().includes(text);
+                    if (parentVisible) result.push(i);
+                } else if (parentVisible && (type === 'file' || String(row[2]).toLowerCase().includes(text))) {
+                    result.push(i);
+                }
+            }
+            return result;
+        }
+
+        function rebuild() {
+            items = [];
+            for (const i of visibleRows()) {
+                items.push(i);
+                if (expanded.has(i)) items.push(~i);
+            }
+            offsets = new Float64Array(items.length + 1);
+            for (let k = 0; k < items.length; k++) {
+                offsets[k + 1] = offsets[k] + (items[k] >= 0 ? ROW_H : codeHeight(ROWS[~items[k]]));
+            }
+            vspacer.style.height = `${offsets[items.length]}px`;
+            render();
+        }
+
+        function firstItemAt(y) {
+            let lo = 0, hi = items.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >> 1;
+                if (offsets[mid + 1] <= y) lo = mid + 1; else hi = mid;
+            }
+            return lo;
+        }
+
+        function rowHtml(i) {
+            const row = ROWS[i];
+            const type = searchType.value;
+            if (row[0] === 2) {
+                return `<div class="vrow enum-section"><strong>${esc(row[1])}</strong> — 함수 ${row[2]}개, 사용 ${row[3]}회</div>`;
+            }
+            const button = `<button class="btn toggle-btn" data-row="${i}" data-state="${expanded.has(i) ? 'opened' : 'closed'}">${expanded.has(i) ? '접기' : '보기'}</button>`;
+            if (row[0] === 0) {
+                return `<div class="vrow">` +
+                    `<div title="${esc(row[1])}">${type === 'file' ? mark(row[1], searchRe) : esc(row[1])}</div>` +
+                    `<div title="${esc(row[2])}">${type === 'function' ? mark(row[2], searchRe) : esc(row[2])}</div>` +
+                    row.slice(10, 10 + EXTRA_COLUMNS).map(v => `<div title="${esc(v)}">${esc(v)}</div>`).join('') +
+                    `<div>${row[3]}</div><div>${row[4]}-${row[5]}</div>` +
+                    `<div title="ENUM 사용 위치: ${esc(row[6])}">${esc(row[6])}</div><div>${button}</div></div>`;
+            }
+            const depth = row[6];
+            const label = depth === 1 ? '└ 호출:' : `└ 호출 (깊이 ${depth}):`;
+            const file = row[1] ? ` ${esc(row[1])}` : '';
+            return `<div class="vrow caller-row">` +
+                `<div style="padding-left: ${30 + (depth - 1) * 15}px;" title="${esc(row[1])}"><em>${label}</em>${file}</div>` +
+                `<div title="${esc(row[2])}">${type === 'function' ? mark(row[2], searchRe) : esc(row[2])}</div>` +
+                '<div></div>'.repeat(EXTRA_COLUMNS) +
+                `<div></div><div>${row[3]}-${row[4]} (호출: L${row[5]})</div>` +
+                `<div title="${esc(row[7])}">${esc(row[7])}</div><div>${button}</div></div>`;
+        }
+
+        function codeHtml(i) {
+            const [shard, pos] = codeRef(ROWS[i]);
+            return `<div class="vcode" style="height: ${codeHeight(ROWS[i])}px">` +
+                `<pre class="line-numbers"><code class="language-c" data-shard="${shard}" data-pos="${pos}">코드를 불러오는 중...</code></pre></div>`;
+        }
+
+        // 펼친 코드 블록에만 코드를 넣고 하이라이트
+        function fillCode(el) {
+            const shard = Number(el.dataset.shard), pos = Number(el.dataset.pos);
+            const key = `${shard}:${pos}`;
+            if (highlighted.has(key)) {
+                el.innerHTML = highlighted.get(key);
+                return;
+            }
+            loadShard(shard).then(codes => {
+                if (!el.isConnected) return;
+                el.textContent = codes[pos];
+                Prism.highlightElement(el);
+                highlighted.set(key, el.innerHTML);
+            }).catch(err => {
+                el.textContent = `코드 파일을 읽을 수 없습니다: ${err.message}`;
+            });
+        }
+
+        function render() {
+            const top = vscroll.scrollTop;
+            const first = firstItemAt(Math.max(0, top - OVERSCAN));
+            const bottom = top + vscroll.clientHeight + OVERSCAN;
+            const parts = [];
+            for (let k = first; k < items.length && offsets[k] < bottom; k++) {
+                parts.push(items[k] >= 0 ? rowHtml(items[k]) : codeHtml(~items[k]));
+            }
+            vwindow.style.transform = `translateY(${offsets[first] || 0}px)`;
+            vwindow.innerHTML = parts.join('');
+            vwindow.querySelectorAll('code[data-shard]').forEach(fillCode);
+        }
+
+        let renderPending = false;
+        vscroll.addEventListener('scroll', () => {
+            if (renderPending) return;
+            renderPending = true;
+            requestAnimationFrame(() => { renderPending = false; render(); });
+        });
+
+        vwindow.addEventListener('click', event => {
+            const btn = event.target.closest('button[data-row]');
+            if (!btn) return;
+            const i = Number(btn.dataset.row);
+            if (expanded.has(i)) expanded.delete(i); else expanded.add(i);
+            rebuild();
+        });
+
+        function filterTable() {
+            vscroll.scrollTop = 0;
+            rebuild();
+        }
+
+        searchField.addEventListener('input', filterTable);
+        searchType.addEventListener('change', filterTable);
+        rebuild();
+'''
@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 import webbrowser
 import math
 import json
@@ -12,10 +13,17 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, QMimeData, QThread, Signal
 from PySide6.QtGui import QIcon, QClipboard, QDragEnterEvent, QDropEvent, QFontDatabase, QAction, QFont, QActionGroup
-import main as eep_checker
 from utils import find_c_files
+from eep_checker.api import AnalysisConfig, analyze
+from eep_checker.client import run_remote
+from eep_checker.cancel import CancelToken
 import time
 
+# 분석 스레드가 진행 상황/결과 신호를 보내는 최소 간격(초). 파일이 수천 개여도 이벤트 루프가 밀리지 않도록 모아서 보냄
+SIGNAL_INTERVAL = 0.1
+# 분석 중 결과 창에 보여주는 함수 수 (나머지는 보고서에서)
+LIVE_RESULT_LIMIT = 500
+
 def load_fonts():
     """외부 폰트 로드"""
     font_dir = os.path.join(os.path.dirname(__file__), 'fonts')
@@ -51,50 +59,68 @@ class PathLineEdit(QLineEdit):
                 self.setText(os.path.normpath(path))
 
 class AnalyzerThread(QThread):
-    """분석 작업을 수행하는 스레드"""
+    """
+    분석 작업을 수행하는 스레드.
+    찾은 함수는 파일 단위로 results 신호로 바로 보내고, 진행 상황/결과 신호는 SIGNAL_INTERVAL마다 모아서 보낸다
+    (첫 결과는 기다리지 않고 바로). cancel()을 부르면 분석이 파일 사이에서 멈춘다.
+    """
     progress = Signal(str, float)
     progress_value = Signal(int)
-    finished = Signal(list, list)
+    results = Signal(list)
+    finished = Signal(object)  # AnalysisResult
     error = Signal(str)
 
-    def __init__(self, args, target_lines_cli_param, context_lines_param, encoding):
+    def __init__(self, config):
         super().__init__()
-        self.args = args
-        self.target_lines_cli_param = target_lines_cli_param
-        self.context_lines_param = context_lines_param
-        self.encoding = encoding
+        self.config = config
+        self.cancel_token = CancelToken()
+        self._last_emit = 0.0
+        self._pending_status = None
+        self._pending_value = None
+        self._pending_rows = []
+        self._sent_rows = False
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
+    def _flush(self, force=False):
+        """모아 둔 진행 상황/결과를 보낸다. force가 아니면 마지막으로 보낸 뒤 SIGNAL_INTERVAL이 지났을 때만"""
+        now = time.monotonic()
+        if not force and now - self._last_emit < SIGNAL_INTERVAL:
+            return
+        self._last_emit = now
+        if self._pending_status is not None:
+            self.progress.emit(*self._pending_status)
+            self._pending_status = None
+        if self._pending_value is not None:
+            self.progress_value.emit(self._pending_value)
+            self._pending_value = None
+        if self._pending_rows:
+            self.results.emit(self._pending_rows)
+            self._pending_rows = []
 
     def run(self):
         try:
-            sys.argv = [
-                'main.py',
-                '--enum', self.args['enum'],
-                '--from', self.args['from_val'],
-                '--to', self.args['to_val'],
-                '--path', self.args['path'],
-                '--encoding', self.encoding
-            ]
-            
-            if self.target_lines_cli_param is not None:
-                sys.argv.extend(['--target-lines', str(self.target_lines_cli_param)])
-
-            if self.context_lines_param is not None:
-                sys.argv.extend(['--context-lines', str(self.context_lines_param)])
-            
-            if self.args.get('csv', False):
-                sys.argv.append('--csv')
-            if self.args.get('include_headers', False):
-                sys.argv.append('--include-headers')
-            if self.args.get('find_caller', False):
-                sys.argv.append('--find-caller')
-            
             def progress_callback(status, elapsed, current_progress=None):
-                self.progress.emit(status, elapsed)
+                self._pending_status = (status, elapsed)
                 if current_progress is not None:
-                    self.progress_value.emit(current_progress)
-            
-            prompt_files, error_logs = eep_checker.main(progress_callback=progress_callback)
-            self.finished.emit(prompt_files, error_logs)
+                    self._pending_value = current_progress
+                self._flush()
+
+            def on_results(rows):
+                self._pending_rows.extend(rows)
+                self._flush(force=not self._sent_rows)
+                self._sent_rows = True
+
+            # 분석 서버가 떠 있으면 서버에 맡기고 (파싱해 둔 상태 재사용), 없으면 이 프로세스에서 분석
+            result = run_remote(self.config, progress_callback=progress_callback,
+                                log=lambda text: print(text, end='', flush=True),
+                                cancel=self.cancel_token, on_results=on_results)
+            if result is None:
+                result = analyze(self.config, progress_callback=progress_callback,
+                                 cancel=self.cancel_token, on_results=on_results)
+            self._flush(force=True)
+            self.finished.emit(result)
             
         except Exception as e:
             self.error.emit(str(e))
@@ -119,7 +145,9 @@ class EEPCheckerGUI(QMainWindow):
         self.csv_enabled = False
         # 호출자 분석 옵션 상태 추가
         self.include_headers_enabled = False
+        self.macro_aliases_enabled = False
         self.find_caller_enabled = False
+        self.parallel_enabled = False
         self.context_lines = None
         
         # 메뉴바 생성
@@ -147,12 +175,22 @@ class EEPCheckerGUI(QMainWindow):
         self.include_headers_action = QAction('헤더 파일(.h) 포함', self, checkable=True, checked=self.include_headers_enabled)
         self.include_headers_action.triggered.connect(self.toggle_include_headers)
         output_menu.addAction(self.include_headers_action)
+
+        # #define 별칭 검색 액션 (분석 전에 모든 .c/.h 파일의 #define을 읽음)
+        self.macro_aliases_action = QAction('#define 별칭도 찾기', self, checkable=True, checked=self.macro_aliases_enabled)
+        self.macro_aliases_action.triggered.connect(self.toggle_macro_aliases)
+        output_menu.addAction(self.macro_aliases_action)
         
         # 호출자 분석 액션 추가
         self.find_caller_action = QAction('호출자 함수 분석', self, checkable=True, checked=self.find_caller_enabled)
         self.find_caller_action.triggered.connect(self.toggle_find_caller)
         output_menu.addAction(self.find_caller_action)
 
+        # 병렬 분석 액션 (CPU 코어 수만큼 프로세스 사용)
+        self.parallel_action = QAction('병렬 분석 (모든 CPU 코어 사용)', self, checkable=True, checked=self.parallel_enabled)
+        self.parallel_action.triggered.connect(self.toggle_parallel)
+        output_menu.addAction(self.parallel_action)
+
         # ENUM 주변 줄 수 설정 액션
         self.context_lines_action = QAction('ENUM 주변 줄 수 설정', self, checkable=True)
         self.context_lines_action.triggered.connect(self.set_context_lines)
@@ -318,11 +356,13 @@ class EEPCheckerGUI(QMainWindow):
         path_buttons.setSpacing(5)
         
         browse_btn = QPushButton("찾기")
+        self.browse_btn = browse_btn
         browse_btn.setObjectName("browse")
         browse_btn.setFixedWidth(50)  # 너비 증가
         browse_btn.clicked.connect(self.browse_path)
         
         open_btn = QPushButton("열기")
+        self.open_btn = open_btn
         open_btn.setObjectName("browse")
         open_btn.setFixedWidth(50)  # 동일한 너비 적용
         open_btn.clicked.connect(self.open_path)
@@ -346,6 +386,14 @@ class EEPCheckerGUI(QMainWindow):
         analyze_btn.setFixedHeight(32)
         analyze_btn.clicked.connect(self.analyze)
         button_layout.addWidget(analyze_btn)
+        self.analyze_btn = analyze_btn
+
+        # 취소 버튼 (분석 중에만 표시)
+        self.cancel_btn = QPushButton("취소")
+        self.cancel_btn.setFixedHeight(32)
+        self.cancel_btn.clicked.connect(self.cancel_analysis)
+        self.cancel_btn.hide()
+        button_layout.addWidget(self.cancel_btn)
         
         # 복사 버튼 (처음부터 표시하되 비활성화)
         self.copy_btn = QPushButton("프롬프트 내용 복사")
@@ -424,6 +472,10 @@ class EEPCheckerGUI(QMainWindow):
         # 최근 프롬프트 파일 경로 저장용
         self.latest_prompt_paths = []
 
+        # 분석 중 받은 결과 (결과 창 표시용, 처음 LIVE_RESULT_LIMIT개만 들고 나머지는 개수만 센다)
+        self.live_results = []
+        self.live_result_count = 0
+
         # 이스터에그 관련 변수 추가
         self._easter_egg_count = 0
         self._last_open_click_time = 0
@@ -590,6 +642,15 @@ class EEPCheckerGUI(QMainWindow):
         self.include_headers_enabled = self.include_headers_action.isChecked()
         self.update_status_bar()
 
+    def toggle_macro_aliases(self):
+        """#define 별칭 검색 옵션 토글"""
+        self.macro_aliases_enabled = self.macro_aliases_action.isChecked()
+        self.update_status_bar()
+
+    def toggle_parallel(self):
+        """병렬 분석 옵션 토글"""
+        self.parallel_enabled = self.parallel_action.isChecked()
+
     def toggle_find_caller(self):
         """호출자 함수 분석 옵션 토글"""
         self.find_caller_enabled = self.find_caller_action.isChecked()
@@ -630,6 +691,8 @@ class EEPCheckerGUI(QMainWindow):
         status_parts.append(f"CSV: {'ON' if self.csv_enabled else 'OFF'}")
         # 헤더
         status_parts.append(f"헤더: {'포함' if self.include_headers_enabled else '제외'}")
+        # #define 별칭
+        status_parts.append(f"별칭: {'ON' if self.macro_aliases_enabled else 'OFF'}")
         # 호출자 분석
         status_parts.append(f"호출자 분석: {'ON' if self.find_caller_enabled else 'OFF'}")
         # 프롬프트 분할
@@ -697,33 +760,70 @@ class EEPCheckerGUI(QMainWindow):
         self.add_recent_item()
 
         self.update_status_bar() # 분석 시작 전 상태 업데이트
-        self.setEnabled(False)
+        self.set_running(True)
         self.progress_bar.show()  # 진행바 표시
         self.progress_bar.setValue(0)
+        self.live_results = []
+        self.live_result_count = 0
+        self.result_text.clear()
         
-        self.analyzer = AnalyzerThread(
-            args={
-                'enum': self.enum_input.text(),
-                'from_val': self.from_input.text(),
-                'to_val': self.to_input.text(),
-                'path': self.path_input.text(),
-                'csv': self.csv_enabled,
-                'include_headers': self.include_headers_enabled,
-                'find_caller': self.find_caller_enabled
-            },
-            target_lines_cli_param=self.target_lines_config,
-            context_lines_param=self.context_lines,
-            encoding=self.current_encoding
-        )
+        self.analyzer = AnalyzerThread(AnalysisConfig(
+            enum=self.enum_input.text(),
+            from_value=self.from_input.text(),
+            to_value=self.to_input.text(),
+            path=self.path_input.text(),
+            encoding=self.current_encoding,
+            target_lines=str(self.target_lines_config) if self.target_lines_config is not None else None,
+            context_lines=self.context_lines,
+            csv=self.csv_enabled,
+            include_headers=self.include_headers_enabled,
+            macro_aliases=self.macro_aliases_enabled,
+            find_caller=self.find_caller_enabled,
+            jobs=0 if self.parallel_enabled else 1,
+        ))
         
         self.analyzer.progress.connect(self.update_progress)
         self.analyzer.progress_value.connect(self.progress_bar.setValue)
+        self.analyzer.results.connect(self.add_live_results)
         self.analyzer.finished.connect(self.analysis_finished)
         self.analyzer.error.connect(self.analysis_error)
         
         # 스레드 시작
         self.analyzer.start()
 
+    def set_running(self, running):
+        """분석 중에는 입력/메뉴를 막고 취소 버튼만 남긴다"""
+        for widget in (self.enum_input, self.from_input, self.to_input, self.path_input,
+                       self.browse_btn, self.open_btn, self.analyze_btn, self.copy_btn, self.menuBar()):
+            widget.setEnabled(not running)
+        self.cancel_btn.setEnabled(running)
+        self.cancel_btn.setVisible(running)
+        if not running:
+            self.copy_btn.setEnabled(bool(self.latest_prompt_paths))
+
+    def cancel_analysis(self):
+        """취소 요청 (분석은 다음 파일로 넘어갈 때 멈춤)"""
+        if getattr(self, 'analyzer', None) is not None and self.analyzer.isRunning():
+            self.analyzer.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.status_label.setText("취소하는 중...")
+
+    def format_live_result(self, row):
+        return f"[{row['enum']}] {row['file']}:{row['start_line']} {row['func_name']} ({row['enum_count']}회)"
+
+    def add_live_results(self, rows):
+        """분석 중 찾은 함수를 결과 창에 바로 추가 (LIVE_RESULT_LIMIT개까지, 그 뒤로는 개수만 센다)"""
+        shown = len(self.live_results)
+        before = self.live_result_count
+        self.live_result_count += len(rows)
+        kept = rows[:max(LIVE_RESULT_LIMIT - shown, 0)]
+        self.live_results.extend(kept)
+        lines = [self.format_live_result(row) for row in kept]
+        if before <= LIVE_RESULT_LIMIT < self.live_result_count:
+            lines.append("... (이후 결과는 보고서에서 확인하세요)")
+        if lines:
+            self.result_text.append('\n'.join(lines))
+
     def update_progress(self, status, elapsed):
         """진행 상황 업데이트"""
         self.status_label.setText(f"{status} ({elapsed:.1f}초)")
@@ -733,7 +833,7 @@ class EEPCheckerGUI(QMainWindow):
         QMessageBox.critical(self, "오류", f"분석 중 오류가 발생했습니다: {error_msg}",
                            QMessageBox.StandardButton.Ok)
         self.status_label.setText('오류 발생')
-        self.setEnabled(True)
+        self.set_running(False)
         self.progress_bar.hide()
 
     def copy_prompt(self):
@@ -835,6 +935,8 @@ AX DX 하자면서 API 하나 안줘~!
                         item['encoding'] = 'utf-8'
                     if 'include_headers' not in item:
                         item['include_headers'] = False
+                    if 'macro_aliases' not in item:
+                        item['macro_aliases'] = False
                     if 'find_caller' not in item: # 최근 항목 호환성
                         item['find_caller'] = False
                     if 'split_by_caller_mode_active' not in item: item['split_by_caller_mode_active'] = False
@@ -867,6 +969,7 @@ AX DX 하자면서 API 하나 안줘~!
             'encoding': self.current_encoding,
             'csv_enabled': self.csv_enabled,
             'include_headers': self.include_headers_action.isChecked(),  # 헤더 파일 포함 설정 저장
+            'macro_aliases': self.macro_aliases_enabled,
             'find_caller': self.find_caller_enabled,
             'target_lines_config': self.target_lines_config,
             'split_by_caller_mode_active': self.split_by_caller_mode_active,
@@ -941,6 +1044,10 @@ AX DX 하자면서 API 하나 안줘~!
         # 헤더 파일 포함 설정 복원
         self.include_headers_enabled = item.get('include_headers', False)
         self.include_headers_action.setChecked(self.include_headers_enabled)
+
+        # #define 별칭 설정 복원
+        self.macro_aliases_enabled = item.get('macro_aliases', False)
+        self.macro_aliases_action.setChecked(self.macro_aliases_enabled)
         
         # 호출자 분석 설정 복원
         self.find_caller_enabled = item.get('find_caller', False)
@@ -966,8 +1073,10 @@ AX DX 하자면서 API 하나 안줘~!
         self.update_recent_menu()
         self.update_status_bar()
 
-    def analysis_finished(self, prompt_files, error_logs):
-        """분석 완료 시 처리"""
+    def analysis_finished(self, result):
+        """분석 완료 시 처리 (result: AnalysisResult)"""
+        cancelled = self.analyzer.cancel_token.cancelled
+        prompt_files, error_logs = result.prompt_files, result.error_logs
         try:
             # 결과 텍스트 초기화
             result_text = []
@@ -979,60 +1088,47 @@ AX DX 하자면서 API 하나 안줘~!
                 result_text.append("")
 
             # 결과 파일 정보 추가
-            if prompt_files:
-                # HTML 파일 찾기
-                enum_name = self.enum_input.text()
-                output_dir = 'outputs'
-                html_files = [f for f in os.listdir(output_dir) 
-                            if f.startswith(f"{enum_name}_Output_") and f.endswith('.html')]
-                
-                if html_files:
-                    html_path = os.path.abspath(os.path.join(output_dir, sorted(html_files)[-1]))
-                    all_prompt_paths = [os.path.abspath(p) for p in prompt_files]
-                    
-                    # 통계 정보 표시
-                    with open(html_path, 'r', encoding='utf-8') as f:
-                        html_content = f.read()
-                        # HTML에서 통계 정보 추출
-                        import re
-                        stats = {}
-                        stats['total_files'] = int(re.search(r'<div class="stat-value">(\d+)</div>\s*</div>\s*<div class="stat-item">\s*<div class="stat-label">함수 수', html_content).group(1))
-                        stats['total_funcs'] = int(re.search(r'<div class="stat-value">(\d+)</div>\s*</div>\s*<div class="stat-item">\s*<div class="stat-label">ENUM', html_content).group(1))
-                        stats['total_enums'] = int(re.search(r'<div class="stat-value">(\d+)</div>\s*</div>\s*</div>', html_content).group(1))
-                        
-                        result_text.append(f"=== {enum_name} 분석 결과 ===")
-                        result_text.append(f"분석 파일 수: {stats['total_files']}")
-                        result_text.append(f"함수 수: {stats['total_funcs']}")
-                        result_text.append(f"ENUM 사용 총 횟수: {stats['total_enums']}")
-                        result_text.append("")
-                    
-                    result_text.append("=== 생성된 파일 ===")
-                    result_text.append(f"HTML: {html_path}")
-                    
-                    # CSV 파일 찾기 (CSV 옵션이 켜져있을 때만)
-                    if self.csv_enabled:
-                        csv_files = [f for f in os.listdir(output_dir)
-                                   if f.startswith(f"{enum_name}_Output_") and f.endswith('.csv')]
-                        if csv_files:
-                            csv_path = os.path.abspath(os.path.join(output_dir, sorted(csv_files)[-1]))
-                            result_text.append(f"CSV: {csv_path}")
-                    
-                    if len(all_prompt_paths) > 1:
-                        result_text.append("프롬프트 파일:")
-                        for path in sorted(all_prompt_paths):
-                            result_text.append(f"- {path}")
-                    else:
-                        result_text.append(f"프롬프트: {all_prompt_paths[0]}")
-                    
-                    # 복사 버튼 활성화
-                    self.copy_btn.setEnabled(True)
-                    
-                    # 최신 프롬프트 파일들 저장
-                    self.latest_prompt_paths = sorted(all_prompt_paths)
-                    
-                    # HTML 파일 브라우저로 열기
-                    webbrowser.open(f'file://{html_path}')
-            
+            if prompt_files and result.html_file:
+                html_path = os.path.abspath(result.html_file)
+                all_prompt_paths = [os.path.abspath(p) for p in prompt_files]
+
+                # 통계 정보 표시 (ENUM별)
+                for stats in result.stats:
+                    result_text.append(f"=== {stats.enum_name} 분석 결과 ===")
+                    result_text.append(f"분석 파일 수: {stats.total_files}")
+                    result_text.append(f"함수 수: {stats.total_funcs}")
+                    result_text.append(f"ENUM 사용 총 횟수: {stats.total_enums}")
+                    result_text.append("")
+
+                result_text.append("=== 생성된 파일 ===")
+                result_text.append(f"HTML: {html_path}")
+                if result.csv_file:
+                    result_text.append(f"CSV: {os.path.abspath(result.csv_file)}")
+
+                if len(all_prompt_paths) > 1:
+                    result_text.append("프롬프트 파일:")
+                    for path in sorted(all_prompt_paths):
+                        result_text.append(f"- {path}")
+                else:
+                    result_text.append(f"프롬프트: {all_prompt_paths[0]}")
+
+                # 복사 버튼 활성화
+                self.copy_btn.setEnabled(True)
+
+                # 최신 프롬프트 파일들 저장
+                self.latest_prompt_paths = sorted(all_prompt_paths)
+
+                # HTML 파일 브라우저로 열기
+                webbrowser.open(f'file://{html_path}')
+
+            # 분석 중에 받은 함수 목록 (취소했으면 그때까지 찾은 것)
+            if self.live_results:
+                result_text.append("")
+                result_text.append(f"=== 찾은 함수 ({self.live_result_count}개{', 취소 전까지' if cancelled else ''}) ===")
+                result_text.extend(self.format_live_result(row) for row in self.live_results)
+                if self.live_result_count > len(self.live_results):
+                    result_text.append("... (이후 결과는 보고서에서 확인하세요)")
+
             # 결과 텍스트 설정
             self.result_text.setText('\n'.join(result_text))
             
@@ -1042,10 +1138,12 @@ AX DX 하자면서 API 하나 안줘~!
             self.status_label.setText('오류 발생')
         
         finally:
-            self.setEnabled(True)
+            self.set_running(False)
             self.progress_bar.hide()
             # 분석 완료 후 상태 메시지 (성공/실패에 따라 다르게)
-            if not error_logs and prompt_files:
+            if cancelled:
+                self.status_label.setText(f"분석 취소됨 (찾은 함수 {self.live_result_count}개)")
+            elif not error_logs and prompt_files:
                 status_msg = f"분석 완료 (인코딩: {self.current_encoding}"
                 if self.csv_enabled:
                     status_msg += ", CSV 출력 포함"
@@ -1056,7 +1154,8 @@ AX DX 하자면서 API 하나 안줘~!
             elif not error_logs and not prompt_files:
                 self.status_label.setText(f"분석 완료: 일치 항목 없음 (인코딩: {self.current_encoding})")
             # 에러가 있으면 analysis_error에서 이미 '오류 발생'으로 설정됨
-            self.update_status_bar() # 최종 상태 반영
+            if not cancelled:
+                self.update_status_bar() # 최종 상태 반영
 
 def main():
     if sys.platform.startswith("win"):
@@ -1077,4 +1176,6 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == '__main__':
+    # PyInstaller 빌드에서 --jobs 워커 프로세스가 GUI를 다시 띄우지 않도록
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
@@ -1,239 +1,144 @@
 import argparse
-import os
-import time
-from eep_checker import parser
-from eep_checker.report import save_html_report
-from eep_checker.csv_report import save_csv_report
-from eep_checker.prompt import make_llm_prompt
-from utils import find_c_files, save_split_prompts, get_analysis_stats, print_analysis_stats
-
-def get_analysis_stats(enum_name: str, results: list) -> dict:
-    """분석 결과의 통계 정보를 반환합니다.
-    
-    Args:
-        enum_name (str): 분석한 ENUM 이름
-        results (list): 분석 결과 리스트
-    
-    Returns:
-        dict: 통계 정보를 담은 딕셔너리
-    """
-    total_files = len(set(r['file'] for r in results))
-    total_funcs = len(results)
-    total_enums = sum(r['enum_count'] for r in results)
-    
-    return {
-        'enum_name': enum_name,
-        'total_files': total_files,
-        'total_funcs': total_funcs,
-        'total_enums': total_enums
-    }
-
-def print_analysis_stats(stats: dict):
-    """분석 통계를 출력합니다."""
-    print(f"\n=== {stats['enum_name']} 분석 결과 ===")
-    print(f"분석 파일 수: {stats['total_files']}")
-    print(f"함수 수: {stats['total_funcs']}")
-    print(f"ENUM 사용 총 횟수: {stats['total_enums']}\n")
-
-def main(progress_callback=None):
-    """
-    EEPROM ENUM 영향 함수 분석기 메인 함수
-    
-    Args:
-        progress_callback (callable, optional): 진행 상황을 알려주는 콜백 함수.
-            callback(status: str, elapsed: float, progress: int) 형식으로 호출됨.
-    Returns:
-        tuple: (prompt_files, error_logs) - 생성된 프롬프트 파일 목록과 에러 로그 목록
-    """
-    start_time = time.time()
-    error_logs = []
-    
-    def update_progress(status, progress=None):
-        """진행 상황 업데이트"""
-        if progress_callback:
-            elapsed = time.time() - start_time
-            progress_callback(status, elapsed, progress)
-
-    def log_error(message):
-        """에러 로깅"""
-        error_logs.append(message)
-        print(message)
-
+import multiprocessing
+import sys
+from eep_checker.api import AnalysisConfig, AnalysisResult, analyze, update_index
+from eep_checker.server import serve, DEFAULT_WATCH_INTERVAL
+from eep_checker.client import run_remote
+from eep_checker.profiling import DEFAULT_TOP
+from eep_checker.tokens import DEFAULT_TOKENIZER
+from utils import find_c_files
+
+def build_arg_parser():
+    """main.py 명령행 인자 파서"""
     argp = argparse.ArgumentParser(description='EEPROM ENUM 영향 함수 분석기')
-    argp.add_argument('--enum', required=True, help='찾으려는 ENUM 이름')
-    argp.add_argument('--from', dest='from_value', required=True, help='변경 전 ENUM 값')
-    argp.add_argument('--to', dest='to_value', required=True, help='변경 후 ENUM 값')
-    argp.add_argument('--path', required=True, help='분석할 C 프로젝트 폴더 경로')
+    argp.add_argument('command', nargs='?', choices=['analyze', 'index', 'query', 'serve'], default='analyze',
+                      help='analyze: 소스를 파싱해 분석 (기본), index: 식별자 색인만 만들기/갱신, '
+                           'query: 색인으로 분석 (바뀐 파일만 다시 색인), serve: 분석 서버 실행')
+    argp.add_argument('--enum', nargs='+',
+                      help='찾으려는 ENUM 이름. 여러 개는 쉼표/공백으로 구분, "@파일"은 이름 목록 파일, glob 패턴 지원 (예: EEPROM_CFG_*)')
+    argp.add_argument('--from', dest='from_value', help='변경 전 ENUM 값')
+    argp.add_argument('--to', dest='to_value', help='변경 후 ENUM 값')
+    argp.add_argument('--path', help='분석할 C 프로젝트 폴더 경로')
     argp.add_argument('--encoding', default='utf-8', help='소스 파일 인코딩 (기본값: utf-8)')
     argp.add_argument('--debug', action='store_true', help='디버그 정보 출력')
-    argp.add_argument('--query', action='store_true', help='쿼리 기반 방식 사용(실험적)')
+    argp.add_argument('--query', action='store_true', help='tree-sitter 쿼리 캡처 기반 엔진 사용 (큰 파일에서 더 빠름)')
     argp.add_argument('--target-lines', type=str, default=None, help='프롬프트 분할 시 파일당 목표 줄 수 (숫자) 또는 "caller" 모드 지정')
+    argp.add_argument('--max-tokens', type=int, default=None,
+                      help='프롬프트를 파일당 토큰 수 예산으로 가장 적은 파일에 나눠 담음 (first-fit-decreasing)')
+    argp.add_argument('--tokenizer', default=DEFAULT_TOKENIZER,
+                      help=f'--max-tokens 토큰 수 추정기: approx, tiktoken[:인코딩], 모듈:함수 (기본: {DEFAULT_TOKENIZER})')
+    argp.add_argument('--no-dedup', action='store_true',
+                      help='여러 파일에 복사된 같은 함수(공백/주석만 다름)도 프롬프트를 따로 만듦')
     argp.add_argument('--context-lines', type=int, default=None, help='ENUM 사용 전후 포함할 줄 수 (기본: 전체 함수)')
     argp.add_argument('--csv', action='store_true', help='분석 결과를 CSV 파일로도 저장')
+    argp.add_argument('--html-mode', choices=['auto', 'inline', 'virtual'], default='auto',
+                      help='HTML 보고서 형식. virtual은 보이는 행만 그리고 코드는 옆 폴더에서 필요할 때 읽음 (기본: auto, 결과가 많으면 virtual)')
+    argp.add_argument('--ndjson', action='store_true', help='분석 결과를 NDJSON 파일(줄마다 JSON 객체 하나)로도 저장')
+    argp.add_argument('--variant', action='append', default=None,
+                      help='빌드 변형별로 #if/#ifdef를 평가해 분석 (예: "A:FEATURE_X,LEVEL=2", "@variants.txt"). 여러 번 지정 가능')
+    argp.add_argument('--macro-aliases', action='store_true',
+                      help='ENUM으로 펼쳐지는 #define 별칭(예: #define BOOT_SLOT EEPROM_BOOT_MODE)도 찾음 (분석 전에 헤더까지 모든 파일의 #define을 읽음)')
     argp.add_argument('--include-headers', action='store_true', help='헤더 파일(.h)도 분석에 포함')
+    argp.add_argument('--no-prefilter', action='store_true', help='ENUM 이름이 없는 파일을 건너뛰는 사전 필터 끄기')
+    argp.add_argument('--no-cache', action='store_true', help='파일별 분석 결과 캐시와 증분 분석 매니페스트 사용 안 함')
+    argp.add_argument('--clear-cache', action='store_true', help='분석 전에 결과 캐시와 매니페스트 비우기')
+    argp.add_argument('--jobs', type=int, default=1, help='병렬 분석 프로세스 수 (기본: 1, 0이면 CPU 코어 수)')
     argp.add_argument('--find-caller', action='store_true', default=False, help='호출자 함수 분석 기능 사용 (기본값: 비활성화)')
-    args = argp.parse_args()
-
-    # 경로 검증
-    if not os.path.exists(args.path):
-        log_error(f"[Error] 지정된 경로가 존재하지 않습니다: {args.path}")
-        return [], error_logs
-    if not os.path.isdir(args.path):
-        log_error(f"[Error] 지정된 경로가 디렉터리가 아닙니다: {args.path}")
-        return [], error_logs
-
-    update_progress(f"C, H 파일 검색 중 (인코딩: {args.encoding})...", 0)
-    c_files = find_c_files(args.path, include_headers=args.include_headers)
-    if not c_files:
-        log_error(f"[Warning] 지정된 경로에서 C/H 파일을 찾을 수 없습니다: {args.path}")
-        return [], error_logs
-    
-    print(f"총 {len(c_files)}개의 {'C/H' if args.include_headers else 'C'} 파일을 찾았습니다.")
-
-    all_results = []
-    llm_prompts_data = []
-    
-    total_files = len(c_files)
-    for i, cfile in enumerate(c_files, 1):
-        progress = int((i / total_files) * 100)
-        rel_path = os.path.relpath(cfile, args.path)
-        update_progress(f"열심히 파일 분석 중... ({i}/{total_files})", progress)
-        
-        # 파일 읽기 시도 (지정된 인코딩 사용)
-        try:
-            # with open(cfile, 'r', encoding=args.encoding, errors='strict') as f:
-            with open(cfile, 'r', encoding=args.encoding, errors='replace') as f:
-                code = f.read()
-        except UnicodeDecodeError as e:
-            log_error(f"[Error] 파일 읽기 실패 ({args.encoding} 인코딩): {rel_path} → {str(e)}")
-            continue
-        except Exception as e:
-            log_error(f"[Error] 파일 읽기 실패: {rel_path} → {str(e)}")
-            continue
-
-        # 파싱 시도
-        try:
-            parser_results = parser.extract_functions_with_enum_file(
-                code,
-                args.enum,
-                file_name=rel_path,
-                debug=args.debug,
-                query_mode=args.query,
-                analyze_callers=args.find_caller,
-                context_lines=args.context_lines,
-            )
-        except Exception as e:
-            log_error(f"[Warning] 파일 파싱 실패: {rel_path} → {str(e)}")
-            continue
-
-        for r in parser_results:
-            all_results.append(r)
-            if args.debug:
-                print(f"함수명 추출 결과: {r['func_name']}")
-            prompt_text = make_llm_prompt(
-                r['file'], r['func_name'], args.enum, args.from_value, args.to_value, r['code'],
-                callers=r.get('callers')
-            )
-            llm_prompts_data.append({'text': prompt_text, 'has_callers': bool(r.get('callers'))})
-
-    if not all_results:
-        log_error(f"[Warning] ENUM '{args.enum}'을(를) 사용하는 함수를 찾을 수 없습니다.")
-        return [], error_logs
-
-    # 통계 정보 수집 및 출력
-    stats = get_analysis_stats(args.enum, all_results)
-    print_analysis_stats(stats)
-
-    # outputs 폴더 생성
-    output_dir = 'outputs'
-    os.makedirs(output_dir, exist_ok=True)
-
-    update_progress("HTML 보고서 생성 중...", 95)
-    try:
-        # HTML 보고서 저장
-        save_html_report(args.enum, all_results, output_dir=output_dir)
-        
-        # CSV 보고서 저장 (--csv 옵션이 있을 때만)
-        if args.csv:
-            update_progress("CSV 보고서 생성 중...", 97)
-            try:
-                save_csv_report(args.enum, all_results, output_dir=output_dir)
-            except Exception as e:
-                log_error(f"[Error] CSV 보고서 생성 실패 → {str(e)}")
-    except Exception as e:
-        log_error(f"[Error] HTML 보고서 생성 실패 → {str(e)}")
-        return [], error_logs
-
-    update_progress("프롬프트 파일 생성 중...", 98)
-    try:
-        # LLM 프롬프트 저장 (분할 포함)
-        import datetime
-        now = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        base_prompt_path = os.path.join(output_dir, f"{args.enum}_LLM_Prompts_{now}.txt")
-        
-        parsed_split_mode = "lines" # 기본 분할 모드
-        parsed_target_lines_for_regular = None
-
-        if args.target_lines:
-            val_lower = args.target_lines.lower()
-            if val_lower.startswith("caller"):
-                if args.find_caller:
-                    parsed_split_mode = "caller"
-                    parts = val_lower.split(':', 1)
-                    if len(parts) > 1 and parts[1].isdigit():
-                        num = int(parts[1])
-                        if num > 0:
-                            parsed_target_lines_for_regular = num
-                        else:
-                            log_error(f'[Warning] "--target-lines caller:N"에서 N은 양의 정수여야 합니다. (입력: {args.target_lines}). 호출자 없는 파일은 분할하지 않습니다.')
-                            # parsed_target_lines_for_regular is None (분할 안함)
-                    # "caller"만 입력된 경우, parsed_target_lines_for_regular는 None (호출자 없는 파일 분할 안함)
-                else:
-                    log_error(f'[Warning] "--target-lines {args.target_lines}" 옵션은 "--find-caller" 옵션과 함께 사용해야 합니다. 기본 분할 없음으로 진행합니다.')
-                    # parsed_split_mode = "lines", parsed_target_lines_for_regular = None (분할 안 함)
-            else:
-                try:
-                    num_val = int(args.target_lines)
-                    if num_val > 0:
-                        parsed_target_lines_for_regular = num_val
-                    else:
-                        log_error("[Warning] '--target-lines' 값은 양의 정수여야 합니다. 기본 라인 분할 없음으로 진행합니다.")
-                        # parsed_target_lines_for_regular is None (분할 안 함)
-                except ValueError:
-                    log_error(f'[Warning] "--target-lines" 값 "{args.target_lines}"이(가) 유효한 숫자나 "caller" 또는 "caller:N" 형식이 아닙니다. 기본 분할 없음으로 진행합니다.')
-                    # parsed_split_mode = "lines", parsed_target_lines_for_regular = None (분할 안 함)
-        
-        # 프롬프트 분할 저장
-        prompt_files = save_split_prompts(
-            prompts_data_list=llm_prompts_data, 
-            base_path=base_prompt_path, 
-            split_mode=parsed_split_mode, 
-            target_lines_for_regular_files=parsed_target_lines_for_regular,
-            find_caller_active=args.find_caller
-        )
-    except Exception as e:
-        log_error(f"[Error] 프롬프트 파일 생성 실패 → {str(e)}")
-        return [], error_logs
+    argp.add_argument('--caller-depth', type=int, default=1, help='호출자의 호출자까지 찾을 단계 수 (--find-caller와 함께 사용, 기본값: 1)')
+    argp.add_argument('--index', default=None,
+                      help='index/query 명령의 식별자 색인 파일 경로 (기본: outputs/.cache/index 아래 분석 폴더별 파일)')
+    argp.add_argument('--port', type=int, default=0, help='serve 명령의 포트 (기본: 빈 포트 자동 선택, 127.0.0.1에서만 받음)')
+    argp.add_argument('--watch-interval', type=float, default=DEFAULT_WATCH_INTERVAL,
+                      help=f'serve 명령에서 파일 변경을 확인하는 간격(초), 0이면 요청 때만 확인 (기본: {DEFAULT_WATCH_INTERVAL})')
+    argp.add_argument('--no-server', action='store_true', help='실행 중인 분석 서버가 있어도 이 프로세스에서 직접 분석')
+    argp.add_argument('--profile', action='store_true',
+                      help='단계별 시간, 가장 오래 걸린 파일, 최대 메모리(tracemalloc)를 출력하고 Chrome trace JSON을 저장')
+    argp.add_argument('--profile-top', type=int, default=DEFAULT_TOP,
+                      help=f'--profile에서 보여줄 가장 오래 걸린 파일 수 (기본: {DEFAULT_TOP})')
+    argp.add_argument('--no-tracemalloc', action='store_true',
+                      help='--profile에서 최대 메모리를 재지 않음 (tracemalloc 때문에 단계 시간이 늘어나는 것을 피함)')
+    return argp
+
+def config_from_args(args):
+    """파싱한 명령행 인자를 AnalysisConfig로 (analyze/query 명령)"""
+    return AnalysisConfig(
+        enum=args.enum, from_value=args.from_value, to_value=args.to_value, path=args.path,
+        encoding=args.encoding, debug=args.debug, query_engine=args.query, target_lines=args.target_lines,
+        max_tokens=args.max_tokens, tokenizer=args.tokenizer, dedup=not args.no_dedup,
+        context_lines=args.context_lines, csv=args.csv, html_mode=args.html_mode, ndjson=args.ndjson,
+        variants=args.variant, macro_aliases=args.macro_aliases, include_headers=args.include_headers,
+        prefilter=not args.no_prefilter, cache=not args.no_cache, clear_cache=args.clear_cache, jobs=args.jobs,
+        find_caller=args.find_caller, caller_depth=args.caller_depth, use_index=args.command == 'query',
+        index_path=args.index, profile=args.profile, profile_top=args.profile_top,
+        profile_memory=not args.no_tracemalloc,
+    )
+
+def run(progress_callback=None, argv=None, warm=None, cancel=None, on_results=None, config=None, cwd=None):
+    """
+    명령행 인자(argv) 또는 AnalysisConfig로 명령 하나를 실행한다 (분석 서버도 이 함수를 부름).
 
-    # 결과 출력
-    if prompt_files:
-        if len(prompt_files) > 1:
-            print(f"프롬프트가 {len(prompt_files)}개 파일로 분할되어 저장되었습니다:")
-            for f_path in prompt_files: # 변수명 변경
-                print(f"- {f_path}")
-        else:
-            print(f"프롬프트 파일이 생성되었습니다: {prompt_files[0]}")
+    Args:
+        argv (list, optional): 명령행 인자 (기본: sys.argv[1:])
+        config (AnalysisConfig, optional): 주어지면 argv 대신 이 설정으로 분석 (GUI)
+        cwd (str, optional): 상대 경로의 기준 폴더 (분석 서버가 요청한 쪽의 현재 폴더를 넘김)
+        나머지 인자는 eep_checker.api.analyze와 같음
+    Returns:
+        AnalysisResult: 분석 결과 (index/serve 명령은 출력 파일 없이 에러 로그만)
+    Raises:
+        SystemExit: 인자 오류 (argparse)
+    """
+    if config is not None:
+        if cwd is not None:
+            config = config.relative_to(cwd)
+        return analyze(config, progress_callback=progress_callback, cancel=cancel, on_results=on_results, warm=warm)
+
+    argp = build_arg_parser()
+    args = argp.parse_args(argv)
+    required = []
+    if args.command != 'serve':
+        required.append(('--path', args.path))
+    if args.command not in ('index', 'serve'):
+        required += [('--enum', args.enum), ('--from', args.from_value), ('--to', args.to_value)]
+    missing = [flag for flag, value in required if value is None]
+    if missing:
+        argp.error(f"다음 인자가 필요합니다: {', '.join(missing)}")
+
+    if args.command == 'serve':
+        if warm is not None:
+            message = "[Error] 분석 서버 안에서는 serve 명령을 실행할 수 없습니다."
+            print(message)
+            return AnalysisResult(error_logs=[message])
+        serve(run, find_c_files, port=args.port, interval=args.watch_interval)
+        return AnalysisResult()
+    if args.command == 'index':
+        config = AnalysisConfig(enum=None, from_value=None, to_value=None, path=args.path, encoding=args.encoding,
+                                jobs=args.jobs, index_path=args.index, profile=args.profile,
+                                profile_top=args.profile_top, profile_memory=not args.no_tracemalloc)
     else:
-        # llm_prompts_data는 있지만 파일이 생성 안된 경우 (예: 모든 프롬프트가 비어있거나 오류로 저장 실패)
-        if llm_prompts_data:
-            print("프롬프트 내용이 있었으나 파일로 저장되지 못했습니다. 에러 로그를 확인해주세요.")
-        # else: all_results 자체가 없어서 llm_prompts_data도 비어있는 경우는 이미 위에서 처리됨
+        config = config_from_args(args)
+    if cwd is not None:
+        config = config.relative_to(cwd)
+    if args.command == 'index':
+        return update_index(config, progress_callback=progress_callback, cancel=cancel, warm=warm)
+    return analyze(config, progress_callback=progress_callback, cancel=cancel, on_results=on_results, warm=warm)
+
+def main(progress_callback=None, argv=None, warm=None, cancel=None, on_results=None):
+    """
+    EEPROM ENUM 영향 함수 분석기 메인 함수 (run()의 예전 형식 반환값)
 
-    elapsed = time.time() - start_time
-    update_progress(f"분석 완료! (총 {elapsed:.1f}초)", 100)
-    print(f"총 수행 시간: {elapsed:.2f}초")
-    
-    return prompt_files, error_logs
+    Returns:
+        tuple: (prompt_files, error_logs) - 생성된 프롬프트 파일 목록과 에러 로그 목록
+    """
+    result = run(progress_callback, argv=argv, warm=warm, cancel=cancel, on_results=on_results)
+    return result.prompt_files, result.error_logs
 
 if __name__ == '__main__':
-    main()
+    multiprocessing.freeze_support()
+    cli_args = sys.argv[1:]
+    args = build_arg_parser().parse_args(cli_args)  # 인자 오류는 서버에 보내기 전에 여기서 끝남
+    remote = None
+    if args.command != 'serve' and not args.no_server:
+        # 분석 서버가 떠 있으면 서버에 맡긴다 (없으면 이 프로세스에서 분석)
+        remote = run_remote(cli_args, log=lambda text: print(text, end='', flush=True))
+    if remote is None:
+        main(argv=cli_args)
@@ -1,13 +1,18 @@
 import os
 import re # 정규 표현식 모듈 추가
+import threading
+from eep_checker.spool import RecordSpool
+from eep_checker.tokens import get_tokenizer, pack_first_fit_decreasing
 
-def find_c_files(root_dir, include_headers=False):
+def find_c_files(root_dir, include_headers=False, dir_index=None):
     """
     지정된 디렉토리에서 C/H 파일을 찾습니다.
     
     Args:
         root_dir (str): 검색할 루트 디렉토리 경로
         include_headers (bool): 헤더 파일(.h)도 포함할지 여부
+        dir_index (dict, optional): 이전 실행에서 저장한 폴더 목록 인덱스.
+            주어지면 수정 시각이 그대로인 폴더는 다시 읽지 않고, 인덱스를 현재 상태로 갱신합니다.
         
     Returns:
         list: 발견된 C/H 파일 경로 목록
@@ -24,6 +29,9 @@ def find_c_files(root_dir, include_headers=False):
     if is_windows_root or is_posix_root:
         raise ValueError("시스템 루트\n디렉터리 불가")
     
+    if dir_index is not None:
+        return _find_c_files_indexed(root_dir, include_headers, dir_index)
+
     c_files = []
     for dirpath, _, filenames in os.walk(root_dir):
         # 숨김 폴더 제외
@@ -36,6 +44,56 @@ def find_c_files(root_dir, include_headers=False):
                 c_files.append(os.path.join(dirpath, f))
     return c_files
 
+def _find_c_files_indexed(root_dir, include_headers, dir_index):
+    """
+    find_c_files와 같은 순서/규칙으로 파일을 찾되, 폴더 목록을 dir_index에 저장해 재사용합니다.
+
+    폴더의 수정 시각(mtime)은 그 안에 항목이 추가/삭제/이름 변경될 때만 바뀌므로,
+    수정 시각이 같은 폴더는 os.scandir 없이 저장된 목록을 그대로 씁니다.
+    dir_index는 {루트 기준 상대 경로: (mtime_ns, 파일 이름 목록, 하위 폴더 이름 목록)} 형식입니다.
+    """
+    old_index = dict(dir_index)
+    dir_index.clear()
+    c_files = []
+
+    def visit(dirpath, rel_dir):
+        try:
+            mtime_ns = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            return
+        cached = old_index.get(rel_dir)
+        if cached is not None and cached[0] == mtime_ns:
+            _, filenames, subdirs = cached
+        else:
+            filenames, subdirs = [], []
+            try:
+                with os.scandir(dirpath) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if not is_dir:
+                            filenames.append(entry.name)
+                        elif not entry.is_symlink():  # os.walk처럼 심볼릭 링크 폴더는 따라가지 않음
+                            subdirs.append(entry.name)
+            except OSError:
+                return
+        dir_index[rel_dir] = (mtime_ns, filenames, subdirs)
+
+        # 숨김 폴더 제외 (하위 폴더도 모두 숨김 경로이므로 더 내려가지 않음)
+        if any(part.startswith('.') for part in dirpath.split(os.sep)):
+            return
+        for f in filenames:
+            # 헤더 파일은 옵션에 따라 포함
+            if f.endswith('.c') or (include_headers and f.endswith('.h')):
+                c_files.append(os.path.join(dirpath, f))
+        for d in subdirs:
+            visit(os.path.join(dirpath, d), os.path.join(rel_dir, d))
+
+    visit(root_dir, '.')
+    return c_files
+
 def split_prompt_content(prompts_data_list, split_mode, target_lines_for_regular_files, find_caller_active):
     """
     프롬프트 내용을 다양한 모드(줄 수, 호출자 유무)에 따라 분할하고 재조합합니다.
@@ -171,7 +229,164 @@ def split_prompt_content(prompts_data_list, split_mode, target_lines_for_regular
     return formatted_parts if formatted_parts else []
 
 
-def save_split_prompts(prompts_data_list, base_path, split_mode, target_lines_for_regular_files, find_caller_active):
+PROMPT_INSTRUCTION_TEXT = """답변은 함수별로 구분된 섹션으로 작성해주세요! 5번 심각도는 1점(낮음) ~ 5점(높음)과 별모양으로 표시해 주십시오.
+    
+"""
+PROMPT_SEPARATOR = '\n' + '-' * 12 + '\n'
+
+class PromptFileWriter:
+    """
+    프롬프트를 하나씩 받아 save_split_prompts와 같은 규칙으로 파일에 나누어 쓰는 스트리밍 작성기.
+
+    프롬프트 전체를 메모리에 모으지 않고 현재 파트 파일에 바로 이어 쓴다.
+    파트 파일 이름에는 프롬프트 개수가 들어가므로 파트가 끝날 때 임시 이름에서 바꾸고,
+    일반 파트가 하나뿐이면 close()에서 분할 없는 이름(base_path)으로 바꾼다.
+
+    max_tokens를 주면 줄 수 대신 토큰 예산으로 나눈다 (--max-tokens). 이때는 프롬프트를 임시 파일(RecordSpool)에
+    모아 두었다가 close()에서 first-fit-decreasing으로 가장 적은 파일에 담고, 파일마다 안내 문구를 넣는다.
+    호출자별 분리 모드의 호출자 있는 프롬프트는 그대로 한 파일에 하나씩 쓴다.
+    """
+
+    def __init__(self, base_path, split_mode, target_lines_for_regular_files, find_caller_active,
+                 max_tokens=None, tokenizer=None):
+        self.base_path = base_path
+        self.base_name, self.ext = os.path.splitext(base_path)
+        self.caller_mode = split_mode == "caller" and find_caller_active
+        self.max_tokens = max_tokens
+        # "lines" 모드에서 분할하지 않을 때는 기존 단일 파일 형식(프롬프트 사이 줄바꿈만)으로 쓴다
+        self.joined = split_mode == "lines" and target_lines_for_regular_files is None and max_tokens is None
+        self.target_lines = target_lines_for_regular_files
+        self.caller_files = []
+        self.regular_files = []  # (경로, 프롬프트 수) - 첫 파트는 close()에서 이름 확정
+        self.packing = None      # 토큰 분할 결과 (close() 후, max_tokens를 줬을 때)
+        self._file = None
+        self._tmp_path = f"{base_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._lines = 0
+        self._count = 0
+        if max_tokens is not None:
+            self._count_tokens = get_tokenizer(tokenizer)
+            self._separator_tokens = self._count_tokens(PROMPT_SEPARATOR)
+            self._spool = RecordSpool()
+            self._token_sizes = []   # 프롬프트마다 (토큰 수 + 구분선)
+
+    def add(self, text, has_callers=False):
+        if self.caller_mode and has_callers:
+            # 호출자가 있는 프롬프트는 각각 별도 파일로
+            path = f"{self.base_name}_caller_part{len(self.caller_files) + 1}_1prompts{self.ext}"
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(PROMPT_INSTRUCTION_TEXT + PROMPT_SEPARATOR + text + PROMPT_SEPARATOR)
+            self.caller_files.append(path)
+            return
+        if not self.caller_mode and not text.strip():
+            return
+        if self.max_tokens is not None:
+            self._spool.append(0, text)
+            self._token_sizes.append(self._count_tokens(text) + self._separator_tokens)
+            return
+
+        lines = len(text.split('\n'))
+        if self._file is not None and self.target_lines is not None \
+                and self._lines + lines > self.target_lines * 1.2:  # 20% 여유
+            self._finish_part()
+        if self._file is None:
+            self._file = open(self._tmp_path, 'w', encoding='utf-8')
+            self._file.write(PROMPT_INSTRUCTION_TEXT + ('\n' + '-' * 12 if self.joined else PROMPT_SEPARATOR))
+            self._lines = 0
+            self._count = 0
+        elif self.joined:
+            self._file.write('\n')
+        else:
+            self._file.write(PROMPT_SEPARATOR)
+        self._file.write(text)
+        self._lines += lines
+        self._count += 1
+
+    def _finish_part(self):
+        self._file.write(PROMPT_SEPARATOR)
+        self._file.close()
+        self._file = None
+        index = len(self.regular_files) + 1
+        part_path = f"{self.base_name}_part{index}_{self._count}prompts{self.ext}"
+        if index > 1:
+            os.replace(self._tmp_path, part_path)
+        else:
+            # 첫 파트는 파트가 하나뿐인지 알 수 있을 때까지 임시 이름으로 둔다
+            part_path = f"{self._tmp_path}.1"
+            os.replace(self._tmp_path, part_path)
+        self.regular_files.append((part_path, self._count))
+
+    def close(self):
+        """
+        마지막 파트를 마무리하고 저장된 파일 경로 목록을 반환한다.
+        (호출자별 파일 먼저, 그다음 일반 파트 순서)
+        """
+        if self._file is not None:
+            self._finish_part()
+        if self.max_tokens is not None:
+            self._write_packed()
+        saved_files = list(self.caller_files)
+        for index, (path, count) in enumerate(self.regular_files, 1):
+            if index == 1:
+                # 단일 파트이고 호출자별 파일이 없으면 원본 base_path 사용
+                if len(self.regular_files) == 1 and not self.caller_files:
+                    final_path = self.base_path
+                else:
+                    final_path = f"{self.base_name}_part1_{count}prompts{self.ext}"
+                os.replace(path, final_path)
+                path = final_path
+            saved_files.append(path)
+        if self.packing is not None:
+            self.packing['files'] = saved_files[len(self.caller_files):]
+        if not saved_files:
+            print("저장할 프롬프트 내용이 없습니다.")
+        return saved_files
+
+    def _write_packed(self):
+        """모아 둔 프롬프트를 토큰 예산에 맞게 first-fit-decreasing으로 나눠 쓰고 self.packing을 채운다"""
+        header_tokens = self._count_tokens(PROMPT_INSTRUCTION_TEXT) + self._separator_tokens
+        capacity = self.max_tokens - header_tokens
+        sizes = self._token_sizes
+        parts = []
+        for items in pack_first_fit_decreasing(sizes, capacity):
+            self._file = open(self._tmp_path, 'w', encoding='utf-8')
+            self._file.write(PROMPT_INSTRUCTION_TEXT)
+            for i in items:
+                self._file.write(PROMPT_SEPARATOR)
+                self._file.write(self._spool.get(0, i))
+            self._count = len(items)
+            self._finish_part()
+            parts.append(header_tokens + sum(sizes[i] for i in items))
+        self._spool.close()
+
+        total = sum(sizes)
+        self.packing = {
+            'max_tokens': self.max_tokens,
+            'prompts': len(sizes),
+            'files': [],                 # close()에서 최종 경로로 채움
+            'tokens': parts,             # 파일별 토큰 수 ('files' 순서)
+            # 안내 문구를 빼고 모두 담을 때 필요한 최소 파일 수 (이론상 하한)
+            'min_files': -(-total // capacity) if capacity > 0 and total else len(parts),
+            'oversized': sum(1 for tokens in parts if tokens > self.max_tokens),
+            # 파일들의 예산 중 실제로 채운 비율 (예산을 넘은 파일은 예산만큼으로 셈)
+            'efficiency': (sum(min(tokens, self.max_tokens) for tokens in parts) / (len(parts) * self.max_tokens)
+                           if parts else 0.0),
+        }
+
+    def discard(self):
+        """쓰던 임시 파일을 지운다"""
+        if self.max_tokens is not None:
+            self._spool.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for path in [self._tmp_path] + [path for path, _ in self.regular_files[:1]]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def save_split_prompts(prompts_data_list, base_path, split_mode, target_lines_for_regular_files, find_caller_active,
+                       max_tokens=None, tokenizer=None):
     """
     프롬프트를 분할하여 저장합니다.
     
@@ -181,72 +396,31 @@ def save_split_prompts(prompts_data_list, base_path, split_mode, target_lines_fo
         split_mode (str): "lines" 또는 "caller"
         target_lines_for_regular_files (int, optional): "lines" 모드 또는 호출자 없는 파일의 목표 줄 수
         find_caller_active (bool): 호출자 분석 기능 활성화 여부
+        max_tokens (int, optional): 주면 줄 수 대신 파일당 토큰 예산으로 나눈다 (PromptFileWriter 참고)
+        tokenizer (str or callable, optional): 토큰 수 추정기 (eep_checker.tokens.get_tokenizer, 기본 approx)
         
     Returns:
         list: 저장된 파일 경로 목록
     """
-    instruction_text = """답변은 함수별로 구분된 섹션으로 작성해주세요! 5번 심각도는 1점(낮음) ~ 5점(높음)과 별모양으로 표시해 주십시오.
-    
-"""
     if not prompts_data_list:
-        # 내용이 없으면 빈 파일 하나만 만들거나, 아무것도 안 만들도록 선택 가능.
-        # 여기서는 아무것도 안 만들고 빈 리스트 반환
+        # 내용이 없으면 아무것도 안 만들고 빈 리스트 반환
         print("저장할 프롬프트 내용이 없습니다.")
         return []
 
-    # split_mode가 "lines"이고 target_lines_for_regular_files가 None이면 분할하지 않고 단일 파일로 저장
-    if split_mode == "lines" and target_lines_for_regular_files is None:
-        all_texts_combined = '\n' + '-' * 12 + '\n'.join([item['text'] for item in prompts_data_list if item['text'].strip()]) + '\n' + '-' * 12 + '\n'
-        if not all_texts_combined.strip('\n' + '-' * 12 + '\n '): # 실제 내용이 있는지 확인
-             print("저장할 프롬프트 내용이 없습니다 (공백 제외).")
-             return []
-        with open(base_path, 'w', encoding='utf-8') as f:
-            f.write(instruction_text + all_texts_combined)
-        return [base_path]
-
-    # content는 이미 prompts_data_list로 받음
-    parts = split_prompt_content(prompts_data_list, split_mode, target_lines_for_regular_files, find_caller_active)
-    
-    if not parts:
-        print("분할된 프롬프트 파트가 없습니다.")
-        return []
+    writer = PromptFileWriter(base_path, split_mode, target_lines_for_regular_files, find_caller_active,
+                              max_tokens=max_tokens, tokenizer=tokenizer)
+    for item in prompts_data_list:
+        writer.add(item['text'], item['has_callers'])
+    return writer.close()
 
-    saved_files = []
-    base_name, ext = os.path.splitext(base_path)
-    
-    # 단일 파트이고 caller 특정 파일이 아닌 경우, 원본 base_path 사용
-    if len(parts) == 1 and not parts[0][2]: # (content, prompt_count, is_caller_specific_file)
-        with open(base_path, 'w', encoding='utf-8') as f:
-            f.write(instruction_text + parts[0][0])
-        return [base_path]
-    
-    # 여러 파트이거나 caller 특정 파일인 경우, 파일명에 인덱스/타입 추가
-    caller_file_idx = 1
-    regular_file_idx = 1
-    for i, (part_content, prompt_count, is_caller_file) in enumerate(parts):
-        if not part_content.strip('\n' + '-' * 12 + '\n '): # 실제 내용이 있는지 확인
-            continue
-
-        if is_caller_file: # 호출자 관련 파일
-            part_path = f"{base_name}_caller_part{caller_file_idx}_{prompt_count}prompts{ext}"
-            caller_file_idx += 1
-        else: # 일반 분할 파일 (호출자 없거나, lines 모드)
-            part_path = f"{base_name}_part{regular_file_idx}_{prompt_count}prompts{ext}"
-            regular_file_idx += 1
-            
-        with open(part_path, 'w', encoding='utf-8') as f:
-            # 각 파트의 시작과 끝에 구분자를 이미 split_prompt_content에서 추가했으므로 여기서는 instruction_text만 추가
-            f.write(instruction_text + part_content) 
-        saved_files.append(part_path)
-    
-    return saved_files
-
-def get_analysis_stats(enum_name: str, results: list) -> dict:
+def get_analysis_stats(enum_name: str, results: list, file_infos: list = None) -> dict:
     """분석 결과의 통계 정보를 반환합니다.
     
     Args:
         enum_name (str): 분석한 ENUM 이름
         results (list): 분석 결과 리스트
+        file_infos (list, optional): 파일별 정보 딕셔너리 리스트. 결과 캐시를 사용했다면
+            캐시 적중/미스 횟수를 함께 집계합니다.
     
     Returns:
         dict: 통계 정보를 담은 딕셔너리
@@ -255,12 +429,16 @@ def get_analysis_stats(enum_name: str, results: list) -> dict:
     total_funcs = len(results)
     total_enums = sum(r['enum_count'] for r in results)
     
-    return {
+    stats = {
         'enum_name': enum_name,
         'total_files': total_files,
         'total_funcs': total_funcs,
         'total_enums': total_enums
     }
+    if file_infos and any(info.get('cache') for info in file_infos):
+        stats['cache_hits'] = sum(1 for info in file_infos if info.get('cache') == 'hit')
+        stats['cache_misses'] = sum(1 for info in file_infos if info.get('cache') == 'miss')
+    return stats
 
 def print_analysis_stats(stats: dict):
     """분석 통계를 출력합니다."""
@@ -269,6 +447,73 @@ def print_analysis_stats(stats: dict):
     print(f"함수 수: {stats['total_funcs']}")
     print(f"ENUM 사용 총 횟수: {stats['total_enums']}\n")
 
+def print_cache_stats(stats: dict):
+    """결과 캐시 적중/미스 횟수를 출력합니다 (파일 단위라 ENUM별 통계 뒤에 한 번만)."""
+    if 'cache_hits' in stats:
+        print(f"결과 캐시 (파일 단위): 적중 {stats['cache_hits']} / 미스 {stats['cache_misses']}\n")
+
+def print_prompt_packing(enum_name: str, packing: dict):
+    """토큰 예산 분할(--max-tokens) 결과를 출력합니다."""
+    print(f"\n=== {enum_name} 프롬프트 토큰 분할 ===")
+    print(f"파일당 최대 토큰: {packing['max_tokens']:,}")
+    print(f"프롬프트 {packing['prompts']}개 → 파일 {len(packing['files'])}개 (최소 {packing['min_files']}개)")
+    for path, tokens in zip(packing['files'], packing['tokens']):
+        print(f"- {os.path.basename(path)}: {tokens:,}토큰")
+    print(f"채움률: {packing['efficiency']:.1%}")
+    if packing['oversized']:
+        print(f"[Warning] 프롬프트 하나만으로 예산을 넘는 파일이 {packing['oversized']}개 있습니다.")
+    print()
+
+def print_duplicate_clusters(clusters: list, top: int = 10):
+    """여러 파일에 복사된 같은 함수 묶음(FunctionClusters.duplicates)을 출력합니다."""
+    copies = sum(c['count'] for c in clusters)
+    print("\n=== 같은 함수 묶음 ===")
+    print(f"묶음 {len(clusters)}개, 함수 {copies}개 → 프롬프트 {copies - len(clusters)}개를 줄였습니다.")
+    for c in clusters[:top]:
+        files = ', '.join(loc['file'] for loc in c['locations'][:3])
+        more = f" 외 {c['count'] - 3}곳" if c['count'] > 3 else ''
+        print(f"- {c['func_name']} ({c['enum']}) ×{c['count']}: {files}{more}")
+    if len(clusters) > top:
+        print(f"... 외 {len(clusters) - top}개 묶음 (HTML 보고서 참고)")
+    print()
+
+def get_prefilter_stats(file_infos: list) -> dict:
+    """사전 필터 통계 정보를 반환합니다.
+
+    건너뛴 파일을 실제로 파싱했다면 걸렸을 시간은 파싱한 파일들의
+    바이트당 평균 처리 시간으로 추정합니다.
+
+    Args:
+        file_infos (list): 파일별 정보 딕셔너리 리스트 ('size', 'skipped', 'elapsed')
+
+    Returns:
+        dict: 통계 정보를 담은 딕셔너리
+    """
+    skipped = [info for info in file_infos if info['skipped']]
+    parsed = [info for info in file_infos
+              if not info['skipped'] and info.get('cache') != 'hit' and info['elapsed'] > 0]
+    scan_time = sum(info['elapsed'] for info in skipped)
+    skipped_bytes = sum(info['size'] for info in skipped)
+    parsed_bytes = sum(info['size'] for info in parsed)
+    estimated_time = 0.0
+    if parsed_bytes:
+        estimated_time = skipped_bytes * sum(info['elapsed'] for info in parsed) / parsed_bytes
+
+    return {
+        'total_files': len(file_infos),
+        'skipped_files': len(skipped),
+        'skipped_bytes': skipped_bytes,
+        'scan_time': scan_time,
+        'saved_time': max(0.0, estimated_time - scan_time)
+    }
+
+def print_prefilter_stats(stats: dict):
+    """사전 필터 통계를 출력합니다."""
+    print("\n=== 사전 필터 ===")
+    print(f"건너뛴 파일 수: {stats['skipped_files']} / {stats['total_files']}")
+    print(f"건너뛴 파일 검사 시간: {stats['scan_time']:.2f}초")
+    print(f"절약한 시간 (추정): {stats['saved_time']:.2f}초\n")
+
 def remove_preprocessor_directives(code_content: str) -> str:
     """
     C 코드 내용에서 주요 전처리기 지시문 라인을 제거합니다.